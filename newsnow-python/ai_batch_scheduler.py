@@ -17,7 +17,7 @@ from datetime import datetime
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from batch_ai_processor import BatchAIProcessor
-from config.settings import LOG_LEVEL, LOG_DIR
+from config.settings import LOG_LEVEL, LOG_DIR, JOB_LEASE_SECONDS
 
 def setup_logging():
     """设置日志配置"""
@@ -48,6 +48,7 @@ def ai_batch_processing_job(logger, batch_size=5, max_batches=10):
     
     try:
         processor = BatchAIProcessor()
+        db_client = processor.db_client
         
         # 限制单次运行的批次数量，避免运行时间过长
         total_processed = 0
@@ -55,10 +56,8 @@ def ai_batch_processing_job(logger, batch_size=5, max_batches=10):
         batch_count = 0
         
         while batch_count < max_batches:
-            # 获取未分析的文章
-            from db.sqlite_client import SQLiteClient
-            db_client = SQLiteClient()
-            unanalyzed_articles = db_client.get_unprocessed_articles(limit=batch_size)
+            # 原子领取未分析的文章，其他调度器或处理进程不会领到同一批；失败的文章保留租约到过期，不会在下一批被重复领取
+            unanalyzed_articles = db_client.claim_unprocessed(processor.worker_id, batch_size, JOB_LEASE_SECONDS)
             
             if not unanalyzed_articles:
                 logger.info("✅ 没有需要分析的文章，任务完成")
@@ -67,8 +66,7 @@ def ai_batch_processing_job(logger, batch_size=5, max_batches=10):
             batch_count += 1
             logger.info(f"📦 处理第 {batch_count} 批 ({len(unanalyzed_articles)} 篇文章)...")
             
-            batch_success = 0
-            for article in unanalyzed_articles:
+            def analyze(article):
                 try:
                     article_id = article.get('id')
                     title = article.get('title', '')
@@ -83,33 +81,28 @@ def ai_batch_processing_job(logger, batch_size=5, max_batches=10):
                         search_results=[]
                     )
                     
-                    if analysis_result:
-                        # 更新数据库
-                        success = db_client.update_article_analysis(article_id, analysis_result)
-                        if success:
-                            logger.info(f"✅ 分析完成: {title[:20]}...")
-                            batch_success += 1
-                            total_success += 1
-                        else:
-                            logger.warning(f"⚠️ 保存失败: {title[:20]}...")
-                    else:
+                    if not analysis_result:
                         logger.warning(f"⚠️ 分析失败: {title[:20]}...")
+                        return False
                     
-                    total_processed += 1
-                    
-                    # 文章间短暂延迟，避免API频率过高
-                    time.sleep(3)
+                    # 更新数据库
+                    if db_client.update_article_analysis(article_id, analysis_result):
+                        logger.info(f"✅ 分析完成: {title[:20]}...")
+                        return True
+                    logger.warning(f"⚠️ 保存失败: {title[:20]}...")
+                    return False
                     
                 except Exception as e:
                     logger.error(f"❌ 处理文章异常: {e}")
-                    continue
+                    return False
             
-            logger.info(f"📊 第 {batch_count} 批完成: {batch_success}/{len(unanalyzed_articles)} 成功")
+            # 批内文章并发分析，DeepSeek 请求的速率和429退避由 api_gate 统一控制，不再固定等待
+            results = processor.executor.map(analyze, unanalyzed_articles)
+            batch_success = sum(1 for result in results if result)
+            total_success += batch_success
+            total_processed += len(unanalyzed_articles)
             
-            # 批次间延迟
-            if batch_count < max_batches and len(unanalyzed_articles) == batch_size:
-                logger.info("⏰ 等待60秒后处理下一批...")
-                time.sleep(60)
+            logger.info(f"📊 第 {batch_count} 批完成: {batch_success}/{len(unanalyzed_articles)} 成功")
         
         logger.info(f"📈 本次任务完成: 处理 {total_processed} 篇, 成功 {total_success} 篇")
         
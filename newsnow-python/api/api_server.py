@@ -7,14 +7,19 @@ API服务器 - 提供HTTP接口供前端调用
 
 import os
 import json
+import time
 import logging
+import threading
 from datetime import datetime
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 from waitress import serve
 
 # 导入配置
-from config.settings import MAX_SEARCH_RESULTS, API_HOST, API_PORT
+from config.settings import (
+    MAX_SEARCH_RESULTS, API_HOST, API_PORT, API_THREADS, SSE_MAX_CLIENTS, SSE_MAX_STREAM_SECONDS,
+    SSE_HEARTBEAT_SECONDS
+)
 
 # 修改为绝对导入路径
 import sys
@@ -23,6 +28,11 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from db.sqlite_client import SQLiteClient
 from utils.search_service import SearchService
+from utils.single_flight import single_flight_stats
+from utils.pipeline import pipeline_stats
+from utils.adaptive_schedule import AdaptiveSchedule
+from processors.flash_poller import flash_poller_stats
+from utils.event_bus import get_event_bus, start_event_tail
 from processors.search_analyzer import SearchAnalyzer
 from processors.content_quality_enhancer import ContentQualityEnhancer
 from api.news_api import register_news_routes
@@ -30,6 +40,22 @@ from api.news_api import register_news_routes
 # 创建日志记录器
 logger = logging.getLogger(__name__)
 
+
+def _sse_event(event, data, event_id=None):
+    """
+    格式化一条 SSE 事件
+    
+    Args:
+        event (str): 事件名
+        data (dict): 事件数据，以JSON发送
+        event_id (int, optional): 事件编号，客户端重连时以 Last-Event-ID 带回
+        
+    Returns:
+        str: SSE 文本
+    """
+    prefix = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{prefix}event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
 class APIServer:
     """API服务器类，提供REST API接口"""
     
@@ -62,7 +88,12 @@ class APIServer:
         self.search_analyzer = SearchAnalyzer(db_path, search_url)
         
         # 初始化内容质量增强器
-        self.content_enhancer = ContentQualityEnhancer()
+        self.content_enhancer = ContentQualityEnhancer(db_path)
+        
+        # 每个事件流连接占用一个工作线程，限制同时连接数，为普通请求保留线程
+        self._stream_slots = threading.BoundedSemaphore(SSE_MAX_CLIENTS)
+        # 抓取和调度通常在其他进程中写入数据库，事件经数据库转发到本进程的事件总线
+        self.event_tail = start_event_tail(self.db_client)
         
         # 注册路由
         self._register_routes()
@@ -177,6 +208,80 @@ class APIServer:
                 'analysis': result
             })
         
+        # 流式分析文章路由，每个分析字段生成完毕即推送
+        @self.app.route('/api/articles/<article_id>/analyze/stream', methods=['GET'])
+        def analyze_article_stream(article_id):
+            source = request.args.get('source', None)
+            
+            article = self.db_client.get_article_by_id(article_id, source)
+            if not article:
+                return jsonify({'error': '文章不存在'}), 404
+            
+            analyzer = self.search_analyzer.finance_analyzer
+            if not analyzer:
+                return jsonify({'error': 'DeepSeek分析服务未启用'}), 503
+            
+            def generate():
+                analysis = {}
+                try:
+                    fields = analyzer.analyze_market_news_stream(
+                        article.get('content') or article.get('title', ''), article.get('title')
+                    )
+                    for key, value in fields:
+                        analysis[key] = value
+                        yield _sse_event('field', {'key': key, 'value': value})
+                    yield _sse_event('done', {'article_id': article_id, 'analysis': analysis})
+                except Exception as e:
+                    logger.error(f"流式分析文章异常: {article_id} - {str(e)}")
+                    yield _sse_event('error', {'article_id': article_id, 'error': str(e)})
+            
+            return Response(generate(), mimetype='text/event-stream',
+                            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+        
+        # 快讯和分析结果的事件流：任一进程写入新快讯或分析完成后推送（延迟不超过 SSE_POLL_INTERVAL），断线重连时按 Last-Event-ID 补发
+        @self.app.route('/api/flash/stream', methods=['GET'])
+        def flash_stream():
+            last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+            try:
+                last_event_id = int(last_event_id) if last_event_id else None
+            except ValueError:
+                # 无法识别的编号无法补发，按需要 reset 处理
+                last_event_id = -1
+            types = [t for t in request.args.get('types', 'flash,analysis').split(',') if t]
+            source = request.args.get('source', None)
+            
+            if not self._stream_slots.acquire(blocking=False):
+                return jsonify({'error': '事件流连接数已达上限，请稍后重试'}), 503, {'Retry-After': '5'}
+            subscription = get_event_bus().subscribe(last_event_id, types)
+            released = []
+            
+            def cleanup():
+                if not released:
+                    released.append(True)
+                    subscription.close()
+                    self._stream_slots.release()
+            
+            def generate():
+                yield "retry: 3000\n\n"
+                if subscription.reset:
+                    # 错过的事件已无法补发，客户端应重新拉取 /api/flash，之后从该编号继续
+                    yield _sse_event('reset', {'last_event_id': last_event_id}, subscription.start_id)
+                # 连接到时断开，由客户端带 Last-Event-ID 重连，避免少数连接长期占用工作线程
+                deadline = time.time() + SSE_MAX_STREAM_SECONDS
+                while time.time() < deadline:
+                    event = subscription.get(timeout=min(SSE_HEARTBEAT_SECONDS, max(0.0, deadline - time.time())))
+                    if event is None:
+                        if subscription.closed:
+                            break
+                        yield ": heartbeat\n\n"
+                    elif not source or event['data'].get('source') == source:
+                        yield _sse_event(event['event'], event['data'], event['id'])
+            
+            response = Response(generate(), mimetype='text/event-stream',
+                                headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+            response.call_on_close(cleanup)
+            return response
+        
         # 获取快讯路由
         @self.app.route('/api/flash', methods=['GET'])
         def get_flash_news():
@@ -204,6 +309,15 @@ class APIServer:
                     'total': self.db_client.get_flash_count(),
                     'by_source': {}
                 },
+                'job_queue': self.db_client.get_job_queue_stats(),
+                'single_flight': single_flight_stats(),
+                'pipeline': pipeline_stats(),
+                # 抓取进程按各来源新条目速率学习到的抓取间隔
+                'crawl_schedule': AdaptiveSchedule(self.db_client).snapshot(),
+                # 与 API 同进程运行的快讯轮询器的入库延迟
+                'flash_poller': flash_poller_stats(),
+                'event_bus': get_event_bus().stats(),
+                'event_tail': self.event_tail.stats(),
                 'timestamp': datetime.now().isoformat()
             }
             
@@ -393,7 +507,7 @@ class APIServer:
     def run(self):
         """启动API服务器"""
         logger.info(f"API服务器正在启动，监听地址: {self.host}:{self.port}")
-        serve(self.app, host=self.host, port=self.port)
+        serve(self.app, host=self.host, port=self.port, threads=API_THREADS)
         
     def run_debug(self):
         """以调试模式启动API服务器"""
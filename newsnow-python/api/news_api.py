@@ -5,6 +5,8 @@
 新闻相关API
 """
 
+import json
+import base64
 import logging
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
@@ -18,6 +20,42 @@ from db.sqlite_client import SQLiteClient
 
 logger = logging.getLogger(__name__)
 
+
+def encode_cursor(after) -> str:
+    """
+    将 (pub_date, id) 编码为不透明的分页游标
+    
+    Args:
+        after: 上一页最后一篇文章的 (pub_date, id)
+        
+    Returns:
+        str: URL安全的游标字符串
+    """
+    raw = json.dumps(list(after), ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str):
+    """
+    解码分页游标
+    
+    Args:
+        cursor: encode_cursor 生成的游标
+        
+    Returns:
+        tuple: (pub_date, id)
+        
+    Raises:
+        ValueError: 游标格式无效
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        pub_date, article_id = json.loads(raw.decode('utf-8'))
+        return pub_date, article_id
+    except Exception:
+        raise ValueError(f"无效的分页游标: {cursor}")
+
+
 class NewsAPI:
     """新闻API处理类"""
     
@@ -31,38 +69,42 @@ class NewsAPI:
         self.db = db_client
     
     def get_news_list(self, page: int = 1, page_size: int = 10, source: str = None, 
-                      category: str = None, query: str = None) -> Dict[str, Any]:
+                      category: str = None, query: str = None,
+                      cursor: str = None) -> Dict[str, Any]:
         """
         获取新闻列表
         
+        列表按 (pub_date, id) 倒序分页。传入上一页返回的 nextCursor 时使用键集分页，
+        翻页代价与页码无关；只传 page 时退化为 OFFSET 分页，兼容旧的调用方式。
+        搜索结果按相关度排序，只支持 page 分页。
+        
         Args:
             page: 页码，从1开始
             page_size: 每页数量
             source: 来源筛选
             category: 分类筛选
             query: 搜索关键词
+            cursor: 上一页返回的 nextCursor
             
         Returns:
             Dict: 包含新闻列表和分页信息
         """
         try:
-            # 直接使用 SQLiteClient 的 get_latest_articles 方法
-            limit = page_size
             offset = (page - 1) * page_size
+            next_cursor = None
             
-            # 如果有搜索关键词，使用 search_articles 方法
             if query:
-                news_list = self.db.search_articles(query, limit=limit, source=source)
+                news_list = self.db.search_articles(query, limit=page_size, source=source,
+                                                    category=category, offset=offset)
+                total = self.db.count_search_results(query, source=source, category=category)
             else:
-                # 使用 get_latest_articles 方法
-                news_list = self.db.get_latest_articles(limit=limit, source=source)
-            
-            # 如果有分类筛选，手动过滤
-            if category and news_list:
-                news_list = [news for news in news_list if news.get('category') == category]
-            
-            # 计算总数（简化处理，实际应该从数据库获取总数）
-            total = len(news_list) * 3  # 模拟总数，实际应从数据库查询
+                after = decode_cursor(cursor) if cursor else None
+                news_list, next_after = self.db.get_articles_page(
+                    limit=page_size, source=source, category=category,
+                    after=after, offset=offset
+                )
+                next_cursor = encode_cursor(next_after) if next_after else None
+                total = self.db.get_article_total(source=source, category=category)
             
             # 计算分页信息
             total_pages = max(1, (total + page_size - 1) // page_size)
@@ -73,7 +115,8 @@ class NewsAPI:
                     'page': page,
                     'pageSize': page_size,
                     'total': total,
-                    'totalPages': total_pages
+                    'totalPages': total_pages,
+                    'nextCursor': next_cursor
                 }
             }
                 
@@ -85,7 +128,8 @@ class NewsAPI:
                     'page': page,
                     'pageSize': page_size,
                     'total': 0,
-                    'totalPages': 0
+                    'totalPages': 0,
+                    'nextCursor': None
                 }
             }
     
@@ -217,14 +261,25 @@ def register_news_routes(app, db_client):
             page_size = min(int(request.args.get('pageSize', 10)), 50)  # 限制每页最大50条
             source = request.args.get('source')
             category = request.args.get('category')
-            query = request.args.get('q')
+            query = request.args.get('q') or request.args.get('query')
+            cursor = request.args.get('cursor')
+            
+            if cursor:
+                try:
+                    decode_cursor(cursor)
+                except ValueError as e:
+                    return jsonify({
+                        'error': '参数错误',
+                        'message': str(e)
+                    }), 400
             
             result = news_api.get_news_list(
                 page=page,
                 page_size=page_size,
                 source=source,
                 category=category,
-                query=query
+                query=query,
+                cursor=cursor
             )
             
             return jsonify(result)
@@ -12,6 +12,9 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from utils.enhanced_ai_service import EnhancedFinanceAnalyzer
 from db.sqlite_client import SQLiteClient
+from utils.ai_executor import AnalysisExecutor
+from utils.job_queue import make_worker_id
+from config.settings import AI_BATCH_MAX_CHARS, JOB_LEASE_SECONDS
 
 class BatchAIProcessor:
     """批量AI分析处理器"""
@@ -19,81 +22,121 @@ class BatchAIProcessor:
     def __init__(self):
         self.analyzer = EnhancedFinanceAnalyzer()
         self.db_client = SQLiteClient()
+        self.executor = AnalysisExecutor()
+        self.worker_id = make_worker_id()
     
-    def process_unanalyzed_articles(self, batch_size=5, delay_between_batches=120):
+    def _analyze_article(self, article):
+        """
+        分析单篇文章并保存分析结果
+        
+        Args:
+            article (dict): 文章数据
+            
+        Returns:
+            bool: 是否分析并保存成功
+        """
+        try:
+            title = article.get('title', '')
+            content = article.get('content', '')
+            
+            print(f"🔍 分析文章: {title[:50]}...")
+            
+            # 执行AI分析
+            analysis_result = self.analyzer.generate_comprehensive_analysis(
+                title=title,
+                content=content,
+                search_results=[]
+            )
+            
+            # 更新数据库
+            return self._save_analysis(article, analysis_result)
+            
+        except Exception as e:
+            print(f"❌ 处理文章异常: {e}")
+            return False
+    
+    def _save_analysis(self, article, analysis_result):
+        """保存分析结果，返回是否成功"""
+        title = article.get('title', '')
+        if not analysis_result:
+            print(f"⚠️ 分析失败: {title[:30]}...")
+            return False
+        if self.db_client.update_article_analysis(article.get('id'), analysis_result):
+            print(f"✅ 分析完成: {title[:30]}...")
+            return True
+        print(f"❌ 保存失败: {title[:30]}...")
+        return False
+    
+    def _analyze_short_articles(self, articles):
+        """
+        合并分析短文章，多篇文章共用一次请求
+        
+        Args:
+            articles (list): 内容不超过 AI_BATCH_MAX_CHARS 的文章列表
+            
+        Returns:
+            list: 与 articles 顺序一致的保存结果
+        """
+        try:
+            print(f"🔍 合并分析 {len(articles)} 篇短文章...")
+            analyses = self.analyzer.generate_comprehensive_analysis_batch([
+                {'id': article.get('id'), 'title': article.get('title', ''), 'content': article.get('content', '')}
+                for article in articles
+            ])
+            return [self._save_analysis(article, analyses.get(str(article.get('id')))) for article in articles]
+        except Exception as e:
+            print(f"❌ 合并分析异常: {e}")
+            return [False] * len(articles)
+    
+    def process_unanalyzed_articles(self, batch_size=5, delay_between_batches=0, max_articles=100):
         """
         批量处理未分析的文章
         
+        每批通过 claim_unprocessed 原子领取文章，多个处理进程同时运行时不会重复分析同一篇文章。
+        分析失败的文章保留租约直到过期，本次运行不会反复领取它们。
+        
         Args:
-            batch_size (int): 每批处理的文章数量
-            delay_between_batches (int): 批次间延迟时间（秒）
+            batch_size (int): 每批处理的文章数量，批内并发分析
+            delay_between_batches (int): 批次间额外延迟时间（秒），默认不等待，请求速率由配额控制
+            max_articles (int): 本次最多处理的文章数量
         """
         print(f"🚀 开始批量AI分析处理...")
         print(f"📊 批次大小: {batch_size}, 批次间延迟: {delay_between_batches}秒")
         
         try:
-            # 获取未分析的文章
-            unanalyzed_articles = self.db_client.get_unprocessed_articles(limit=100)
-            
-            if not unanalyzed_articles:
-                print("✅ 没有需要分析的文章")
-                return
-            
-            print(f"📝 找到 {len(unanalyzed_articles)} 篇未分析的文章")
-            
-            # 分批处理
             total_processed = 0
             total_success = 0
+            batch_num = 0
             
-            for i in range(0, len(unanalyzed_articles), batch_size):
-                batch = unanalyzed_articles[i:i + batch_size]
-                batch_num = (i // batch_size) + 1
+            while total_processed < max_articles:
+                batch = self.db_client.claim_unprocessed(
+                    self.worker_id, min(batch_size, max_articles - total_processed), JOB_LEASE_SECONDS
+                )
+                if not batch:
+                    break
+                
+                if batch_num and delay_between_batches:
+                    print(f"⏰ 等待 {delay_between_batches} 秒后处理下一批...")
+                    time.sleep(delay_between_batches)
+                batch_num += 1
                 
                 print(f"\n📦 处理第 {batch_num} 批 ({len(batch)} 篇文章)...")
                 
-                batch_success = 0
-                for article in batch:
-                    try:
-                        article_id = article.get('id')
-                        title = article.get('title', '')
-                        content = article.get('content', '')
-                        
-                        print(f"🔍 分析文章: {title[:50]}...")
-                        
-                        # 执行AI分析
-                        analysis_result = self.analyzer.generate_comprehensive_analysis(
-                            title=title,
-                            content=content,
-                            search_results=[]
-                        )
-                        
-                        if analysis_result:
-                            # 更新数据库
-                            success = self.db_client.update_article_analysis(article_id, analysis_result)
-                            if success:
-                                print(f"✅ 分析完成: {title[:30]}...")
-                                batch_success += 1
-                                total_success += 1
-                            else:
-                                print(f"❌ 保存失败: {title[:30]}...")
-                        else:
-                            print(f"⚠️ 分析失败: {title[:30]}...")
-                        
-                        total_processed += 1
-                        
-                        # 文章间短暂延迟
-                        time.sleep(5)
-                        
-                    except Exception as e:
-                        print(f"❌ 处理文章异常: {e}")
-                        continue
+                # 短文章合并为一次请求，其余文章并发分析，DeepSeek 请求的速率由 api_gate 统一控制
+                short = [article for article in batch if len(article.get('content') or '') <= AI_BATCH_MAX_CHARS]
+                long = [article for article in batch if len(article.get('content') or '') > AI_BATCH_MAX_CHARS]
+                results = self.executor.map(self._analyze_article, long)
+                if short:
+                    results += self._analyze_short_articles(short)
+                batch_success = sum(1 for result in results if result)
+                total_success += batch_success
+                total_processed += len(batch)
                 
                 print(f"📊 第 {batch_num} 批完成: {batch_success}/{len(batch)} 成功")
-                
-                # 批次间延迟（除了最后一批）
-                if i + batch_size < len(unanalyzed_articles):
-                    print(f"⏰ 等待 {delay_between_batches} 秒后处理下一批...")
-                    time.sleep(delay_between_batches)
+            
+            if not total_processed:
+                print("✅ 没有需要分析的文章")
+                return
             
             print(f"\n🎉 批量处理完成!")
             print(f"📊 总计处理: {total_processed} 篇")
@@ -107,8 +150,7 @@ def main():
     """主函数"""
     processor = BatchAIProcessor()
     processor.process_unanalyzed_articles(
-        batch_size=3,  # 每批3篇文章
-        delay_between_batches=90  # 批次间等待90秒
+        batch_size=3  # 每批3篇文章
     )
 
 if __name__ == "__main__":
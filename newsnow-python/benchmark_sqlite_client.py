@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SQLite客户端微基准 - 对比每次调用新建连接与线程长连接的单次调用延迟
+
+用法:
+    python benchmark_sqlite_client.py [--rows 100000] [--calls 2000]
+"""
+
+import os
+import sys
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from db.sqlite_client import SQLiteClient
+
+
+def populate(db_client, rows):
+    """批量写入测试数据"""
+    sources = ["jin10", "gelonghui", "wallstreet", "fastbull", "cls"]
+    base_time = datetime(2025, 1, 1)
+
+    with db_client._get_connection() as conn:
+        conn.executemany(
+            '''
+            INSERT INTO articles (id, title, content, url, pub_date, source, category, summary, created_at, processed)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''',
+            (
+                (
+                    f"bench-{i}",
+                    f"测试文章 {i}",
+                    "正文内容" * 20,
+                    f"https://example.com/{i}",
+                    (base_time + timedelta(minutes=i)).isoformat(),
+                    sources[i % len(sources)],
+                    "财经",
+                    "摘要",
+                    datetime.now().isoformat(),
+                    i % 2,
+                )
+                for i in range(rows)
+            )
+        )
+
+
+def legacy_article_exists(db_path, article_id, source):
+    """原实现：每次调用都新建连接"""
+    with sqlite3.connect(db_path) as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT COUNT(*) FROM articles WHERE id = ? AND source = ?', (article_id, source))
+        return cursor.fetchone()[0] > 0
+
+
+def legacy_get_latest_articles(db_path, limit):
+    """原实现：每次调用都新建连接"""
+    with sqlite3.connect(db_path) as conn:
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        cursor.execute('SELECT * FROM articles ORDER BY pub_date DESC LIMIT ?', (limit,))
+        return [dict(row) for row in cursor.fetchall()]
+
+
+def measure(label, func, calls):
+    """执行 calls 次并返回单次调用平均延迟（微秒）"""
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    per_call = (time.perf_counter() - start) / calls * 1e6
+    print(f"  {label:<36} {per_call:10.1f} µs/次")
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SQLite客户端连接复用微基准')
+    parser.add_argument('--rows', type=int, default=100000, help='测试数据行数')
+    parser.add_argument('--calls', type=int, default=2000, help='每项测试的调用次数')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'bench.db')
+        db_client = SQLiteClient(db_path)
+
+        print(f"写入 {args.rows} 行测试数据...")
+        populate(db_client, args.rows)
+
+        sources = ["jin10", "gelonghui", "wallstreet", "fastbull", "cls"]
+
+        def random_key():
+            i = random.randrange(args.rows)
+            return f"bench-{i}", sources[i % len(sources)]
+
+        print("article_exists:")
+        before = measure("每次新建连接（原实现）", lambda: legacy_article_exists(db_path, *random_key()), args.calls)
+        after = measure("线程长连接", lambda: db_client.article_exists(*random_key()), args.calls)
+        print(f"  加速比: {before / after:.1f}x")
+
+        print("get_latest_articles(limit=20):")
+        before = measure("每次新建连接（原实现）", lambda: legacy_get_latest_articles(db_path, 20), args.calls)
+        after = measure("线程长连接", lambda: db_client.get_latest_articles(20), args.calls)
+        print(f"  加速比: {before / after:.1f}x")
+
+        db_client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@
 """
 
 import os
+import json
 from datetime import datetime
 
 # API配置
@@ -17,16 +18,91 @@ CRAWL_INTERVAL = int(os.environ.get("CRAWL_INTERVAL", "30"))  # 抓取间隔（
 PROCESS_INTERVAL = int(os.environ.get("PROCESS_INTERVAL", "15"))  # 处理间隔（分钟）
 SEARCH_INTERVAL = int(os.environ.get("SEARCH_INTERVAL", "60"))  # 搜索间隔（分钟）
 MAX_BATCH_SIZE = int(os.environ.get("MAX_BATCH_SIZE", "20"))  # 每次处理的最大文章数量
+RUNTIME_ENV_FILE = os.environ.get("RUNTIME_ENV_FILE", ".env")  # 定时任务进程监视的环境变量文件，变化时重新加载配置
 USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36"
 REQUEST_TIMEOUT = 30  # 请求超时时间（秒）
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", "5"))  # 建立连接的超时时间（秒）
+HTTP_POOL_MAXSIZE = int(os.environ.get("HTTP_POOL_MAXSIZE", "10"))  # 每个主机保持的最大连接数
+HTTP_MAX_RETRIES = int(os.environ.get("HTTP_MAX_RETRIES", "3"))  # 429/5xx 及连接错误的最大重试次数
+HTTP_BACKOFF_FACTOR = float(os.environ.get("HTTP_BACKOFF_FACTOR", "0.5"))  # 重试退避系数（秒），第n次重试等待 factor * 2^(n-1)
+CRAWL_CONCURRENT = os.environ.get("CRAWL_CONCURRENT", "True").lower() == "true"  # 是否并发抓取所有来源
+CRAWL_MAX_WORKERS = int(os.environ.get("CRAWL_MAX_WORKERS", "4"))  # 并发抓取的线程数
+CRAWL_PER_HOST_LIMIT = int(os.environ.get("CRAWL_PER_HOST_LIMIT", "1"))  # 同一主机同时进行的抓取任务数
+CRAWL_HOST_DELAY = float(os.environ.get("CRAWL_HOST_DELAY", "1.0"))  # 同一主机相邻抓取任务的最小间隔（秒）
+CRAWL_MAX_GAP_PAGES = int(os.environ.get("CRAWL_MAX_GAP_PAGES", "5"))  # 增量抓取与上次位置有缺口时最多向前翻的页数
+CRAWL_MAX_ITEM_FAILURES = int(os.environ.get("CRAWL_MAX_ITEM_FAILURES", "3"))  # 单个条目连续处理失败的次数上限，超过后抓取位置不再等待它
+CRAWL_ADAPTIVE = os.environ.get("CRAWL_ADAPTIVE", "True").lower() == "true"  # 按各来源的新条目速率自适应调整抓取间隔
+CRAWL_ADAPTIVE_MIN_INTERVAL = float(os.environ.get("CRAWL_ADAPTIVE_MIN_INTERVAL", "30"))  # 自适应抓取间隔下限（秒）
+CRAWL_ADAPTIVE_MAX_INTERVAL = float(os.environ.get("CRAWL_ADAPTIVE_MAX_INTERVAL", "3600"))  # 自适应抓取间隔上限（秒）
+CRAWL_ADAPTIVE_TARGET_NEW = float(os.environ.get("CRAWL_ADAPTIVE_TARGET_NEW", "3"))  # 每次抓取期望得到的新条目数
+CRAWL_ADAPTIVE_BACKOFF = float(os.environ.get("CRAWL_ADAPTIVE_BACKOFF", "1.5"))  # 没有新条目时抓取间隔的放大倍数
+CRAWL_ADAPTIVE_TICK = int(os.environ.get("CRAWL_ADAPTIVE_TICK", "10"))  # 检查到期来源的间隔（秒）
+ASYNC_CRAWL_MAX_CONNECTIONS = int(os.environ.get("ASYNC_CRAWL_MAX_CONNECTIONS", "200"))  # 异步抓取连接池总连接数
+ASYNC_CRAWL_PER_HOST_LIMIT = int(os.environ.get("ASYNC_CRAWL_PER_HOST_LIMIT", "8"))  # 异步抓取同一主机的并发请求数
+ASYNC_CRAWL_HOST_INTERVAL = float(os.environ.get("ASYNC_CRAWL_HOST_INTERVAL", "0.2"))  # 异步抓取同一主机相邻请求的最小间隔（秒）
+ASYNC_CRAWL_KEEPALIVE = float(os.environ.get("ASYNC_CRAWL_KEEPALIVE", "30"))  # 空闲连接保持时间（秒）
+PIPELINE_QUEUE_SIZE = int(os.environ.get("PIPELINE_QUEUE_SIZE", "32"))  # 抓取流水线各阶段之间的队列容量，队列满时上游阻塞
+PIPELINE_FETCH_WORKERS = int(os.environ.get("PIPELINE_FETCH_WORKERS", "2"))  # 流水线抓取详情页的并发数
+PIPELINE_PARSE_WORKERS = int(os.environ.get("PIPELINE_PARSE_WORKERS", "1"))  # 流水线解析详情页的并发数
+PIPELINE_ENRICH_WORKERS = int(os.environ.get("PIPELINE_ENRICH_WORKERS", "4"))  # 流水线搜索增强的并发数
+PIPELINE_ANALYZE_WORKERS = int(os.environ.get("PIPELINE_ANALYZE_WORKERS", "8"))  # 流水线AI分析的并发数
+PIPELINE_PERSIST_WORKERS = int(os.environ.get("PIPELINE_PERSIST_WORKERS", "1"))  # 流水线写入数据库的并发数
+FLASH_POLL_SOURCES = [source for source in os.environ.get(
+    "FLASH_POLL_SOURCES", "jin10,cls,gelonghui,wallstreet,fastbull"
+).split(",") if source]  # 快讯高频轮询的来源
+FLASH_POLL_INTERVAL = float(os.environ.get("FLASH_POLL_INTERVAL", "3"))  # 每个来源两次轮询的间隔（秒）
+FLASH_POLL_LIMIT = int(os.environ.get("FLASH_POLL_LIMIT", "20"))  # 每次轮询获取的快讯数量
+FLASH_POLL_MEMORY = int(os.environ.get("FLASH_POLL_MEMORY", "5000"))  # 内存中记住的最近快讯ID数量，用于去重
+FLASH_INGEST_TARGET_SECONDS = float(os.environ.get("FLASH_INGEST_TARGET_SECONDS", "9"))  # 快讯从发布到入库可见的目标延迟（秒）
 
 # AI分析配置
 ENABLE_DEEPSEEK = os.environ.get("ENABLE_DEEPSEEK", "True").lower() == "true"
 ENABLE_LOCAL_MODEL = os.environ.get("ENABLE_LOCAL_MODEL", "False").lower() == "true"
+DEEPSEEK_REQUESTS_PER_MINUTE = int(os.environ.get("DEEPSEEK_REQUESTS_PER_MINUTE", "8"))  # DeepSeek 每分钟请求数配额
+DEEPSEEK_TOKENS_PER_MINUTE = int(os.environ.get("DEEPSEEK_TOKENS_PER_MINUTE", "120000"))  # DeepSeek 每分钟令牌数配额，0 表示不限制
+AI_INITIAL_CONCURRENCY = int(os.environ.get("AI_INITIAL_CONCURRENCY", "2"))  # AI 请求初始在途数
+AI_MAX_CONCURRENCY = int(os.environ.get("AI_MAX_CONCURRENCY", "8"))  # AI 请求在途数上限，收到 429 时自动减半
+AI_ANALYSIS_WORKERS = int(os.environ.get("AI_ANALYSIS_WORKERS", "8"))  # 批量分析的并发线程数
+AI_HEDGE_ENABLED = os.environ.get("AI_HEDGE_ENABLED", "False").lower() == "true"  # 慢请求是否用空闲配额发出对冲请求（对冲请求同样计费）
+AI_HEDGE_DELAY = float(os.environ.get("AI_HEDGE_DELAY", "30"))  # 延迟样本不足时触发对冲的等待时间（秒）
+AI_HEDGE_MIN_DELAY = float(os.environ.get("AI_HEDGE_MIN_DELAY", "5"))  # 触发对冲的最短等待时间（秒）
+AI_RATE_LIMIT_BACKOFF = float(os.environ.get("AI_RATE_LIMIT_BACKOFF", "60"))  # 429 没有 Retry-After 时的最短暂停时间（秒）
+AI_CACHE_ENABLED = os.environ.get("AI_CACHE_ENABLED", "True").lower() == "true"  # 是否在数据库中缓存 AI 响应
+AI_CACHE_TTL = int(os.environ.get("AI_CACHE_TTL", "86400"))  # AI 响应缓存有效期（秒）
+AI_CACHE_MAX_ENTRIES = int(os.environ.get("AI_CACHE_MAX_ENTRIES", "50000"))  # AI 响应缓存最大条数
+AI_CACHE_MAX_BYTES = int(os.environ.get("AI_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))  # AI 响应缓存最大字节数
+AI_CACHE_EVICT_INTERVAL = int(os.environ.get("AI_CACHE_EVICT_INTERVAL", "100"))  # 每写入多少条缓存执行一次淘汰
+AI_BATCH_SIZE = int(os.environ.get("AI_BATCH_SIZE", "8"))  # 一次请求合并分析的短文章数
+AI_BATCH_MAX_CHARS = int(os.environ.get("AI_BATCH_MAX_CHARS", "600"))  # 内容不超过该长度的文章参与合并分析
+AI_BATCH_MAX_TOKENS = int(os.environ.get("AI_BATCH_MAX_TOKENS", "8000"))  # 合并分析请求的最大输出 token 数
 LOCAL_MODEL_PATH = os.environ.get("LOCAL_MODEL_PATH", "./models/analysis-model")
 
+# 任务队列配置
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", "5"))  # 任务最大尝试次数，超过后进入死信
+JOB_LEASE_SECONDS = int(os.environ.get("JOB_LEASE_SECONDS", "600"))  # 任务租约时长（秒），超时未完成可被重新领取
+JOB_BACKOFF_BASE = float(os.environ.get("JOB_BACKOFF_BASE", "60"))  # 失败重试的基础退避时间（秒），每次失败翻倍
+JOB_BACKOFF_MAX = float(os.environ.get("JOB_BACKOFF_MAX", "3600"))  # 失败重试的最长退避时间（秒）
+JOB_DONE_RETENTION = int(os.environ.get("JOB_DONE_RETENTION", "86400"))  # 已完成任务在队列中保留的时间（秒），之后清理
+JOB_SOURCE_WEIGHTS = json.loads(os.environ.get(
+    "JOB_SOURCE_WEIGHTS", '{"jin10": 3, "cls": 3, "wallstreet": 2, "gelonghui": 1, "fastbull": 1}'
+))  # 各来源的优先级权重
+JOB_RECENCY_WEIGHT = float(os.environ.get("JOB_RECENCY_WEIGHT", "10"))  # 刚发布文章的时效优先级，按半衰期递减
+JOB_RECENCY_HALF_LIFE = float(os.environ.get("JOB_RECENCY_HALF_LIFE", "6"))  # 时效优先级的半衰期（小时）
+JOB_KEYWORD_WEIGHT = float(os.environ.get("JOB_KEYWORD_WEIGHT", "5"))  # 标题包含重要关键词时增加的优先级
+JOB_PRIORITY_KEYWORDS = [keyword for keyword in os.environ.get(
+    "JOB_PRIORITY_KEYWORDS", "央行,美联储,降准,降息,加息,非农,CPI,GDP,突发,重磅,暴跌,暴涨,停牌,证监会"
+).split(",") if keyword]  # 重要关键词
+
 # 数据库配置
 DB_API_TIMEOUT = int(os.environ.get("DB_API_TIMEOUT", "30"))  # 秒
+SQLITE_BUSY_TIMEOUT = int(os.environ.get("SQLITE_BUSY_TIMEOUT", "30"))  # 等待写锁的超时时间（秒）
+SQLITE_MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))  # 内存映射大小（字节）
+SQLITE_CACHE_SIZE_KB = int(os.environ.get("SQLITE_CACHE_SIZE_KB", "65536"))  # 每个连接的页缓存大小（KB）
+SQLITE_FTS_TOKENIZER = os.environ.get("SQLITE_FTS_TOKENIZER", "trigram")  # 全文索引分词器，trigram 可处理中文
+DEDUP_FILTER_ENABLED = os.environ.get("DEDUP_FILTER_ENABLED", "True").lower() == "true"  # 查询数据库前先用布隆过滤器去重
+DEDUP_FILTER_ERROR_RATE = float(os.environ.get("DEDUP_FILTER_ERROR_RATE", "0.01"))  # 去重过滤器期望误判率
+DEDUP_FILTER_MIN_CAPACITY = int(os.environ.get("DEDUP_FILTER_MIN_CAPACITY", "100000"))  # 去重过滤器最小容量（键数）
+DEDUP_FILTER_REFRESH_INTERVAL = float(os.environ.get("DEDUP_FILTER_REFRESH_INTERVAL", "5"))  # 追赶其他进程写入的最小间隔（秒）
 
 # 日志配置
 LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
@@ -41,12 +117,22 @@ MAX_SUMMARY_LENGTH = 200  # 摘要最大长度
 SEARXNG_URL = os.environ.get("SEARXNG_URL", "http://searxng:8080")
 SEARXNG_TIMEOUT = int(os.environ.get("SEARXNG_TIMEOUT", "10"))  # 请求超时时间（秒）
 SEARCH_CACHE_TTL = int(os.environ.get("SEARCH_CACHE_TTL", "3600"))  # 缓存过期时间（秒）
+MEMORY_CACHE_MAX_ENTRIES = int(os.environ.get("MEMORY_CACHE_MAX_ENTRIES", "1000"))  # 进程内缓存默认最大条数
+MEMORY_CACHE_MAX_BYTES = int(os.environ.get("MEMORY_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))  # 进程内缓存默认最大字节数
 MAX_SEARCH_RESULTS = int(os.environ.get("MAX_SEARCH_RESULTS", "10"))  # 搜索结果数量限制
 
 # API服务器配置
 API_HOST = os.environ.get("API_HOST", "0.0.0.0")
 API_PORT = int(os.environ.get("API_PORT", "5000"))
 API_DEBUG = os.environ.get("API_DEBUG", "False").lower() == "true"
+API_THREADS = int(os.environ.get("API_THREADS", "32"))  # API 服务器的工作线程数，每个事件流连接占用一个线程
+SSE_MAX_CLIENTS = int(os.environ.get("SSE_MAX_CLIENTS", "16"))  # 同时保持的事件流连接数上限，超出时返回 503，应小于 API_THREADS
+SSE_MAX_STREAM_SECONDS = int(os.environ.get("SSE_MAX_STREAM_SECONDS", "300"))  # 单个事件流连接的最长时间（秒），到时断开由客户端带 Last-Event-ID 重连
+SSE_HEARTBEAT_SECONDS = float(os.environ.get("SSE_HEARTBEAT_SECONDS", "15"))  # 没有事件时发送心跳注释的间隔（秒）
+SSE_HISTORY_SIZE = int(os.environ.get("SSE_HISTORY_SIZE", "1000"))  # 内存中保留用于断线补发的事件数
+SSE_CLIENT_BUFFER = int(os.environ.get("SSE_CLIENT_BUFFER", "256"))  # 每个事件流连接的缓冲事件数，满时断开该连接
+SSE_POLL_INTERVAL = float(os.environ.get("SSE_POLL_INTERVAL", "1"))  # API 进程读取数据库中新事件（包括其他进程写入的）的间隔（秒）
+SSE_OUTBOX_SIZE = int(os.environ.get("SSE_OUTBOX_SIZE", "10000"))  # 数据库中保留的最近事件数，超出的旧事件在写入时删除
 ENABLE_CORS = os.environ.get("ENABLE_CORS", "True").lower() == "true"
 
 # 来源配置
@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+异步爬虫基类 - 基于 aiohttp 的共享连接池和按主机限流
+
+各爬虫的同步方法保持不变。详情页请求通过 _detail_request 描述，
+异步路径用共享的 aiohttp 会话发起请求（HTTP keep-alive、按主机限制并发和请求间隔），
+取回的响应交给同步的 get_article_detail(article_id, response=...) 解析、分析和保存，
+这部分包含阻塞调用，放在线程池中执行。
+"""
+
+import json
+import asyncio
+import logging
+import time
+from functools import partial, wraps
+from urllib.parse import urlparse
+# 修改为绝对导入路径
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import (
+    REQUEST_TIMEOUT, ASYNC_CRAWL_MAX_CONNECTIONS, ASYNC_CRAWL_PER_HOST_LIMIT,
+    ASYNC_CRAWL_HOST_INTERVAL, ASYNC_CRAWL_KEEPALIVE
+)
+from utils.single_flight import get_single_flight
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncResponse:
+    """异步请求的响应，提供与 requests.Response 相同的 status_code / text / json() 接口"""
+
+    def __init__(self, url, status_code, text, headers=None):
+        self.url = url
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class _AsyncHostLimiter:
+    """按主机限制并发请求数，并保证同一主机相邻请求至少间隔 interval 秒"""
+
+    def __init__(self, limit, interval):
+        self.limit = max(1, limit)
+        self.interval = interval
+        self._semaphores = {}
+        self._next_start = {}
+
+    async def __call__(self, host, coro_func):
+        semaphore = self._semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._semaphores[host] = asyncio.Semaphore(self.limit)
+        async with semaphore:
+            if self.interval > 0:
+                now = time.monotonic()
+                start_at = max(now, self._next_start.get(host, 0))
+                self._next_start[host] = start_at + self.interval
+                if start_at > now:
+                    await asyncio.sleep(start_at - now)
+            return await coro_func()
+
+
+def detail_flight_key(crawler, article_id):
+    """
+    文章详情的合并键，get_article_detail 和即时处理流水线共用，
+    同一篇文章无论从哪条路径进入都只处理一次
+
+    Args:
+        crawler: 爬虫实例
+        article_id: 文章ID
+
+    Returns:
+        tuple: (爬虫类名, 文章ID)
+    """
+    return type(crawler).__name__, str(article_id)
+
+
+def _coalesce_detail(method):
+    """
+    包装 get_article_detail：调度器、批量分析和 API 同时请求同一篇文章时，
+    只有一个调用真正抓取、分析和保存，其余调用等待并共享结果。
+    已带有响应对象的调用（异步路径）直接执行。
+    """
+    flight = get_single_flight("article_detail")
+
+    @wraps(method)
+    def wrapper(self, article_id, *args, **kwargs):
+        if args or kwargs.get("response") is not None:
+            return method(self, article_id, *args, **kwargs)
+        return flight.do(detail_flight_key(self, article_id), method, self, article_id, **kwargs)
+
+    return wrapper
+
+
+class AsyncCrawlerBase:
+    """
+    异步爬虫基类
+
+    同一事件循环中的所有爬虫共享一个 aiohttp 会话和按主机的限流器，
+    因此可以同时保持数百个详情请求在途，而每个主机的压力仍然受控。
+    """
+
+    # 事件循环 -> (会话, 限流器)
+    _sessions = {}
+
+    def __init_subclass__(cls, **kwargs):
+        """子类的 get_article_detail 自动合并同一篇文章的并发请求"""
+        super().__init_subclass__(**kwargs)
+        method = cls.__dict__.get("get_article_detail")
+        if method is not None:
+            cls.get_article_detail = _coalesce_detail(method)
+
+    @classmethod
+    def _get_session(cls):
+        """获取当前事件循环共享的 aiohttp 会话，首次调用时创建"""
+        loop = asyncio.get_running_loop()
+        entry = cls._sessions.get(loop)
+        if entry is None or entry[0].closed:
+            import aiohttp
+
+            connector = aiohttp.TCPConnector(
+                limit=ASYNC_CRAWL_MAX_CONNECTIONS,
+                limit_per_host=ASYNC_CRAWL_PER_HOST_LIMIT,
+                keepalive_timeout=ASYNC_CRAWL_KEEPALIVE,
+                ttl_dns_cache=300
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+            )
+            entry = (session, _AsyncHostLimiter(ASYNC_CRAWL_PER_HOST_LIMIT, ASYNC_CRAWL_HOST_INTERVAL))
+            cls._sessions[loop] = entry
+        return entry
+
+    @classmethod
+    async def close_sessions(cls):
+        """关闭当前事件循环的共享会话，应在事件循环结束前调用"""
+        entry = cls._sessions.pop(asyncio.get_running_loop(), None)
+        if entry and not entry[0].closed:
+            await entry[0].close()
+
+    async def fetch(self, method, url, **kwargs):
+        """
+        通过共享会话发起请求，受按主机的并发数和请求间隔限制
+
+        Args:
+            method (str): HTTP 方法
+            url (str): 请求地址
+            **kwargs: 传给 aiohttp 的参数，如 params、json、data
+
+        Returns:
+            AsyncResponse: 响应
+        """
+        session, limiter = self._get_session()
+        headers = kwargs.pop("headers", None) or getattr(self, "headers", None)
+
+        async def do_request():
+            async with session.request(method, url, headers=headers, **kwargs) as response:
+                text = await response.text(errors="replace")
+                return AsyncResponse(str(response.url), response.status, text, dict(response.headers))
+
+        return await limiter(urlparse(url).netloc, do_request)
+
+    def _detail_request(self, article_id):
+        """
+        描述详情页请求，支持异步抓取的爬虫需要实现
+
+        Args:
+            article_id (str): 文章ID
+
+        Returns:
+            tuple: (HTTP方法, URL, 其他请求参数字典)，不支持时返回 None
+        """
+        return None
+
+    async def get_latest_articles_async(self, **kwargs):
+        """
+        异步获取最新文章列表
+
+        列表每个来源只有一次请求，直接在线程池中复用同步实现。
+
+        Returns:
+            list: 文章列表
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, partial(self.get_latest_articles, **kwargs))
+
+    async def get_article_detail_async(self, article_id):
+        """
+        异步获取文章详情
+
+        网络请求走共享的 aiohttp 会话，解析和后续处理在线程池中执行；
+        没有实现 _detail_request 的爬虫整体在线程池中调用同步方法。
+
+        Args:
+            article_id (str): 文章ID
+
+        Returns:
+            dict: 文章详情，失败时返回 None
+        """
+        loop = asyncio.get_running_loop()
+        request = self._detail_request(article_id)
+        if request is None:
+            return await loop.run_in_executor(None, self.get_article_detail, article_id)
+
+        method, url, kwargs = request
+        try:
+            response = await self.fetch(method, url, **kwargs)
+        except Exception as e:
+            logger.error(f"异步获取文章详情异常: {article_id} {url} - {str(e)}")
+            return None
+
+        return await loop.run_in_executor(None, partial(self.get_article_detail, article_id, response=response))
@@ -9,8 +9,6 @@ import re
 import json
 import time
 import random
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime
 from urllib.parse import urljoin
 # 修改为绝对导入路径
@@ -18,9 +16,11 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from crawlers.async_base import AsyncCrawlerBase
 from config.settings import USER_AGENT, REQUEST_TIMEOUT
+from utils import http_client
 
-class CLSCrawler:
+class CLSCrawler(AsyncCrawlerBase):
     """财联社爬虫类"""
     
     def __init__(self):
@@ -57,7 +57,7 @@ class CLSCrawler:
                 "last_time": last_time
             }
             
-            response = requests.post(
+            response = http_client.post(
                 self.telegraph_api,
                 headers=self.headers,
                 json=payload,
@@ -149,7 +149,7 @@ class CLSCrawler:
             # 添加随机延迟，避免请求过快
             time.sleep(random.uniform(1, 3))
             
-            response = requests.post(
+            response = http_client.post(
                 self.article_api,
                 headers=self.headers,
                 json=payload,
@@ -239,7 +239,7 @@ class CLSCrawler:
                 "type_id": type_id
             }
             
-            response = requests.post(
+            response = http_client.post(
                 url,
                 headers=self.headers,
                 json=payload,
@@ -319,33 +319,41 @@ class CLSCrawler:
             print(f"获取财联社文章列表异常: {str(e)}")
             return []
     
-    def get_article_detail(self, article_id):
+    def _detail_request(self, article_id):
+        """详情接口请求: (HTTP方法, URL, 其他请求参数)"""
+        payload = {
+            "id": article_id,
+            "platform": "2",
+            "version": "5.11.25"
+        }
+        return "POST", self.article_api, {"json": payload}
+    
+    def get_article_detail(self, article_id, response=None):
         """
         获取文章详情
         
         Args:
             article_id (str): 文章ID
+            response (optional): 已取回的详情接口响应，异步抓取时由 get_article_detail_async 传入
             
         Returns:
             dict: 文章详情
         """
         try:
             # 构建请求数据
-            payload = {
-                "id": article_id,
-                "platform": "2",
-                "version": "5.11.25"
-            }
-            
-            # 添加随机延迟，避免请求过快
-            time.sleep(random.uniform(1, 3))
+            method, url, request_kwargs = self._detail_request(article_id)
             
-            response = requests.post(
-                self.article_api,
-                headers=self.headers,
-                json=payload,
-                timeout=REQUEST_TIMEOUT
-            )
+            if response is None:
+                # 添加随机延迟，避免请求过快
+                time.sleep(random.uniform(1, 3))
+                
+                response = http_client.request(
+                    method,
+                    url,
+                    headers=self.headers,
+                    timeout=REQUEST_TIMEOUT,
+                    **request_kwargs
+                )
             
             if response.status_code != 200:
                 print(f"获取财联社文章详情失败: HTTP {response.status_code}")
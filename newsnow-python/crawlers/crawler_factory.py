@@ -5,15 +5,11 @@
 爬虫工厂类 - 统一管理和调用不同来源的爬虫
 """
 
+import logging
 import importlib
+import threading
+from datetime import datetime
 from typing import Dict, List, Any, Optional, Type
-
-# 导入所有爬虫类
-from .jin10 import Jin10Crawler
-from .gelonghui import GelonghuiCrawler
-from .wallstreet import WallstreetCrawler  # 注意类名是 WallstreetCrawler 而不是 WallStreetCrawler
-from .fastbull import FastbullCrawler  # 注意类名是 FastbullCrawler 而不是 FastBullCrawler
-from .cls import CLSCrawler
 # 修改为绝对导入路径
 import sys
 import os
@@ -21,25 +17,40 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.settings import SOURCES
 
+logger = logging.getLogger(__name__)
+
+# 来源 -> (模块, 类名)。爬虫模块会连带导入 bs4、requests、搜索服务和 AI 分析器，
+# 因此在第一次使用某个来源时才导入并创建对应爬虫，只用到一个来源的命令行调用不必加载其他爬虫
+CRAWLER_REGISTRY = {
+    "jin10": ("crawlers.jin10", "Jin10Crawler"),
+    "gelonghui": ("crawlers.gelonghui", "GelonghuiCrawler"),
+    "wallstreet": ("crawlers.wallstreet", "WallstreetCrawler"),  # 注意类名是 WallstreetCrawler 而不是 WallStreetCrawler
+    "fastbull": ("crawlers.fastbull", "FastbullCrawler"),  # 注意类名是 FastbullCrawler 而不是 FastBullCrawler
+    "cls": ("crawlers.cls", "CLSCrawler"),
+}
+
 
 class CrawlerFactory:
-    """爬虫工厂类，负责创建和管理各种爬虫实例"""
+    """爬虫工厂类，负责按需创建和管理各种爬虫实例"""
     
     def __init__(self):
-        """初始化爬虫工厂，创建所有爬虫实例"""
+        """初始化爬虫工厂，爬虫在第一次获取时才创建"""
+        self._registry = dict(CRAWLER_REGISTRY)
         self._crawlers = {}
-        self._initialize_crawlers()
+        self._lock = threading.Lock()
     
-    def _initialize_crawlers(self):
-        """初始化所有爬虫实例"""
-        # 创建各类爬虫实例
-        self._crawlers = {
-            "jin10": Jin10Crawler(),
-            "gelonghui": GelonghuiCrawler(),
-            "wallstreet": WallstreetCrawler(),  # 修正类名
-            "fastbull": FastbullCrawler(),  # 修正类名
-            "cls": CLSCrawler()
-        }
+    def register(self, source: str, module: str, class_name: str) -> None:
+        """
+        注册爬虫，注册时不导入模块
+        
+        Args:
+            source (str): 来源标识
+            module (str): 爬虫所在模块，如 'crawlers.cls'
+            class_name (str): 爬虫类名
+        """
+        with self._lock:
+            self._registry[source.lower()] = (module, class_name)
+            self._crawlers.pop(source.lower(), None)
     
     def get_crawler(self, source: str) -> Optional[Any]:
         """
@@ -51,16 +62,32 @@ class CrawlerFactory:
         Returns:
             Any: 爬虫实例，如果找不到则返回None
         """
-        return self._crawlers.get(source.lower())
+        source = source.lower()
+        crawler = self._crawlers.get(source)
+        if crawler is not None or source not in self._registry:
+            return crawler
+        
+        with self._lock:
+            crawler = self._crawlers.get(source)
+            if crawler is None:
+                module_name, class_name = self._registry[source]
+                try:
+                    crawler_class = getattr(importlib.import_module(module_name), class_name)
+                    crawler = crawler_class()
+                except Exception as e:
+                    logger.error(f"创建爬虫 {source} ({module_name}.{class_name}) 失败: {str(e)}")
+                    return None
+                self._crawlers[source] = crawler
+            return crawler
     
     def get_all_sources(self) -> List[str]:
         """
-        获取所有支持的爬虫来源
+        获取所有支持的爬虫来源，不会创建爬虫
         
         Returns:
             List[str]: 所有支持的爬虫来源列表
         """
-        return list(self._crawlers.keys())
+        return list(self._registry.keys())
     
     def get_source_name(self, source: str) -> str:
         """
@@ -125,13 +152,90 @@ class CrawlerFactory:
             print(f"获取{source}文章详情异常: {str(e)}")
             return None
     
-    def get_news_flash(self, source: str, limit: int = 20) -> List[Dict]:
+    async def get_latest_articles_async(self, source: str, page: int = 1, limit: int = 20) -> List[Dict]:
+        """
+        异步获取指定来源的最新文章
+        
+        Args:
+            source (str): 爬虫来源标识
+            page (int): 页码
+            limit (int): 每页数量
+            
+        Returns:
+            List[Dict]: 文章列表
+        """
+        crawler = self.get_crawler(source)
+        if not crawler:
+            print(f"找不到'{source}'对应的爬虫")
+            return []
+        
+        try:
+            if source == "wallstreet":
+                # 华尔街见闻爬虫不接受page参数
+                return await crawler.get_latest_articles_async(limit=limit)
+            else:
+                return await crawler.get_latest_articles_async(page=page, limit=limit)
+        except Exception as e:
+            print(f"异步获取{source}最新文章异常: {str(e)}")
+            return []
+    
+    async def get_article_detail_async(self, source: str, article_id: str) -> Optional[Dict]:
+        """
+        异步获取指定来源的文章详情
+        
+        Args:
+            source (str): 爬虫来源标识
+            article_id (str): 文章ID
+            
+        Returns:
+            Optional[Dict]: 文章详情，如果获取失败则返回None
+        """
+        crawler = self.get_crawler(source)
+        if not crawler:
+            print(f"找不到'{source}'对应的爬虫")
+            return None
+        
+        try:
+            return await crawler.get_article_detail_async(article_id)
+        except Exception as e:
+            print(f"异步获取{source}文章详情异常: {str(e)}")
+            return None
+    
+    async def get_article_details_async(self, source: str, article_ids: List[str]) -> List[Optional[Dict]]:
+        """
+        并发获取多篇文章详情，同一主机的请求数和间隔由共享会话的限流器控制
+        
+        Args:
+            source (str): 爬虫来源标识
+            article_ids (List[str]): 文章ID列表
+            
+        Returns:
+            List[Optional[Dict]]: 与 article_ids 一一对应的文章详情，失败的为None
+        """
+        import asyncio
+        
+        return list(await asyncio.gather(
+            *(self.get_article_detail_async(source, article_id) for article_id in article_ids)
+        ))
+    
+    async def close_async(self):
+        """关闭当前事件循环中爬虫共享的 aiohttp 会话"""
+        from crawlers.async_base import AsyncCrawlerBase
+        
+        await AsyncCrawlerBase.close_sessions()
+    
+    def get_news_flash(self, source: str, limit: int = 20, before: Optional[str] = None,
+                       validator_scope: Optional[str] = None) -> List[Dict]:
         """
         获取指定来源的快讯
         
         Args:
             source (str): 爬虫来源标识
             limit (int): 获取数量
+            before (str, optional): 只获取早于该发布时间的快讯，用于向前翻页补齐缺口。
+                目前只有财联社支持，其他来源传入时返回空列表
+            validator_scope (str, optional): 条件请求的作用域，见 http_client.conditional_get。
+                每个消费者使用自己的作用域；不传时总是完整获取。财联社接口为 POST，不使用条件请求
             
         Returns:
             List[Dict]: 快讯列表
@@ -141,14 +245,23 @@ class CrawlerFactory:
             print(f"找不到'{source}'对应的爬虫")
             return []
         
+        if before and source != "cls":
+            return []
+        
         try:
             # 不同爬虫可能有不同的快讯获取方法
             if source == "jin10":
-                return crawler.get_latest_news(limit=limit)
+                return crawler.get_latest_news(limit=limit, validator_scope=validator_scope)
             elif source == "gelonghui":
-                return crawler.get_flash_news(limit=limit)
+                return crawler.get_flash_news(limit=limit, validator_scope=validator_scope)
             elif source == "cls":
-                return crawler.get_flash_list(limit=limit)
+                # 财联社接口的 last_time 为秒级时间戳，返回早于该时间的快讯
+                last_time = int(datetime.fromisoformat(before).timestamp()) if before else ""
+                return crawler.get_latest_flash(limit=limit, last_time=last_time)
+            elif source == "wallstreet":
+                return crawler.get_flash_news(limit=limit, validator_scope=validator_scope)
+            elif source == "fastbull":
+                return crawler.get_express_news(limit=limit, validator_scope=validator_scope)
             else:
                 print(f"{source}不支持获取快讯")
                 return []
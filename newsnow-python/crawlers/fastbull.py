@@ -9,7 +9,6 @@ import re
 import json
 import time
 import random
-import requests
 import logging
 from bs4 import BeautifulSoup
 from datetime import datetime
@@ -19,7 +18,9 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from crawlers.async_base import AsyncCrawlerBase
 from config.settings import USER_AGENT, REQUEST_TIMEOUT
+from utils import http_client
 from utils.search_service import SearchService
 from utils.enhanced_ai_service import EnhancedFinanceAnalyzer as FinanceAnalyzer
 from db.sqlite_client import SQLiteClient
@@ -27,7 +28,7 @@ from db.sqlite_client import SQLiteClient
 # 配置日志
 logger = logging.getLogger(__name__)
 
-class FastbullCrawler:
+class FastbullCrawler(AsyncCrawlerBase):
     """FastBull爬虫类"""
     
     def __init__(self):
@@ -47,13 +48,14 @@ class FastbullCrawler:
         self.finance_analyzer = FinanceAnalyzer()
         self.db_client = SQLiteClient()
     
-    def get_latest_articles(self, page=1, limit=20):
+    def get_latest_articles(self, page=1, limit=20, validator_scope=None):
         """
         获取最新文章
         
         Args:
             page (int): 页码
             limit (int): 每页数量
+            validator_scope (str, optional): 条件请求的作用域，见 http_client.conditional_get；不传时总是完整获取列表
             
         Returns:
             list: 文章列表
@@ -64,12 +66,17 @@ class FastbullCrawler:
             
             print(f"开始获取FastBull新闻列表: {url}")
             
-            response = requests.get(
+            response = http_client.conditional_get(
                 url,
                 headers=self.headers,
+                validator_scope=http_client.slice_scope(validator_scope, page=page, limit=limit),
                 timeout=REQUEST_TIMEOUT
             )
             
+            if response.status_code == 304:
+                # 列表自上次抓取以来没有变化，跳过解析
+                return http_client.NotModifiedList()
+            
             if response.status_code != 200:
                 print(f"获取FastBull文章列表失败: HTTP {response.status_code}")
                 return []
@@ -119,7 +126,7 @@ class FastbullCrawler:
             # 如果没有获取到新闻，尝试获取快讯
             if len(all_news) == 0:
                 print("没有获取到FastBull新闻，尝试获取快讯")
-                return self.get_express_news(page, limit)
+                return self.get_express_news(page, limit, validator_scope=validator_scope)
             
             # 分页处理
             start_index = (page - 1) * limit
@@ -128,18 +135,21 @@ class FastbullCrawler:
             
             print(f"成功获取到 {len(paginated_news)} 篇FastBull文章")
             
+            http_client.remember_validators(response)
+            
             return paginated_news
         except Exception as e:
             print(f"获取FastBull文章列表异常: {str(e)}")
             return []
     
-    def get_express_news(self, page=1, limit=20):
+    def get_express_news(self, page=1, limit=20, validator_scope=None):
         """
         获取FastBull快讯列表
         
         Args:
             page (int): 页码
             limit (int): 每页数量
+            validator_scope (str, optional): 条件请求的作用域，见 http_client.conditional_get；不传时总是完整获取列表
             
         Returns:
             list: 快讯列表
@@ -149,12 +159,17 @@ class FastbullCrawler:
             
             print(f"开始获取FastBull快讯列表: {url}")
             
-            response = requests.get(
+            response = http_client.conditional_get(
                 url,
                 headers=self.headers,
+                validator_scope=http_client.slice_scope(validator_scope, page=page, limit=limit),
                 timeout=REQUEST_TIMEOUT
             )
             
+            if response.status_code == 304:
+                # 列表自上次抓取以来没有变化，跳过解析
+                return http_client.NotModifiedList()
+            
             if response.status_code != 200:
                 print(f"获取FastBull快讯列表失败: HTTP {response.status_code}")
                 return []
@@ -214,17 +229,27 @@ class FastbullCrawler:
             
             print(f"成功获取到 {len(paginated_news)} 条FastBull快讯")
             
+            http_client.remember_validators(response)
+            
             return paginated_news
         except Exception as e:
             print(f"获取FastBull快讯列表异常: {str(e)}")
             return []
     
-    def get_article_detail(self, article_id_or_url):
+    def _detail_request(self, article_id_or_url):
+        """详情页请求: (HTTP方法, URL, 其他请求参数)"""
+        url = article_id_or_url
+        if not url.startswith("http"):
+            url = f"{self.base_url}{url}"
+        return "GET", url, {}
+    
+    def get_article_detail(self, article_id_or_url, response=None):
         """
         获取文章详情
         
         Args:
             article_id_or_url (str): 文章ID或完整URL
+            response (optional): 已取回的详情页响应，异步抓取时由 get_article_detail_async 传入
             
         Returns:
             dict: 文章详情
@@ -232,20 +257,21 @@ class FastbullCrawler:
         logger.warning(f"!!!!!!!!!! [FastBull ENTRYPOINT TEST VIA LOGGER] Entering get_article_detail for ID: {article_id_or_url} !!!!!!!!!!!")
         try:
             # 构建URL
-            url = article_id_or_url
-            if not url.startswith("http"):
-                url = f"{self.base_url}{url}"
-            
-            print(f"[FastBull Debug] Article ID: {article_id_or_url} - Starting to fetch article detail from: {url}")
-            
-            # 添加随机延迟，避免请求过快
-            time.sleep(random.uniform(1, 3))
+            method, url, request_kwargs = self._detail_request(article_id_or_url)
             
-            response = requests.get(
-                url,
-                headers=self.headers,
-                timeout=REQUEST_TIMEOUT
-            )
+            if response is None:
+                print(f"[FastBull Debug] Article ID: {article_id_or_url} - Starting to fetch article detail from: {url}")
+                
+                # 添加随机延迟，避免请求过快
+                time.sleep(random.uniform(1, 3))
+                
+                response = http_client.request(
+                    method,
+                    url,
+                    headers=self.headers,
+                    timeout=REQUEST_TIMEOUT,
+                    **request_kwargs
+                )
             
             print(f"[FastBull Debug] Article ID: {article_id_or_url} - HTTP Status: {response.status_code}")
             if response.status_code != 200:
@@ -9,7 +9,6 @@ import re
 import json
 import time
 import random
-import requests
 import logging
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
@@ -18,7 +17,9 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from crawlers.async_base import AsyncCrawlerBase
 from config.settings import USER_AGENT, REQUEST_TIMEOUT
+from utils import http_client
 from utils.search_service import SearchService
 from utils.enhanced_ai_service import EnhancedFinanceAnalyzer as FinanceAnalyzer
 from db.sqlite_client import SQLiteClient
@@ -26,7 +27,7 @@ from db.sqlite_client import SQLiteClient
 # 配置日志
 logger = logging.getLogger(__name__)
 
-class GelonghuiCrawler:
+class GelonghuiCrawler(AsyncCrawlerBase):
     """格隆汇爬虫类"""
     
     def __init__(self):
@@ -45,13 +46,14 @@ class GelonghuiCrawler:
         self.finance_analyzer = FinanceAnalyzer()
         self.db_client = SQLiteClient()
     
-    def get_latest_articles(self, page=1, limit=20):
+    def get_latest_articles(self, page=1, limit=20, validator_scope=None):
         """
         获取最新文章
         
         Args:
             page (int): 页码
             limit (int): 每页数量
+            validator_scope (str, optional): 条件请求的作用域，见 http_client.conditional_get；不传时总是完整获取列表
             
         Returns:
             list: 文章列表
@@ -60,12 +62,17 @@ class GelonghuiCrawler:
             # 使用HTML解析方式获取新闻列表
             url = f"{self.base_url}/news"
             
-            response = requests.get(
+            response = http_client.conditional_get(
                 url,
                 headers=self.headers,
+                validator_scope=http_client.slice_scope(validator_scope, page=page, limit=limit),
                 timeout=REQUEST_TIMEOUT
             )
             
+            if response.status_code == 304:
+                # 列表自上次抓取以来没有变化，跳过解析
+                return http_client.NotModifiedList()
+            
             if response.status_code != 200:
                 print(f"获取格隆汇文章列表失败: HTTP {response.status_code}")
                 return []
@@ -142,6 +149,8 @@ class GelonghuiCrawler:
                     print(f"解析格隆汇文章数据异常: {str(e)}")
                     continue
             
+            http_client.remember_validators(response)
+            
             return articles
         
         except Exception as e:
@@ -175,7 +184,7 @@ class GelonghuiCrawler:
             for test_url in possible_urls:
                 try:
                     print(f"[Gelonghui Debug] Article ID: {article_id} - Trying URL: {test_url}")
-                    test_response = requests.get(
+                    test_response = http_client.get(
                         test_url,
                         headers=self.headers,
                         timeout=REQUEST_TIMEOUT,
@@ -325,13 +334,14 @@ class GelonghuiCrawler:
             logger.error(f"获取格隆汇文章详情异常: {str(e)}")
             return None
     
-    def get_flash_news(self, page=1, limit=20):
+    def get_flash_news(self, page=1, limit=20, validator_scope=None):
         """
         获取快讯
         
         Args:
             page (int): 页码
             limit (int): 每页数量
+            validator_scope (str, optional): 条件请求的作用域，见 http_client.conditional_get；不传时总是完整获取列表
             
         Returns:
             list: 快讯列表
@@ -340,12 +350,17 @@ class GelonghuiCrawler:
             # 构建API URL
             url = f"{self.api_url}/telegraph/index?page={page}&size={limit}"
             
-            response = requests.get(
+            response = http_client.conditional_get(
                 url,
                 headers=self.headers,
+                validator_scope=validator_scope,
                 timeout=REQUEST_TIMEOUT
             )
             
+            if response.status_code == 304:
+                # 列表自上次抓取以来没有变化，跳过解析
+                return http_client.NotModifiedList()
+            
             if response.status_code != 200:
                 print(f"获取格隆汇快讯失败: HTTP {response.status_code}")
                 return []
@@ -389,6 +404,8 @@ class GelonghuiCrawler:
                     print(f"解析格隆汇快讯数据异常: {str(e)}")
                     continue
             
+            http_client.remember_validators(response)
+            
             return news_list
         
         except Exception as e:
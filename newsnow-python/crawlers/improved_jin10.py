@@ -8,9 +8,10 @@
 import json
 import time
 import random
-import requests
 from datetime import datetime
 from urllib.parse import urlencode
+from utils import http_client
+from utils.lru_cache import TTLCache
 
 class ImprovedJin10Crawler:
     """改进版金十财经爬虫"""
@@ -27,22 +28,13 @@ class ImprovedJin10Crawler:
             "Accept": "application/json, text/plain, */*",
             "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8"
         }
-        # 添加一个简单的缓存机制
-        self._cache = {}
-        self._cache_time = {}
+        # 有界的请求结果缓存
         self._cache_ttl = 300  # 缓存有效期5分钟
+        self._cache = TTLCache(ttl=self._cache_ttl)
     
     def _get_with_cache(self, cache_key, fetch_func):
         """带缓存的获取数据"""
-        current_time = time.time()
-        if cache_key in self._cache and current_time - self._cache_time.get(cache_key, 0) < self._cache_ttl:
-            return self._cache[cache_key]
-        
-        data = fetch_func()
-        if data:
-            self._cache[cache_key] = data
-            self._cache_time[cache_key] = current_time
-        return data
+        return self._cache.get_or_set(cache_key, fetch_func)
     
     def _fetch_api(self, url, params=None, headers=None):
         """请求API"""
@@ -51,7 +43,7 @@ class ImprovedJin10Crawler:
             if headers:
                 _headers.update(headers)
             
-            response = requests.get(url, params=params, headers=_headers, timeout=10)
+            response = http_client.get(url, params=params, headers=_headers, timeout=10)
             if response.status_code != 200:
                 print(f"API请求失败: {url}, 状态码: {response.status_code}")
                 return None
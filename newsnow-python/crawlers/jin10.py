@@ -9,7 +9,6 @@ import re
 import json
 import time
 import random
-import requests
 from bs4 import BeautifulSoup
 from datetime import datetime
 import traceback # Added for detailed exception logging
@@ -20,12 +19,14 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from crawlers.async_base import AsyncCrawlerBase
 from config.settings import USER_AGENT, REQUEST_TIMEOUT, MAX_SEARCH_RESULTS
+from utils import http_client
 from utils.search_service import SearchService
 from utils.enhanced_ai_service import EnhancedFinanceAnalyzer as FinanceAnalyzer
 from db.sqlite_client import SQLiteClient
 
-class Jin10Crawler:
+class Jin10Crawler(AsyncCrawlerBase):
     """金十数据爬虫类"""
     
     def __init__(self):
@@ -44,27 +45,33 @@ class Jin10Crawler:
         self.db_client = SQLiteClient()
         self.supports_immediate_processing = True
     
-    def get_latest_news(self, page=1, limit=20):
+    def get_latest_news(self, page=1, limit=20, validator_scope=None):
         """
         获取最新快讯
         
         Args:
             limit (int): 获取数量
+            validator_scope (str, optional): 条件请求的作用域，见 http_client.conditional_get；不传时总是完整获取列表
             
         Returns:
             list: 快讯列表
         """
         try:
-            # 使用时间戳确保获取最新数据
-            timestamp = int(time.time() * 1000)
-            url = f"{self.js_api}?t={timestamp}"
+            url = self.js_api
             
-            response = requests.get(
+            # 有校验信息时发送条件请求；服务器没有返回 ETag / Last-Modified 时仍附加时间戳参数确保获取最新数据
+            response = http_client.conditional_get(
                 url,
                 headers=self.headers,
+                validator_scope=http_client.slice_scope(validator_scope, page=page, limit=limit),
+                cache_buster="t",
                 timeout=REQUEST_TIMEOUT
             )
             
+            if response.status_code == 304:
+                # 列表自上次抓取以来没有变化，跳过解析
+                return http_client.NotModifiedList()
+            
             if response.status_code != 200:
                 print(f"获取金十快讯失败: HTTP {response.status_code}")
                 return []
@@ -136,32 +143,42 @@ class Jin10Crawler:
             
             print(f"成功获取到 {len(paginated_news)} 条金十数据新闻")
             
+            http_client.remember_validators(response)
+            
             return paginated_news
         
         except Exception as e:
             print(f"获取金十快讯异常: {str(e)}")
             return []
     
-    def get_latest_articles(self, page=1, limit=20):
+    def get_latest_articles(self, page=1, limit=20, validator_scope=None):
         """
         获取最新文章
         
         Args:
             page (int): 页码
             limit (int): 每页数量
+            validator_scope (str, optional): 条件请求的作用域，见 http_client.conditional_get；不传时总是完整获取列表
             
         Returns:
             list: 文章列表
         """
         # 金十数据的新实现使用JS文件获取数据，直接调用get_latest_news方法
-        return self.get_latest_news(limit=limit)
+        return self.get_latest_news(limit=limit, validator_scope=validator_scope)
     
-    def get_article_detail(self, article_id):
+    def _detail_request(self, article_id):
+        """详情页请求: (HTTP方法, URL, 其他请求参数)"""
+        return "GET", f"{self.flash_url}/detail/{article_id}", {}
+    
+    def get_article_detail(self, article_id, response=None):
         """
         获取文章详情
         
+        依次执行抓取、解析、搜索增强、AI分析和保存；ArticleCrawler 的流水线会把这些步骤拆成独立的阶段执行。
+        
         Args:
             article_id (str): 文章ID
+            response (optional): 已取回的详情页响应，异步抓取时由 get_article_detail_async 传入
             
         Returns:
             dict: 文章详情
@@ -170,180 +187,249 @@ class Jin10Crawler:
         logger.warning(f"!!!!!!!!!! [Jin10 ENTRYPOINT TEST VIA LOGGER] Entering get_article_detail for ID: {article_id} !!!!!!!!!!!")
         logger.warning("!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!")
         try:
-            url = f"{self.flash_url}/detail/{article_id}"
+            if response is None:
+                response = self.fetch_detail(article_id)
             
-            # 添加随机延迟，避免请求过快
-            time.sleep(random.uniform(1, 3))
-            
-            response = requests.get(
-                url,
-                headers=self.headers,
-                timeout=REQUEST_TIMEOUT
-            )
-            
-            print(f"[Jin10 Debug] Article ID: {article_id} - HTTP Status: {response.status_code}")
-            if response.status_code != 200:
-                print(f"[Jin10 Error] 获取金十文章详情失败: HTTP {response.status_code} for URL: {url}")
-                # print(f"[Jin10 Debug] Response content: {response.text[:500]}") # Uncomment for more detail if needed
+            article_data_raw = self.parse_detail(article_id, response)
+            if not article_data_raw:
                 return None
             
-            print(f"[Jin10 Debug] Article ID: {article_id} - Successfully fetched HTML content.")
-            soup = BeautifulSoup(response.text, "html.parser")
-            
-            # 提取文章信息
-            title_elem = soup.select_one(".content-title")
-            if not title_elem:
-                print(f"[Jin10 Error] Article ID: {article_id} - Failed to find title element (.content-title).")
-                return None
-            title = title_elem.get_text(strip=True)
-            print(f"[Jin10 Debug] Article ID: {article_id} - Extracted title: {title}")
+            searxng_results = self.enrich_article(article_data_raw)
+            analysis_data = self.analyze_article(article_data_raw, searxng_results)
+            return self.persist_article(article_data_raw, analysis_data)
 
-            # 提取内容 - 金十数据的详情页主要是图片内容
-            content_elem = soup.select_one(".content-pic")
-            if not content_elem:
-                print(f"[Jin10 Warn] Article ID: {article_id} - Failed to find content element (.content-pic). Trying alternative selectors.")
-                # 尝试其他可能的内容选择器
-                content_elem = soup.select_one(".detail-content")
-            
-            if content_elem:
-                content = content_elem.get_text(separator='\n', strip=True)
-                html_content = str(content_elem)
-            else:
-                print(f"[Jin10 Warn] Article ID: {article_id} - No content found. Using title as content.")
-                content = title
-                html_content = f"<p>{title}</p>"
-        
-            print(f"[Jin10 Debug] Article ID: {article_id} - Extracted content (first 50 chars): {content[:50]}")
-
-            # 提取发布时间
-            pub_date_elem = soup.select_one(".content-time")
-            if not pub_date_elem:
-                print(f"[Jin10 Warn] Article ID: {article_id} - Failed to find pub_date element (.content-time). Date will be current time.")
-                pub_date_text = ""
-            else:
-                pub_date_text = pub_date_elem.get_text(strip=True)
-            print(f"[Jin10 Debug] Article ID: {article_id} - Extracted pub_date_text: {pub_date_text}")
-            
-            # 尝试解析发布时间
-            pub_date = datetime.now()
+        except Exception as e:
+            print(f"获取并处理金十文章详情异常: {str(e)}")
+            # Log detailed error to DB if possible
             try:
-                if pub_date_text:
-                    # 金十数据的时间格式: "2025-06-05 周四 21:44:31"
-                    # 移除星期几部分，只保留日期和时间
-                    cleaned_time = re.sub(r'\s+周[一二三四五六日]\s+', ' ', pub_date_text)
-                    parsed_date = datetime.strptime(cleaned_time, "%Y-%m-%d %H:%M:%S")
-                    
-                    # 检查日期是否有效
-                    if parsed_date.year > 2000:
-                        pub_date = parsed_date
-                    else:
-                        print(f"解析的金十数据文章时间年份无效: {parsed_date.year}，使用当前时间")
-                else:
-                    print(f"金十数据文章时间为空，使用当前时间")
-            except Exception as e:
-                print(f"解析金十数据文章时间失败: {pub_date_text}，使用当前时间: {str(e)}")
-                # 尝试其他可能的格式
-                try:
-                    # 尝试直接解析ISO格式
-                    parsed_date = datetime.fromisoformat(pub_date_text.replace("Z", "+00:00"))
-                    if parsed_date.year > 2000:
-                        pub_date = parsed_date
-                except Exception:
-                    pass  # 使用默认的当前时间
+                self.db_client.add_article_log(article_id, 'error', f'Jin10Crawler.get_article_detail: {str(e)}')
+            except Exception as log_e:
+                print(f"记录错误日志到数据库失败: {str(log_e)}")
+            return None
+    
+    def fetch_detail(self, article_id):
+        """
+        抓取详情页
+        
+        Args:
+            article_id (str): 文章ID
             
-            # 提取文章中的第一张图片作为封面图
-            image_url = ""
-            img_elem = soup.select_one(".content-pic img")
-            if img_elem:
-                image_url = img_elem.get("src", "")
-                if not image_url.startswith("http"):
-                    image_url = f"{self.base_url}{image_url}"
+        Returns:
+            requests.Response: 详情页响应
+        """
+        method, url, request_kwargs = self._detail_request(article_id)
+        
+        # 添加随机延迟，避免请求过快
+        time.sleep(random.uniform(1, 3))
+        
+        return http_client.request(
+            method,
+            url,
+            headers=self.headers,
+            timeout=REQUEST_TIMEOUT,
+            **request_kwargs
+        )
+    
+    def parse_detail(self, article_id, response):
+        """
+        解析详情页
+        
+        Args:
+            article_id (str): 文章ID
+            response: 详情页响应
             
-            article_data_raw = {
-                "id": article_id,
-                "title": title,
-                "content": content, # Plain text content for AI analysis
-                "htmlContent": html_content, # HTML content for display or other purposes
-                "url": url,
-                "pubDate": pub_date.isoformat(),
-                "source": "Jin10",
-                "category": "财经",
-                "author": "金十数据",
-                "imageUrl": image_url,
-                "tags": [] # 金十详情页似乎没有明确标签
-            }
-
-            print(f"[Jin10 Debug] Article ID: {article_id} - Successfully extracted article data.")
-
-            # 2. Perform SearxNG search
-            logger.info(f"[Jin10] 开始为文章进行搜索增强: {title}")
-            searxng_results = self.search_service.search(query=title, max_results=MAX_SEARCH_RESULTS if MAX_SEARCH_RESULTS else 3)
-            if searxng_results:
-                logger.info(f"[Jin10] 搜索增强成功，获取到 {len(searxng_results)} 条相关信息")
-            else:
-                logger.warning(f"[Jin10] 搜索增强失败，将使用原始内容进行AI分析")
+        Returns:
+            dict: 文章数据，请求失败或页面结构不符时返回 None
+        """
+        _, url, _ = self._detail_request(article_id)
+        print(f"[Jin10 Debug] Article ID: {article_id} - HTTP Status: {response.status_code}")
+        if response.status_code != 200:
+            print(f"[Jin10 Error] 获取金十文章详情失败: HTTP {response.status_code} for URL: {url}")
+            # print(f"[Jin10 Debug] Response content: {response.text[:500]}") # Uncomment for more detail if needed
+            return None
+        
+        print(f"[Jin10 Debug] Article ID: {article_id} - Successfully fetched HTML content.")
+        soup = BeautifulSoup(response.text, "html.parser")
+        
+        # 提取文章信息
+        title_elem = soup.select_one(".content-title")
+        if not title_elem:
+            print(f"[Jin10 Error] Article ID: {article_id} - Failed to find title element (.content-title).")
+            return None
+        title = title_elem.get_text(strip=True)
+        print(f"[Jin10 Debug] Article ID: {article_id} - Extracted title: {title}")
 
-            # 3. Perform AI analysis with enriched context
-            logger.info(f"[Jin10] 开始AI分析: {title}")
-            analysis_data = self.finance_analyzer.generate_comprehensive_analysis(
-                title=article_data_raw['title'],
-                content=article_data_raw['content'], 
-                search_results=searxng_results
-            )
+        # 提取内容 - 金十数据的详情页主要是图片内容
+        content_elem = soup.select_one(".content-pic")
+        if not content_elem:
+            print(f"[Jin10 Warn] Article ID: {article_id} - Failed to find content element (.content-pic). Trying alternative selectors.")
+            # 尝试其他可能的内容选择器
+            content_elem = soup.select_one(".detail-content")
+        
+        if content_elem:
+            content = content_elem.get_text(separator='\n', strip=True)
+            html_content = str(content_elem)
+        else:
+            print(f"[Jin10 Warn] Article ID: {article_id} - No content found. Using title as content.")
+            content = title
+            html_content = f"<p>{title}</p>"
+    
+        print(f"[Jin10 Debug] Article ID: {article_id} - Extracted content (first 50 chars): {content[:50]}")
 
-            if not analysis_data or "error" in analysis_data:
-                ai_error_msg = analysis_data.get("error", "Unknown AI analysis error") if isinstance(analysis_data, dict) else "AI returned None or invalid data"
-                logger.error(f"[Jin10] AI分析失败: {title} - {ai_error_msg}")
-                
-                # Attempt to save the article without analysis data, but still mark as processed=0 (default for save_article if no analysis_data)
-                logger.info(f"[Jin10] 尝试保存文章（无AI分析）: {title}")
-                raw_article_to_save = article_data_raw.copy()
-                raw_article_to_save['processed'] = 0 # Explicitly set for clarity if save_article doesn't infer this
-                save_success_no_ai = self.db_client.save_article(raw_article_to_save, analysis_data=None) # Pass None for analysis_data
+        # 提取发布时间
+        pub_date_elem = soup.select_one(".content-time")
+        if not pub_date_elem:
+            print(f"[Jin10 Warn] Article ID: {article_id} - Failed to find pub_date element (.content-time). Date will be current time.")
+            pub_date_text = ""
+        else:
+            pub_date_text = pub_date_elem.get_text(strip=True)
+        print(f"[Jin10 Debug] Article ID: {article_id} - Extracted pub_date_text: {pub_date_text}")
+        
+        # 尝试解析发布时间
+        pub_date = datetime.now()
+        try:
+            if pub_date_text:
+                # 金十数据的时间格式: "2025-06-05 周四 21:44:31"
+                # 移除星期几部分，只保留日期和时间
+                cleaned_time = re.sub(r'\s+周[一二三四五六日]\s+', ' ', pub_date_text)
+                parsed_date = datetime.strptime(cleaned_time, "%Y-%m-%d %H:%M:%S")
                 
-                if save_success_no_ai:
-                    logger.info(f"[Jin10] 文章已保存（无AI分析），可由批处理器处理: {title}")
-                    # Return the raw data, but indicate it was NOT processed immediately with full analysis.
-                    # ArticleCrawler will see no 'processed_immediately' flag and might log it as failure for immediate processing.
-                    # SearchAnalyzer will later pick it up if it's marked as processed=0.
-                    article_data_raw['processed_immediately_ai_failed'] = True # Custom flag
-                    article_data_raw['analysis_data'] = None # Ensure no stale/error analysis data
-                    return article_data_raw # Return raw data
+                # 检查日期是否有效
+                if parsed_date.year > 2000:
+                    pub_date = parsed_date
                 else:
-                    logger.error(f"[Jin10] 保存文章失败: {title}")
-                    return None
-            
-            logger.info(f"[Jin10] AI分析成功: {title}")
-
-            # 4. Save article with analysis data (this will mark it as processed=1 by save_article)
-            logger.info(f"[Jin10] 保存文章和AI分析数据: {title}")
-            save_success_with_ai = self.db_client.save_article(article_data_raw, analysis_data)
-            if save_success_with_ai:
-                logger.info(f"[Jin10] 文章已保存并标记为已处理: {title}")
-                article_data_raw['analysis_data'] = analysis_data # Ensure analysis_data is part of the returned dict
-                article_data_raw['processed_immediately'] = True
-                return article_data_raw
+                    print(f"解析的金十数据文章时间年份无效: {parsed_date.year}，使用当前时间")
             else:
-                logger.error(f"[Jin10] 保存文章和AI分析失败，尝试仅保存文章: {title}")
-                # Attempt to save raw article without analysis if the combined save failed, mark as processed=0
-                logger.info(f"[Jin10] 尝试保存原始文章（备用方案）: {title}")
-                raw_article_to_save_fallback = article_data_raw.copy()
-                raw_article_to_save_fallback['processed'] = 0
-                save_fallback_success = self.db_client.save_article(raw_article_to_save_fallback, analysis_data=None)
-                if save_fallback_success:
-                    logger.info(f"[Jin10] 原始文章已保存（备用方案）: {title}")
-                    article_data_raw['processed_immediately_final_save_failed'] = True # Custom flag
-                    article_data_raw['analysis_data'] = None
-                    return article_data_raw # Return raw data
-                else:
-                    logger.error(f"[Jin10] 备用保存方案也失败: {title}")
-                    return None
-
+                print(f"金十数据文章时间为空，使用当前时间")
         except Exception as e:
-            print(f"获取并处理金十文章详情异常: {str(e)}")
-            # Log detailed error to DB if possible
+            print(f"解析金十数据文章时间失败: {pub_date_text}，使用当前时间: {str(e)}")
+            # 尝试其他可能的格式
             try:
-                self.db_client.add_article_log(article_id, 'error', f'Jin10Crawler.get_article_detail: {str(e)}')
-            except Exception as log_e:
-                print(f"记录错误日志到数据库失败: {str(log_e)}")
-            return None
+                # 尝试直接解析ISO格式
+                parsed_date = datetime.fromisoformat(pub_date_text.replace("Z", "+00:00"))
+                if parsed_date.year > 2000:
+                    pub_date = parsed_date
+            except Exception:
+                pass  # 使用默认的当前时间
+        
+        # 提取文章中的第一张图片作为封面图
+        image_url = ""
+        img_elem = soup.select_one(".content-pic img")
+        if img_elem:
+            image_url = img_elem.get("src", "")
+            if not image_url.startswith("http"):
+                image_url = f"{self.base_url}{image_url}"
+        
+        article_data_raw = {
+            "id": article_id,
+            "title": title,
+            "content": content, # Plain text content for AI analysis
+            "htmlContent": html_content, # HTML content for display or other purposes
+            "url": url,
+            "pubDate": pub_date.isoformat(),
+            "source": "Jin10",
+            "category": "财经",
+            "author": "金十数据",
+            "imageUrl": image_url,
+            "tags": [] # 金十详情页似乎没有明确标签
+        }
+
+        print(f"[Jin10 Debug] Article ID: {article_id} - Successfully extracted article data.")
+        return article_data_raw
+    
+    def enrich_article(self, article):
+        """
+        用文章标题搜索相关信息
+        
+        Args:
+            article (dict): 文章数据
+            
+        Returns:
+            list: 搜索结果，失败时为空
+        """
+        title = article["title"]
+        logger.info(f"[Jin10] 开始为文章进行搜索增强: {title}")
+        searxng_results = self.search_service.search(query=title, max_results=MAX_SEARCH_RESULTS if MAX_SEARCH_RESULTS else 3)
+        if searxng_results:
+            logger.info(f"[Jin10] 搜索增强成功，获取到 {len(searxng_results)} 条相关信息")
+        else:
+            logger.warning(f"[Jin10] 搜索增强失败，将使用原始内容进行AI分析")
+        return searxng_results
+    
+    def analyze_article(self, article, search_results):
+        """
+        结合搜索结果进行AI分析
+        
+        Args:
+            article (dict): 文章数据
+            search_results (list): 搜索结果
+            
+        Returns:
+            dict: 分析结果，失败时为 None 或包含 error 字段
+        """
+        logger.info(f"[Jin10] 开始AI分析: {article['title']}")
+        return self.finance_analyzer.generate_comprehensive_analysis(
+            title=article['title'],
+            content=article['content'], 
+            search_results=search_results
+        )
+    
+    def persist_article(self, article, analysis_data):
+        """
+        保存文章和分析结果，分析失败时只保存文章，留给批处理器处理
+        
+        Args:
+            article (dict): 文章数据
+            analysis_data (dict): 分析结果
+            
+        Returns:
+            dict: 文章详情，processed_immediately 表示已带分析结果保存；保存失败时返回 None
+        """
+        title = article["title"]
+        if not analysis_data or "error" in analysis_data:
+            ai_error_msg = analysis_data.get("error", "Unknown AI analysis error") if isinstance(analysis_data, dict) else "AI returned None or invalid data"
+            logger.error(f"[Jin10] AI分析失败: {title} - {ai_error_msg}")
+            
+            # Attempt to save the article without analysis data, but still mark as processed=0 (default for save_article if no analysis_data)
+            logger.info(f"[Jin10] 尝试保存文章（无AI分析）: {title}")
+            raw_article_to_save = article.copy()
+            raw_article_to_save['processed'] = 0 # Explicitly set for clarity if save_article doesn't infer this
+            save_success_no_ai = self.db_client.save_article(raw_article_to_save, analysis_data=None) # Pass None for analysis_data
+            
+            if save_success_no_ai:
+                logger.info(f"[Jin10] 文章已保存（无AI分析），可由批处理器处理: {title}")
+                # Return the raw data, but indicate it was NOT processed immediately with full analysis.
+                # ArticleCrawler will see no 'processed_immediately' flag and might log it as failure for immediate processing.
+                # SearchAnalyzer will later pick it up if it's marked as processed=0.
+                article['processed_immediately_ai_failed'] = True # Custom flag
+                article['analysis_data'] = None # Ensure no stale/error analysis data
+                return article # Return raw data
+            else:
+                logger.error(f"[Jin10] 保存文章失败: {title}")
+                return None
+        
+        logger.info(f"[Jin10] AI分析成功: {title}")
+
+        # Save article with analysis data (this will mark it as processed=1 by save_article)
+        logger.info(f"[Jin10] 保存文章和AI分析数据: {title}")
+        save_success_with_ai = self.db_client.save_article(article, analysis_data)
+        if save_success_with_ai:
+            logger.info(f"[Jin10] 文章已保存并标记为已处理: {title}")
+            article['analysis_data'] = analysis_data # Ensure analysis_data is part of the returned dict
+            article['processed_immediately'] = True
+            return article
+        else:
+            logger.error(f"[Jin10] 保存文章和AI分析失败，尝试仅保存文章: {title}")
+            # Attempt to save raw article without analysis if the combined save failed, mark as processed=0
+            logger.info(f"[Jin10] 尝试保存原始文章（备用方案）: {title}")
+            raw_article_to_save_fallback = article.copy()
+            raw_article_to_save_fallback['processed'] = 0
+            save_fallback_success = self.db_client.save_article(raw_article_to_save_fallback, analysis_data=None)
+            if save_fallback_success:
+                logger.info(f"[Jin10] 原始文章已保存（备用方案）: {title}")
+                article['processed_immediately_final_save_failed'] = True # Custom flag
+                article['analysis_data'] = None
+                return article # Return raw data
+            else:
+                logger.error(f"[Jin10] 备用保存方案也失败: {title}")
+                return None
@@ -9,7 +9,6 @@ import re
 import json
 import time
 import random
-import requests
 import logging
 from bs4 import BeautifulSoup
 from datetime import datetime
@@ -19,7 +18,9 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from crawlers.async_base import AsyncCrawlerBase
 from config.settings import USER_AGENT, REQUEST_TIMEOUT
+from utils import http_client
 from utils.search_service import SearchService
 from utils.enhanced_ai_service import EnhancedFinanceAnalyzer as FinanceAnalyzer
 from db.sqlite_client import SQLiteClient
@@ -27,7 +28,7 @@ from db.sqlite_client import SQLiteClient
 # 配置日志
 logger = logging.getLogger(__name__)
 
-class WallstreetCrawler:
+class WallstreetCrawler(AsyncCrawlerBase):
     """华尔街见闻爬虫类"""
     
     def __init__(self):
@@ -49,13 +50,14 @@ class WallstreetCrawler:
         self.finance_analyzer = FinanceAnalyzer()
         self.db_client = SQLiteClient()
     
-    def get_latest_articles(self, limit=20, channel_id="global"):
+    def get_latest_articles(self, limit=20, channel_id="global", validator_scope=None):
         """
         获取最新文章
         
         Args:
             limit (int): 获取数量
             channel_id (str): 频道ID，默认为global(全球)
+            validator_scope (str, optional): 条件请求的作用域，见 http_client.conditional_get；不传时总是完整获取列表
             
         Returns:
             list: 文章列表
@@ -70,12 +72,17 @@ class WallstreetCrawler:
             }
             url = f"{self.article_api}?{urlencode(params)}"
             
-            response = requests.get(
+            response = http_client.conditional_get(
                 url,
                 headers=self.headers,
+                validator_scope=validator_scope,
                 timeout=REQUEST_TIMEOUT
             )
             
+            if response.status_code == 304:
+                # 列表自上次抓取以来没有变化，跳过解析
+                return http_client.NotModifiedList()
+            
             if response.status_code != 200:
                 print(f"获取华尔街见闻文章列表失败: HTTP {response.status_code}")
                 return []
@@ -148,18 +155,25 @@ class WallstreetCrawler:
                     print(f"解析华尔街见闻文章数据异常: {str(e)}")
                     continue
             
+            http_client.remember_validators(response)
+            
             return articles
         
         except Exception as e:
             print(f"获取华尔街见闻文章列表异常: {str(e)}")
             return []
     
-    def get_article_detail(self, article_id):
+    def _detail_request(self, article_id):
+        """详情页请求: (HTTP方法, URL, 其他请求参数)，extract=1 提取完整内容"""
+        return "GET", f"{self.article_api}/{article_id}", {"params": {"extract": "1"}}
+    
+    def get_article_detail(self, article_id, response=None):
         """
         获取文章详情
         
         Args:
             article_id (str): 文章ID
+            response (optional): 已取回的详情API响应，异步抓取时由 get_article_detail_async 传入
             
         Returns:
             dict: 文章详情
@@ -167,22 +181,21 @@ class WallstreetCrawler:
         logger.warning(f"!!!!!!!!!! [Wallstreet ENTRYPOINT TEST VIA LOGGER] Entering get_article_detail for ID: {article_id} !!!!!!!!!!!")
         try:
             # 构建API URL，添加必需的extract参数
-            params = {
-                "extract": "1"  # 提取完整内容
-            }
-            url = f"{self.article_api}/{article_id}"
-            
-            print(f"[Wallstreet Debug] Article ID: {article_id} - Starting to fetch article detail from: {url}")
+            method, url, request_kwargs = self._detail_request(article_id)
             
-            # 添加随机延迟，避免请求过快
-            time.sleep(random.uniform(1, 3))
-            
-            response = requests.get(
-                url,
-                headers=self.headers,
-                params=params,
-                timeout=REQUEST_TIMEOUT
-            )
+            if response is None:
+                print(f"[Wallstreet Debug] Article ID: {article_id} - Starting to fetch article detail from: {url}")
+                
+                # 添加随机延迟，避免请求过快
+                time.sleep(random.uniform(1, 3))
+                
+                response = http_client.request(
+                    method,
+                    url,
+                    headers=self.headers,
+                    timeout=REQUEST_TIMEOUT,
+                    **request_kwargs
+                )
             
             print(f"[Wallstreet Debug] Article ID: {article_id} - HTTP Status: {response.status_code}")
             if response.status_code != 200:
@@ -312,12 +325,13 @@ class WallstreetCrawler:
             logger.error(f"获取华尔街见闻文章详情异常: {str(e)}")
             return None
     
-    def get_flash_news(self, limit=20):
+    def get_flash_news(self, limit=20, validator_scope=None):
         """
         获取快讯
         
         Args:
             limit (int): 获取数量
+            validator_scope (str, optional): 条件请求的作用域，见 http_client.conditional_get；不传时总是完整获取列表
             
         Returns:
             list: 快讯列表
@@ -331,12 +345,17 @@ class WallstreetCrawler:
             }
             url = f"{self.flash_api}?{urlencode(params)}"
             
-            response = requests.get(
+            response = http_client.conditional_get(
                 url,
                 headers=self.headers,
+                validator_scope=validator_scope,
                 timeout=REQUEST_TIMEOUT
             )
             
+            if response.status_code == 304:
+                # 列表自上次抓取以来没有变化，跳过解析
+                return http_client.NotModifiedList()
+            
             if response.status_code != 200:
                 print(f"获取华尔街见闻快讯失败: HTTP {response.status_code}")
                 return []
@@ -387,6 +406,8 @@ class WallstreetCrawler:
                     print(f"解析华尔街见闻快讯数据异常: {str(e)}")
                     continue
             
+            http_client.remember_validators(response)
+            
             return news_list
         
         except Exception as e:
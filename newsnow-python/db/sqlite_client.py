@@ -9,7 +9,9 @@ import os
 import sqlite3
 import json
 import time
+import atexit
 import logging
+import threading
 from datetime import datetime
 from pathlib import Path
 # 修改为绝对导入路径
@@ -17,10 +19,347 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from config.settings import SOURCES
+from config.settings import (
+    SOURCES, SQLITE_BUSY_TIMEOUT, SQLITE_MMAP_SIZE, SQLITE_CACHE_SIZE_KB, SQLITE_FTS_TOKENIZER, SSE_OUTBOX_SIZE
+)
 
 logger = logging.getLogger(__name__)
 
+
+class _ConnectionManager:
+    """按数据库文件管理各线程的长连接，同一线程内复用同一个连接"""
+    
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = {}  # 线程ID -> (线程对象, 连接)
+        self._generation = 0
+        # 本进程是否已对该文件建表和迁移
+        self.schema_ready = False
+    
+    def get(self):
+        """获取当前线程的连接，不存在或已被关闭时重新创建"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            if self._local.generation == self._generation:
+                return conn
+            # close_all 之后由所属线程自己关闭旧连接，避免关闭其他线程正在使用的连接
+            self._local.conn = None
+            self._close_connection(conn)
+        
+        conn = self._open()
+        with self._lock:
+            self._prune_dead_threads()
+            current = threading.current_thread()
+            self._connections[current.ident] = (current, conn)
+            self._local.conn = conn
+            self._local.generation = self._generation
+        return conn
+    
+    def _open(self):
+        """创建新连接并设置性能相关的PRAGMA"""
+        # 连接只在创建它的线程中使用，关闭时可能来自其他线程，因此关闭同线程检查
+        conn = sqlite3.connect(self.db_path, timeout=SQLITE_BUSY_TIMEOUT, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA mmap_size={int(SQLITE_MMAP_SIZE)}')
+        conn.execute(f'PRAGMA cache_size=-{int(SQLITE_CACHE_SIZE_KB)}')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        return conn
+    
+    def _prune_dead_threads(self):
+        """关闭已退出线程遗留的连接（调用方需持有锁）"""
+        for ident, (thread, conn) in list(self._connections.items()):
+            if not thread.is_alive():
+                self._close_connection(conn)
+                del self._connections[ident]
+    
+    def close_all(self):
+        """
+        关闭当前线程和已退出线程的连接，其他线程的连接在其下次使用时由该线程自己关闭并重建
+        
+        连接可能正被其他线程使用（如正在执行的查询），从这里关闭会让对方的操作中途失败，
+        因此只递增代数，由各线程在 get() 中发现代数变化后自行处理。
+        
+        Returns:
+            int: 本次关闭的连接数
+        """
+        current = threading.current_thread().ident
+        with self._lock:
+            self._generation += 1
+            self.schema_ready = False
+            connections = []
+            for ident, (thread, conn) in list(self._connections.items()):
+                if ident == current or not thread.is_alive():
+                    connections.append(conn)
+                    del self._connections[ident]
+            if getattr(self._local, 'conn', None) is not None:
+                self._local.conn = None
+        
+        for conn in connections:
+            self._close_connection(conn)
+        return len(connections)
+    
+    @staticmethod
+    def _close_connection(conn):
+        """关闭单个连接，关闭前执行 PRAGMA optimize 更新统计信息"""
+        try:
+            conn.execute('PRAGMA optimize')
+            conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"关闭数据库连接异常: {str(e)}")
+
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def _get_connection_manager(db_path):
+    """获取数据库文件对应的连接管理器，同一文件的所有客户端共享"""
+    key = db_path if db_path == ':memory:' else os.path.abspath(db_path)
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = _ConnectionManager(db_path)
+            _managers[key] = manager
+        return manager
+
+
+def close_all_connections():
+    """关闭当前线程和已退出线程在所有数据库文件上的长连接，进程退出时自动调用"""
+    with _managers_lock:
+        managers = list(_managers.values())
+    
+    closed = 0
+    for manager in managers:
+        closed += manager.close_all()
+    if closed:
+        logger.info(f"已关闭 {closed} 个SQLite连接")
+
+
+atexit.register(close_all_connections)
+
+
+# 全文检索 bm25 各列权重: title, content, summary
+FTS_BM25_WEIGHTS = (10.0, 1.0, 3.0)
+
+# 数据库迁移列表: (版本号, SQL语句列表)，版本号必须递增，已发布的迁移不要修改
+SCHEMA_MIGRATIONS = [
+    (1, [
+        # 单列的 source / processed 索引是下面组合索引的前缀，删除以减少写放大
+        'DROP INDEX IF EXISTS idx_articles_source',
+        'DROP INDEX IF EXISTS idx_articles_processed',
+        'DROP INDEX IF EXISTS idx_flash_source',
+        'CREATE INDEX IF NOT EXISTS idx_articles_pub_date ON articles (pub_date)',
+        'CREATE INDEX IF NOT EXISTS idx_flash_pub_date ON flash_news (pub_date)',
+        # article_exists / update_article 等按 (id, source) 查询，组合索引可直接覆盖
+        'CREATE UNIQUE INDEX IF NOT EXISTS idx_articles_id_source ON articles (id, source)',
+        'CREATE INDEX IF NOT EXISTS idx_articles_url ON articles (url)',
+        'CREATE INDEX IF NOT EXISTS idx_articles_source_pub_date ON articles (source, pub_date)',
+        # 待处理 / 待增强队列: WHERE processed = 0 [AND source = ?] ORDER BY pub_date DESC
+        'CREATE INDEX IF NOT EXISTS idx_articles_processed_pub_date ON articles (processed, pub_date)',
+        'CREATE INDEX IF NOT EXISTS idx_articles_processed_source_pub_date ON articles (processed, source, pub_date)',
+        'CREATE INDEX IF NOT EXISTS idx_articles_quality_pub_date ON articles (quality_enhanced, pub_date)',
+        'CREATE INDEX IF NOT EXISTS idx_articles_quality_source_pub_date ON articles (quality_enhanced, source, pub_date)',
+        'CREATE INDEX IF NOT EXISTS idx_articles_created_at ON articles (created_at)',
+        'CREATE INDEX IF NOT EXISTS idx_flash_source_pub_date ON flash_news (source, pub_date)',
+    ]),
+    (2, [
+        # 文章全文索引（外部内容表，只存索引不存原文），由触发器与 articles 保持同步
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+            title, content, summary,
+            content='articles', content_rowid='rowid',
+            tokenize='{SQLITE_FTS_TOKENIZER}'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS articles_fts_ai AFTER INSERT ON articles BEGIN
+            INSERT INTO articles_fts (rowid, title, content, summary)
+            VALUES (new.rowid, new.title, new.content, new.summary);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS articles_fts_ad AFTER DELETE ON articles BEGIN
+            INSERT INTO articles_fts (articles_fts, rowid, title, content, summary)
+            VALUES ('delete', old.rowid, old.title, old.content, old.summary);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS articles_fts_au AFTER UPDATE OF title, content, summary ON articles BEGIN
+            INSERT INTO articles_fts (articles_fts, rowid, title, content, summary)
+            VALUES ('delete', old.rowid, old.title, old.content, old.summary);
+            INSERT INTO articles_fts (rowid, title, content, summary)
+            VALUES (new.rowid, new.title, new.content, new.summary);
+        END
+        """,
+        # 设置默认排序函数，使 ORDER BY rank 由FTS5内部完成，无需临时排序
+        "INSERT INTO articles_fts (articles_fts, rank) VALUES ('rank', 'bm25({})')".format(
+            ', '.join(str(w) for w in FTS_BM25_WEIGHTS)
+        ),
+        # 为已有文章建立索引
+        "INSERT INTO articles_fts (articles_fts) VALUES ('rebuild')",
+    ]),
+    (3, [
+        # 键集分页按 (pub_date, id) 排序，替换原来只含 pub_date 的索引
+        'DROP INDEX IF EXISTS idx_articles_pub_date',
+        'DROP INDEX IF EXISTS idx_articles_source_pub_date',
+        'CREATE INDEX IF NOT EXISTS idx_articles_pub_date_id ON articles (pub_date, id)',
+        'CREATE INDEX IF NOT EXISTS idx_articles_source_pub_date_id ON articles (source, pub_date, id)',
+        'CREATE INDEX IF NOT EXISTS idx_articles_category_pub_date_id ON articles (category, pub_date, id)',
+        # 按 (source, category) 维护的文章计数，分页总数直接读取，无需 COUNT(*) 扫描
+        """
+        CREATE TABLE IF NOT EXISTS article_counts (
+            source TEXT NOT NULL,
+            category TEXT NOT NULL,
+            total INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (source, category)
+        )
+        """,
+        """
+        INSERT OR REPLACE INTO article_counts (source, category, total)
+        SELECT COALESCE(source, ''), COALESCE(category, ''), COUNT(*) FROM articles
+        GROUP BY COALESCE(source, ''), COALESCE(category, '')
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS article_counts_ai AFTER INSERT ON articles BEGIN
+            INSERT INTO article_counts (source, category, total)
+            VALUES (COALESCE(new.source, ''), COALESCE(new.category, ''), 1)
+            ON CONFLICT (source, category) DO UPDATE SET total = total + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS article_counts_ad AFTER DELETE ON articles BEGIN
+            UPDATE article_counts SET total = total - 1
+            WHERE source = COALESCE(old.source, '') AND category = COALESCE(old.category, '');
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS article_counts_au AFTER UPDATE OF source, category ON articles
+        WHEN COALESCE(old.source, '') != COALESCE(new.source, '')
+          OR COALESCE(old.category, '') != COALESCE(new.category, '')
+        BEGIN
+            UPDATE article_counts SET total = total - 1
+            WHERE source = COALESCE(old.source, '') AND category = COALESCE(old.category, '');
+            INSERT INTO article_counts (source, category, total)
+            VALUES (COALESCE(new.source, ''), COALESCE(new.category, ''), 1)
+            ON CONFLICT (source, category) DO UPDATE SET total = total + 1;
+        END
+        """,
+    ]),
+    (4, [
+        # 列表接口的 ETag / Last-Modified，用于条件请求
+        """
+        CREATE TABLE IF NOT EXISTS http_validators (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            updated_at TEXT
+        )
+        """,
+    ]),
+    (5, [
+        # 每个来源已抓取到的最新位置，增量抓取时只保留比它更新的条目
+        """
+        CREATE TABLE IF NOT EXISTS crawl_cursors (
+            source TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            last_id TEXT,
+            last_time TEXT,
+            updated_at TEXT,
+            PRIMARY KEY (source, kind)
+        )
+        """,
+    ]),
+    (6, [
+        # AI 响应缓存，键为模型、提示词版本和规范化内容的哈希，多个进程共享
+        """
+        CREATE TABLE IF NOT EXISTS ai_response_cache (
+            key TEXT PRIMARY KEY,
+            model TEXT,
+            response TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            hits INTEGER NOT NULL DEFAULT 0,
+            created_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        )
+        """,
+        'CREATE INDEX IF NOT EXISTS idx_ai_response_cache_accessed_at ON ai_response_cache(accessed_at)',
+    ]),
+    (7, [
+        # 持久化任务队列：按优先级领取，租约过期后可被其他进程重新领取，失败按退避重试，超过次数进入死信
+        """
+        CREATE TABLE IF NOT EXISTS job_queue (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            article_id TEXT NOT NULL,
+            source TEXT NOT NULL DEFAULT '',
+            priority REAL NOT NULL DEFAULT 0,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL,
+            available_at REAL NOT NULL,
+            lease_owner TEXT,
+            lease_expires_at REAL,
+            last_error TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL,
+            UNIQUE (kind, article_id, source)
+        )
+        """,
+        'CREATE INDEX IF NOT EXISTS idx_job_queue_claim ON job_queue (kind, status, priority)',
+    ]),
+    (8, [
+        # 未处理文章的领取租约：领取者写入 claimed_by，租约过期前其他进程不会领取同一篇文章
+        'ALTER TABLE articles ADD COLUMN claimed_by TEXT',
+        'ALTER TABLE articles ADD COLUMN claim_expires_at REAL',
+    ]),
+    (9, [
+        # 自适应抓取调度：每个来源和抓取类型学习到的新条目速率和抓取间隔，多个进程共享
+        """
+        CREATE TABLE IF NOT EXISTS crawl_schedule (
+            source TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            interval REAL NOT NULL,
+            rate REAL,
+            last_new INTEGER,
+            last_crawl_at REAL,
+            next_due_at REAL,
+            updated_at TEXT,
+            PRIMARY KEY (source, kind)
+        )
+        """,
+    ]),
+    (10, [
+        # 事件流的发件箱：写入新快讯和分析结果的进程在这里追加事件，API 进程按 id 读取后推送，
+        # 抓取和调度在独立进程中运行时客户端同样能收到事件
+        """
+        CREATE TABLE IF NOT EXISTS stream_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            type TEXT NOT NULL,
+            data TEXT NOT NULL,
+            created_at REAL NOT NULL
+        )
+        """,
+    ]),
+]
+
+# 可选迁移: 失败时（例如SQLite未编译FTS5或不支持 trigram 分词器）跳过并继续执行后续迁移
+# 版本 2 的全文索引缺失时检索回退到 LIKE，可在升级SQLite后用 rebuild_search_index 补建
+OPTIONAL_MIGRATIONS = {2}
+
+# 任务类型 -> articles 中表示该任务已完成的列
+JOB_DONE_COLUMNS = {
+    'analyze': 'processed',
+    'enhance': 'quality_enhanced',
+}
+
+# trigram 分词器无法匹配少于3个字符的词，这类查询回退到 LIKE
+FTS_MIN_TERM_LENGTH = 3 if SQLITE_FTS_TOKENIZER.split()[0] == 'trigram' else 1
+
+
 class SQLiteClient:
     """SQLite数据库客户端类"""
     
@@ -39,12 +378,31 @@ class SQLiteClient:
             db_path = os.path.join(data_dir, 'newsnow.db')
         
         self.db_path = db_path
-        self._init_db()
-        logger.info(f"SQLite数据库初始化完成: {db_path}")
+        self._connections = _get_connection_manager(db_path)
+        # 同一文件在进程内只需建表和迁移一次，之后创建的客户端直接复用
+        if not self._connections.schema_ready:
+            self._init_db()
+            self._connections.schema_ready = db_path != ':memory:'
+            logger.info(f"SQLite数据库初始化完成: {db_path}")
+    
+    def _get_connection(self):
+        """
+        获取当前线程的长连接
+        
+        连接在同一线程内复用，可直接用于 with 语句：成功时提交，异常时回滚，但不会关闭连接。
+        
+        Returns:
+            sqlite3.Connection: 数据库连接
+        """
+        return self._connections.get()
+    
+    def close(self):
+        """关闭当前线程在该数据库文件上的长连接，其他线程的连接在其下次使用时重建"""
+        self._connections.close_all()
     
     def _init_db(self):
         """初始化数据库表结构"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._get_connection() as conn:
             cursor = conn.cursor()
             
             # 创建文章表
@@ -107,14 +465,85 @@ class SQLiteClient:
             )
             ''')
             
-            # 创建索引
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_articles_source ON articles (source)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_articles_processed ON articles (processed)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_articles_pub_date ON articles (pub_date)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_flash_source ON flash_news (source)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_flash_pub_date ON flash_news (pub_date)')
-            
             conn.commit()
+        
+        self._migrate()
+    
+    def _migrate(self):
+        """
+        按版本号执行数据库迁移，当前版本记录在 PRAGMA user_version 中。
+        每个迁移在单独的事务中执行，失败时回滚且版本号不变。
+        可选迁移失败时记录警告并跳过，必需迁移失败时抛出异常，避免在缺少表或列的数据库上继续运行。
+        """
+        with self._get_connection() as conn:
+            current_version = conn.execute('PRAGMA user_version').fetchone()[0]
+        
+        for version, statements in SCHEMA_MIGRATIONS:
+            if version <= current_version:
+                continue
+            
+            try:
+                applied = self._apply_migration(version, statements)
+            except sqlite3.Error as e:
+                if version not in OPTIONAL_MIGRATIONS:
+                    logger.error(f"数据库迁移到版本 {version} 失败: {str(e)}")
+                    raise
+                # 只跳过该迁移本身，版本号照常推进，后续迁移继续执行
+                logger.warning(f"可选的数据库迁移 {version} 失败，已跳过，全文检索将回退到 LIKE: {str(e)}")
+                applied = self._apply_migration(version, [])
+            
+            if applied:
+                logger.info(f"数据库迁移到版本 {version}: {self.db_path}")
+    
+    def _apply_migration(self, version, statements):
+        """
+        在一个事务中执行迁移语句并将版本号更新为 version
+        
+        Returns:
+            bool: 是否执行，其他进程已完成同一迁移时返回 False
+        """
+        with self._get_connection() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            # 其他进程可能已经完成了同一迁移
+            if conn.execute('PRAGMA user_version').fetchone()[0] >= version:
+                return False
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f'PRAGMA user_version = {int(version)}')
+        return True
+    
+    def _has_search_index(self):
+        """检查全文索引表是否存在"""
+        with self._get_connection() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'articles_fts'"
+            ).fetchone()
+            return row is not None
+    
+    def rebuild_search_index(self):
+        """
+        根据 articles 表重建全文索引，用于修复索引或为旧数据库补建索引
+        
+        Returns:
+            bool: 是否重建成功
+        """
+        try:
+            if not self._has_search_index():
+                # 建库时跳过了全文索引迁移（见 OPTIONAL_MIGRATIONS），在当前SQLite上重新创建
+                with self._get_connection() as conn:
+                    for statement in dict(SCHEMA_MIGRATIONS)[2]:
+                        conn.execute(statement)
+            
+            with self._get_connection() as conn:
+                conn.execute("INSERT INTO articles_fts (articles_fts) VALUES ('rebuild')")
+                conn.execute("INSERT INTO articles_fts (articles_fts) VALUES ('optimize')")
+            
+            logger.info(f"全文索引重建完成: {self.db_path}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"重建全文索引异常: {str(e)}")
+            return False
     
     def save_article(self, article, analysis_data=None):
         """
@@ -136,7 +565,7 @@ class SQLiteClient:
                 return self.update_article(article, analysis_data)
 
             # Article does not exist, insert new
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 
                 processed_status = 1 if analysis_data else 0
@@ -185,6 +614,8 @@ class SQLiteClient:
                 
                 conn.commit()
                 logger.info(f"保存新文章成功: [{source}] {article.get('title')} (ID: {article_id}), Processed: {bool(processed_status)}")
+                if analysis_data:
+                    self._publish_analysis(article_id, source, article.get('title', ''))
                 return True
             
         except Exception as e:
@@ -208,7 +639,7 @@ class SQLiteClient:
             article_id = article.get('id')
             source = article.get('source', '')
             
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 log_message_suffix = ""
 
@@ -281,6 +712,8 @@ class SQLiteClient:
 
                 conn.commit()
                 logger.info(f"更新文章成功: [{source}] {article.get('title')} (ID: {article_id}){log_message_suffix}")
+                if analysis_data and cursor.rowcount > 0:
+                    self._publish_analysis(article_id, source, article.get('title', ''))
                 return True
             
         except Exception as e:
@@ -305,14 +738,10 @@ class SQLiteClient:
             if self.flash_exists(news_id, source):
                 return True  # 快讯已存在，无需重复保存
             
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 
-                cursor.execute('''
-                INSERT INTO flash_news (
-                    id, title, content, url, pub_date, source, created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
+                row = (
                     news.get('id', ''),
                     news.get('title', ''),
                     news.get('content', ''),
@@ -320,16 +749,303 @@ class SQLiteClient:
                     news.get('pubDate', ''),
                     news.get('source', ''),
                     datetime.now().isoformat()
-                ))
+                )
+                cursor.execute('''
+                INSERT INTO flash_news (
+                    id, title, content, url, pub_date, source, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', row)
                 
                 conn.commit()
                 logger.info(f"保存快讯成功: [{source}] {news.get('title')} (ID: {news_id})")
+                self._publish_flash([row])
                 return True
                 
         except Exception as e:
             logger.error(f"保存快讯异常: {str(e)}")
             return False
     
+    def _publish_flash(self, rows):
+        """提交后把新增的快讯写入事件发件箱，rows 为 flash_news 的插入参数"""
+        self.add_stream_events([
+            ("flash", {
+                "id": news_id, "title": title, "content": content, "url": url,
+                "pubDate": pub_date, "source": source, "created_at": created_at
+            })
+            for news_id, title, content, url, pub_date, source, created_at in rows
+        ])
+    
+    def _publish_analysis(self, article_id, source, title):
+        """提交后写入文章分析完成事件，客户端按 ID 获取分析详情"""
+        self.add_stream_events([("analysis", {"id": article_id, "source": source, "title": title})])
+    
+    def add_stream_events(self, events):
+        """
+        追加事件到发件箱，只保留最近 SSE_OUTBOX_SIZE 个
+        
+        Args:
+            events (list): (事件类型, 事件内容) 列表，内容需可序列化为 JSON
+            
+        Returns:
+            int: 写入的事件数
+        """
+        if not events:
+            return 0
+        try:
+            now = time.time()
+            with self._get_connection() as conn:
+                conn.executemany(
+                    'INSERT INTO stream_events (type, data, created_at) VALUES (?, ?, ?)',
+                    [(event_type, json.dumps(data, ensure_ascii=False), now) for event_type, data in events]
+                )
+                conn.execute(
+                    'DELETE FROM stream_events WHERE id <= (SELECT MAX(id) FROM stream_events) - ?',
+                    (SSE_OUTBOX_SIZE,)
+                )
+            return len(events)
+            
+        except Exception as e:
+            logger.error(f"写入事件异常: {str(e)}")
+            return 0
+    
+    def get_stream_events(self, after_id, limit=500):
+        """
+        读取发件箱中编号大于 after_id 的事件
+        
+        Args:
+            after_id (int): 已读取的最后一个事件编号
+            limit (int): 数量限制
+            
+        Returns:
+            list: 按编号递增的事件 {"id", "event", "data"}
+        """
+        try:
+            with self._get_connection() as conn:
+                rows = conn.execute(
+                    'SELECT id, type, data FROM stream_events WHERE id > ? ORDER BY id LIMIT ?', (after_id, limit)
+                ).fetchall()
+                return [{"id": row[0], "event": row[1], "data": json.loads(row[2])} for row in rows]
+                
+        except Exception as e:
+            logger.error(f"读取事件异常: {str(e)}")
+            return []
+    
+    def get_last_stream_event_id(self):
+        """
+        Returns:
+            int: 发件箱中最新事件的编号，没有事件时为 0
+        """
+        try:
+            with self._get_connection() as conn:
+                return conn.execute('SELECT COALESCE(MAX(id), 0) FROM stream_events').fetchone()[0]
+                
+        except Exception as e:
+            logger.error(f"读取事件编号异常: {str(e)}")
+            return 0
+    
+    def save_articles_bulk(self, articles):
+        """
+        批量保存文章，所有写入在同一个事务中完成。
+        新文章以未处理状态插入；已存在的文章只刷新非空的基本字段，不改变处理状态和分析数据。
+        
+        Args:
+            articles (list): 文章数据列表
+            
+        Returns:
+            dict: 写入统计，包含 inserted（新增数量）和 updated（更新数量）
+        """
+        result = {"inserted": 0, "updated": 0}
+        
+        # 同一批次中的重复ID只保留最后一条
+        rows = {}
+        now = datetime.now().isoformat()
+        for article in articles:
+            article_id = article.get('id')
+            if not article_id:
+                continue
+            rows[str(article_id)] = (
+                str(article_id),
+                article.get('title', ''),
+                article.get('content', ''),
+                article.get('url', ''),
+                article.get('pubDate', ''),
+                article.get('source', ''),
+                article.get('category', ''),
+                article.get('summary', ''),
+                article.get('author', ''),
+                article.get('imageUrl', ''),
+                json.dumps(article.get('tags', []), ensure_ascii=False),
+                now
+            )
+        
+        if not rows:
+            return result
+        
+        try:
+            with self._get_connection() as conn:
+                # 立即获取写锁，保证存在性判断与写入之间没有其他写入者
+                conn.execute('BEGIN IMMEDIATE')
+                existing_ids = self._select_existing_ids(conn, 'articles', list(rows.keys()))
+                
+                conn.executemany('''
+                INSERT INTO articles (
+                    id, title, content, url, pub_date, source, category,
+                    summary, author, image_url, tags, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    title = COALESCE(NULLIF(excluded.title, ''), articles.title),
+                    content = COALESCE(NULLIF(excluded.content, ''), articles.content),
+                    url = COALESCE(NULLIF(excluded.url, ''), articles.url),
+                    pub_date = COALESCE(NULLIF(excluded.pub_date, ''), articles.pub_date),
+                    category = COALESCE(NULLIF(excluded.category, ''), articles.category),
+                    summary = COALESCE(NULLIF(excluded.summary, ''), articles.summary),
+                    author = COALESCE(NULLIF(excluded.author, ''), articles.author),
+                    image_url = COALESCE(NULLIF(excluded.image_url, ''), articles.image_url),
+                    tags = CASE WHEN excluded.tags = '[]' THEN articles.tags ELSE excluded.tags END
+                ''', list(rows.values()))
+            
+            result["updated"] = len(existing_ids)
+            result["inserted"] = len(rows) - len(existing_ids)
+            logger.info(f"批量保存文章完成: 新增 {result['inserted']} 篇, 更新 {result['updated']} 篇")
+            
+        except Exception as e:
+            logger.error(f"批量保存文章异常: {str(e)}")
+            result["error"] = str(e)
+        
+        return result
+    
+    def save_flash_bulk(self, news_list):
+        """
+        批量保存快讯，所有写入在同一个事务中完成，已存在的快讯直接跳过
+        
+        Args:
+            news_list (list): 快讯数据列表
+            
+        Returns:
+            dict: 写入统计，包含 inserted（新增数量）和 skipped（已存在跳过的数量）
+        """
+        result = {"inserted": 0, "skipped": 0}
+        
+        now = datetime.now().isoformat()
+        rows = [
+            (
+                str(news.get('id')),
+                news.get('title', ''),
+                news.get('content', ''),
+                news.get('url', ''),
+                news.get('pubDate', ''),
+                news.get('source', ''),
+                now
+            )
+            for news in news_list if news.get('id')
+        ]
+        
+        if not rows:
+            return result
+        
+        try:
+            # 逐行插入（仍在同一个事务中），以便知道哪些快讯是新增的并在提交后发布事件
+            inserted_rows = []
+            with self._get_connection() as conn:
+                for row in rows:
+                    cursor = conn.execute('''
+                    INSERT INTO flash_news (
+                        id, title, content, url, pub_date, source, created_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(id) DO NOTHING
+                    ''', row)
+                    if cursor.rowcount > 0:
+                        inserted_rows.append(row)
+            
+            result["inserted"] = len(inserted_rows)
+            result["skipped"] = len(rows) - len(inserted_rows)
+            logger.info(f"批量保存快讯完成: 新增 {result['inserted']} 条, 跳过 {result['skipped']} 条")
+            self._publish_flash(inserted_rows)
+            
+        except Exception as e:
+            logger.error(f"批量保存快讯异常: {str(e)}")
+            result["error"] = str(e)
+        
+        return result
+    
+    def get_existing_article_ids(self, article_ids, source=None):
+        """
+        批量检查文章是否已存在，用一次查询代替逐条调用 article_exists
+        
+        Args:
+            article_ids (list): 文章ID列表
+            source (str, optional): 文章来源
+            
+        Returns:
+            set: 已存在的文章ID集合
+        """
+        try:
+            with self._get_connection() as conn:
+                return self._select_existing_ids(conn, 'articles', [str(i) for i in article_ids], source)
+        except Exception as e:
+            logger.error(f"批量检查文章是否存在异常: {str(e)}")
+            return set()
+    
+    def get_existing_flash_ids(self, news_ids, source=None):
+        """
+        批量检查快讯是否已存在
+        
+        Args:
+            news_ids (list): 快讯ID列表
+            source (str, optional): 快讯来源
+            
+        Returns:
+            set: 已存在的快讯ID集合
+        """
+        try:
+            with self._get_connection() as conn:
+                return self._select_existing_ids(conn, 'flash_news', [str(i) for i in news_ids], source)
+        except Exception as e:
+            logger.error(f"批量检查快讯是否存在异常: {str(e)}")
+            return set()
+    
+    def iter_dedup_keys(self, table, after_rowid=0, batch_size=5000):
+        """
+        按 rowid 顺序遍历文章或快讯的去重键，用于构建和追赶去重过滤器
+        
+        Args:
+            table (str): 'articles' 或 'flash_news'
+            after_rowid (int): 只返回 rowid 大于该值的行
+            batch_size (int): 每批读取的行数
+            
+        Yields:
+            tuple: (rowid, id, source, url)
+        """
+        if table not in ('articles', 'flash_news'):
+            raise ValueError(f"不支持的表: {table}")
+        
+        with self._get_connection() as conn:
+            while True:
+                rows = conn.execute(
+                    f'SELECT rowid, id, source, url FROM {table} WHERE rowid > ? ORDER BY rowid LIMIT ?',
+                    (after_rowid, batch_size)
+                ).fetchall()
+                if not rows:
+                    break
+                for row in rows:
+                    yield tuple(row)
+                after_rowid = rows[-1][0]
+    
+    @staticmethod
+    def _select_existing_ids(conn, table, ids, source=None, chunk_size=500):
+        """分批查询表中已存在的ID，避免超出SQLite的参数数量限制"""
+        existing = set()
+        for i in range(0, len(ids), chunk_size):
+            chunk = ids[i:i + chunk_size]
+            placeholders = ','.join('?' * len(chunk))
+            query = f'SELECT id FROM {table} WHERE id IN ({placeholders})'
+            params = list(chunk)
+            if source:
+                query += ' AND source = ?'
+                params.append(source)
+            existing.update(row[0] for row in conn.execute(query, params))
+        return existing
+    
     def article_exists(self, article_id, source):
         """
         检查文章是否已存在
@@ -342,7 +1058,7 @@ class SQLiteClient:
             bool: 文章是否存在
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute(
@@ -368,7 +1084,7 @@ class SQLiteClient:
             bool: 文章是否存在
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute(
@@ -395,7 +1111,7 @@ class SQLiteClient:
             bool: 快讯是否存在
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute(
@@ -422,8 +1138,7 @@ class SQLiteClient:
             list: 文章列表
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 
                 if source:
@@ -465,6 +1180,110 @@ class SQLiteClient:
             logger.error(f"获取未处理文章异常: {str(e)}")
             return []
     
+    def claim_unprocessed(self, worker_id, n, lease_seconds, source=None):
+        """
+        原子地领取最新的未处理文章并加上租约
+        
+        查询和标记在同一条 UPDATE ... RETURNING 中完成，多个进程同时调用时不会领到同一篇文章；
+        领取者崩溃或超时后租约过期，文章可被重新领取。
+        
+        Args:
+            worker_id (str): 领取者标识
+            n (int): 最多领取的数量
+            lease_seconds (float): 租约时长（秒）
+            source (str, optional): 只领取该来源的文章
+            
+        Returns:
+            list: 文章列表，按发布时间从新到旧
+        """
+        try:
+            now = time.time()
+            source_clause = 'AND source = ?' if source else ''
+            with self._get_connection() as conn:
+                conn.execute('BEGIN IMMEDIATE')
+                rows = conn.execute(f'''
+                UPDATE articles SET claimed_by = ?, claim_expires_at = ?
+                WHERE rowid IN (
+                    SELECT rowid FROM articles
+                    WHERE processed = 0 {source_clause}
+                      AND (claim_expires_at IS NULL OR claim_expires_at <= ?)
+                    ORDER BY pub_date DESC
+                    LIMIT ?
+                )
+                RETURNING *
+                ''', [worker_id, now + lease_seconds] + ([source] if source else []) + [now, n]).fetchall()
+                articles = [self._row_to_article(row) for row in rows]
+            articles.sort(key=lambda article: article.get('pubDate') or '', reverse=True)
+            if articles:
+                logger.info(f"{worker_id} 领取 {len(articles)} 篇未处理的文章")
+            return articles
+                
+        except Exception as e:
+            logger.error(f"领取未处理文章异常: {str(e)}")
+            return []
+    
+    def claim_article(self, article_id, source, worker_id, lease_seconds):
+        """
+        领取单篇未处理文章，已被其他领取者持有且租约未过期时失败
+        
+        Args:
+            article_id (str): 文章ID
+            source (str): 文章来源，为空时只按ID匹配
+            worker_id (str): 领取者标识
+            lease_seconds (float): 租约时长（秒）
+            
+        Returns:
+            bool: 是否领取成功（自己已持有时同样成功）
+        """
+        try:
+            now = time.time()
+            source_clause = 'AND source = ?' if source else ''
+            with self._get_connection() as conn:
+                cursor = conn.execute(f'''
+                UPDATE articles SET claimed_by = ?, claim_expires_at = ?
+                WHERE id = ? {source_clause} AND processed = 0
+                  AND (claimed_by IS NULL OR claimed_by = ? OR claim_expires_at <= ?)
+                ''', [worker_id, now + lease_seconds, article_id] + ([source] if source else []) + [worker_id, now])
+                return cursor.rowcount > 0
+                
+        except Exception as e:
+            logger.error(f"领取文章异常: {str(e)}")
+            return False
+    
+    def release_claims(self, worker_id, article_ids=None):
+        """
+        释放领取者持有的文章租约，使文章可以立即被重新领取
+        
+        Args:
+            worker_id (str): 领取者标识
+            article_ids (list, optional): 只释放这些文章，默认释放全部
+            
+        Returns:
+            int: 释放的文章数
+        """
+        try:
+            with self._get_connection() as conn:
+                if article_ids is None:
+                    cursor = conn.execute('''
+                    UPDATE articles SET claimed_by = NULL, claim_expires_at = NULL WHERE claimed_by = ?
+                    ''', (worker_id,))
+                    return cursor.rowcount
+                
+                released = 0
+                ids = list(article_ids)
+                for i in range(0, len(ids), 500):
+                    chunk = ids[i:i + 500]
+                    cursor = conn.execute(f'''
+                    UPDATE articles SET claimed_by = NULL, claim_expires_at = NULL
+                    WHERE claimed_by = ? AND id IN ({','.join('?' * len(chunk))})
+                    ''', [worker_id] + chunk)
+                    released += cursor.rowcount
+                return released
+                
+        except Exception as e:
+            logger.error(f"释放文章租约异常: {str(e)}")
+            return 0
+    
     def update_article_analysis(self, article_id, analysis_data, source=None):
         """
         更新文章分析结果
@@ -478,7 +1297,7 @@ class SQLiteClient:
             bool: 是否更新成功
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 
                 # 构建元数据对象
@@ -493,20 +1312,24 @@ class SQLiteClient:
                     UPDATE articles 
                     SET metadata = ?, processed = 1
                     WHERE id = ? AND source = ?
+                    RETURNING id, source, title
                     '''
-                    cursor.execute(query, (json.dumps(metadata, ensure_ascii=False), article_id, source))
+                    updated = cursor.execute(query, (json.dumps(metadata, ensure_ascii=False), article_id, source)).fetchall()
                 else:
                     query = '''
                     UPDATE articles 
                     SET metadata = ?, processed = 1
                     WHERE id = ?
+                    RETURNING id, source, title
                     '''
-                    cursor.execute(query, (json.dumps(metadata, ensure_ascii=False), article_id))
+                    updated = cursor.execute(query, (json.dumps(metadata, ensure_ascii=False), article_id)).fetchall()
                 
                 conn.commit()
                 
-                if cursor.rowcount > 0:
+                if updated:
                     logger.info(f"更新文章分析结果成功: ID={article_id}")
+                    for row in updated:
+                        self._publish_analysis(row['id'], row['source'], row['title'])
                     return True
                 else:
                     logger.warning(f"未找到要更新的文章: ID={article_id}")
@@ -528,31 +1351,29 @@ class SQLiteClient:
             dict: 文章详情，失败返回None
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 
-                # 处理简单ID和完整路径ID
-                # 如果是简单ID（不包含'/'），尝试匹配完整路径中的任何部分
-                if '/' not in article_id:
-                    logger.info(f"使用简单ID查询: {article_id}")
+                # 先按主键精确匹配
+                if source:
+                    query = 'SELECT * FROM articles WHERE id = ? AND source = ?'
+                    cursor.execute(query, (article_id, source))
+                else:
+                    query = 'SELECT * FROM articles WHERE id = ?'
+                    cursor.execute(query, (article_id,))
+                
+                row = cursor.fetchone()
+                
+                # 简单ID（不包含'/'）精确匹配失败时，尝试匹配完整路径中的任何部分（需要全表扫描）
+                if row is None and '/' not in article_id:
+                    logger.info(f"精确匹配失败，使用简单ID模糊查询: {article_id}")
                     if source:
                         query = "SELECT * FROM articles WHERE id LIKE ? AND source = ?"
                         cursor.execute(query, (f'%{article_id}%', source))
                     else:
                         query = "SELECT * FROM articles WHERE id LIKE ?"
                         cursor.execute(query, (f'%{article_id}%',))
-                else:
-                    # 完整路径ID的处理方式不变
-                    logger.info(f"使用完整路径ID查询: {article_id}")
-                    if source:
-                        query = 'SELECT * FROM articles WHERE id = ? AND source = ?'
-                        cursor.execute(query, (article_id, source))
-                    else:
-                        query = 'SELECT * FROM articles WHERE id = ?'
-                        cursor.execute(query, (article_id,))
-                
-                row = cursor.fetchone()
+                    row = cursor.fetchone()
                 
                 if row:
                     article = dict(row)
@@ -596,7 +1417,7 @@ class SQLiteClient:
             bool: 是否记录成功
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute('''
@@ -628,7 +1449,7 @@ class SQLiteClient:
             int: 文章数量
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 
                 query = 'SELECT COUNT(*) FROM articles WHERE 1=1'
@@ -661,7 +1482,7 @@ class SQLiteClient:
             int: 快讯数量
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 
                 if source:
@@ -690,8 +1511,7 @@ class SQLiteClient:
             list: 文章列表
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 
                 if source:
@@ -752,8 +1572,7 @@ class SQLiteClient:
             list: 快讯列表
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 
                 if source:
@@ -786,72 +1605,826 @@ class SQLiteClient:
             logger.error(f"获取最新快讯异常: {str(e)}")
             return []
     
-    def search_articles(self, keyword, limit=20, source=None):
+    def _build_search_clause(self, keyword, source=None, category=None):
+        """
+        构建文章搜索的 FROM / WHERE 子句
+        
+        Returns:
+            tuple: (FROM和WHERE子句, 参数列表, 是否使用全文索引)
+        """
+        terms = keyword.split()
+        fts_terms = [term for term in terms if len(term) >= FTS_MIN_TERM_LENGTH]
+        short_terms = [term for term in terms if len(term) < FTS_MIN_TERM_LENGTH]
+        use_fts = bool(fts_terms) and self._has_search_index()
+        
+        conditions = []
+        params = []
+        
+        if use_fts:
+            # 每个关键词作为短语匹配，避免用户输入被解析为FTS语法
+            match_expr = ' '.join('"{}"'.format(term.replace('"', '""')) for term in fts_terms)
+            conditions.append('articles_fts MATCH ?')
+            params.append(match_expr)
+            from_clause = 'articles_fts JOIN articles a ON a.rowid = articles_fts.rowid'
+            like_terms = short_terms  # 过短的关键词无法走索引，在索引命中的结果上再用 LIKE 过滤
+        else:
+            from_clause = 'articles a'
+            like_terms = [keyword]
+        
+        for term in like_terms:
+            conditions.append('(a.title LIKE ? OR a.content LIKE ? OR a.summary LIKE ?)')
+            params.extend([f"%{term}%"] * 3)
+        
+        if source:
+            conditions.append('a.source = ?')
+            params.append(source)
+        
+        if category:
+            conditions.append('a.category = ?')
+            params.append(category)
+        
+        return f"FROM {from_clause} WHERE {' AND '.join(conditions)}", params, use_fts
+    
+    def search_articles(self, keyword, limit=20, source=None, category=None, offset=0):
         """
         搜索文章
         
+        优先使用全文索引，按 bm25 相关度排序并返回高亮片段；
+        过短的关键词（trigram 分词下少于3个字符）在索引结果上用 LIKE 过滤；
+        全部关键词都过短或索引不可用时回退到 LIKE 匹配，按发布时间排序。
+        
         Args:
-            keyword (str): 搜索关键词
+            keyword (str): 搜索关键词，多个关键词用空格分隔，需同时匹配
             limit (int): 获取数量限制
             source (str, optional): 文章来源筛选
+            category (str, optional): 文章分类筛选
+            offset (int): 跳过的结果数量
             
         Returns:
-            list: 文章列表
+            list: 文章列表，全文检索结果额外包含 snippet（高亮片段）和 rank（bm25得分，越小越相关）
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            clause, params, use_fts = self._build_search_clause(keyword, source, category)
+            
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 
-                search_term = f"%{keyword}%"
-                
-                if source:
-                    query = '''
-                    SELECT * FROM articles 
-                    WHERE (title LIKE ? OR content LIKE ? OR summary LIKE ?) AND source = ?
-                    ORDER BY pub_date DESC LIMIT ?
+                if use_fts:
+                    query = f'''
+                    SELECT a.*,
+                           snippet(articles_fts, -1, '<mark>', '</mark>', '...', 32) AS snippet,
+                           articles_fts.rank AS rank
+                    {clause}
+                    ORDER BY articles_fts.rank LIMIT ? OFFSET ?
                     '''
-                    cursor.execute(query, (search_term, search_term, search_term, source, limit))
                 else:
-                    query = '''
-                    SELECT * FROM articles 
-                    WHERE title LIKE ? OR content LIKE ? OR summary LIKE ?
-                    ORDER BY pub_date DESC LIMIT ?
+                    query = f'''
+                    SELECT a.* {clause}
+                    ORDER BY a.pub_date DESC LIMIT ? OFFSET ?
                     '''
-                    cursor.execute(query, (search_term, search_term, search_term, limit))
-                
-                articles = []
-                for row in cursor.fetchall():
-                    article = dict(row)
-                    if 'tags' in article and article['tags']:
-                        try:
-                            article['tags'] = json.loads(article['tags'])
-                        except:
-                            article['tags'] = []
-                    
-                    # 处理AI分析数据
-                    if 'metadata' in article and article['metadata']:
-                        try:
-                            article['analysis_data'] = json.loads(article['metadata'])
-                        except:
-                            article['analysis_data'] = {}
-                    else:
-                        article['analysis_data'] = {}
-                    
-                    # 转换字段名
-                    if 'pub_date' in article:
-                        article['pubDate'] = article.pop('pub_date')
-                    if 'image_url' in article:
-                        article['imageUrl'] = article.pop('image_url')
-                    
-                    articles.append(article)
+                cursor.execute(query, params + [limit, offset])
                 
-                return articles
+                return [self._row_to_article(row) for row in cursor.fetchall()]
                 
         except Exception as e:
             logger.error(f"搜索文章异常: {str(e)}")
             return []
     
+    def count_search_results(self, keyword, source=None, category=None):
+        """
+        统计搜索结果总数，筛选条件与 search_articles 相同
+        
+        Args:
+            keyword (str): 搜索关键词
+            source (str, optional): 文章来源筛选
+            category (str, optional): 文章分类筛选
+            
+        Returns:
+            int: 结果总数
+        """
+        try:
+            clause, params, _ = self._build_search_clause(keyword, source, category)
+            
+            with self._get_connection() as conn:
+                return conn.execute(f'SELECT COUNT(*) {clause}', params).fetchone()[0]
+                
+        except Exception as e:
+            logger.error(f"统计搜索结果异常: {str(e)}")
+            return 0
+    
+    def get_articles_page(self, limit=10, source=None, category=None, after=None, offset=0):
+        """
+        按 (pub_date, id) 倒序分页获取文章
+        
+        提供 after 时使用键集分页，直接从索引定位到上一页末尾，翻页代价与页码无关；
+        否则使用 offset 分页。
+        
+        Args:
+            limit (int): 每页数量
+            source (str, optional): 文章来源筛选
+            category (str, optional): 文章分类筛选
+            after (tuple, optional): 上一页最后一篇文章的 (pub_date, id)
+            offset (int): 未提供 after 时跳过的文章数量
+            
+        Returns:
+            tuple: (文章列表, 下一页的 (pub_date, id)，没有更多文章时为 None)
+        """
+        try:
+            conditions = []
+            params = []
+            
+            if source:
+                conditions.append('source = ?')
+                params.append(source)
+            
+            if category:
+                conditions.append('category = ?')
+                params.append(category)
+            
+            if after:
+                conditions.append('(pub_date, id) < (?, ?)')
+                params.extend(after)
+                offset = 0
+            
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+            
+            with self._get_connection() as conn:
+                # 多取一条用于判断是否还有下一页
+                rows = conn.execute(f'''
+                SELECT * FROM articles {where}
+                ORDER BY pub_date DESC, id DESC LIMIT ? OFFSET ?
+                ''', params + [limit + 1, offset]).fetchall()
+            
+            articles = [self._row_to_article(row) for row in rows[:limit]]
+            next_after = None
+            if len(rows) > limit:
+                last = articles[-1]
+                next_after = (last['pubDate'], last['id'])
+            
+            return articles, next_after
+            
+        except Exception as e:
+            logger.error(f"分页获取文章异常: {str(e)}")
+            return [], None
+    
+    def get_article_total(self, source=None, category=None):
+        """
+        从触发器维护的计数表获取文章总数，无需扫描 articles 表
+        
+        Args:
+            source (str, optional): 文章来源筛选
+            category (str, optional): 文章分类筛选
+            
+        Returns:
+            int: 文章数量
+        """
+        try:
+            query = 'SELECT COALESCE(SUM(total), 0) FROM article_counts WHERE 1=1'
+            params = []
+            
+            if source:
+                query += ' AND source = ?'
+                params.append(source)
+            
+            if category:
+                query += ' AND category = ?'
+                params.append(category)
+            
+            with self._get_connection() as conn:
+                return conn.execute(query, params).fetchone()[0]
+                
+        except Exception as e:
+            logger.error(f"获取文章总数异常: {str(e)}")
+            return 0
+    
+    @staticmethod
+    def _row_to_article(row):
+        """将 articles 查询结果转换为接口使用的文章字典"""
+        article = dict(row)
+        if 'tags' in article and article['tags']:
+            try:
+                article['tags'] = json.loads(article['tags'])
+            except:
+                article['tags'] = []
+        
+        # 处理AI分析数据
+        if 'metadata' in article and article['metadata']:
+            try:
+                article['analysis_data'] = json.loads(article['metadata'])
+            except:
+                article['analysis_data'] = {}
+        else:
+            article['analysis_data'] = {}
+        
+        # 转换字段名
+        if 'pub_date' in article:
+            article['pubDate'] = article.pop('pub_date')
+        if 'image_url' in article:
+            article['imageUrl'] = article.pop('image_url')
+        
+        return article
+    
+    def get_crawl_cursor(self, source, kind):
+        """
+        获取来源的增量抓取位置
+        
+        Args:
+            source (str): 来源标识
+            kind (str): 抓取类型，articles 或 flash
+            
+        Returns:
+            dict: {"last_id": ..., "last_time": ...}，没有记录时返回 None
+        """
+        try:
+            with self._get_connection() as conn:
+                row = conn.execute(
+                    'SELECT last_id, last_time FROM crawl_cursors WHERE source = ? AND kind = ?',
+                    (source, kind)
+                ).fetchone()
+                return dict(row) if row else None
+                
+        except Exception as e:
+            logger.error(f"获取抓取位置异常: {str(e)}")
+            return None
+    
+    def save_crawl_cursor(self, source, kind, last_id, last_time):
+        """
+        保存来源的增量抓取位置
+        
+        Args:
+            source (str): 来源标识
+            kind (str): 抓取类型，articles 或 flash
+            last_id (str): 已抓取的最新条目ID
+            last_time (str): 已抓取的最新条目发布时间
+            
+        Returns:
+            bool: 是否保存成功
+        """
+        try:
+            with self._get_connection() as conn:
+                conn.execute('''
+                INSERT INTO crawl_cursors (source, kind, last_id, last_time, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(source, kind) DO UPDATE SET
+                    last_id = excluded.last_id,
+                    last_time = excluded.last_time,
+                    updated_at = excluded.updated_at
+                ''', (source, kind, str(last_id), last_time, datetime.now().isoformat()))
+                return True
+                
+        except Exception as e:
+            logger.error(f"保存抓取位置异常: {str(e)}")
+            return False
+    
+    def get_crawl_schedule(self):
+        """
+        获取所有来源学习到的抓取间隔
+        
+        Returns:
+            list: 每项包含 source、kind、interval、rate、last_new、last_crawl_at、next_due_at
+        """
+        try:
+            with self._get_connection() as conn:
+                rows = conn.execute(
+                    'SELECT source, kind, interval, rate, last_new, last_crawl_at, next_due_at '
+                    'FROM crawl_schedule ORDER BY source, kind'
+                ).fetchall()
+                return [dict(row) for row in rows]
+                
+        except Exception as e:
+            logger.error(f"获取抓取调度异常: {str(e)}")
+            return []
+    
+    def save_crawl_schedule(self, state):
+        """
+        保存来源的抓取间隔
+        
+        Args:
+            state (dict): 包含 source、kind、interval、rate、last_new、last_crawl_at、next_due_at
+            
+        Returns:
+            bool: 是否保存成功
+        """
+        try:
+            with self._get_connection() as conn:
+                conn.execute('''
+                INSERT INTO crawl_schedule (source, kind, interval, rate, last_new, last_crawl_at, next_due_at, updated_at)
+                VALUES (:source, :kind, :interval, :rate, :last_new, :last_crawl_at, :next_due_at, :updated_at)
+                ON CONFLICT(source, kind) DO UPDATE SET
+                    interval = excluded.interval,
+                    rate = excluded.rate,
+                    last_new = excluded.last_new,
+                    last_crawl_at = excluded.last_crawl_at,
+                    next_due_at = excluded.next_due_at,
+                    updated_at = excluded.updated_at
+                ''', dict(state, updated_at=datetime.now().isoformat()))
+                return True
+                
+        except Exception as e:
+            logger.error(f"保存抓取调度异常: {str(e)}")
+            return False
+    
+    def get_http_validators(self, url):
+        """
+        获取URL上次成功抓取时的缓存校验信息
+        
+        Args:
+            url (str): 作用域加完整请求地址（含查询参数），见 http_client.conditional_get
+            
+        Returns:
+            dict: {"etag": ..., "last_modified": ...}，没有记录时返回 None
+        """
+        try:
+            with self._get_connection() as conn:
+                row = conn.execute(
+                    'SELECT etag, last_modified FROM http_validators WHERE url = ?', (url,)
+                ).fetchone()
+                return dict(row) if row else None
+                
+        except Exception as e:
+            logger.error(f"获取缓存校验信息异常: {str(e)}")
+            return None
+    
+    def save_http_validators(self, url, etag=None, last_modified=None):
+        """
+        保存URL的缓存校验信息
+        
+        Args:
+            url (str): 作用域加完整请求地址（含查询参数），见 http_client.conditional_get
+            etag (str, optional): 响应的 ETag
+            last_modified (str, optional): 响应的 Last-Modified
+            
+        Returns:
+            bool: 是否保存成功
+        """
+        try:
+            with self._get_connection() as conn:
+                conn.execute('''
+                INSERT INTO http_validators (url, etag, last_modified, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    updated_at = excluded.updated_at
+                ''', (url, etag, last_modified, datetime.now().isoformat()))
+                return True
+                
+        except Exception as e:
+            logger.error(f"保存缓存校验信息异常: {str(e)}")
+            return False
+    
+    def get_cached_response(self, key, min_created_at=0):
+        """
+        读取 AI 响应缓存，命中时更新访问时间和命中次数
+        
+        Args:
+            key (str): 缓存键
+            min_created_at (float): 早于该时间戳写入的缓存视为过期
+            
+        Returns:
+            str: 缓存的响应内容，未命中或已过期时返回 None
+        """
+        try:
+            with self._get_connection() as conn:
+                row = conn.execute(
+                    'SELECT response FROM ai_response_cache WHERE key = ? AND created_at >= ?',
+                    (key, min_created_at)
+                ).fetchone()
+                if not row:
+                    return None
+                conn.execute(
+                    'UPDATE ai_response_cache SET accessed_at = ?, hits = hits + 1 WHERE key = ?',
+                    (time.time(), key)
+                )
+                return row[0]
+                
+        except Exception as e:
+            logger.error(f"读取AI响应缓存异常: {str(e)}")
+            return None
+    
+    def save_cached_response(self, key, model, response):
+        """
+        写入 AI 响应缓存
+        
+        Args:
+            key (str): 缓存键
+            model (str): 模型名称
+            response (str): 响应内容
+            
+        Returns:
+            bool: 是否保存成功
+        """
+        try:
+            now = time.time()
+            with self._get_connection() as conn:
+                conn.execute('''
+                INSERT INTO ai_response_cache (key, model, response, size, hits, created_at, accessed_at)
+                VALUES (?, ?, ?, ?, 0, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    model = excluded.model,
+                    response = excluded.response,
+                    size = excluded.size,
+                    created_at = excluded.created_at,
+                    accessed_at = excluded.accessed_at
+                ''', (key, model, response, len(response.encode('utf-8')), now, now))
+                return True
+                
+        except Exception as e:
+            logger.error(f"保存AI响应缓存异常: {str(e)}")
+            return False
+    
+    def delete_cached_response(self, key):
+        """
+        删除一条 AI 响应缓存
+        
+        Args:
+            key (str): 缓存键
+            
+        Returns:
+            bool: 是否删除成功
+        """
+        try:
+            with self._get_connection() as conn:
+                conn.execute('DELETE FROM ai_response_cache WHERE key = ?', (key,))
+                return True
+                
+        except Exception as e:
+            logger.error(f"删除AI响应缓存异常: {str(e)}")
+            return False
+    
+    def evict_cached_responses(self, min_created_at=0, max_entries=None, max_bytes=None):
+        """
+        删除过期的 AI 响应缓存，超出条数或字节数上限时按最近访问时间淘汰
+        
+        Args:
+            min_created_at (float): 早于该时间戳写入的缓存视为过期
+            max_entries (int, optional): 最大条数
+            max_bytes (int, optional): 最大字节数
+            
+        Returns:
+            int: 删除的条数
+        """
+        try:
+            with self._get_connection() as conn:
+                deleted = conn.execute(
+                    'DELETE FROM ai_response_cache WHERE created_at < ?', (min_created_at,)
+                ).rowcount
+                
+                count, total_bytes = conn.execute(
+                    'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ai_response_cache'
+                ).fetchone()
+                excess_entries = count - max_entries if max_entries else 0
+                excess_bytes = total_bytes - max_bytes if max_bytes else 0
+                if excess_entries <= 0 and excess_bytes <= 0:
+                    return deleted
+                
+                # 从最久未访问的开始淘汰，直到条数和字节数都回到上限以内
+                victims = []
+                for key, size in conn.execute(
+                    'SELECT key, size FROM ai_response_cache ORDER BY accessed_at'
+                ).fetchall():
+                    if excess_entries <= 0 and excess_bytes <= 0:
+                        break
+                    victims.append((key,))
+                    excess_entries -= 1
+                    excess_bytes -= size
+                conn.executemany('DELETE FROM ai_response_cache WHERE key = ?', victims)
+                return deleted + len(victims)
+                
+        except Exception as e:
+            logger.error(f"淘汰AI响应缓存异常: {str(e)}")
+            return 0
+    
+    def get_response_cache_stats(self):
+        """
+        获取 AI 响应缓存的占用情况
+        
+        Returns:
+            dict: {"entries": 条数, "bytes": 字节数, "hits": 累计命中次数}
+        """
+        try:
+            with self._get_connection() as conn:
+                entries, total_bytes, hits = conn.execute(
+                    'SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(hits), 0) FROM ai_response_cache'
+                ).fetchone()
+                return {"entries": entries, "bytes": total_bytes, "hits": hits}
+                
+        except Exception as e:
+            logger.error(f"获取AI响应缓存统计异常: {str(e)}")
+            return {"entries": 0, "bytes": 0, "hits": 0}
+    
+    def find_articles_without_job(self, kind, limit=1000):
+        """
+        查找尚未完成且没有对应任务的文章，用于把文章加入任务队列
+        
+        Args:
+            kind (str): 任务类型，见 JOB_DONE_COLUMNS
+            limit (int): 最多返回的数量
+            
+        Returns:
+            list: 文章列表，只包含 id、source、title、pubDate 和 created_at
+        """
+        try:
+            done_column = JOB_DONE_COLUMNS[kind]
+            with self._get_connection() as conn:
+                rows = conn.execute(f'''
+                SELECT a.id, a.source, a.title, a.pub_date, a.created_at FROM articles a
+                LEFT JOIN job_queue j ON j.kind = ? AND j.article_id = a.id AND j.source = COALESCE(a.source, '')
+                WHERE a.{done_column} = 0 AND j.id IS NULL
+                LIMIT ?
+                ''', (kind, limit)).fetchall()
+                return [{'id': row['id'], 'source': row['source'] or '', 'title': row['title'],
+                         'pubDate': row['pub_date'], 'created_at': row['created_at']} for row in rows]
+                
+        except Exception as e:
+            logger.error(f"查找待入队文章异常: {str(e)}")
+            return []
+    
+    def enqueue_jobs(self, jobs):
+        """
+        批量加入任务，同一类型、文章和来源的任务已存在时忽略
+        
+        Args:
+            jobs (list): 任务列表，每项包含 kind、article_id、source、priority、max_attempts
+            
+        Returns:
+            int: 新加入的任务数
+        """
+        if not jobs:
+            return 0
+        try:
+            now = time.time()
+            with self._get_connection() as conn:
+                before = conn.total_changes
+                conn.executemany('''
+                INSERT OR IGNORE INTO job_queue
+                    (kind, article_id, source, priority, max_attempts, available_at, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', [(job['kind'], job['article_id'], job.get('source') or '', job.get('priority', 0),
+                       job['max_attempts'], now, now, now) for job in jobs])
+                return conn.total_changes - before
+                
+        except Exception as e:
+            logger.error(f"加入任务队列异常: {str(e)}")
+            return 0
+    
+    def claim_jobs(self, kind, worker_id, n, lease_seconds, source=None):
+        """
+        原子地领取优先级最高的可用任务并加上租约
+        
+        可用任务包括到达重试时间的待处理任务，以及租约已过期的任务（领取者崩溃或超时）。
+        租约过期且已达到最大尝试次数的任务直接进入死信。
+        
+        Args:
+            kind (str): 任务类型
+            worker_id (str): 领取者标识
+            n (int): 最多领取的数量
+            lease_seconds (float): 租约时长（秒），超时未完成的任务可被重新领取
+            source (str, optional): 只领取该来源的任务
+            
+        Returns:
+            list: 任务列表，每项包含 id、article_id、source、priority、attempts 等字段
+        """
+        try:
+            now = time.time()
+            source_clause = 'AND source = ?' if source else ''
+            params = [kind] + ([source] if source else [])
+            with self._get_connection() as conn:
+                conn.execute('BEGIN IMMEDIATE')
+                conn.execute(f'''
+                UPDATE job_queue SET status = 'dead', lease_owner = NULL, updated_at = ?,
+                    last_error = COALESCE(last_error, '租约过期')
+                WHERE kind = ? {source_clause} AND status = 'leased'
+                  AND lease_expires_at <= ? AND attempts >= max_attempts
+                ''', [now] + params + [now])
+                rows = conn.execute(f'''
+                UPDATE job_queue SET status = 'leased', lease_owner = ?, lease_expires_at = ?,
+                    attempts = attempts + 1, updated_at = ?
+                WHERE id IN (
+                    SELECT id FROM job_queue
+                    WHERE kind = ? {source_clause} AND (
+                        (status = 'pending' AND available_at <= ?)
+                        OR (status = 'leased' AND lease_expires_at <= ?)
+                    )
+                    ORDER BY priority DESC, id
+                    LIMIT ?
+                )
+                RETURNING *
+                ''', [worker_id, now + lease_seconds, now] + params + [now, now, n]).fetchall()
+                jobs = sorted((dict(row) for row in rows), key=lambda job: (-job['priority'], job['id']))
+            return jobs
+                
+        except Exception as e:
+            logger.error(f"领取任务异常: {str(e)}")
+            return []
+    
+    def extend_job_lease(self, job_id, worker_id, lease_seconds):
+        """
+        延长任务租约，只有当前持有者可以延长
+        
+        Returns:
+            bool: 是否仍持有租约
+        """
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.execute('''
+                UPDATE job_queue SET lease_expires_at = ?, updated_at = ?
+                WHERE id = ? AND lease_owner = ? AND status = 'leased'
+                ''', (time.time() + lease_seconds, time.time(), job_id, worker_id))
+                return cursor.rowcount > 0
+                
+        except Exception as e:
+            logger.error(f"延长任务租约异常: {str(e)}")
+            return False
+    
+    def complete_job(self, job_id, worker_id):
+        """
+        标记任务完成，租约已被其他领取者接管时不修改
+        
+        Returns:
+            bool: 是否标记成功
+        """
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.execute('''
+                UPDATE job_queue SET status = 'done', lease_owner = NULL, lease_expires_at = NULL,
+                    last_error = NULL, updated_at = ?
+                WHERE id = ? AND lease_owner = ? AND status = 'leased'
+                ''', (time.time(), job_id, worker_id))
+                return cursor.rowcount > 0
+                
+        except Exception as e:
+            logger.error(f"标记任务完成异常: {str(e)}")
+            return False
+    
+    def fail_job(self, job_id, worker_id, error, retry_delay):
+        """
+        记录任务失败：未达到最大尝试次数时延迟后重试，否则进入死信
+        
+        Args:
+            job_id (int): 任务ID
+            worker_id (str): 领取者标识
+            error (str): 失败原因
+            retry_delay (float): 重试前等待的秒数
+            
+        Returns:
+            str: 任务的新状态 pending 或 dead，租约已丢失时返回 None
+        """
+        try:
+            now = time.time()
+            with self._get_connection() as conn:
+                row = conn.execute('''
+                UPDATE job_queue SET
+                    status = CASE WHEN attempts >= max_attempts THEN 'dead' ELSE 'pending' END,
+                    available_at = ?, lease_owner = NULL, lease_expires_at = NULL,
+                    last_error = ?, updated_at = ?
+                WHERE id = ? AND lease_owner = ? AND status = 'leased'
+                RETURNING status
+                ''', (now + retry_delay, (error or '')[:1000], now, job_id, worker_id)).fetchone()
+                return row[0] if row else None
+                
+        except Exception as e:
+            logger.error(f"记录任务失败异常: {str(e)}")
+            return None
+    
+    def defer_job(self, job_id, worker_id, reason, delay):
+        """
+        放回未能开始处理的任务（如文章正被其他进程处理），延迟后重试且不计入尝试次数
+        
+        Args:
+            job_id (int): 任务ID
+            worker_id (str): 领取者标识
+            reason (str): 放回原因
+            delay (float): 重试前等待的秒数
+            
+        Returns:
+            bool: 是否放回成功，租约已丢失时为 False
+        """
+        try:
+            now = time.time()
+            with self._get_connection() as conn:
+                cursor = conn.execute('''
+                UPDATE job_queue SET status = 'pending', attempts = MAX(attempts - 1, 0),
+                    available_at = ?, lease_owner = NULL, lease_expires_at = NULL,
+                    last_error = ?, updated_at = ?
+                WHERE id = ? AND lease_owner = ? AND status = 'leased'
+                ''', (now + delay, (reason or '')[:1000], now, job_id, worker_id))
+                return cursor.rowcount > 0
+                
+        except Exception as e:
+            logger.error(f"放回任务异常: {str(e)}")
+            return False
+    
+    def get_dead_jobs(self, kind=None, limit=100):
+        """
+        获取死信任务
+        
+        Args:
+            kind (str, optional): 任务类型
+            limit (int): 数量限制
+            
+        Returns:
+            list: 任务列表，最近失败的在前
+        """
+        try:
+            with self._get_connection() as conn:
+                if kind:
+                    rows = conn.execute(
+                        "SELECT * FROM job_queue WHERE status = 'dead' AND kind = ? ORDER BY updated_at DESC LIMIT ?",
+                        (kind, limit)
+                    ).fetchall()
+                else:
+                    rows = conn.execute(
+                        "SELECT * FROM job_queue WHERE status = 'dead' ORDER BY updated_at DESC LIMIT ?", (limit,)
+                    ).fetchall()
+                return [dict(row) for row in rows]
+                
+        except Exception as e:
+            logger.error(f"获取死信任务异常: {str(e)}")
+            return []
+    
+    def requeue_dead_jobs(self, kind=None, job_ids=None):
+        """
+        把死信任务重新放回队列，尝试次数清零
+        
+        Args:
+            kind (str, optional): 任务类型
+            job_ids (list, optional): 只重新入队这些任务
+            
+        Returns:
+            int: 重新入队的任务数
+        """
+        try:
+            now = time.time()
+            conditions = ["status = 'dead'"]
+            params = [now, now]
+            if kind:
+                conditions.append('kind = ?')
+                params.append(kind)
+            if job_ids:
+                conditions.append(f"id IN ({','.join('?' * len(job_ids))})")
+                params.extend(job_ids)
+            with self._get_connection() as conn:
+                cursor = conn.execute(f'''
+                UPDATE job_queue SET status = 'pending', attempts = 0, available_at = ?, updated_at = ?
+                WHERE {' AND '.join(conditions)}
+                ''', params)
+                return cursor.rowcount
+                
+        except Exception as e:
+            logger.error(f"重新入队死信任务异常: {str(e)}")
+            return 0
+    
+    def prune_done_jobs(self, kind, older_than):
+        """
+        删除早于 older_than 完成的任务
+        
+        只删除文章已标记完成（或已删除）的任务；任务完成但文章未标记的保留，
+        否则 find_articles_without_job 会把文章重新加入队列。
+        
+        Args:
+            kind (str): 任务类型，见 JOB_DONE_COLUMNS
+            older_than (float): 时间戳
+            
+        Returns:
+            int: 删除的任务数
+        """
+        try:
+            done_column = JOB_DONE_COLUMNS[kind]
+            with self._get_connection() as conn:
+                cursor = conn.execute(f'''
+                DELETE FROM job_queue
+                WHERE kind = ? AND status = 'done' AND updated_at < ?
+                  AND NOT EXISTS (
+                      SELECT 1 FROM articles a
+                      WHERE a.id = job_queue.article_id AND COALESCE(a.source, '') = job_queue.source
+                        AND COALESCE(a.{done_column}, 0) = 0
+                  )
+                ''', (kind, older_than))
+                return cursor.rowcount
+                
+        except Exception as e:
+            logger.error(f"清理已完成任务异常: {str(e)}")
+            return 0
+    
+    def get_job_queue_stats(self):
+        """
+        获取任务队列各类型、各状态的任务数
+        
+        Returns:
+            dict: 任务类型 -> {状态: 数量}
+        """
+        try:
+            with self._get_connection() as conn:
+                stats = {}
+                for row in conn.execute('SELECT kind, status, COUNT(*) FROM job_queue GROUP BY kind, status'):
+                    stats.setdefault(row[0], {})[row[1]] = row[2]
+                return stats
+                
+        except Exception as e:
+            logger.error(f"获取任务队列统计异常: {str(e)}")
+            return {}
+    
     def clear_database(self):
         """
         清空数据库（仅用于测试）
@@ -860,7 +2433,7 @@ class SQLiteClient:
             bool: 是否清空成功
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute('DELETE FROM articles')
@@ -894,7 +2467,7 @@ class SQLiteClient:
                 backup_path = os.path.join(backup_dir, f'newsnow_backup_{timestamp}.db')
             
             # 连接源数据库
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 # 创建备份数据库
                 with sqlite3.connect(backup_path) as backup_conn:
                     conn.backup(backup_conn)
@@ -917,7 +2490,7 @@ class SQLiteClient:
             bool: 是否更新成功
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 
                 article_id = enhanced_article.get('id')
@@ -989,8 +2562,7 @@ class SQLiteClient:
             list: 文章列表
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 
                 if source:
@@ -1042,8 +2614,7 @@ class SQLiteClient:
             list: 文章列表
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 
                 # 计算日期范围
@@ -1094,7 +2665,7 @@ class SQLiteClient:
             dict: 质量统计数据
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 
                 # 总文章数
@@ -1153,8 +2724,7 @@ class SQLiteClient:
             list: 高质量文章列表
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 
                 query = '''
@@ -16,6 +16,7 @@ from typing import List, Dict, Any, Optional
 from crawlers.improved_jin10 import ImprovedJin10Crawler
 from utils.improved_ai_service import FinanceAnalyzer
 from utils.improved_search_service import FinanceSearchService
+from utils.lru_cache import TTLCache
 
 # 配置日志
 logging.basicConfig(
@@ -49,24 +50,11 @@ class FinanceSystem:
     
     def _init_cache(self):
         """初始化缓存"""
-        self.article_cache = {}
-        self.analysis_cache = {}
-        self.search_cache = {}
         self.MAX_CACHE_ITEMS = 1000
         self.CACHE_TTL = 3600  # 默认缓存1小时
-    
-    def _manage_cache(self, cache, key, value):
-        """管理缓存项"""
-        # 如果缓存过大，移除最早的项
-        if len(cache) >= self.MAX_CACHE_ITEMS:
-            # 按添加时间排序并移除最早的10%
-            sorted_items = sorted(cache.items(), key=lambda x: x[1].get("_cache_time", 0))
-            for old_key, _ in sorted_items[:int(self.MAX_CACHE_ITEMS * 0.1)]:
-                del cache[old_key]
-        
-        # 添加缓存时间
-        value["_cache_time"] = time.time()
-        cache[key] = value
+        # 分析结果由 FinanceAnalyzer 的持久化响应缓存负责，这里只缓存文章和搜索结果
+        self.article_cache = TTLCache(max_entries=self.MAX_CACHE_ITEMS, ttl=self.CACHE_TTL)
+        self.search_cache = TTLCache(max_entries=self.MAX_CACHE_ITEMS, ttl=900)  # 搜索结果缓存15分钟
     
     def get_latest_news(self, limit=20, source="jin10"):
         """获取最新财经消息"""
@@ -107,11 +95,10 @@ class FinanceSystem:
             cache_key = f"{source}_{article_id}"
             
             # 检查缓存
-            if cache_key in self.article_cache:
-                cached = self.article_cache[cache_key]
-                if time.time() - cached.get("_cache_time", 0) < self.CACHE_TTL:
-                    logger.info(f"使用缓存的文章详情: {cache_key}")
-                    return cached
+            cached = self.article_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"使用缓存的文章详情: {cache_key}")
+                return cached
             
             # 获取文章详情
             if source == "jin10":
@@ -122,7 +109,7 @@ class FinanceSystem:
             
             # 缓存结果
             if article:
-                self._manage_cache(self.article_cache, cache_key, article)
+                self.article_cache.set(cache_key, article)
             
             return article
         except Exception as e:
@@ -133,14 +120,6 @@ class FinanceSystem:
         """分析内容"""
         try:
             logger.info(f"分析内容: {title or content[:50]}...")
-            cache_key = f"{content_type}_{hash(content)}"
-            
-            # 检查缓存
-            if cache_key in self.analysis_cache:
-                cached = self.analysis_cache[cache_key]
-                if time.time() - cached.get("_cache_time", 0) < self.CACHE_TTL:
-                    logger.info(f"使用缓存的分析结果: {cache_key}")
-                    return cached
             
             # 根据内容类型选择不同的分析方法
             result = None
@@ -154,18 +133,16 @@ class FinanceSystem:
                 logger.warning(f"不支持的内容类型: {content_type}")
                 return None
             
-            # 缓存结果
-            if result:
-                analysis_result = {
-                    "content_type": content_type,
-                    "title": title,
-                    "content_hash": hash(content),
-                    "analysis": result,
-                    "timestamp": datetime.now().isoformat()
-                }
-                self._manage_cache(self.analysis_cache, cache_key, analysis_result)
+            if not result:
+                return None
             
-            return analysis_result
+            return {
+                "content_type": content_type,
+                "title": title,
+                "content_hash": hash(content),
+                "analysis": result,
+                "timestamp": datetime.now().isoformat()
+            }
         except Exception as e:
             logger.error(f"内容分析失败: {str(e)}")
             return None
@@ -177,12 +154,10 @@ class FinanceSystem:
             cache_key = f"search_{query}_{categories}_{time_range}_{limit}"
             
             # 检查缓存（搜索结果使用较短的缓存时间）
-            search_ttl = 900  # 15分钟
-            if cache_key in self.search_cache:
-                cached = self.search_cache[cache_key]
-                if time.time() - cached.get("_cache_time", 0) < search_ttl:
-                    logger.info(f"使用缓存的搜索结果: {cache_key}")
-                    return cached
+            cached = self.search_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"使用缓存的搜索结果: {cache_key}")
+                return cached
             
             # 执行搜索
             search_result = self.search_service.search(
@@ -194,7 +169,7 @@ class FinanceSystem:
             
             # 缓存结果
             if search_result and "error" not in search_result:
-                self._manage_cache(self.search_cache, cache_key, search_result)
+                self.search_cache.set(cache_key, search_result)
             
             return search_result
         except Exception as e:
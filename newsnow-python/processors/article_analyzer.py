@@ -19,6 +19,7 @@ from utils.text_extractor import extract_clean_content, is_content_valid
 from utils.ai_service import generate_analysis
 from utils.improved_ai_service import FinanceAnalyzer
 from db.sqlite_client import SQLiteClient
+from utils.job_queue import JobQueue
 from config.settings import MAX_BATCH_SIZE, ENABLE_DEEPSEEK
 
 logger = logging.getLogger(__name__)
@@ -49,6 +50,9 @@ class ArticleProcessor:
                 self.use_deepseek = False
                 logger.warning("未找到 DeepSeek API 密钥，将使用默认分析服务")
         
+        # 多个进程共享的分析任务队列，按优先级领取，不会重复处理
+        self.job_queue = JobQueue(self.db_client, "analyze")
+        
         logger.info(f"文章处理器初始化完成，使用 DeepSeek: {self.use_deepseek}")
     
     def get_unprocessed_articles(self, limit=MAX_BATCH_SIZE, source=None):
@@ -206,33 +210,17 @@ class ArticleProcessor:
         """
         batch_start_time = time.time()
         
-        # 获取未处理文章
-        articles = self.get_unprocessed_articles(batch_size, source)
-        article_count = len(articles)
+        # 从任务队列按优先级领取并并发处理，失败的任务按退避重试，DeepSeek 请求的速率由 api_gate 统一控制
+        stats = self.job_queue.run_batch(self.process_article, batch_size, source)
+        article_count = stats["total"]
         
         if article_count == 0:
             logger.info("没有找到需要处理的文章")
             return {"total": 0, "success": 0, "failed": 0, "time": 0}
         
-        logger.info(f"开始批量处理 {article_count} 篇文章")
-        
         # 处理统计
-        success_count = 0
-        fail_count = 0
-        
-        # 依次处理每篇文章
-        for index, article in enumerate(articles, 1):
-            logger.info(f"[{index}/{article_count}] 开始处理文章 ID: {article.get('id')}")
-            
-            try:
-                result = self.process_article(article)
-                if result:
-                    success_count += 1
-                else:
-                    fail_count += 1
-            except Exception as e:
-                logger.error(f"处理异常: {str(e)}")
-                fail_count += 1
+        success_count = stats["success"]
+        fail_count = stats["failed"]
         
         # 计算总耗时
         total_time = time.time() - batch_start_time
@@ -7,18 +7,67 @@
 
 import time
 import logging
+import threading
 from datetime import datetime
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 # 修改为绝对导入路径
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from crawlers.crawler_factory import CrawlerFactory
+from crawlers.async_base import detail_flight_key
 from db.sqlite_client import SQLiteClient
-from config.settings import SOURCES
+from utils.http_client import NotModifiedList
+from utils.dedup_filter import get_dedup_filter
+from utils.pipeline import Pipeline
+from utils.single_flight import get_single_flight
+from utils.adaptive_schedule import AdaptiveSchedule
+from utils.job_queue import parse_article_time
+from config.settings import (
+    SOURCES, CRAWL_CONCURRENT, CRAWL_MAX_WORKERS, CRAWL_PER_HOST_LIMIT, CRAWL_HOST_DELAY,
+    CRAWL_MAX_GAP_PAGES, CRAWL_MAX_ITEM_FAILURES, DEDUP_FILTER_ENABLED, PIPELINE_QUEUE_SIZE, PIPELINE_FETCH_WORKERS,
+    PIPELINE_PARSE_WORKERS, PIPELINE_ENRICH_WORKERS, PIPELINE_ANALYZE_WORKERS, PIPELINE_PERSIST_WORKERS
+)
 
 logger = logging.getLogger(__name__)
 
+# 支持快讯的来源
+FLASH_SOURCES = ["jin10", "gelonghui", "cls"]
+
+
+class _HostLimiter:
+    """按主机限制并发数，并保证同一主机相邻两个任务之间至少间隔 delay 秒"""
+    
+    def __init__(self, limit=1, delay=0.0):
+        self.limit = max(1, limit)
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._semaphores = {}
+        self._next_start = {}
+    
+    def _semaphore(self, host):
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.limit)
+            return self._semaphores[host]
+    
+    def run(self, host, func, *args, **kwargs):
+        """占用主机名额执行 func，返回 (结果, 等待秒数)"""
+        wait_start = time.time()
+        semaphore = self._semaphore(host)
+        with semaphore:
+            if self.delay > 0:
+                with self._lock:
+                    start_at = max(time.time(), self._next_start.get(host, 0))
+                    self._next_start[host] = start_at + self.delay
+                pause = start_at - time.time()
+                if pause > 0:
+                    time.sleep(pause)
+            waited = time.time() - wait_start
+            return func(*args, **kwargs), waited
+
 class ArticleCrawler:
     """文章抓取器类，负责从各个来源抓取最新文章并保存到数据库"""
     
@@ -31,8 +80,122 @@ class ArticleCrawler:
         """
         self.crawler_factory = CrawlerFactory()
         self.db_client = SQLiteClient(db_path)
+        # 去重过滤器判断为新条目的不再查询数据库，同一数据库在进程内共用一个，退出时持久化以便下次快速启动
+        self.dedup_filter = get_dedup_filter(self.db_client) if DEDUP_FILTER_ENABLED else None
+        # 即时处理文章的流水线，所有来源共用，首次使用时创建
+        self._pipeline = None
+        self._pipeline_lock = threading.Lock()
+        # 各来源按新条目速率学习到的抓取间隔
+        self.schedule = AdaptiveSchedule(self.db_client)
+        # (来源, 抓取类型, 条目ID) -> 连续处理失败次数，达到 CRAWL_MAX_ITEM_FAILURES 后抓取位置不再等待该条目
+        self._item_failures = {}
+        self._item_failures_lock = threading.Lock()
         logger.info("文章抓取器初始化完成")
     
+    def _get_pipeline(self):
+        """
+        获取抓取→解析→搜索增强→AI分析→写库流水线
+        
+        各阶段有独立的并发数，阶段之间是有界队列：AI分析慢时抓取和解析继续进行，
+        直到队列填满才阻塞，所以慢的 AI 请求不会卡住其他文章的抓取。
+        
+        Returns:
+            Pipeline: 流水线，条目为 {"crawler", "article_id", ...} 字典，结果与 get_article_detail 相同
+        """
+        with self._pipeline_lock:
+            if self._pipeline is None:
+                self._pipeline = (
+                    Pipeline("article_crawl", queue_size=PIPELINE_QUEUE_SIZE)
+                    .add_stage("fetch", self._fetch_stage, PIPELINE_FETCH_WORKERS)
+                    .add_stage("parse", self._parse_stage, PIPELINE_PARSE_WORKERS)
+                    .add_stage("enrich", self._enrich_stage, PIPELINE_ENRICH_WORKERS)
+                    .add_stage("analyze", self._analyze_stage, PIPELINE_ANALYZE_WORKERS)
+                    .add_stage("persist", self._persist_stage, PIPELINE_PERSIST_WORKERS)
+                )
+            return self._pipeline
+    
+    def close(self):
+        """关闭流水线并保存去重过滤器，运行时重建组件时调用"""
+        with self._pipeline_lock:
+            pipeline, self._pipeline = self._pipeline, None
+        if pipeline:
+            pipeline.close()
+        if self.dedup_filter:
+            self.dedup_filter.save()
+    
+    @staticmethod
+    def _fetch_stage(item):
+        item["response"] = item["crawler"].fetch_detail(item["article_id"])
+        return item if item["response"] is not None else None
+    
+    @staticmethod
+    def _parse_stage(item):
+        item["article"] = item["crawler"].parse_detail(item["article_id"], item.pop("response"))
+        return item if item["article"] else None
+    
+    @staticmethod
+    def _enrich_stage(item):
+        item["search_results"] = item["crawler"].enrich_article(item["article"])
+        return item
+    
+    @staticmethod
+    def _analyze_stage(item):
+        item["analysis"] = item["crawler"].analyze_article(item["article"], item["search_results"])
+        return item
+    
+    @staticmethod
+    def _persist_stage(item):
+        return item["crawler"].persist_article(item["article"], item["analysis"])
+    
+    def _process_details(self, crawler_instance, article_ids):
+        """
+        即时处理一批文章：获取详情、搜索增强、AI分析并保存
+        
+        爬虫实现了各阶段方法（fetch_detail、parse_detail、enrich_article、analyze_article、persist_article）时
+        交给流水线并发处理，否则依次调用 get_article_detail。两条路径都按 (爬虫, 文章ID) 合并并发请求。
+        
+        Args:
+            crawler_instance: 爬虫实例
+            article_ids (list): 文章ID列表
+            
+        Returns:
+            list: 与 article_ids 顺序一致的 (文章ID, 处理结果, 异常) 列表
+        """
+        if not hasattr(crawler_instance, "persist_article"):
+            outcomes = []
+            for article_id in article_ids:
+                try:
+                    outcomes.append((article_id, crawler_instance.get_article_detail(article_id), None))
+                except Exception as e:
+                    outcomes.append((article_id, None, e))
+            return outcomes
+        
+        pipeline = self._get_pipeline()
+        flight = get_single_flight("article_detail")
+        # 与 get_article_detail 共用合并组：同一篇文章已在处理（其他批次、API 或批量分析）时等待其结果，
+        # 不再重复抓取和分析；第一个阶段的队列满时 submit 阻塞，形成背压
+        futures = []
+        for article_id in article_ids:
+            try:
+                futures.append((article_id, flight.submit(
+                    detail_flight_key(crawler_instance, article_id),
+                    lambda article_id=article_id: pipeline.submit({"crawler": crawler_instance, "article_id": article_id})
+                )))
+            except Exception as e:
+                futures.append((article_id, e))
+        
+        # 合并到的计算（如 API 发起的 get_article_detail）抛出的异常只算这一篇失败，不影响同批其他文章
+        outcomes = []
+        for article_id, future in futures:
+            if isinstance(future, Exception):
+                outcomes.append((article_id, None, future))
+                continue
+            try:
+                outcomes.append((article_id, future.result(), None))
+            except Exception as e:
+                outcomes.append((article_id, None, e))
+        return outcomes
+    
     def crawl_source(self, source, limit=20):
         """
         抓取指定来源的最新文章
@@ -63,80 +226,114 @@ class ArticleCrawler:
                     "time": time.time() - start_time
                 }
 
-            # 获取最新文章摘要 (e.g., from Jin10Crawler.get_latest_news())
-            article_summaries = crawler_instance.get_latest_articles(limit=limit)
+            # 获取比上次抓取位置更新的文章摘要 (e.g., from Jin10Crawler.get_latest_news())
+            cursor = self.db_client.get_crawl_cursor(source, "articles")
+            article_summaries, fetched_count = self._fetch_incremental(
+                lambda before: [] if before else crawler_instance.get_latest_articles(limit=limit, validator_scope="articles"),
+                cursor, limit
+            )
             
-            if not article_summaries:
-                logger.warning(f"{source_name} 未获取到文章摘要")
+            if isinstance(article_summaries, NotModifiedList):
+                logger.info(f"{source_name} 文章列表未变化，跳过")
                 return {
                     "source": source,
                     "total_fetched_summaries": 0,
                     "summaries_saved_for_later": 0,
                     "immediately_processed": 0,
+                    "skipped_unchanged": 1,
+                    "time": time.time() - start_time
+                }
+            
+            if not article_summaries:
+                if fetched_count:
+                    logger.info(f"{source_name} 没有新文章，{fetched_count} 篇均早于上次抓取位置")
+                else:
+                    logger.warning(f"{source_name} 未获取到文章摘要")
+                return {
+                    "source": source,
+                    "total_fetched_summaries": fetched_count,
+                    "summaries_saved_for_later": 0,
+                    "immediately_processed": 0,
+                    "skipped_seen": fetched_count,
                     "time": time.time() - start_time
                 }
             
-            logger.info(f"从 {source_name} 获取到 {len(article_summaries)} 篇文章摘要")
+            logger.info(f"从 {source_name} 获取到 {fetched_count} 篇文章摘要，其中 {len(article_summaries)} 篇为新文章")
             
             summaries_saved_for_later_count = 0
             immediately_processed_count = 0
+            failed_ids = set()
 
+            # 确保每篇摘要都有有效的 article_id
+            valid_summaries = []
             for article_summary in article_summaries:
-                try:
-                    # 确保我们有一个有效的 article_id
-                    article_id = article_summary.get("article_id") or article_summary.get("id")
-                    if not article_id:
-                        logger.warning(f"文章摘要缺少ID: {article_summary.get('title', 'N/A')}, 来自 {source_name}, 跳过.")
-                        continue
+                article_id = article_summary.get("article_id") or article_summary.get("id")
+                if not article_id:
+                    logger.warning(f"文章摘要缺少ID: {article_summary.get('title', 'N/A')}, 来自 {source_name}, 跳过.")
+                    continue
+                article_summary["id"] = article_id
+                valid_summaries.append(article_summary)
+
+            # 条件处理：即时处理或保存摘要
+            if hasattr(crawler_instance, 'supports_immediate_processing') and \
+               crawler_instance.supports_immediate_processing:
 
-                    # 检查文章是否已存在 (使用 article_id 和 source)
-                    if self.db_client.article_exists(article_id, source):
-                        logger.debug(f"文章 {article_id} ({source_name}) 已存在，跳过.")
+                # 一次查询找出已存在的文章 (使用 article_id 和 source)，过滤器判定为新的文章不查询数据库
+                summary_ids = [summary["id"] for summary in valid_summaries]
+                if self.dedup_filter:
+                    existing_ids = self.dedup_filter.existing_article_ids(summary_ids, source)
+                else:
+                    existing_ids = self.db_client.get_existing_article_ids(summary_ids, source)
+
+                new_ids = [summary["id"] for summary in valid_summaries if str(summary["id"]) not in existing_ids]
+                logger.info(f"{source_name} 支持即时处理。{len(new_ids)} 篇新文章交由爬虫获取详情、分析并保存, "
+                           f"{len(valid_summaries) - len(new_ids)} 篇已存在跳过")
+                
+                for article_id, detailed_article_data, error in self._process_details(crawler_instance, new_ids):
+                    if error is not None:
+                        failed_ids.add(str(article_id))
+                        logger.error(f"处理文章摘要 ID {article_id} ({source_name}) 时发生异常: {str(error)}", exc_info=error)
+                        self.db_client.add_article_log(article_id, "error", f"ArticleCrawler loop exception for {source_name}: {str(error)}")
                         continue
                     
-                    # 条件处理：即时处理或保存摘要
-                    if hasattr(crawler_instance, 'supports_immediate_processing') and \
-                       crawler_instance.supports_immediate_processing:
-                        
-                        logger.info(f"{source_name} 支持即时处理。调用 get_article_detail for ID: {article_id}")
-                        # crawler_instance.get_article_detail 将处理获取、搜索、AI分析和保存
-                        detailed_article_data = crawler_instance.get_article_detail(article_id)
-                        
-                        if detailed_article_data and detailed_article_data.get("processed_immediately"):
-                            logger.info(f"文章 {article_id} ({source_name}) 已通过爬虫即时处理并保存.")
-                            immediately_processed_count += 1
-                        elif detailed_article_data: # 可能已保存但AI分析失败或未标记
-                            logger.warning(f"文章 {article_id} ({source_name}) 由爬虫处理，但未明确标记为 'processed_immediately'. 检查爬虫日志。保存状态: {detailed_article_data.get('id') is not None}")
-                            # Decide if this counts towards a specific counter, e.g. if it was saved at all
-                            if self.db_client.article_exists(article_id, source): # Check if it ended up saved
-                                logger.info(f"文章 {article_id} ({source_name}) 确认已保存，但即时处理标志缺失或为false.")
-                                # Potentially count as 'summaries_saved_for_later_count' if processed=0, or a new category
-                        else:
-                            logger.error(f"即时处理文章 {article_id} ({source_name}) 失败。爬虫 {crawler_instance.__class__.__name__} 返回 None.")
-                            self.db_client.add_article_log(article_id, "error", f"Immediate processing by {crawler_instance.__class__.__name__} for {source_name} failed.")
+                    if detailed_article_data and self.dedup_filter:
+                        self.dedup_filter.add_article(detailed_article_data)
+                    
+                    if detailed_article_data and detailed_article_data.get("processed_immediately"):
+                        logger.info(f"文章 {article_id} ({source_name}) 已通过爬虫即时处理并保存.")
+                        immediately_processed_count += 1
+                    elif detailed_article_data: # 可能已保存但AI分析失败或未标记
+                        logger.warning(f"文章 {article_id} ({source_name}) 由爬虫处理，但未明确标记为 'processed_immediately'. 检查爬虫日志。保存状态: {detailed_article_data.get('id') is not None}")
+                        # Decide if this counts towards a specific counter, e.g. if it was saved at all
+                        if self.db_client.article_exists(article_id, source): # Check if it ended up saved
+                            logger.info(f"文章 {article_id} ({source_name}) 确认已保存，但即时处理标志缺失或为false.")
+                            # Potentially count as 'summaries_saved_for_later_count' if processed=0, or a new category
                     else:
-                        # 为不支持即时处理的爬虫保存摘要
-                        logger.info(f"{source_name} 不支持即时处理。保存文章摘要 ID: {article_id}")
-                        # article_summary 应该包含足够的信息供 save_article (如 title, url, source, published_at)
-                        save_result = self.db_client.save_article(article_summary) # 这会保存 processed=0
-                        if save_result:
-                            summaries_saved_for_later_count += 1
-                        else:
-                            logger.warning(f"保存文章摘要失败: {article_summary.get('title', 'N/A')} (ID: {article_id}) from {source_name}")
-                
-                except Exception as e:
-                    current_id_for_log = article_summary.get("article_id") or article_summary.get("id", "N/A")
-                    logger.error(f"处理文章摘要 ID {current_id_for_log} ({source_name}) 时发生异常: {str(e)}", exc_info=True)
-                    if current_id_for_log != "N/A":
-                        self.db_client.add_article_log(current_id_for_log, "error", f"ArticleCrawler loop exception for {source_name}: {str(e)}")
-                    continue
+                        failed_ids.add(str(article_id))
+                        logger.error(f"即时处理文章 {article_id} ({source_name}) 失败。爬虫 {crawler_instance.__class__.__name__} 返回 None.")
+                        self.db_client.add_article_log(article_id, "error", f"Immediate processing by {crawler_instance.__class__.__name__} for {source_name} failed.")
+            elif valid_summaries:
+                # 为不支持即时处理的爬虫批量保存摘要，单个事务写入 (新文章 processed=0，已存在的刷新基本信息)
+                logger.info(f"{source_name} 不支持即时处理。批量保存 {len(valid_summaries)} 篇文章摘要")
+                bulk_result = self.db_client.save_articles_bulk(valid_summaries)
+                summaries_saved_for_later_count = bulk_result.get("inserted", 0)
+                if "error" in bulk_result:
+                    failed_ids.update(summary["id"] for summary in valid_summaries)
+                elif self.dedup_filter:
+                    for summary in valid_summaries:
+                        self.dedup_filter.add_article(summary)
+            
+            # 推进抓取位置，处理失败的文章下次仍会被抓取，连续失败次数过多的除外
+            failed_ids = self._track_failures(source, "articles", valid_summaries, failed_ids)
+            self._advance_cursor(source, "articles", valid_summaries, cursor, failed_ids, fetched_at=start_time)
             
             # 更新统计结果
             result = {
                 "source": source,
-                "total_fetched_summaries": len(article_summaries),
+                "total_fetched_summaries": fetched_count,
                 "summaries_saved_for_later": summaries_saved_for_later_count,
                 "immediately_processed": immediately_processed_count,
+                "skipped_seen": fetched_count - len(article_summaries),
                 "time": time.time() - start_time
             }
             
@@ -174,44 +371,56 @@ class ArticleCrawler:
         logger.info(f"开始抓取 {source_name} 的最新快讯")
         
         try:
-            # 获取最新快讯
-            news_list = self.crawler_factory.get_news_flash(source, limit=limit)
+            # 获取比上次抓取位置更新的快讯，与上次之间有缺口时向前翻页
+            cursor = self.db_client.get_crawl_cursor(source, "flash")
+            news_list, fetched_count = self._fetch_incremental(
+                lambda before: self.crawler_factory.get_news_flash(source, limit=limit, before=before, validator_scope="flash"),
+                cursor, limit
+            )
             
-            if not news_list:
-                logger.warning(f"{source_name} 未获取到快讯")
+            if isinstance(news_list, NotModifiedList):
+                logger.info(f"{source_name} 快讯列表未变化，跳过")
                 return {
                     "source": source,
                     "total": 0,
                     "saved": 0,
+                    "skipped_unchanged": 1,
+                    "time": time.time() - start_time
+                }
+            
+            if not news_list:
+                if fetched_count:
+                    logger.info(f"{source_name} 没有新快讯，{fetched_count} 条均早于上次抓取位置")
+                else:
+                    logger.warning(f"{source_name} 未获取到快讯")
+                return {
+                    "source": source,
+                    "total": fetched_count,
+                    "saved": 0,
+                    "skipped_seen": fetched_count,
                     "time": time.time() - start_time
                 }
             
-            logger.info(f"从 {source_name} 获取到 {len(news_list)} 条快讯")
+            logger.info(f"从 {source_name} 获取到 {fetched_count} 条快讯，其中 {len(news_list)} 条为新快讯")
             
-            # 保存快讯到数据库
-            saved_count = 0
-            for news in news_list:
-                try:
-                    # 检查快讯是否已存在
-                    if self.db_client.flash_exists(news.get("id"), source):
-                        continue
-                    
-                    # 保存快讯
-                    save_result = self.db_client.save_flash(news)
-                    if save_result:
-                        saved_count += 1
-                    else:
-                        logger.warning(f"保存快讯失败: {news.get('title')}")
-                
-                except Exception as e:
-                    logger.error(f"保存快讯异常: {str(e)}")
-                    continue
+            # 过滤器确认已存在的快讯不再写入，全部已存在时跳过写事务
+            new_news = self._filter_existing_flash(news_list)
+            
+            # 单个事务批量保存快讯，已存在的快讯自动跳过
+            bulk_result = self.db_client.save_flash_bulk(new_news) if new_news else {"inserted": 0}
+            saved_count = bulk_result.get("inserted", 0)
+            if "error" not in bulk_result:
+                if self.dedup_filter:
+                    for news in new_news:
+                        self.dedup_filter.add_flash(news)
+                self._advance_cursor(source, "flash", news_list, cursor, fetched_at=start_time)
             
             # 统计结果
             result = {
                 "source": source,
-                "total": len(news_list),
+                "total": fetched_count,
                 "saved": saved_count,
+                "skipped_seen": fetched_count - len(news_list),
                 "time": time.time() - start_time
             }
             
@@ -230,52 +439,274 @@ class ArticleCrawler:
                 "time": time.time() - start_time
             }
     
-    def crawl_all_sources(self, article_limit=20, flash_limit=50):
+    def _filter_existing_flash(self, news_list):
+        """
+        去掉去重过滤器确认已存在的快讯
+        
+        Args:
+            news_list (list): 快讯列表
+            
+        Returns:
+            list: 尚未保存的快讯
+        """
+        if not self.dedup_filter:
+            return news_list
+        
+        by_source = {}
+        for news in news_list:
+            by_source.setdefault(news.get("source"), []).append(str(news.get("id")))
+        existing = set()
+        for news_source, ids in by_source.items():
+            existing.update((news_source, news_id)
+                            for news_id in self.dedup_filter.existing_flash_ids(ids, news_source))
+        return [news for news in news_list if (news.get("source"), str(news.get("id"))) not in existing]
+    
+    def _fetch_incremental(self, fetch_page, cursor, limit):
+        """
+        增量获取列表，只保留比抓取位置更新的条目
+        
+        第一页就到达上次抓取位置时直接停止；整页都是新条目说明与上次之间可能有缺口，
+        以本页最早的发布时间继续向前翻页，最多 CRAWL_MAX_GAP_PAGES 页。
+        
+        Args:
+            fetch_page (callable): fetch_page(before) 返回列表，before 为 None 时获取最新一页，
+                否则获取早于该发布时间的一页，不支持翻页时返回空列表
+            cursor (dict): 上次抓取位置 {"last_id": ..., "last_time": ...}，首次抓取为 None
+            limit (int): 每页数量
+            
+        Returns:
+            tuple: (新条目列表, 获取到的条目总数)。第一页返回 NotModifiedList 时原样返回
+        """
+        new_items = []
+        seen_ids = set()
+        fetched_count = 0
+        before = None
+        
+        for page in range(CRAWL_MAX_GAP_PAGES + 1):
+            page_items = fetch_page(before)
+            if page == 0 and isinstance(page_items, NotModifiedList):
+                return page_items, 0
+            if not page_items:
+                break
+            
+            fetched_count += len(page_items)
+            reached = False
+            for item in page_items:
+                item_id = str(item.get("article_id") or item.get("id") or "")
+                if self._is_seen(item_id, item.get("pubDate") or "", cursor):
+                    reached = True
+                elif not item_id or item_id not in seen_ids:
+                    seen_ids.add(item_id)
+                    new_items.append(item)
+            
+            # 首次抓取没有位置可以对齐，只取一页；到达已抓取位置或本页不满时没有缺口
+            if not cursor or reached or len(page_items) < limit:
+                break
+            
+            page_dates = [(parse_article_time(item.get("pubDate")), item["pubDate"]) for item in page_items]
+            page_dates = [page_date for page_date in page_dates if page_date[0] is not None]
+            if not page_dates:
+                break
+            before = min(page_dates)[1]
+            logger.info(f"与上次抓取位置 {cursor.get('last_time')} 之间可能有缺口，继续获取早于 {before} 的条目")
+        
+        return new_items, fetched_count
+    
+    @staticmethod
+    def _cursor_time(cursor):
+        """抓取位置的时间戳；没有位置、无法解析或晚于当前时间（此前误用了备用的当前时间）时返回 None"""
+        if not cursor:
+            return None
+        cursor_time = parse_article_time(cursor.get("last_time"))
+        if cursor_time is None or cursor_time > time.time():
+            return None
+        return cursor_time
+    
+    @classmethod
+    def _is_seen(cls, item_id, pub_date, cursor):
+        """条目是否不晚于上次抓取位置，发布时间按时间戳比较，不同格式的字符串不会误判"""
+        if not cursor:
+            return False
+        if item_id and item_id == cursor.get("last_id"):
+            return True
+        cursor_time = cls._cursor_time(cursor)
+        item_time = parse_article_time(pub_date)
+        return cursor_time is not None and item_time is not None and item_time < cursor_time
+    
+    def _track_failures(self, source, kind, items, failed_ids):
+        """
+        记录条目的连续失败次数，成功的条目清零
+        
+        Args:
+            source (str): 来源标识
+            kind (str): 抓取类型
+            items (list): 本次处理的新条目
+            failed_ids (set): 处理失败的条目ID
+            
+        Returns:
+            set: 仍需等待重试的失败条目ID，失败次数达到 CRAWL_MAX_ITEM_FAILURES 的条目不再阻止抓取位置推进
+        """
+        retry_ids = set()
+        with self._item_failures_lock:
+            for item in items:
+                item_id = str(item.get("id"))
+                key = (source, kind, item_id)
+                if item_id not in failed_ids:
+                    self._item_failures.pop(key, None)
+                    continue
+                failures = self._item_failures.get(key, 0) + 1
+                if failures < CRAWL_MAX_ITEM_FAILURES:
+                    self._item_failures[key] = failures
+                    retry_ids.add(item_id)
+                else:
+                    self._item_failures.pop(key, None)
+                    logger.warning(f"{source} 的条目 {item_id} 连续 {failures} 次处理失败，抓取位置不再等待它")
+        return retry_ids
+    
+    def _advance_cursor(self, source, kind, items, cursor, failed_ids=(), fetched_at=None):
+        """
+        将抓取位置推进到已成功保存的最新条目
+        
+        有处理失败的条目时，只推进到最早失败条目之前，保证失败的条目下次仍会被抓取。
+        发布时间无法解析或不早于获取列表的时间（爬虫解析失败时用当前时间代替）的条目不参与推进，
+        避免抓取位置跑到未来而把之后真实发布的条目当作已抓取。
+        
+        Args:
+            source (str): 来源标识
+            kind (str): 抓取类型，articles 或 flash
+            items (list): 本次处理的新条目
+            cursor (dict): 当前抓取位置
+            failed_ids (set): 处理失败的条目ID
+            fetched_at (float, optional): 开始获取列表的时间戳，默认为当前时间
+        """
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        candidates = [(parse_article_time(item.get("pubDate")), item) for item in items]
+        candidates = [(pub_time, item) for pub_time, item in candidates
+                      if pub_time is not None and pub_time < fetched_at]
+        failed_times = [pub_time for pub_time, item in candidates if str(item.get("id")) in failed_ids]
+        if failed_times:
+            oldest_failed = min(failed_times)
+            candidates = [(pub_time, item) for pub_time, item in candidates if pub_time < oldest_failed]
+        if not candidates:
+            return
+        
+        newest_time, newest = max(candidates, key=lambda candidate: candidate[0])
+        cursor_time = self._cursor_time(cursor)
+        if cursor_time is not None and newest_time <= cursor_time:
+            return
+        self.db_client.save_crawl_cursor(source, kind, newest.get("id"), newest["pubDate"])
+    
+    def get_feeds(self, source=None):
+        """
+        获取所有抓取任务
+        
+        Args:
+            source (str, optional): 只返回该来源的任务
+            
+        Returns:
+            list: (抓取类型, 来源) 列表，每个来源有 articles 任务，支持快讯的来源另有 flash 任务
+        """
+        feeds = []
+        for name in self.crawler_factory.get_all_sources():
+            if source and name != source:
+                continue
+            feeds.append(("articles", name))
+            if name in FLASH_SOURCES:
+                feeds.append(("flash", name))
+        return feeds
+    
+    def crawl_due_sources(self, article_limit=20, flash_limit=50, concurrent=None, max_workers=None, source=None):
+        """
+        只抓取已到自适应抓取时间的来源
+        
+        Args:
+            article_limit (int): 每个来源的文章数量限制
+            flash_limit (int): 每个来源的快讯数量限制
+            concurrent (bool, optional): 是否并发抓取，默认读取 CRAWL_CONCURRENT 配置
+            max_workers (int, optional): 并发线程数，默认读取 CRAWL_MAX_WORKERS 配置
+            source (str, optional): 只考虑该来源
+            
+        Returns:
+            dict: 与 crawl_all_sources 相同的抓取结果统计，没有到期的来源时为 None
+        """
+        due = self.schedule.due(self.get_feeds(source))
+        if not due:
+            return None
+        return self.crawl_all_sources(article_limit, flash_limit, concurrent, max_workers, feeds=due)
+    
+    def seconds_until_next_crawl(self, source=None):
+        """
+        距离下一个来源到期的秒数
+        
+        Args:
+            source (str, optional): 只考虑该来源
+            
+        Returns:
+            float: 秒数，已有来源到期时为 0
+        """
+        return self.schedule.seconds_until_due(self.get_feeds(source))
+    
+    def crawl_all_sources(self, article_limit=20, flash_limit=50, concurrent=None, max_workers=None, feeds=None):
         """
         抓取所有来源的最新文章和快讯
         
+        并发模式下每个来源的文章和快讯作为独立任务提交到有界线程池，
+        同一主机的任务受并发上限和间隔限制，总耗时接近最慢的单个来源。
+        每个任务的新条目数记入自适应调度表，用于计算该任务的下次抓取时间。
+        
         Args:
             article_limit (int): 每个来源的文章数量限制
             flash_limit (int): 每个来源的快讯数量限制
+            concurrent (bool, optional): 是否并发抓取，默认读取 CRAWL_CONCURRENT 配置
+            max_workers (int, optional): 并发线程数，默认读取 CRAWL_MAX_WORKERS 配置
+            feeds (list, optional): 只执行这些 (抓取类型, 来源) 任务，默认全部
             
         Returns:
-            dict: 抓取结果统计
+            dict: 抓取结果统计，timings 中记录每个来源各任务的耗时，schedule 中为本次抓取后的各任务间隔
         """
         start_time = time.time()
+        concurrent = CRAWL_CONCURRENT if concurrent is None else concurrent
         
-        logger.info(f"===== 开始抓取所有来源 {datetime.now().isoformat()} =====")
-        
-        # 获取所有支持的来源
-        sources = self.crawler_factory.get_all_sources()
+        logger.info(f"===== 开始抓取所有来源 {datetime.now().isoformat()} "
+                   f"({'并发' if concurrent else '顺序'}模式) =====")
         
         # 抓取结果统计
         results = {
             "articles": {
                 "total": 0,
                 "saved": 0,
+                "skipped_unchanged": 0,
                 "sources": {}
             },
             "flash": {
                 "total": 0,
                 "saved": 0,
+                "skipped_unchanged": 0,
                 "sources": {}
-            }
+            },
+            "timings": {},
+            "schedule": {}
         }
         
-        # 依次抓取每个来源的文章
-        for source in sources:
-            # 抓取文章
-            article_result = self.crawl_source(source, article_limit)
-            results["articles"]["total"] += article_result.get("total", 0)
-            results["articles"]["saved"] += article_result.get("saved", 0)
-            results["articles"]["sources"][source] = article_result
-            
-            # 支持快讯的来源，抓取快讯
-            if source in ["jin10", "gelonghui", "cls"]:
-                flash_result = self.crawl_flash(source, flash_limit)
-                results["flash"]["total"] += flash_result.get("total", 0)
-                results["flash"]["saved"] += flash_result.get("saved", 0)
-                results["flash"]["sources"][source] = flash_result
+        # 每个来源的文章和快讯分别作为一个任务
+        tasks = []
+        for kind, source in (self.get_feeds() if feeds is None else feeds):
+            if kind == "flash":
+                tasks.append((kind, source, self.crawl_flash, flash_limit))
+            else:
+                tasks.append((kind, source, self.crawl_source, article_limit))
+        
+        if concurrent:
+            self._run_tasks_concurrently(tasks, results, max_workers or CRAWL_MAX_WORKERS)
+        else:
+            # 依次抓取每个来源
+            for kind, source, func, limit in tasks:
+                self._merge_result(results, kind, source, func(source, limit))
+        
+        for kind, source, _, limit in tasks:
+            result = results[kind]["sources"].get(source, {})
+            state = self.schedule.record(kind, source, self._new_item_count(kind, result), limit)
+            results["schedule"].setdefault(source, {})[kind] = state["interval"]
         
         # 计算总耗时
         total_time = time.time() - start_time
@@ -286,6 +717,89 @@ class ArticleCrawler:
                    f"新增 {results['articles']['saved']} 篇")
         logger.info(f"快讯 {results['flash']['total']} 条, "
                    f"新增 {results['flash']['saved']} 条")
+        logger.info(f"未变化跳过: 文章列表 {results['articles']['skipped_unchanged']} 个, "
+                   f"快讯列表 {results['flash']['skipped_unchanged']} 个")
+        for source, timing in results["timings"].items():
+            logger.info(f"{self.crawler_factory.get_source_name(source)} 耗时: "
+                       + ", ".join(f"{kind} {seconds:.2f}秒" for kind, seconds in timing.items()))
+        for source, intervals in results["schedule"].items():
+            logger.info(f"{self.crawler_factory.get_source_name(source)} 下次抓取间隔: "
+                       + ", ".join(f"{kind} {interval:.0f}秒" for kind, interval in intervals.items()))
+        if self.dedup_filter:
+            stats = self.dedup_filter.stats()
+            logger.info(f"去重过滤器: 检查 {stats['checks']} 次, 跳过数据库 {stats['negatives']} 次, "
+                       f"假阳性 {stats['false_positives']} 次 (实际误判率 {stats['observed_fp_rate']:.4f}, "
+                       f"估算误判率 {stats['expected_fp_rate']:.4f})")
+            self.dedup_filter.save()
+        if self._pipeline:
+            for stage, stats in self._pipeline.stats().items():
+                logger.info(f"流水线 {stage}: 完成 {stats['processed']}, 结束 {stats['dropped']}, 异常 {stats['errors']}, "
+                           f"平均 {stats['avg_seconds']:.2f}秒, 队列 {stats['queue_depth']}/{stats['queue_size']}, "
+                           f"等待下游 {stats['blocked_seconds']:.2f}秒")
         logger.info(f"总耗时: {total_time:.2f}秒")
         
         return results
+    
+    def _run_tasks_concurrently(self, tasks, results, max_workers):
+        """
+        在有界线程池中执行抓取任务，同一主机受 CRAWL_PER_HOST_LIMIT 和 CRAWL_HOST_DELAY 限制
+        
+        Args:
+            tasks (list): (类型, 来源, 抓取函数, 数量限制) 列表
+            results (dict): 合并结果的统计字典
+            max_workers (int): 线程数上限
+        """
+        limiter = _HostLimiter(CRAWL_PER_HOST_LIMIT, CRAWL_HOST_DELAY)
+        
+        with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="crawl") as executor:
+            futures = {
+                executor.submit(limiter.run, self._source_host(source), func, source, limit): (kind, source)
+                for kind, source, func, limit in tasks
+            }
+            
+            for future in as_completed(futures):
+                kind, source = futures[future]
+                try:
+                    result, waited = future.result()
+                    result["wait_time"] = waited
+                except Exception as e:
+                    logger.error(f"并发抓取 {source} {kind} 异常: {str(e)}")
+                    result = {"source": source, "total": 0, "saved": 0, "error": str(e), "time": 0}
+                self._merge_result(results, kind, source, result)
+        
+        # 结果按完成顺序合并，这里恢复为来源顺序，便于阅读日志和统计
+        order = {source: index for index, (_, source, _, _) in enumerate(tasks)}
+        for section in ("articles", "flash"):
+            results[section]["sources"] = dict(
+                sorted(results[section]["sources"].items(), key=lambda item: order[item[0]])
+            )
+        results["timings"] = dict(sorted(results["timings"].items(), key=lambda item: order[item[0]]))
+    
+    def _source_host(self, source):
+        """获取来源对应的主机名，用于按主机限流"""
+        crawler_instance = self.crawler_factory.get_crawler(source)
+        base_url = getattr(crawler_instance, "base_url", "") or ""
+        return urlparse(base_url).netloc or source
+    
+    @staticmethod
+    def _new_item_count(kind, result):
+        """
+        从单个任务的结果中取出实际新增的条目数，抓取失败时返回 None
+
+        只统计真正写入或处理的条目：比抓取位置新但已由快讯轮询或其他路径保存的条目不算新条目，
+        否则调度会把重复条目当作来源变忙而缩短间隔。
+        """
+        if "error" in result:
+            return None
+        if kind == "flash":
+            return result.get("saved", 0)
+        return result.get("summaries_saved_for_later", 0) + result.get("immediately_processed", 0)
+    
+    @staticmethod
+    def _merge_result(results, kind, source, result):
+        """将单个任务的结果合并到总统计中"""
+        results[kind]["total"] += result.get("total", 0)
+        results[kind]["saved"] += result.get("saved", 0)
+        results[kind]["skipped_unchanged"] += result.get("skipped_unchanged", 0)
+        results[kind]["sources"][source] = result
+        results["timings"].setdefault(source, {})[kind] = result.get("time", 0)
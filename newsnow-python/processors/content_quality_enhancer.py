@@ -16,6 +16,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.improved_ai_service import FinanceAnalyzer
 from db.sqlite_client import SQLiteClient
+from utils.job_queue import JobQueue
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +31,8 @@ class ContentQualityEnhancer:
             db_path (str, optional): 数据库路径
         """
         self.db_client = SQLiteClient(db_path)
+        # 质量增强任务队列，多个进程共享
+        self.job_queue = JobQueue(self.db_client, "enhance")
         
         # 初始化AI分析器
         api_key = os.environ.get("DEEPSEEK_API_KEY")
@@ -101,16 +104,16 @@ class ContentQualityEnhancer:
             List[Dict]: 增强后的文章列表
         """
         try:
-            # 获取需要增强的文章（优先选择未增强的）
-            articles = self.db_client.get_articles_for_enhancement(limit, source)
-            
+            # 从任务队列按优先级领取未增强的文章，失败的任务按退避重试
             enhanced_articles = []
-            for article in articles:
-                enhanced = self.enhance_article_quality(
-                    article.get('id'), article.get('source')
-                )
+            
+            def enhance(article):
+                enhanced = self.enhance_article_quality(article.get('id'), article.get('source'))
                 if enhanced:
                     enhanced_articles.append(enhanced)
+                return enhanced
+            
+            self.job_queue.run_batch(enhance, limit, source)
             
             logger.info(f"批量增强完成，处理了 {len(enhanced_articles)} 篇文章")
             return enhanced_articles
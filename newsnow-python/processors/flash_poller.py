@@ -0,0 +1,370 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+快讯高频轮询器 - 每个来源每隔几秒拉取一小页快讯，只把没见过的快讯批量写入 flash_news
+
+快讯原本只在每半小时一次的文章抓取中顺带获取，一条快讯从发布到入库可能要等半个小时。轮询器为每个来源
+开一个轮询线程，每 FLASH_POLL_INTERVAL 秒用条件请求获取最新 FLASH_POLL_LIMIT 条（列表未变化时服务器
+返回 304，不解析也不写库；校验信息记在独立的作用域下，与 ArticleCrawler 的抓取互不影响）；最近见过的快讯ID记在内存中，已见过的直接丢弃，不查询数据库；新快讯交给
+单独的写入线程，队列中积攒的快讯在同一个事务中批量写入，写入线程是唯一的写者，不与轮询线程争抢写锁。
+
+每条快讯从发布时间到写入事务提交（其他连接可见）的延迟记入统计，目标为 FLASH_INGEST_TARGET_SECONDS 秒以内。
+
+    poller = FlashPoller()
+    poller.start()
+    ...
+    poller.stats()["publish_to_visible"]   # {"p50": ..., "p90": ..., "over_target": ...}
+"""
+
+import time
+import queue
+import logging
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime
+
+import sys
+import os
+# 修改为绝对导入路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crawlers.crawler_factory import CrawlerFactory
+from db.sqlite_client import SQLiteClient
+from utils.http_client import NotModifiedList
+from config.settings import (
+    FLASH_POLL_SOURCES, FLASH_POLL_INTERVAL, FLASH_POLL_LIMIT, FLASH_POLL_MEMORY, FLASH_INGEST_TARGET_SECONDS
+)
+
+logger = logging.getLogger(__name__)
+
+
+def publish_timestamp(pub_date):
+    """
+    把快讯的发布时间转换为时间戳
+
+    Args:
+        pub_date (str): ISO 格式的发布时间，不带时区时按本地时间处理
+
+    Returns:
+        float: 时间戳，无法解析时返回 None
+    """
+    if not pub_date:
+        return None
+    try:
+        return datetime.fromisoformat(str(pub_date).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+class LatencyTracker:
+    """记录最近的延迟样本，计算分位数和超出目标的次数"""
+
+    def __init__(self, target=None, window=1000):
+        """
+        Args:
+            target (float, optional): 目标延迟（秒），默认读取 FLASH_INGEST_TARGET_SECONDS
+            window (int): 计算分位数时使用的最近样本数
+        """
+        self.target = FLASH_INGEST_TARGET_SECONDS if target is None else target
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.over_target = 0
+
+    def add(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+            if seconds > self.target:
+                self.over_target += 1
+
+    def summary(self):
+        """
+        Returns:
+            dict: 样本总数、超出目标次数，以及最近样本的平均值、p50、p90、p99 和最大值（秒）
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+            result = {"count": self.count, "target": self.target, "over_target": self.over_target}
+        if not samples:
+            return result
+        result.update({
+            "avg": round(sum(samples) / len(samples), 3),
+            "p50": round(samples[int(len(samples) * 0.5)], 3),
+            "p90": round(samples[min(len(samples) - 1, int(len(samples) * 0.9))], 3),
+            "p99": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))], 3),
+            "max": round(samples[-1], 3)
+        })
+        return result
+
+
+class FlashPoller:
+    """快讯高频轮询器"""
+
+    def __init__(self, db_client=None, crawler_factory=None, sources=None, interval=None, limit=None,
+                 memory=None, name="flash_poller"):
+        """
+        Args:
+            db_client (SQLiteClient, optional): 数据库客户端，默认新建
+            crawler_factory (CrawlerFactory, optional): 爬虫工厂，默认新建
+            sources (list, optional): 轮询的来源，默认读取 FLASH_POLL_SOURCES
+            interval (float, optional): 每个来源的轮询间隔（秒），默认读取 FLASH_POLL_INTERVAL
+            limit (int, optional): 每次获取的快讯数量，默认读取 FLASH_POLL_LIMIT
+            memory (int, optional): 内存中记住的快讯ID数量，默认读取 FLASH_POLL_MEMORY
+            name (str): 名称，用于线程名和统计
+        """
+        self.db_client = db_client or SQLiteClient()
+        self.crawler_factory = crawler_factory or CrawlerFactory()
+        self.sources = list(sources or FLASH_POLL_SOURCES)
+        self.interval = FLASH_POLL_INTERVAL if interval is None else interval
+        self.limit = FLASH_POLL_LIMIT if limit is None else limit
+        self.memory = FLASH_POLL_MEMORY if memory is None else memory
+        self.name = name
+
+        # 最近见过的快讯ID，按写入顺序淘汰最旧的
+        self._seen = None
+        self._seen_lock = threading.Lock()
+        # (来源, 快讯, 获取时间)，由写入线程批量写库
+        self._queue = queue.Queue()
+        self._stop = threading.Event()
+        self._threads = []
+        self._polled = set()
+        # 早于此时发布的是积压快讯，不计入入库延迟
+        self._created_at = time.time()
+
+        self._lock = threading.Lock()
+        self._source_stats = {source: {"polls": 0, "not_modified": 0, "errors": 0, "fetched": 0, "new": 0,
+                                       "fetch_seconds": 0.0} for source in self.sources}
+        self._write_stats = {"batches": 0, "inserted": 0, "skipped": 0, "errors": 0, "write_seconds": 0.0}
+        self.publish_latency = LatencyTracker()
+        self.fetch_latency = LatencyTracker()
+        self._source_latency = {source: LatencyTracker() for source in self.sources}
+        _register(self)
+
+    def _load_seen(self):
+        """首次使用时用数据库中最新的快讯ID初始化，调用方须持有锁"""
+        if self._seen is None:
+            self._seen = OrderedDict(
+                (str(news["id"]), True) for news in reversed(self.db_client.get_latest_flash(limit=self.memory))
+            )
+        return self._seen
+
+    def _take_new(self, news_list):
+        """返回没见过的快讯并记住它们的ID"""
+        new_news = []
+        with self._seen_lock:
+            seen = self._load_seen()
+            for news in news_list:
+                news_id = str(news.get("id") or "")
+                if not news_id or news_id in seen:
+                    continue
+                seen[news_id] = True
+                new_news.append(news)
+            while len(seen) > self.memory:
+                seen.popitem(last=False)
+        return new_news
+
+    def _forget(self, news_list):
+        """写入失败时忘掉这些ID，下次轮询重新写入"""
+        with self._seen_lock:
+            for news in news_list:
+                self._seen.pop(str(news.get("id")), None)
+
+    def poll_source(self, source):
+        """
+        轮询一个来源一次，新快讯放入写入队列
+
+        Args:
+            source (str): 来源标识
+
+        Returns:
+            int: 新快讯数量
+        """
+        start_time = time.time()
+        try:
+            # 使用独立的条件请求作用域，轮询器收到的 200 不会让 ArticleCrawler 的快讯和文章抓取收到 304
+            news_list = self.crawler_factory.get_news_flash(source, limit=self.limit, validator_scope="flash_poller")
+        except Exception as e:
+            logger.error(f"轮询 {source} 快讯异常: {str(e)}")
+            with self._lock:
+                self._source_stats[source]["errors"] += 1
+            return 0
+        fetched_at = time.time()
+
+        new_news = [] if isinstance(news_list, NotModifiedList) else self._take_new(news_list)
+        for news in new_news:
+            self._queue.put((source, news, fetched_at))
+        # 第一次取得列表时所有快讯都没见过，之后整页都是新快讯才说明可能有遗漏
+        first_poll = source not in self._polled
+        if news_list:
+            self._polled.add(source)
+
+        with self._lock:
+            stats = self._source_stats[source]
+            stats["polls"] += 1
+            stats["fetch_seconds"] += fetched_at - start_time
+            stats["fetched"] += len(news_list)
+            stats["new"] += len(new_news)
+            if isinstance(news_list, NotModifiedList):
+                stats["not_modified"] += 1
+        if not first_poll and len(new_news) >= self.limit:
+            logger.warning(f"{source} 一次轮询的 {len(new_news)} 条快讯都是新的，可能有遗漏，"
+                           f"可以缩短 FLASH_POLL_INTERVAL 或增大 FLASH_POLL_LIMIT")
+        return len(new_news)
+
+    def flush(self, timeout=0.0):
+        """
+        把写入队列中积攒的快讯在一个事务中写入数据库，并记录入库延迟
+
+        Args:
+            timeout (float): 队列为空时最多等待的秒数
+
+        Returns:
+            int: 新增的快讯数量
+        """
+        try:
+            entries = [self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()]
+        except queue.Empty:
+            return 0
+        while True:
+            try:
+                entries.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        news_list = [news for _, news, _ in entries]
+        start_time = time.time()
+        result = self.db_client.save_flash_bulk(news_list)
+        visible_at = time.time()
+
+        with self._lock:
+            self._write_stats["batches"] += 1
+            self._write_stats["write_seconds"] += visible_at - start_time
+            if "error" in result:
+                self._write_stats["errors"] += 1
+            else:
+                self._write_stats["inserted"] += result.get("inserted", 0)
+                self._write_stats["skipped"] += result.get("skipped", 0)
+        if "error" in result:
+            self._forget(news_list)
+            return 0
+
+        for source, news, fetched_at in entries:
+            self.fetch_latency.add(visible_at - fetched_at)
+            published_at = publish_timestamp(news.get("pubDate"))
+            if published_at is None or published_at < self._created_at:
+                continue
+            # 来源时间与本机时钟可能有偏差，不记负延迟
+            latency = max(0.0, visible_at - published_at)
+            self.publish_latency.add(latency)
+            self._source_latency[source].add(latency)
+        return result.get("inserted", 0)
+
+    def poll_all_once(self):
+        """
+        依次轮询所有来源一次并写入数据库
+
+        Returns:
+            int: 新增的快讯数量
+        """
+        for source in self.sources:
+            self.poll_source(source)
+        return self.flush()
+
+    def _poll_loop(self, source):
+        while not self._stop.is_set():
+            start_time = time.time()
+            self.poll_source(source)
+            self._stop.wait(max(0.0, self.interval - (time.time() - start_time)))
+
+    def _write_loop(self):
+        # 停止后仍把队列中剩余的快讯写完
+        while not self._stop.is_set() or not self._queue.empty():
+            try:
+                inserted = self.flush(timeout=0.5)
+            except Exception as e:
+                logger.error(f"快讯批量写入异常: {str(e)}")
+                continue
+            if inserted:
+                latency = self.publish_latency.summary()
+                logger.info(f"快讯入库 {inserted} 条, 发布→可见 p50 {latency.get('p50', 0):.1f}秒, "
+                           f"p90 {latency.get('p90', 0):.1f}秒")
+
+    def start(self):
+        """为每个来源启动轮询线程，并启动写入线程"""
+        if self._threads:
+            return
+        self._stop.clear()
+        self._threads.append(threading.Thread(target=self._write_loop, name=f"{self.name}-writer", daemon=True))
+        for source in self.sources:
+            self._threads.append(threading.Thread(target=self._poll_loop, args=(source,),
+                                                  name=f"{self.name}-{source}", daemon=True))
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"快讯轮询已启动: {', '.join(self.sources)}，每 {self.interval} 秒轮询一次，"
+                   f"每次 {self.limit} 条")
+
+    def stop(self):
+        """停止轮询，返回时已取得的快讯均已写入数据库"""
+        self._stop.set()
+        threads, self._threads = self._threads, []
+        for thread in threads:
+            thread.join()
+
+    def close(self):
+        """运行时重建组件时调用"""
+        self.stop()
+
+    def stats(self):
+        """
+        获取轮询统计
+
+        Returns:
+            dict: sources 为各来源的轮询次数、304 次数、异常数、获取/新增数量、平均请求耗时和发布→可见延迟；
+                writes 为批量写入次数、新增/跳过数量和平均写入耗时；publish_to_visible 为发布到入库可见的延迟，
+                fetch_to_visible 为取得到入库可见的延迟
+        """
+        with self._lock:
+            sources = {}
+            for source, stats in self._source_stats.items():
+                sources[source] = {key: value for key, value in stats.items() if key != "fetch_seconds"}
+                sources[source]["avg_fetch_seconds"] = (
+                    round(stats["fetch_seconds"] / stats["polls"], 3) if stats["polls"] else 0.0
+                )
+                sources[source]["publish_to_visible"] = self._source_latency[source].summary()
+            writes = {key: value for key, value in self._write_stats.items() if key != "write_seconds"}
+            writes["avg_write_seconds"] = (
+                round(self._write_stats["write_seconds"] / self._write_stats["batches"], 4)
+                if self._write_stats["batches"] else 0.0
+            )
+        return {
+            "running": bool(self._threads),
+            "interval": self.interval,
+            "limit": self.limit,
+            "sources": sources,
+            "writes": writes,
+            "publish_to_visible": self.publish_latency.summary(),
+            "fetch_to_visible": self.fetch_latency.summary()
+        }
+
+
+_pollers = {}
+_pollers_lock = threading.Lock()
+
+
+def _register(poller):
+    with _pollers_lock:
+        _pollers[poller.name] = poller
+
+
+def flash_poller_stats():
+    """
+    获取本进程中所有快讯轮询器的统计
+
+    Returns:
+        dict: 轮询器名称 -> 统计
+    """
+    with _pollers_lock:
+        pollers = list(_pollers.values())
+    return {poller.name: poller.stats() for poller in pollers}
@@ -7,6 +7,7 @@
 
 import logging
 import time
+import itertools
 from datetime import datetime
 # 修改为绝对导入路径
 import sys
@@ -25,6 +26,7 @@ from crawlers.crawler_factory import CrawlerFactory # Added
 from utils.text_extractor import extract_clean_content, is_content_valid # Added
 from config.settings import MAX_SEARCH_RESULTS, ENABLE_DEEPSEEK # Added ENABLE_DEEPSEEK
 from utils.improved_ai_service import FinanceAnalyzer # Added for consistent AI service usage
+from utils.job_queue import JobQueue
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +46,8 @@ class SearchAnalyzer:
         self.db_client = SQLiteClient(db_path)
         self.search_service = SearchService(search_url)
         self.crawler_factory = CrawlerFactory() # Added
+        # 与 ArticleProcessor 共享的分析任务队列
+        self.job_queue = JobQueue(self.db_client, "analyze")
 
         # Initialize FinanceAnalyzer for consistent AI service usage
         self.use_deepseek = ENABLE_DEEPSEEK
@@ -175,101 +179,19 @@ class SearchAnalyzer:
         """
         batch_start_time = time.time()
         
-        # 获取数据库中标记为未处理的文章摘要
-        unprocessed_article_summaries = self.db_client.get_unprocessed_articles(batch_size, source)
-        article_count = len(unprocessed_article_summaries)
+        # 从与 ArticleProcessor 共享的任务队列领取，各篇文章并发处理，DeepSeek 请求的速率由 api_gate 统一控制
+        counter = itertools.count(1)
+        stats = self.job_queue.run_batch(
+            lambda summary: self._analyze_summary(next(counter), batch_size, summary), batch_size, source
+        )
+        article_count = stats["total"]
         
         if article_count == 0:
             logger.info("SearchAnalyzer: No unprocessed articles found to analyze.")
             return {"total": 0, "success": 0, "failed": 0, "time": 0}
         
-        logger.info(f"SearchAnalyzer: Starting batch analysis for {article_count} articles.")
-        
-        success_count = 0
-        fail_count = 0
-        
-        for index, summary in enumerate(unprocessed_article_summaries, 1):
-            article_id = summary.get('id')
-            article_source = summary.get('source')
-            article_title = summary.get('title', 'N/A') # title for logging
-
-            logger.info(f"SearchAnalyzer Batch [{index}/{article_count}]: Processing article ID {article_id} ('{article_title}') from {article_source}.")
-
-            try:
-                crawler_instance = self.crawler_factory.get_crawler(article_source)
-                if not crawler_instance:
-                    logger.error(f"SearchAnalyzer: No crawler instance for source '{article_source}' for article ID {article_id}. Skipping.")
-                    fail_count += 1
-                    continue
-
-                # 调用爬虫的 get_article_detail 方法
-                # 这个方法对于 Jin10Crawler 这样的即时处理爬虫，会完成所有工作并返回包含分析的数据
-                # 对于旧爬虫，它可能只返回原始内容
-                detailed_article_data = crawler_instance.get_article_detail(article_id)
-
-                if detailed_article_data and detailed_article_data.get("processed_immediately") and detailed_article_data.get("analysis_data"):
-                    logger.info(f"SearchAnalyzer: Article ID {article_id} ('{article_title}') was already processed immediately by {article_source} crawler. Counting as success.")
-                    # 确保数据库状态一致 (虽然爬虫应该已经设置了 processed=1)
-                    # 如果需要，可以再次调用 self.db_client.mark_as_processed(article_id, article_source) 但通常不必要
-                    success_count += 1
-                elif detailed_article_data: # 不是即时处理，或者即时处理失败但返回了原始数据
-                    logger.info(f"SearchAnalyzer: Article ID {article_id} ('{article_title}') not (fully) processed immediately. Proceeding with fallback search and analysis.")
-                    
-                    # 从 detailed_article_data 提取所需信息
-                    # Jin10Crawler 返回的 detailed_article_data 结构：
-                    # {'id': ..., 'title': ..., 'content': (cleaned_text), 'htmlContent': ..., 'url': ..., 'source': ..., 
-                    #  'published_at': ..., 'cover_image_url': ..., 'searxng_results': [...], 'analysis_data': {...}, 'processed_immediately': True}
-                    # 其他爬虫可能只返回: {'id': ..., 'title': ..., 'content': (html_content), 'url': ..., 'source': ..., 'published_at': ...}
-                    
-                    raw_content_from_crawler = detailed_article_data.get('content') # Jin10Crawler返回的是clean_text, 其他可能是HTML
-                    # 如果 Jin10Crawler 的 get_article_detail 失败了AI分析但保存了文章，它可能没有 analysis_data 和 processed_immediately=true
-                    # 这种情况下，我们仍希望 SearchAnalyzer 来处理它
-                    
-                    # 尝试获取预提取的搜索结果 (如果爬虫提供了)
-                    searxng_results_from_crawler = detailed_article_data.get('searxng_results')
-
-                    # 内容清理 (如果得到的是HTML)
-                    # 假设 Jin10Crawler 已经提供了 'content' 作为干净文本
-                    # 对于其他爬虫，如果 'content' 是HTML，需要清理
-                    # 我们需要一种方式来判断 'content' 是HTML还是纯文本，或者让爬虫明确区分
-                    # 暂时假设，如果不是 Jin10 并且有 content，就尝试清理
-                    cleaned_text_content = raw_content_from_crawler
-                    if article_source != 'jin10' and raw_content_from_crawler: # 简化的判断，可能需要更稳健的方式
-                         # 检查是否看起来像HTML，如果是，则清理
-                        if "<html" in raw_content_from_crawler.lower() or "<div" in raw_content_from_crawler.lower():
-                            logger.info(f"SearchAnalyzer: Content for {article_id} from {article_source} appears to be HTML, cleaning...")
-                            cleaned_text_content = extract_clean_content(raw_content_from_crawler)
-                        else:
-                             logger.info(f"SearchAnalyzer: Content for {article_id} from {article_source} assumed to be plain text.")
-                    elif not raw_content_from_crawler:
-                        logger.warning(f"SearchAnalyzer: No content found in detailed_article_data for {article_id} from {article_source}. Using title.")
-                        cleaned_text_content = detailed_article_data.get('title', article_title)
-                    
-                    if not is_content_valid(cleaned_text_content, detailed_article_data.get('title', article_title)):
-                        logger.warning(f"SearchAnalyzer: Content for {article_id} ('{detailed_article_data.get('title', article_title)}') is invalid after potential cleaning. Using title as content.")
-                        cleaned_text_content = detailed_article_data.get('title', article_title)
-
-                    fallback_result = self._perform_search_and_analysis_fallback(
-                        article_id=article_id,
-                        title=detailed_article_data.get('title', article_title),
-                        text_content=cleaned_text_content,
-                        source=article_source,
-                        url=detailed_article_data.get('url'),
-                        published_at=detailed_article_data.get('published_at'),
-                        searxng_results_from_crawler=searxng_results_from_crawler
-                    )
-                    if fallback_result:
-                        success_count += 1
-                    else:
-                        fail_count += 1
-                else:
-                    logger.error(f"SearchAnalyzer: get_article_detail for ID {article_id} ('{article_title}') from {article_source} returned None. Skipping.")
-                    self.db_client.add_article_log(article_id, "error", f"SearchAnalyzer: {crawler_instance.__class__.__name__}.get_article_detail returned None for {article_source}")
-                    fail_count += 1
-            except Exception as e:
-                logger.error(f"SearchAnalyzer Batch: Error processing article ID {article_id} ('{article_title}'): {str(e)}", exc_info=True)
-                self.db_client.add_article_log(article_id, "error", f"SearchAnalyzer batch loop error: {str(e)}")
-                fail_count += 1
+        success_count = stats["success"]
+        fail_count = stats["failed"]
         
         total_time = time.time() - batch_start_time
         avg_time = total_time / article_count if article_count > 0 else 0
@@ -285,6 +207,99 @@ class SearchAnalyzer:
             "avg_time": avg_time
         }
     
+    def _analyze_summary(self, index, article_count, summary):
+        """
+        分析单篇文章摘要
+        
+        Args:
+            index (int): 在本批中的序号
+            article_count (int): 本批文章总数
+            summary (dict): 文章摘要
+            
+        Returns:
+            bool: 是否处理成功
+        """
+        article_id = summary.get('id')
+        article_source = summary.get('source')
+        article_title = summary.get('title', 'N/A') # title for logging
+
+        logger.info(f"SearchAnalyzer Batch [{index}/{article_count}]: Processing article ID {article_id} ('{article_title}') from {article_source}.")
+
+        try:
+            crawler_instance = self.crawler_factory.get_crawler(article_source)
+            if not crawler_instance:
+                logger.error(f"SearchAnalyzer: No crawler instance for source '{article_source}' for article ID {article_id}. Skipping.")
+                return False
+
+            # 调用爬虫的 get_article_detail 方法
+            # 这个方法对于 Jin10Crawler 这样的即时处理爬虫，会完成所有工作并返回包含分析的数据
+            # 对于旧爬虫，它可能只返回原始内容
+            detailed_article_data = crawler_instance.get_article_detail(article_id)
+
+            if detailed_article_data and detailed_article_data.get("processed_immediately") and detailed_article_data.get("analysis_data"):
+                logger.info(f"SearchAnalyzer: Article ID {article_id} ('{article_title}') was already processed immediately by {article_source} crawler. Counting as success.")
+                # 确保数据库状态一致 (虽然爬虫应该已经设置了 processed=1)
+                # 如果需要，可以再次调用 self.db_client.mark_as_processed(article_id, article_source) 但通常不必要
+                return True
+            elif detailed_article_data: # 不是即时处理，或者即时处理失败但返回了原始数据
+                logger.info(f"SearchAnalyzer: Article ID {article_id} ('{article_title}') not (fully) processed immediately. Proceeding with fallback search and analysis.")
+                
+                # 从 detailed_article_data 提取所需信息
+                # Jin10Crawler 返回的 detailed_article_data 结构：
+                # {'id': ..., 'title': ..., 'content': (cleaned_text), 'htmlContent': ..., 'url': ..., 'source': ..., 
+                #  'published_at': ..., 'cover_image_url': ..., 'searxng_results': [...], 'analysis_data': {...}, 'processed_immediately': True}
+                # 其他爬虫可能只返回: {'id': ..., 'title': ..., 'content': (html_content), 'url': ..., 'source': ..., 'published_at': ...}
+                
+                raw_content_from_crawler = detailed_article_data.get('content') # Jin10Crawler返回的是clean_text, 其他可能是HTML
+                # 如果 Jin10Crawler 的 get_article_detail 失败了AI分析但保存了文章，它可能没有 analysis_data 和 processed_immediately=true
+                # 这种情况下，我们仍希望 SearchAnalyzer 来处理它
+                
+                # 尝试获取预提取的搜索结果 (如果爬虫提供了)
+                searxng_results_from_crawler = detailed_article_data.get('searxng_results')
+
+                # 内容清理 (如果得到的是HTML)
+                # 假设 Jin10Crawler 已经提供了 'content' 作为干净文本
+                # 对于其他爬虫，如果 'content' 是HTML，需要清理
+                # 我们需要一种方式来判断 'content' 是HTML还是纯文本，或者让爬虫明确区分
+                # 暂时假设，如果不是 Jin10 并且有 content，就尝试清理
+                cleaned_text_content = raw_content_from_crawler
+                if article_source != 'jin10' and raw_content_from_crawler: # 简化的判断，可能需要更稳健的方式
+                     # 检查是否看起来像HTML，如果是，则清理
+                    if "<html" in raw_content_from_crawler.lower() or "<div" in raw_content_from_crawler.lower():
+                        logger.info(f"SearchAnalyzer: Content for {article_id} from {article_source} appears to be HTML, cleaning...")
+                        cleaned_text_content = extract_clean_content(raw_content_from_crawler)
+                    else:
+                         logger.info(f"SearchAnalyzer: Content for {article_id} from {article_source} assumed to be plain text.")
+                elif not raw_content_from_crawler:
+                    logger.warning(f"SearchAnalyzer: No content found in detailed_article_data for {article_id} from {article_source}. Using title.")
+                    cleaned_text_content = detailed_article_data.get('title', article_title)
+                
+                if not is_content_valid(cleaned_text_content, detailed_article_data.get('title', article_title)):
+                    logger.warning(f"SearchAnalyzer: Content for {article_id} ('{detailed_article_data.get('title', article_title)}') is invalid after potential cleaning. Using title as content.")
+                    cleaned_text_content = detailed_article_data.get('title', article_title)
+
+                fallback_result = self._perform_search_and_analysis_fallback(
+                    article_id=article_id,
+                    title=detailed_article_data.get('title', article_title),
+                    text_content=cleaned_text_content,
+                    source=article_source,
+                    url=detailed_article_data.get('url'),
+                    published_at=detailed_article_data.get('published_at'),
+                    searxng_results_from_crawler=searxng_results_from_crawler
+                )
+                if fallback_result:
+                    return True
+                else:
+                    return False
+            else:
+                logger.error(f"SearchAnalyzer: get_article_detail for ID {article_id} ('{article_title}') from {article_source} returned None. Skipping.")
+                self.db_client.add_article_log(article_id, "error", f"SearchAnalyzer: {crawler_instance.__class__.__name__}.get_article_detail returned None for {article_source}")
+                return False
+        except Exception as e:
+            logger.error(f"SearchAnalyzer Batch: Error processing article ID {article_id} ('{article_title}'): {str(e)}", exc_info=True)
+            self.db_client.add_article_log(article_id, "error", f"SearchAnalyzer batch loop error: {str(e)}")
+            return False
+    
     def search_related_articles(self, article_id, max_results=5):
         """
         搜索与指定文章相关的文章
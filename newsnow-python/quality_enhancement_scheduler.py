@@ -16,7 +16,6 @@ from datetime import datetime
 # 添加项目根目录到 Python 路径
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from processors.content_quality_enhancer import ContentQualityEnhancer
-from db.sqlite_client import SQLiteClient
 from config.settings import LOG_LEVEL, LOG_DIR, LOG_FILENAME
 
 def setup_logging():
@@ -48,46 +47,11 @@ def quality_enhancement_job(logger, batch_size=10, source=None):
     
     try:
         enhancer = ContentQualityEnhancer()
-        db_client = SQLiteClient()
         
-        # 获取待增强的文章
-        articles = db_client.get_articles_for_enhancement(limit=batch_size, source=source)
+        # 通过 enhance 任务队列领取文章，与 scheduler.py 等其他进程同时运行时不会增强同一篇文章
+        enhanced = enhancer.batch_enhance_articles(limit=batch_size, source=source)
         
-        if not articles:
-            logger.info("没有找到待增强的文章")
-            return
-        
-        logger.info(f"找到 {len(articles)} 篇待增强文章")
-        
-        success_count = 0
-        failed_count = 0
-        
-        for article in articles:
-            try:
-                article_id = article.get('id')
-                article_source = article.get('source')
-                title = article.get('title', '无标题')
-                
-                logger.info(f"正在增强文章: {title} (ID: {article_id})")
-                
-                # 增强文章质量
-                enhanced = enhancer.enhance_article_quality(article_id, article_source)
-                
-                if enhanced:
-                    success_count += 1
-                    logger.info(f"✓ 文章增强成功: {title}")
-                else:
-                    failed_count += 1
-                    logger.warning(f"✗ 文章增强失败: {title}")
-                
-                # 添加延迟避免过于频繁的请求
-                time.sleep(1)
-                
-            except Exception as e:
-                failed_count += 1
-                logger.error(f"增强文章异常: {title} - {str(e)}")
-        
-        logger.info(f"批量增强完成: 成功 {success_count} 篇, 失败 {failed_count} 篇")
+        logger.info(f"批量增强完成: 成功 {len(enhanced)} 篇, 队列状态: {enhancer.job_queue.stats()}")
         
     except Exception as e:
         logger.error(f"质量增强任务异常: {str(e)}")
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+重建文章全文索引 - 为已有数据库一次性补建或修复 articles_fts
+
+用法:
+    python rebuild_search_index.py [--db data/newsnow.db]
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from db.sqlite_client import SQLiteClient
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='重建文章全文索引')
+    parser.add_argument('--db', type=str, default=None, help='数据库文件路径，默认为 data/newsnow.db')
+    args = parser.parse_args()
+
+    start_time = time.time()
+    db_client = SQLiteClient(args.db)
+    success = db_client.rebuild_search_index()
+    db_client.close()
+
+    if success:
+        logger.info(f"已为 {db_client.get_article_count()} 篇文章建立全文索引，耗时 {time.time() - start_time:.2f}秒")
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -19,12 +19,9 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from config.settings import (
     API_HOST, API_PORT, API_DEBUG, 
-    CRAWL_INTERVAL, PROCESS_INTERVAL
+    CRAWL_INTERVAL, PROCESS_INTERVAL, CRAWL_ADAPTIVE, CRAWL_ADAPTIVE_TICK
 )
-from api.api_server import create_api_server
-from processors.article_crawler import ArticleCrawler
-from processors.article_analyzer import ArticleProcessor
-from processors.search_analyzer import SearchAnalyzer
+# 各组件（Flask、爬虫、AI分析器）在启动对应任务时才导入，只运行部分组件的命令不加载其余模块
 
 logger = logging.getLogger(__name__)
 
@@ -97,20 +94,42 @@ def stop_searxng():
         logger.error(f"停止SearXNG服务异常: {str(e)}")
         return False
 
-def run_crawler_task(interval=CRAWL_INTERVAL, article_limit=20, flash_limit=50, source=None, once=False):
+def run_crawler_task(interval=CRAWL_INTERVAL, article_limit=20, flash_limit=50, source=None, once=False,
+                     adaptive=CRAWL_ADAPTIVE):
     """
     运行爬虫任务
     
     Args:
-        interval (int): 任务间隔时间（分钟）
+        interval (int): 任务间隔时间（分钟），自适应模式下不使用
         article_limit (int): 每个来源的文章数量限制
         flash_limit (int): 每个来源的快讯数量限制
         source (str, optional): 文章来源筛选
         once (bool): 是否只运行一次
+        adaptive (bool): 首次抓取后是否按各来源学习到的间隔只抓取到期的来源
     """
+    from processors.article_crawler import ArticleCrawler
+    
     crawler = ArticleCrawler()
     
+    def _adaptive_task():
+        # 从未抓取过的来源视为已到期，之后每个来源按自己学习到的间隔抓取
+        while True:
+            try:
+                wait = crawler.seconds_until_next_crawl(source)
+                if wait > 0:
+                    time.sleep(min(wait, CRAWL_ADAPTIVE_TICK))
+                    continue
+                crawler.crawl_due_sources(article_limit=article_limit, flash_limit=flash_limit, source=source)
+            except Exception as e:
+                logger.error(f"自适应爬虫任务异常: {str(e)}")
+                time.sleep(60)  # 发生异常时等待1分钟后重试
+    
     def _task():
+        if adaptive and not once:
+            logger.info("爬虫按各来源的新条目速率自适应调整抓取间隔")
+            _adaptive_task()
+            return
+        
         while True:
             try:
                 logger.info("开始执行爬虫任务...")
@@ -157,6 +176,9 @@ def run_processor_task(interval=PROCESS_INTERVAL, batch_size=20, source=None, on
         once (bool): 是否只运行一次
         use_search (bool): 是否使用搜索增强分析
     """
+    from processors.article_analyzer import ArticleProcessor
+    from processors.search_analyzer import SearchAnalyzer
+    
     processor = ArticleProcessor()
     search_analyzer = SearchAnalyzer() if use_search else None
     
@@ -197,6 +219,33 @@ def run_processor_task(interval=PROCESS_INTERVAL, batch_size=20, source=None, on
     
     return thread
 
+def run_flash_poller_task(source=None, once=False):
+    """
+    运行快讯高频轮询
+    
+    Args:
+        source (str, optional): 只轮询该来源，默认轮询 FLASH_POLL_SOURCES 中的所有来源
+        once (bool): 是否只轮询一次
+    """
+    from processors.flash_poller import FlashPoller
+    
+    poller = FlashPoller(sources=[source] if source else None)
+    
+    def _task():
+        if once:
+            inserted = poller.poll_all_once()
+            logger.info(f"快讯轮询完成: 新增 {inserted} 条")
+        else:
+            # 轮询和写入在轮询器自己的线程中进行
+            poller.start()
+    
+    # 创建并启动线程
+    thread = threading.Thread(target=_task)
+    thread.daemon = True
+    thread.start()
+    
+    return thread
+
 def run_api_server(host=API_HOST, port=API_PORT, debug=API_DEBUG):
     """
     运行API服务器
@@ -208,6 +257,8 @@ def run_api_server(host=API_HOST, port=API_PORT, debug=API_DEBUG):
     """
     logger.info(f"正在启动API服务器: {host}:{port}...")
     
+    from api.api_server import create_api_server
+    
     api_server = create_api_server(host=host, port=port)
     
     def _run_server():
@@ -234,12 +285,14 @@ def main():
     parser.add_argument('--all', action='store_true', help='启动所有组件（爬虫、处理器、API服务器和SearXNG）')
     parser.add_argument('--crawler', action='store_true', help='启动爬虫')
     parser.add_argument('--processor', action='store_true', help='启动处理器')
+    parser.add_argument('--flash', action='store_true', help='启动快讯高频轮询（不包含在 --all 中）')
     parser.add_argument('--api', action='store_true', help='启动API服务器')
     parser.add_argument('--searx', action='store_true', help='启动SearXNG服务')
     
     # 运行选项
     parser.add_argument('--once', action='store_true', help='仅运行一次，不启动定时任务')
     parser.add_argument('--crawl-interval', type=int, default=CRAWL_INTERVAL, help='爬取间隔（分钟）')
+    parser.add_argument('--fixed-interval', action='store_true', help='按固定间隔爬取所有来源，不使用自适应调度')
     parser.add_argument('--process-interval', type=int, default=PROCESS_INTERVAL, help='处理间隔（分钟）')
     parser.add_argument('--article-limit', type=int, default=20, help='每个来源抓取的文章数量')
     parser.add_argument('--flash-limit', type=int, default=50, help='每个来源抓取的快讯数量')
@@ -254,7 +307,7 @@ def main():
     logger.info("财经新闻处理系统启动中...")
     
     # 如果没有指定任何组件，则默认启动所有组件
-    if not (args.crawler or args.processor or args.api or args.searx):
+    if not (args.crawler or args.processor or args.api or args.searx or args.flash):
         args.all = True
     
     # 启动SearXNG服务
@@ -272,7 +325,8 @@ def main():
                 article_limit=args.article_limit,
                 flash_limit=args.flash_limit,
                 source=args.source,
-                once=args.once
+                once=args.once,
+                adaptive=CRAWL_ADAPTIVE and not args.fixed_interval
             )
             active_threads.append(crawler_thread)
         
@@ -288,6 +342,11 @@ def main():
             )
             active_threads.append(processor_thread)
         
+        # 启动快讯高频轮询
+        if args.flash:
+            logger.info("正在启动快讯高频轮询...")
+            active_threads.append(run_flash_poller_task(source=args.source, once=args.once))
+        
         # 启动API服务器
         if args.all or args.api:
             logger.info("正在启动API服务器...")
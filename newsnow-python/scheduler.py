@@ -16,13 +16,14 @@ from datetime import datetime
 
 # 添加项目根目录到 Python 路径
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from processors.article_analyzer import ArticleProcessor
-from processors.article_crawler import ArticleCrawler
-from processors.content_quality_enhancer import ContentQualityEnhancer
-from utils.search_service import SearchService
-from utils.improved_ai_service import FinanceAnalyzer
-from db.sqlite_client import SQLiteClient
-from config.settings import CRAWL_INTERVAL, PROCESS_INTERVAL, SEARCH_INTERVAL, LOG_LEVEL, LOG_DIR, LOG_FILENAME
+from utils.runtime import get_runtime
+from config.settings import (
+    CRAWL_INTERVAL, PROCESS_INTERVAL, SEARCH_INTERVAL, LOG_LEVEL, LOG_DIR, LOG_FILENAME,
+    CRAWL_ADAPTIVE, CRAWL_ADAPTIVE_TICK
+)
+
+# 抓取器、处理器等组件在进程内只创建一次，各次任务共用，配置文件变化时重建
+runtime = get_runtime()
 
 # 配置日志
 def setup_logging():
@@ -55,7 +56,7 @@ def crawl_articles_job(logger, article_limit=20, flash_limit=50, source=None):
     logger.info(f"===== 开始文章抓取任务: {datetime.now().isoformat()} =====")
     
     try:
-        crawler = ArticleCrawler()
+        crawler = runtime.get("crawler")
         
         if source:
             # 抓取指定来源
@@ -83,6 +84,46 @@ def crawl_articles_job(logger, article_limit=20, flash_limit=50, source=None):
     
     logger.info(f"===== 文章抓取任务结束 =====\n")
 
+# 自适应抓取任务
+def crawl_due_job(logger, article_limit=20, flash_limit=50, source=None):
+    """
+    只抓取已到自适应抓取时间的来源，没有到期来源时直接返回
+    
+    Args:
+        logger: 日志记录器
+        article_limit (int): 每个来源的文章数量限制
+        flash_limit (int): 每个来源的快讯数量限制
+        source (str, optional): 来源筛选
+    """
+    try:
+        crawler = runtime.get("crawler")
+        results = crawler.crawl_due_sources(article_limit=article_limit, flash_limit=flash_limit, source=source)
+        if results is None:
+            return
+        
+        crawled = ", ".join(f"{source_name}/{kind}" for source_name, timing in results["timings"].items()
+                            for kind in timing)
+        logger.info(f"自适应抓取完成: {crawled}; 新增文章 {results['articles']['saved']} 篇, "
+                   f"新增快讯 {results['flash']['saved']} 条, 耗时 {results.get('time', 0):.2f}秒, "
+                   f"{crawler.seconds_until_next_crawl(source):.0f}秒后有来源到期")
+    except Exception as e:
+        logger.error(f"自适应抓取任务异常: {str(e)}")
+
+# 快讯高频轮询任务
+def flash_poller_job(logger):
+    """
+    确保快讯轮询器在运行，配置重新加载后轮询器被重建时在这里重新启动
+    
+    Args:
+        logger: 日志记录器
+    """
+    try:
+        poller = runtime.get("flash_poller")
+        if not poller.stats()["running"]:
+            poller.start()
+    except Exception as e:
+        logger.error(f"快讯轮询任务异常: {str(e)}")
+
 # 文章处理任务
 def process_articles_job(logger, batch_size=20, source=None):
     """
@@ -96,7 +137,7 @@ def process_articles_job(logger, batch_size=20, source=None):
     logger.info(f"===== 开始文章处理任务: {datetime.now().isoformat()} =====")
     
     try:
-        processor = ArticleProcessor()
+        processor = runtime.get("processor")
         result = processor.process_batch(batch_size=batch_size, source=source)
         
         logger.info(f"处理完成: 总计 {result['total']} 篇文章, "
@@ -120,47 +161,12 @@ def quality_enhancement_job(logger, batch_size=10, source=None):
     logger.info(f"===== 开始内容质量增强任务: {datetime.now().isoformat()} =====")
     
     try:
-        enhancer = ContentQualityEnhancer()
-        db_client = SQLiteClient()
-        
-        # 获取待增强的文章
-        articles = db_client.get_articles_for_enhancement(limit=batch_size, source=source)
-        
-        if not articles:
-            logger.info("没有找到待增强的文章")
-            return
-        
-        logger.info(f"找到 {len(articles)} 篇待增强文章")
+        enhancer = runtime.get("enhancer")
         
-        success_count = 0
-        failed_count = 0
+        # 通过 enhance 任务队列领取文章，多个调度进程不会增强同一篇文章，失败的任务按退避重试
+        enhanced = enhancer.batch_enhance_articles(limit=batch_size, source=source)
         
-        for article in articles:
-            try:
-                article_id = article.get('id')
-                article_source = article.get('source')
-                title = article.get('title', '无标题')
-                
-                logger.info(f"正在增强文章: {title} (ID: {article_id})")
-                
-                # 增强文章质量
-                enhanced = enhancer.enhance_article_quality(article_id, article_source)
-                
-                if enhanced:
-                    success_count += 1
-                    logger.info(f"✓ 文章增强成功: {title}")
-                else:
-                    failed_count += 1
-                    logger.warning(f"✗ 文章增强失败: {title}")
-                
-                # 添加延迟避免过于频繁的请求
-                time.sleep(1)
-                
-            except Exception as e:
-                failed_count += 1
-                logger.error(f"增强文章异常: {title} - {str(e)}")
-        
-        logger.info(f"批量增强完成: 成功 {success_count} 篇, 失败 {failed_count} 篇")
+        logger.info(f"批量增强完成: 成功 {len(enhanced)} 篇, 队列状态: {enhancer.job_queue.stats()}")
         
     except Exception as e:
         logger.error(f"质量增强任务异常: {str(e)}")
@@ -180,9 +186,10 @@ def search_finance_topics_job(logger, max_topics=5, max_results_per_topic=10):
     logger.info(f"===== 开始搜索热门财经话题任务: {datetime.now().isoformat()} =====")
     
     try:
-        # 初始化搜索服务和数据库客户端
-        search_service = SearchService()
-        db_client = SQLiteClient()
+        # 获取共享的搜索服务和数据库客户端
+        search_service = runtime.get("search_service")
+        db_client = runtime.get("db_client")
+        dedup_filter = runtime.get("dedup_filter")
         
         # 检查SearXNG服务是否可用
         if not search_service.health_check():
@@ -225,8 +232,11 @@ def search_finance_topics_job(logger, max_topics=5, max_results_per_topic=10):
             # 将搜索结果保存到数据库
             for item in results:
                 try:
-                    # 检查URL是否已存在
-                    if db_client.check_article_exists(item["url"]):
+                    # 检查URL是否已存在，过滤器判定为新URL时不查询数据库
+                    if dedup_filter:
+                        if dedup_filter.url_exists(item["url"]):
+                            continue
+                    elif db_client.check_article_exists(item["url"]):
                         continue
                     
                     # 准备文章数据
@@ -246,10 +256,15 @@ def search_finance_topics_job(logger, max_topics=5, max_results_per_topic=10):
                     # 保存到数据库
                     db_client.save_article(article_data)
                     saved_results += 1
+                    if dedup_filter:
+                        dedup_filter.add_article(article_data)
                     
                 except Exception as e:
                     logger.error(f"保存搜索结果异常: {str(e)}")
         
+        if dedup_filter:
+            dedup_filter.save()
+        
         elapsed_time = time.time() - start_time
         logger.info(f"搜索完成: 总计 {total_results} 条结果, 新增 {saved_results} 条, 耗时 {elapsed_time:.2f}秒")
         
@@ -263,9 +278,13 @@ def main():
     # 解析命令行参数
     parser = argparse.ArgumentParser(description='新闻文章处理系统')
     parser.add_argument('--once', action='store_true', help='仅运行一次，不启动定时任务')
-    parser.add_argument('--task', type=str, choices=['crawl', 'process', 'search', 'quality', 'all'], default='all',
-                        help='执行的任务类型：crawl(抓取), process(处理), search(搜索), quality(质量增强), all(全部)')
+    parser.add_argument('--task', type=str, choices=['crawl', 'process', 'search', 'quality', 'flash', 'all'],
+                        default='all',
+                        help='执行的任务类型：crawl(抓取), process(处理), search(搜索), quality(质量增强), '
+                             'flash(快讯高频轮询，不包含在 all 中), all(全部)')
     parser.add_argument('--crawl-interval', type=int, default=CRAWL_INTERVAL, help='抓取任务间隔（分钟）')
+    parser.add_argument('--fixed-interval', action='store_true',
+                        help='按 --crawl-interval 固定间隔抓取所有来源，不使用自适应调度')
     parser.add_argument('--process-interval', type=int, default=PROCESS_INTERVAL, help='处理任务间隔（分钟）')
     parser.add_argument('--search-interval', type=int, default=SEARCH_INTERVAL, help='搜索任务间隔（分钟）')
     parser.add_argument('--quality-interval', type=int, default=30, help='质量增强任务间隔（分钟）')
@@ -284,18 +303,30 @@ def main():
                f"处理间隔={args.process_interval}分钟, 搜索间隔={args.search_interval}分钟, "
                f"质量增强间隔={args.quality_interval}分钟, 来源={args.source or '全部'}")
     
+    # 收到 SIGHUP 时在下一个任务开始前重新加载配置
+    runtime.install_signal_handler()
+    
     # 立即执行一次
-    if args.task in ['crawl', 'all']:
-        crawl_articles_job(logger, args.article_limit, args.flash_limit, args.source)
+    adaptive = CRAWL_ADAPTIVE and not args.fixed_interval and not args.once
+    if args.task in ['crawl', 'all'] and adaptive:
+        runtime.run("crawl", crawl_due_job, logger, args.article_limit, args.flash_limit, args.source)
+    elif args.task in ['crawl', 'all']:
+        runtime.run("crawl", crawl_articles_job, logger, args.article_limit, args.flash_limit, args.source)
     
     if args.task in ['process', 'all']:
-        process_articles_job(logger, args.batch, args.source)
+        runtime.run("process", process_articles_job, logger, args.batch, args.source)
     
     if args.task in ['search', 'all']:
-        search_finance_topics_job(logger, args.max_topics, args.max_results)
+        runtime.run("search", search_finance_topics_job, logger, args.max_topics, args.max_results)
     
     if args.task in ['quality', 'all']:
-        quality_enhancement_job(logger, args.batch, args.source)
+        runtime.run("quality", quality_enhancement_job, logger, args.batch, args.source)
+    
+    if args.task == 'flash' and args.once:
+        inserted = runtime.get("flash_poller").poll_all_once()
+        logger.info(f"快讯轮询完成: 新增 {inserted} 条")
+    elif args.task == 'flash':
+        runtime.run("flash", flash_poller_job, logger)
     
     # 如果只运行一次，直接退出
     if args.once:
@@ -303,30 +334,41 @@ def main():
         return
     
     # 设置定时任务
-    if args.task in ['crawl', 'all']:
+    if args.task in ['crawl', 'all'] and adaptive:
+        # 每个来源按各自学习到的间隔抓取，这里只是定期检查哪些来源到期
+        schedule.every(CRAWL_ADAPTIVE_TICK).seconds.do(
+            runtime.run, "crawl", crawl_due_job, logger, args.article_limit, args.flash_limit, args.source
+        )
+        logger.info(f"自适应抓取任务已设置，每 {CRAWL_ADAPTIVE_TICK} 秒检查一次到期来源")
+    elif args.task in ['crawl', 'all']:
         schedule.every(args.crawl_interval).minutes.do(
-            crawl_articles_job, logger, args.article_limit, args.flash_limit, args.source
+            runtime.run, "crawl", crawl_articles_job, logger, args.article_limit, args.flash_limit, args.source
         )
         logger.info(f"文章抓取任务已设置，每 {args.crawl_interval} 分钟执行一次")
     
     if args.task in ['process', 'all']:
         schedule.every(args.process_interval).minutes.do(
-            process_articles_job, logger, args.batch, args.source
+            runtime.run, "process", process_articles_job, logger, args.batch, args.source
         )
         logger.info(f"文章处理任务已设置，每 {args.process_interval} 分钟执行一次")
     
     if args.task in ['search', 'all']:
         schedule.every(args.search_interval).minutes.do(
-            search_finance_topics_job, logger, args.max_topics, args.max_results
+            runtime.run, "search", search_finance_topics_job, logger, args.max_topics, args.max_results
         )
         logger.info(f"搜索热门财经话题任务已设置，每 {args.search_interval} 分钟执行一次")
     
     if args.task in ['quality', 'all']:
         schedule.every(args.quality_interval).minutes.do(
-            quality_enhancement_job, logger, args.batch, args.source
+            runtime.run, "quality", quality_enhancement_job, logger, args.batch, args.source
         )
         logger.info(f"内容质量增强任务已设置，每 {args.quality_interval} 分钟执行一次")
     
+    if args.task == 'flash':
+        # 轮询器在自己的线程中运行，这里只负责在配置重新加载后重新启动它
+        schedule.every(CRAWL_ADAPTIVE_TICK).seconds.do(runtime.run, "flash", flash_poller_job, logger)
+        logger.info(f"快讯高频轮询已启动")
+    
     # 运行定时任务
     logger.info(f"定时任务已启动")
     try:
@@ -335,6 +377,8 @@ def main():
             time.sleep(1)
     except KeyboardInterrupt:
         logger.info("收到终止信号，程序退出")
+        # 关闭组件，快讯轮询器把已取得的快讯写完
+        runtime.reset()
     except Exception as e:
         logger.error(f"程序异常: {str(e)}")
         raise
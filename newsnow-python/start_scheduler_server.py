@@ -32,9 +32,8 @@ class ServerScheduler:
     
     def __init__(self):
         self.running = False
-        self.crawler_factory = None
+        self.crawler = None
         self.last_run_time = None
-        self.run_interval = 300  # 5分钟间隔
         
     def setup(self):
         """初始化设置"""
@@ -50,15 +49,10 @@ class ServerScheduler:
             if script_dir not in sys.path:
                 sys.path.insert(0, script_dir)
             
-            # 导入爬虫工厂
-            from crawlers.crawler_factory import CrawlerFactory
-            self.crawler_factory = CrawlerFactory()
-            logger.info("✅ 爬虫工厂初始化成功")
-            
-            # 测试数据库连接
-            from db.sqlite_client import SQLiteClient
-            db_client = SQLiteClient()
-            logger.info("✅ 数据库连接成功")
+            # 创建文章抓取器（同时连接数据库），各来源按学习到的间隔抓取
+            from processors.article_crawler import ArticleCrawler
+            self.crawler = ArticleCrawler()
+            logger.info("✅ 文章抓取器和数据库连接初始化成功")
             
             return True
             
@@ -72,38 +66,22 @@ class ServerScheduler:
         try:
             logger.info("🕷️ 开始执行爬虫任务...")
             
-            # 获取可用爬虫
-            available_crawlers = self.crawler_factory.get_available_crawlers()
-            logger.info(f"可用爬虫: {available_crawlers}")
-            
-            # 执行Jin10爬虫
-            if 'jin10' in available_crawlers:
-                logger.info("执行Jin10爬虫...")
-                jin10_crawler = self.crawler_factory.get_crawler('jin10')
-                
-                if jin10_crawler:
-                    # 运行爬虫
-                    articles = jin10_crawler.crawl()
-                    logger.info(f"Jin10爬虫完成，获取 {len(articles)} 篇文章")
-                else:
-                    logger.error("Jin10爬虫创建失败")
-            else:
-                logger.warning("Jin10爬虫不可用")
+            # 只抓取已到期的来源
+            results = self.crawler.crawl_due_sources()
+            if results:
+                logger.info(f"本次抓取: 新增文章 {results['articles']['saved']} 篇, "
+                           f"新增快讯 {results['flash']['saved']} 条")
             
             self.last_run_time = datetime.now()
-            logger.info(f"✅ 爬虫任务完成，下次运行时间: {self.last_run_time}")
+            logger.info(f"✅ 爬虫任务完成，{self.crawler.seconds_until_next_crawl():.0f}秒后有来源到期")
             
         except Exception as e:
             logger.error(f"❌ 爬虫任务执行失败: {str(e)}")
             logger.error(f"错误详情: {traceback.format_exc()}")
     
     def should_run(self):
-        """检查是否应该运行"""
-        if self.last_run_time is None:
-            return True
-        
-        elapsed = (datetime.now() - self.last_run_time).total_seconds()
-        return elapsed >= self.run_interval
+        """检查是否有来源到了自适应抓取时间"""
+        return self.crawler.seconds_until_next_crawl() <= 0
     
     def run_loop(self):
         """主运行循环"""
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+自适应抓取调度测试脚本 - 验证繁忙来源缩短间隔、空闲来源退避，并只抓取到期来源，不访问网络
+"""
+
+import os
+import sys
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from testing_db import temp_db, temp_path
+from processors.article_crawler import ArticleCrawler
+from utils.adaptive_schedule import AdaptiveSchedule
+from test_article_crawler import FakeFactory, FeedCrawler
+
+
+def _make_schedule():
+    db_client = temp_db('schedule.db')
+    return AdaptiveSchedule(db_client, min_interval=30, max_interval=3600, target_new=3, backoff=2), db_client
+
+
+def test_intervals_follow_rate():
+    """繁忙来源缩短间隔，空闲来源成倍退避，均不超出上下限"""
+    schedule, db_client = _make_schedule()
+    initial = schedule.initial_interval
+
+    # 第一次抓取只建立基准，不计算速率
+    assert schedule.record("flash", "busy", 50, limit=50, now=0)["interval"] == initial
+    assert schedule.record("articles", "idle", 5, now=0)["interval"] == initial
+    assert schedule.due([("flash", "busy"), ("flash", "new")], now=10) == [("flash", "new")]
+
+    # 每分钟 12 条新快讯，期望每次 3 条，间隔收敛到 15 秒并受下限限制
+    state = schedule.record("flash", "busy", 12, now=60)
+    assert state["interval"] == 30 and abs(state["rate"] - 0.2) < 1e-9
+
+    # 空闲来源每次没有新条目时间隔翻倍，直到上限
+    intervals = [schedule.record("articles", "idle", 0, now=now)["interval"] for now in (600, 1200, 1800)]
+    assert intervals[0] == min(initial * 2, 3600) and intervals[-1] == 3600
+
+    # 抓取失败时不更新速率，按原间隔重试
+    state = schedule.record("flash", "busy", None, now=90)
+    assert state["interval"] == 30 and abs(state["rate"] - 0.2) < 1e-9 and state["next_due_at"] == 120
+
+    # 状态保存在数据库中，重新创建的调度表沿用学习到的间隔
+    reloaded = AdaptiveSchedule(db_client, min_interval=30, max_interval=3600)
+    snapshot = {(item["kind"], item["source"]): item for item in reloaded.snapshot()}
+    assert snapshot[("flash", "busy")]["interval"] == 30
+    assert snapshot[("articles", "idle")]["interval"] == 3600
+    assert reloaded.due([("flash", "busy"), ("articles", "idle")], now=120) == [("flash", "busy")]
+    assert reloaded.seconds_until_due([("flash", "busy"), ("articles", "idle")], now=100) == 20
+
+
+def test_full_page_tightens():
+    """整页都是新条目时可能有遗漏，间隔至少减半"""
+    schedule, _ = _make_schedule()
+    schedule.record("flash", "burst", 0, now=0)
+    # 按速率只需 3000/10*3=900 秒，但整页 10 条都是新的，间隔不超过原来的一半
+    state = schedule.record("flash", "burst", 10, limit=10, now=3000)
+    assert state["interval"] == min(900, schedule.initial_interval / 2)
+
+
+def test_crawl_due_sources():
+    """只抓取到期的来源，抓取结果记入调度表"""
+    crawler = ArticleCrawler(temp_path('schedule.db'))
+    crawler.dedup_filter = None
+    busy, idle = FeedCrawler('jin10', prefix='jin10-'), FeedCrawler('wallstreet', prefix='wallstreet-')
+    busy.publish(0, 5)
+    idle.publish(0, 2)
+    crawler.crawler_factory = FakeFactory({'jin10': busy, 'wallstreet': idle})
+    assert crawler.get_feeds() == [("articles", "jin10"), ("flash", "jin10"), ("articles", "wallstreet")]
+
+    # 第一次所有来源都到期
+    results = crawler.crawl_due_sources(concurrent=False)
+    assert set(results["schedule"]) == {"jin10", "wallstreet"}
+    assert crawler.crawl_due_sources(concurrent=False) is None
+    assert crawler.seconds_until_next_crawl() > 0
+
+    # 让 jin10 快讯到期：距上次抓取 60 秒，期间发布了 20 条
+    state = crawler.schedule._states[("flash", "jin10")]
+    state["last_crawl_at"] -= 60
+    state["next_due_at"] = 0
+    busy.publish(5, 20)
+    requests = idle.requests
+    results = crawler.crawl_due_sources(concurrent=False)
+    assert list(results["flash"]["sources"]) == ["jin10"] and results["articles"]["sources"] == {}
+    assert results["flash"]["saved"] == 20
+    assert results["schedule"]["jin10"]["flash"] == crawler.schedule.min_interval
+    assert idle.requests == requests
+
+
+def test_new_item_count_uses_inserted():
+    """比抓取位置新但已经保存过的条目不算新条目，不会缩短抓取间隔"""
+    crawler = ArticleCrawler(temp_path('schedule.db'))
+    crawler.dedup_filter = None
+    feed = FeedCrawler('jin10', prefix='jin10-')
+    feed.publish(0, 5)
+    crawler.crawler_factory = FakeFactory({'jin10': feed})
+
+    result = crawler.crawl_flash('jin10', limit=10)
+    assert crawler._new_item_count("flash", result) == 5
+
+    # 抓取位置丢失（如被其他进程重置）后同一批快讯再次被当作新条目抓取，但都已保存
+    crawler.db_client.save_crawl_cursor('jin10', 'flash', 'jin10-000', '2025-01-01T00:00:00')
+    result = crawler.crawl_flash('jin10', limit=10)
+    assert result['total'] - result['skipped_seen'] == 4 and result['saved'] == 0
+    assert crawler._new_item_count("flash", result) == 0
+
+    result = crawler.crawl_source('jin10', limit=10)
+    assert crawler._new_item_count("articles", result) == 5
+    assert crawler._new_item_count("articles", {"error": "boom"}) is None
+
+
+if __name__ == "__main__":
+    test_intervals_follow_rate()
+    test_full_page_tightens()
+    test_crawl_due_sources()
+    test_new_item_count_uses_inserted()
+    print("✓ 自适应抓取调度测试通过")
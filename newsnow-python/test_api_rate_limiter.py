@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+API限流测试脚本 - 验证令牌桶、自适应并发、对冲请求和并发分析执行器，不访问网络
+"""
+
+import os
+import sys
+import time
+import threading
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.api_rate_limiter import (
+    APIRateLimiter, AdaptiveConcurrency, RequestGate, parse_retry_after, estimate_tokens
+)
+from utils.ai_executor import AnalysisExecutor
+
+
+class FakeResponse:
+    """模拟 requests.Response"""
+
+    def __init__(self, status_code=200, headers=None, total_tokens=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.total_tokens = total_tokens
+
+    def json(self):
+        return {"usage": {"total_tokens": self.total_tokens}} if self.total_tokens else {}
+
+
+def test_token_buckets():
+    """请求数和令牌数任一耗尽时返回等待时间，不阻塞"""
+    limiter = APIRateLimiter(max_requests_per_minute=3, max_tokens_per_minute=600)
+    assert limiter.try_acquire(100) == 0
+    assert limiter.try_acquire(100) == 0
+    # 令牌不足：剩余 400 个，还差 100 个，按每秒 10 个补充
+    assert 9 < limiter.try_acquire(500) <= 10
+    assert limiter.try_acquire(100) == 0
+    # 请求数耗尽：每 20 秒补充一次
+    assert 19 < limiter.try_acquire(0) <= 20
+
+    # 实际消耗少于预估时归还令牌
+    limiter = APIRateLimiter(max_requests_per_minute=100, max_tokens_per_minute=600)
+    assert limiter.try_acquire(600) == 0
+    limiter.record_usage(600, 300)
+    assert limiter.try_acquire(290) == 0
+
+
+def test_wait_outside_lock():
+    """一个线程等待配额时，其他线程仍能立即查询"""
+    limiter = APIRateLimiter(max_requests_per_minute=60)
+    for _ in range(60):
+        assert limiter.try_acquire() == 0
+
+    waiter = threading.Thread(target=limiter.acquire)
+    waiter.start()
+    time.sleep(0.1)
+    start = time.time()
+    assert limiter.try_acquire() > 0
+    assert time.time() - start < 0.05
+    waiter.join()
+
+
+def test_rate_limited_pause_and_backoff():
+    """429 按 Retry-After 暂停并把并发上限减半，成功后逐步恢复"""
+    assert parse_retry_after("2") == 2.0
+    assert parse_retry_after("bad") is None
+    assert estimate_tokens([{"content": "你好"}, {"content": "abc"}], 100) == 105
+
+    limiter = APIRateLimiter(max_requests_per_minute=600)
+    concurrency = AdaptiveConcurrency(initial=8, maximum=8)
+    gate = RequestGate(limiter, concurrency, hedge=False)
+
+    response = gate.call(lambda: FakeResponse(429, {"Retry-After": "0.3"}))
+    assert response.status_code == 429
+    assert concurrency.limit == 4
+    assert 0.2 < limiter.try_acquire() <= 0.3
+
+    start = time.time()
+    assert gate.call(lambda: FakeResponse(200)).status_code == 200
+    assert time.time() - start >= 0.2
+    for _ in range(20):
+        gate.call(lambda: FakeResponse(200))
+    assert concurrency.limit > 6
+    assert concurrency.in_flight == 0
+
+
+def test_rate_limited_without_retry_after():
+    """429 没有 Retry-After 时至少暂停 min_backoff，连续 429 逐步延长，成功后恢复"""
+    limiter = APIRateLimiter(max_requests_per_minute=600, min_backoff=10)
+    gate = RequestGate(limiter, AdaptiveConcurrency(initial=4, maximum=4), hedge=False)
+
+    assert gate.call(lambda: FakeResponse(429)).status_code == 429
+    assert 9 < limiter.try_acquire() <= 10
+    # 同一次暂停期间的 429 不延长退避
+    limiter.on_rate_limited()
+    assert 9 < limiter.try_acquire() <= 10
+
+    # 暂停结束后再次收到 429，退避为 1.5 倍
+    limiter._paused_until = 0.0
+    limiter.on_rate_limited()
+    assert 14 < limiter.try_acquire() <= 15
+
+    limiter._paused_until = 0.0
+    limiter.on_success()
+    limiter.on_rate_limited()
+    assert 9 < limiter.try_acquire() <= 10
+
+
+def test_adaptive_concurrency_limits_in_flight():
+    """在途请求数不超过当前上限"""
+    concurrency = AdaptiveConcurrency(initial=2, maximum=2)
+    gate = RequestGate(APIRateLimiter(max_requests_per_minute=6000), concurrency, hedge=False)
+    active = [0]
+    peak = [0]
+    lock = threading.Lock()
+
+    def request():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return FakeResponse(200)
+
+    AnalysisExecutor(max_workers=8).map(lambda _: gate.call(request), range(16))
+    assert peak[0] == 2
+
+
+def test_hedged_request():
+    """请求耗时超过对冲等待时间时发出第二个请求，取先返回的结果"""
+    gate = RequestGate(APIRateLimiter(max_requests_per_minute=600), AdaptiveConcurrency(initial=4, maximum=4),
+                       hedge=True, hedge_delay=0.1)
+    calls = []
+
+    def request():
+        calls.append(time.time())
+        if len(calls) == 1:
+            time.sleep(1.0)
+            return FakeResponse(200, total_tokens=1)
+        return FakeResponse(200, total_tokens=2)
+
+    start = time.time()
+    response = gate.call(request)
+    assert time.time() - start < 0.5
+    assert response.total_tokens == 2
+    stats = gate.stats()
+    assert stats["hedged"] == 1
+    assert stats["hedge_wins"] == 1
+
+
+def test_analysis_executor():
+    """结果与输入顺序一致，单个任务异常不影响其他任务"""
+    def work(i):
+        if i == 3:
+            raise ValueError("boom")
+        time.sleep(0.05)
+        return i * 2
+
+    start = time.time()
+    results = AnalysisExecutor(max_workers=10).map(work, range(10))
+    assert results == [0, 2, 4, None, 8, 10, 12, 14, 16, 18]
+    assert time.time() - start < 0.3
+
+
+if __name__ == "__main__":
+    test_token_buckets()
+    test_wait_outside_lock()
+    test_rate_limited_pause_and_backoff()
+    test_rate_limited_without_retry_after()
+    test_adaptive_concurrency_limits_in_flight()
+    test_hedged_request()
+    test_analysis_executor()
+    print("✓ API限流测试通过")
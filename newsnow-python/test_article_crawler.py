@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+文章抓取器测试脚本 - 使用模拟爬虫验证并发抓取，不访问网络
+"""
+
+import os
+import sys
+import time
+import threading
+from datetime import datetime
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from testing_db import temp_path
+from processors.article_crawler import ArticleCrawler
+from utils.http_client import NotModifiedList
+
+
+class FakeCrawler:
+    """模拟爬虫：每次请求耗时 delay 秒，并记录同一主机的最大并发数"""
+
+    supports_immediate_processing = False
+
+    def __init__(self, source, host, delay, stats):
+        self.source = source
+        self.base_url = f"https://{host}"
+        self.delay = delay
+        self.stats = stats
+        self.unchanged = False
+
+    def _request(self):
+        host = self.base_url
+        with self.stats['lock']:
+            self.stats['active'][host] = self.stats['active'].get(host, 0) + 1
+            self.stats['peak'][host] = max(self.stats['peak'].get(host, 0), self.stats['active'][host])
+        time.sleep(self.delay)
+        with self.stats['lock']:
+            self.stats['active'][host] -= 1
+
+    def get_latest_articles(self, limit=20, validator_scope=None):
+        self._request()
+        if self.unchanged:
+            return NotModifiedList()
+        return [{'id': f'{self.source}-{i}', 'title': f'{self.source} 文章{i}', 'source': self.source}
+                for i in range(3)]
+
+    def get_news_flash(self, limit=50, before=None, validator_scope=None):
+        if before:
+            return []
+        self._request()
+        if self.unchanged:
+            return NotModifiedList()
+        return [{'id': f'{self.source}-f{i}', 'title': f'{self.source} 快讯{i}', 'source': self.source}
+                for i in range(2)]
+
+
+class FakeFactory:
+    """模拟爬虫工厂"""
+
+    def __init__(self, crawlers):
+        self._crawlers = crawlers
+
+    def get_crawler(self, source):
+        return self._crawlers.get(source)
+
+    def get_all_sources(self):
+        return list(self._crawlers.keys())
+
+    def get_source_name(self, source):
+        return source
+
+    def get_news_flash(self, source, limit=20, before=None, validator_scope=None):
+        return self._crawlers[source].get_news_flash(limit=limit, before=before)
+
+
+class FeedCrawler:
+    """模拟按发布时间倒序的信息流，快讯支持 before 向前翻页"""
+
+    supports_immediate_processing = False
+
+    def __init__(self, source='feed', prefix='n'):
+        self.source = source
+        self.prefix = prefix
+        self.base_url = f"https://{source}.example.com"
+        self.feed = []
+        self.requests = 0
+
+    def publish(self, start, count):
+        """发布 count 条新条目，编号从 start 开始"""
+        for i in range(start, start + count):
+            self.feed.insert(0, {'id': f'{self.prefix}{i:03d}', 'title': f'条目{i}', 'source': self.source,
+                                 'pubDate': f'2025-01-01T{i // 60:02d}:{i % 60:02d}:00'})
+
+    def _copy(self, item):
+        # 与真实爬虫一样，无法解析的发布时间在解析时用当前时间代替
+        return dict(item, pubDate=item['pubDate'] or datetime.now().isoformat())
+
+    def get_latest_articles(self, limit=20, validator_scope=None):
+        self.requests += 1
+        return [self._copy(item) for item in self.feed[:limit]]
+
+    def get_news_flash(self, limit=50, before=None, validator_scope=None):
+        self.requests += 1
+        items = [item for item in self.feed if not before or (item['pubDate'] and item['pubDate'] < before)]
+        return [self._copy(item) for item in items[:limit]]
+
+
+class FailingFeedCrawler(FeedCrawler):
+    """即时处理文章的信息流，failing 中的文章每次处理都失败"""
+
+    supports_immediate_processing = True
+
+    def __init__(self, db_client, failing):
+        super().__init__()
+        self.db_client = db_client
+        self.failing = failing
+        self.attempts = {}
+
+    def get_article_detail(self, article_id):
+        self.attempts[article_id] = self.attempts.get(article_id, 0) + 1
+        if article_id in self.failing:
+            return None
+        article = next(dict(item) for item in self.feed if item['id'] == article_id)
+        self.db_client.save_article(article)
+        return dict(article, processed_immediately=True)
+
+
+def _make_crawler(delay=0.2):
+    crawler = ArticleCrawler(temp_path('crawl.db'))
+    stats = {'lock': threading.Lock(), 'active': {}, 'peak': {}}
+    crawler.crawler_factory = FakeFactory({
+        'jin10': FakeCrawler('jin10', 'www.jin10.com', delay, stats),
+        'gelonghui': FakeCrawler('gelonghui', 'www.gelonghui.com', delay, stats),
+        'wallstreet': FakeCrawler('wallstreet', 'wallstreetcn.com', delay, stats),
+        'fastbull': FakeCrawler('fastbull', 'www.fastbull.com', delay, stats),
+        'cls': FakeCrawler('cls', 'www.cls.cn', delay, stats),
+    })
+    return crawler, stats
+
+
+def test_crawl_all_sources_concurrent():
+    """并发抓取：总耗时接近最慢的单个主机，同一主机不超过并发上限"""
+    crawler, stats = _make_crawler()
+
+    start = time.time()
+    results = crawler.crawl_all_sources(concurrent=True, max_workers=8)
+    elapsed = time.time() - start
+
+    # 顺序执行需要 8 个任务 x 0.2 秒；并发时最慢的主机有 2 个任务，加上主机间隔
+    assert elapsed < 1.6, elapsed
+    assert all(peak == 1 for peak in stats['peak'].values()), stats['peak']
+
+    assert list(results['articles']['sources']) == ['jin10', 'gelonghui', 'wallstreet', 'fastbull', 'cls']
+    assert list(results['flash']['sources']) == ['jin10', 'gelonghui', 'cls']
+    assert results['flash']['total'] == 6
+    assert results['flash']['saved'] == 6
+    assert set(results['timings']['jin10']) == {'articles', 'flash'}
+    assert set(results['timings']['wallstreet']) == {'articles'}
+    assert crawler.db_client.get_article_total() == 15
+    crawler.db_client.close()
+
+
+def test_crawl_all_sources_sequential():
+    """顺序模式保持原有统计结构"""
+    crawler, _ = _make_crawler(delay=0)
+
+    results = crawler.crawl_all_sources(concurrent=False)
+
+    assert set(results) == {'articles', 'flash', 'timings', 'schedule', 'time'}
+    assert results['flash']['saved'] == 6
+    assert crawler.db_client.get_flash_count() == 6
+    crawler.db_client.close()
+
+
+def test_crawl_all_sources_unchanged():
+    """列表返回 304 的来源计入 skipped_unchanged"""
+    crawler, _ = _make_crawler(delay=0)
+    crawler.crawler_factory.get_crawler('jin10').unchanged = True
+    crawler.crawler_factory.get_crawler('wallstreet').unchanged = True
+
+    results = crawler.crawl_all_sources(concurrent=False)
+
+    assert results['articles']['skipped_unchanged'] == 2
+    assert results['flash']['skipped_unchanged'] == 1
+    assert results['articles']['sources']['jin10']['skipped_unchanged'] == 1
+    assert results['flash']['saved'] == 4
+    crawler.db_client.close()
+
+
+def test_incremental_crawl():
+    """抓取位置之前的条目不再保存，整页都是新条目时向前翻页补齐缺口"""
+    crawler = ArticleCrawler(temp_path('crawl.db'))
+    feed = FeedCrawler()
+    crawler.crawler_factory = FakeFactory({'feed': feed})
+
+    feed.publish(0, 30)
+    result = crawler.crawl_flash('feed', limit=10)
+    assert result['saved'] == 10  # 首次抓取只取最新一页
+    assert crawler.db_client.get_crawl_cursor('feed', 'flash') == {'last_id': 'n029', 'last_time': '2025-01-01T00:29:00'}
+
+    result = crawler.crawl_flash('feed', limit=10)
+    assert result['saved'] == 0
+    assert result['skipped_seen'] == 10
+
+    # 两次抓取之间发布了 25 条，需要翻 3 页
+    feed.publish(30, 25)
+    feed.requests = 0
+    result = crawler.crawl_flash('feed', limit=10)
+    assert result['saved'] == 25
+    assert feed.requests == 3
+    assert crawler.db_client.get_flash_count() == 35
+
+    # 文章列表不支持翻页，只保存比抓取位置新的文章
+    result = crawler.crawl_source('feed', limit=10)
+    assert result['summaries_saved_for_later'] == 10
+    feed.publish(55, 3)
+    result = crawler.crawl_source('feed', limit=10)
+    assert result['summaries_saved_for_later'] == 3
+    assert result['skipped_seen'] == 7
+    crawler.db_client.close()
+
+
+def test_cursor_ignores_fallback_dates():
+    """发布时间按时间戳比较；解析失败用当前时间代替的条目不推进抓取位置，之后真实发布的条目仍会保存"""
+    crawler = ArticleCrawler(temp_path('crawl.db'))
+    crawler.dedup_filter = None
+    feed = FeedCrawler()
+    crawler.crawler_factory = FakeFactory({'feed': feed})
+
+    feed.publish(0, 5)
+    assert crawler.crawl_flash('feed', limit=10)['saved'] == 5
+
+    feed.feed.insert(0, {'id': 'bad-date', 'title': '时间解析失败', 'source': 'feed', 'pubDate': None})
+    assert crawler.crawl_flash('feed', limit=10)['saved'] == 1
+    assert crawler.db_client.get_crawl_cursor('feed', 'flash')['last_id'] == 'n004'
+
+    # 格式不同的发布时间（空格分隔）按时间比较，不会被当作已抓取
+    feed.publish(5, 2)
+    feed.feed.insert(0, {'id': 'n007', 'title': '条目7', 'source': 'feed', 'pubDate': '2025-01-01 00:07:00'})
+    assert crawler.crawl_flash('feed', limit=10)['saved'] == 3
+    assert crawler.db_client.get_crawl_cursor('feed', 'flash')['last_id'] == 'n007'
+
+    # 已经跑到未来的抓取位置不再使用
+    crawler.db_client.save_crawl_cursor('feed', 'flash', 'future', '2999-01-01T00:00:00')
+    feed.publish(8, 1)
+    assert crawler.crawl_flash('feed', limit=10)['saved'] == 1
+    crawler.db_client.close()
+
+
+def test_failed_item_retry_cap():
+    """处理失败的文章重试 CRAWL_MAX_ITEM_FAILURES 次后不再阻止抓取位置推进"""
+    crawler = ArticleCrawler(temp_path('crawl.db'))
+    crawler.dedup_filter = None
+    feed = FailingFeedCrawler(crawler.db_client, failing={'n002'})
+    crawler.crawler_factory = FakeFactory({'feed': feed})
+    feed.publish(0, 3)
+
+    assert crawler.crawl_source('feed', limit=10)['immediately_processed'] == 2
+    assert crawler.db_client.get_crawl_cursor('feed', 'articles')['last_id'] == 'n001'
+    for _ in range(4):
+        crawler.crawl_source('feed', limit=10)
+
+    assert feed.attempts == {'n000': 1, 'n001': 1, 'n002': 3}
+    assert crawler.db_client.get_crawl_cursor('feed', 'articles')['last_id'] == 'n002'
+    assert crawler.crawl_source('feed', limit=10)['skipped_seen'] == 3
+    crawler.db_client.close()
+
+
+if __name__ == "__main__":
+    test_crawl_all_sources_concurrent()
+    test_crawl_all_sources_sequential()
+    test_crawl_all_sources_unchanged()
+    test_incremental_crawl()
+    test_cursor_ignores_fallback_dates()
+    test_failed_item_retry_cap()
+    print("✓ 文章抓取器测试通过")
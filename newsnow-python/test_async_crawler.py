@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+异步爬虫测试脚本 - 替换网络请求，验证按主机限流和异步详情抓取流程
+"""
+
+import os
+import sys
+import time
+import json
+import asyncio
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from crawlers.async_base import AsyncResponse, _AsyncHostLimiter
+from crawlers.cls import CLSCrawler
+
+
+def test_host_limiter():
+    """同一主机的并发数受限，不同主机互不影响"""
+    limiter = _AsyncHostLimiter(limit=2, interval=0)
+    active = {}
+    peak = {}
+
+    async def request(host):
+        active[host] = active.get(host, 0) + 1
+        peak[host] = max(peak.get(host, 0), active[host])
+        await asyncio.sleep(0.05)
+        active[host] -= 1
+        return host
+
+    async def main():
+        calls = [limiter(host, lambda host=host: request(host)) for host in ['a.com', 'b.com'] * 10]
+        return await asyncio.gather(*calls)
+
+    start = time.time()
+    results = asyncio.run(main())
+    elapsed = time.time() - start
+
+    assert len(results) == 20
+    assert peak == {'a.com': 2, 'b.com': 2}
+    # 每个主机 10 个请求、并发 2，约 5 轮
+    assert elapsed < 0.5, elapsed
+
+
+def test_get_article_detail_async():
+    """异步取回的响应交给同步方法解析，详情批量并发抓取"""
+    crawler = CLSCrawler()
+    requests_seen = []
+
+    async def fake_fetch(method, url, **kwargs):
+        requests_seen.append((method, url, kwargs['json']['id']))
+        await asyncio.sleep(0.05)
+        body = {'status': 'ok', 'data': {'title': f"文章{kwargs['json']['id']}", 'content': '<p>正文</p>',
+                                          'ctime': 1735689600, 'tag': ['宏观']}}
+        return AsyncResponse(url, 200, json.dumps(body, ensure_ascii=False))
+
+    crawler.fetch = fake_fetch
+
+    async def main():
+        return await asyncio.gather(*(crawler.get_article_detail_async(str(i)) for i in range(50)))
+
+    start = time.time()
+    details = asyncio.run(main())
+    elapsed = time.time() - start
+
+    assert [d['title'] for d in details] == [f'文章{i}' for i in range(50)]
+    assert details[0]['summary'] == '正文'
+    assert details[0]['tags'] == ['宏观']
+    assert {method for method, _, _ in requests_seen} == {'POST'}
+    # 同步实现每篇至少等待1秒；异步请求全部同时在途
+    assert elapsed < 1.0, elapsed
+
+
+if __name__ == "__main__":
+    test_host_limiter()
+    test_get_article_detail_async()
+    print("✓ 异步爬虫测试通过")
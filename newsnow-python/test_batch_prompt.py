@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+合并分析测试脚本 - 验证短文章分批、按id拆分结果和单篇回退，不访问网络
+"""
+
+import os
+import sys
+import json
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.batch_prompt import plan_batches, pack_articles, demux_results
+from utils.improved_ai_service import FinanceAnalyzer
+from utils.enhanced_ai_service import EnhancedFinanceAnalyzer
+
+
+def _articles(count, length=50):
+    return [{"id": i, "title": f"快讯{i}", "content": "内容" * (length // 2)} for i in range(count)]
+
+
+def test_plan_batches():
+    """短文章按批次分组，长文章和落单的短文章单独分析"""
+    articles = _articles(7) + [{"id": "long", "content": "长" * 1000}]
+    batches, singles = plan_batches(articles, batch_size=3, max_chars=600)
+    assert [len(batch) for batch in batches] == [3, 3]
+    assert [article["id"] for article in singles] == ["long", 6]
+
+    batches, singles = plan_batches(_articles(4), batch_size=1)
+    assert batches == [] and len(singles) == 4
+
+
+def test_pack_and_demux():
+    """打包保留id，拆分时忽略未知id、重复id和非对象结果"""
+    packed = json.loads(pack_articles([{"id": 1, "title": "标题", "content": "a  b\nc", "background": "背景"}],
+                                      extra_fields=("background",)))
+    assert packed == [{"id": "1", "title": "标题", "content": "a b c", "background": "背景"}]
+
+    data = {"results": [{"id": "1", "sentiment": "积极"}, {"id": 1, "sentiment": "重复"},
+                        {"id": "9", "sentiment": "未知"}, "坏数据"]}
+    assert demux_results(data, [1, 2]) == {"1": {"sentiment": "积极"}}
+    assert demux_results([{"id": "2", "x": 1}], ["2"]) == {"2": {"x": 1}}
+    assert demux_results({"error": "无法解析"}, ["1"]) == {}
+
+
+def test_finance_analyzer_batch():
+    """一次请求分析一批新闻，缺失的文章回退到单篇分析"""
+    analyzer = FinanceAnalyzer(api_key="test-key")
+    analyzer.response_cache = None
+    batch_calls = []
+    single_calls = []
+
+    def fake_call(prompt, system_prompt=None, model="deepseek-chat", max_tokens=800, json_output=False):
+        batch_calls.append(max_tokens)
+        ids = [item["id"] for item in json.loads(prompt.split("：\n\n", 1)[1].split("\n\n请返回")[0])]
+        # 模型漏掉了最后一篇
+        return {"results": [{"id": article_id, "market_summary": f"摘要{article_id}"} for article_id in ids[:-1]]}
+
+    def fake_single(text, title=None, searxng_results=None):
+        single_calls.append(title)
+        return {"market_summary": f"单篇{title}"}
+
+    analyzer._call_deepseek_api = fake_call
+    analyzer.analyze_market_news = fake_single
+    results = analyzer.analyze_market_news_batch(_articles(8), batch_size=4)
+
+    assert len(batch_calls) == 2
+    assert batch_calls[0] == 3200
+    assert sorted(single_calls) == ["快讯3", "快讯7"]
+    assert results["0"] == {"market_summary": "摘要0"}
+    assert results["7"] == {"market_summary": "单篇快讯7"}
+    assert len(results) == 8
+
+
+def test_enhanced_analyzer_batch():
+    """合并结果无法拆分时整批回退到单篇分析"""
+    analyzer = EnhancedFinanceAnalyzer(api_key="test-key")
+    analyzer.response_cache = None
+    responses = iter([
+        {"success": True, "cache_key": "k1",
+         "content": "```json\n" + json.dumps({"results": [{"id": "0", "analysis_title": "A"},
+                                                         {"id": "1", "analysis_title": "B"}]}) + "\n```"},
+        {"success": True, "cache_key": "k2", "content": "不是JSON"},
+    ])
+    analyzer._call_api_with_retry = lambda prompt, system_prompt=None, max_tokens=1200: next(responses)
+    singles = []
+    analyzer.generate_comprehensive_analysis = lambda title, content, search_results=None: singles.append(title) or {
+        "analysis_title": f"单篇{title}"}
+
+    results = analyzer.generate_comprehensive_analysis_batch(_articles(4), batch_size=2)
+    assert results["0"]["analysis_title"] == "A"
+    assert results["1"]["ai_model"] == "deepseek-chat"
+    assert sorted(singles) == ["快讯2", "快讯3"]
+    assert results["3"] == {"analysis_title": "单篇快讯3"}
+
+
+if __name__ == "__main__":
+    test_plan_batches()
+    test_pack_and_demux()
+    test_finance_analyzer_batch()
+    test_enhanced_analyzer_batch()
+    print("✓ 合并分析测试通过")
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+文章领取测试脚本 - 验证并发领取不重复、租约过期后重新领取，以及与任务队列互斥
+"""
+
+import os
+import sys
+import time
+import threading
+from datetime import datetime, timedelta
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from testing_db import temp_db
+from utils.job_queue import JobQueue
+
+
+def _make_db(count=0):
+    db = temp_db('claim.db')
+    base = datetime(2025, 1, 1)
+    for i in range(count):
+        db.save_article({"id": f"a{i}", "title": f"文章{i}", "content": "内容", "source": "fastbull",
+                         "pubDate": (base + timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M:%S")})
+    return db
+
+
+def test_claim_order_and_lease():
+    """按发布时间从新到旧领取，租约期间不会被再次领取，过期或释放后可重新领取"""
+    db = _make_db(5)
+    first = db.claim_unprocessed("w1", 2, 60)
+    assert [article["id"] for article in first] == ["a4", "a3"]
+    assert first[0]["pubDate"] and first[0]["claimed_by"] == "w1"
+
+    second = db.claim_unprocessed("w2", 10, 0.2)
+    assert [article["id"] for article in second] == ["a2", "a1", "a0"]
+    assert db.claim_unprocessed("w3", 10, 60) == []
+
+    # w2 的租约过期，w3 接管
+    time.sleep(0.3)
+    assert len(db.claim_unprocessed("w3", 10, 60)) == 3
+
+    assert db.release_claims("w1", ["a4"]) == 1
+    assert [article["id"] for article in db.claim_unprocessed("w4", 10, 60)] == ["a4"]
+
+    # 已处理的文章不再被领取
+    assert db.release_claims("w3") == 3
+    db.update_article_analysis("a2", {"summary": "分析"})
+    assert [article["id"] for article in db.claim_unprocessed("w5", 10, 60)] == ["a1", "a0"]
+
+
+def test_concurrent_claims_do_not_overlap():
+    """多个领取者并发领取，每篇文章只被领取一次"""
+    db = _make_db(80)
+    claimed = {}
+    lock = threading.Lock()
+
+    def worker(name):
+        while True:
+            articles = db.claim_unprocessed(name, 3, 60)
+            if not articles:
+                return
+            with lock:
+                for article in articles:
+                    claimed.setdefault(article["id"], []).append(name)
+
+    threads = [threading.Thread(target=worker, args=(f"w{i}",)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(claimed) == 80
+    assert all(len(owners) == 1 for owners in claimed.values())
+
+
+def test_job_queue_respects_claims():
+    """任务队列不会处理已被批处理进程领取的文章，处理失败时释放文章"""
+    db = _make_db(2)
+    db.claim_unprocessed("batch", 1, 60)  # 领取 a1
+    queue = JobQueue(db, "analyze", backoff_base=0)
+    handled = []
+
+    result = queue.run_batch(lambda article: handled.append(article["id"]), 10)
+    assert handled == ["a0"]
+    assert result == {"total": 2, "success": 0, "failed": 2}
+    # 处理失败的 a0 已释放，可被批处理进程领取
+    assert [article["id"] for article in db.claim_unprocessed("batch", 10, 60)] == ["a0"]
+
+
+def test_lost_claim_does_not_use_attempts():
+    """文章被批处理进程占用时任务放回队列，不消耗尝试次数，也不会进入死信"""
+    db = _make_db(1)
+    db.claim_unprocessed("batch", 1, 60)
+    queue = JobQueue(db, "analyze", backoff_base=0, max_attempts=2)
+    handled = []
+
+    for _ in range(5):
+        assert queue.run_batch(lambda article: handled.append(article["id"]) or True, 10)["total"] == 1
+    assert handled == []
+    assert queue.stats().get("dead", 0) == 0
+    job = db.claim_jobs("analyze", "w", 10, 60)[0]
+    assert job["attempts"] == 1 and job["last_error"] == "文章正被其他进程处理"
+    db.fail_job(job["id"], "w", "", 0)
+
+    # 批处理进程释放文章后任务正常完成
+    db.release_claims("batch")
+    assert queue.run_batch(lambda article: handled.append(article["id"]) or True, 10)["success"] == 1
+    assert handled == ["a0"]
+
+
+if __name__ == "__main__":
+    test_claim_order_and_lease()
+    test_concurrent_claims_do_not_overlap()
+    test_job_queue_respects_claims()
+    test_lost_claim_does_not_use_attempts()
+    print("✓ 文章领取测试通过")
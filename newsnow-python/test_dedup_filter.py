@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+去重过滤器测试脚本 - 验证无假阴性、持久化加载、追赶新行和误判统计
+"""
+
+import os
+import sys
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from testing_db import temp_db
+from unittest import mock
+
+from utils import dedup_filter
+from utils.dedup_filter import BloomFilter, DedupFilter, get_dedup_filter
+from processors.article_crawler import ArticleCrawler
+
+
+def _make_db(articles=200, flash=100):
+    db_client = temp_db('dedup.db')
+    db_client.save_articles_bulk([
+        {'id': f'a{i}', 'title': f'文章{i}', 'source': 'Jin10', 'url': f'https://example.com/a/{i}'}
+        for i in range(articles)
+    ])
+    db_client.save_flash_bulk([
+        {'id': f'f{i}', 'title': f'快讯{i}', 'source': '财联社'} for i in range(flash)
+    ])
+    return db_client
+
+
+def test_bloom_filter():
+    """已添加的键一定命中，未添加的键误判率接近期望值"""
+    bloom = BloomFilter(10000, 0.01)
+    for i in range(10000):
+        bloom.add(f'key{i}')
+
+    assert all(f'key{i}' in bloom for i in range(10000))
+    false_positives = sum(f'other{i}' in bloom for i in range(10000))
+    assert false_positives < 200, false_positives
+    assert 0.005 < bloom.expected_error_rate() < 0.02
+
+
+def test_dedup_lookups():
+    """已存在的条目全部找出，新条目不查询数据库，阳性结果经数据库确认"""
+    db_client = _make_db()
+    dedup = DedupFilter(db_client, refresh_interval=0)
+
+    ids = [f'a{i}' for i in range(150, 250)]
+    assert dedup.existing_article_ids(ids, 'Jin10') == {f'a{i}' for i in range(150, 200)}
+    assert dedup.existing_article_ids(ids, '其他来源') == set()
+    assert dedup.existing_flash_ids(['f1', 'f99', 'f100'], '财联社') == {'f1', 'f99'}
+    assert dedup.url_exists('https://example.com/a/5')
+    assert not dedup.url_exists('https://example.com/a/500')
+
+    stats = dedup.stats()
+    assert stats['checks'] == 100 + 100 + 3 + 2
+    assert stats['positives'] - stats['false_positives'] == 50 + 2 + 1
+    assert stats['negatives'] + stats['false_positives'] == 50 + 100 + 1 + 1
+    assert stats['observed_fp_rate'] < 0.05
+    db_client.close()
+
+
+def test_persistence_and_catch_up():
+    """保存后再次启动直接加载文件，并追赶此后写入数据库的行"""
+    db_client = _make_db()
+    dedup = DedupFilter(db_client, refresh_interval=0)
+    assert dedup.save()
+    keys = dedup.stats()['keys']
+
+    # 其他进程写入的新行
+    db_client.save_articles_bulk([{'id': 'new1', 'title': '新文章', 'source': 'Jin10', 'url': 'https://example.com/new'}])
+    db_client.save_flash_bulk([{'id': 'fnew', 'title': '新快讯', 'source': '财联社'}])
+
+    warm = DedupFilter(db_client, refresh_interval=3600)
+    assert warm.stats()['keys'] == keys + 3
+    assert warm.existing_article_ids(['new1'], 'Jin10') == {'new1'}
+    assert warm.url_exists('https://example.com/new')
+
+    # 刷新间隔内只靠调用方记录新条目
+    db_client.save_flash_bulk([{'id': 'fnew2', 'title': '新快讯2', 'source': '财联社'}])
+    warm.add_flash({'id': 'fnew2', 'source': '财联社'})
+    assert warm.existing_flash_ids(['fnew2'], '财联社') == {'fnew2'}
+
+    # 文件损坏时从数据库重建
+    with open(dedup.path, 'wb') as f:
+        f.write(b'broken')
+    rebuilt = DedupFilter(db_client)
+    assert rebuilt.existing_flash_ids(['fnew', 'fnew2'], '财联社') == {'fnew', 'fnew2'}
+    db_client.close()
+
+
+def test_grow_when_full():
+    """键数超过容量时扩容重建，不产生假阴性"""
+    db_client = _make_db(articles=0, flash=0)
+    dedup = DedupFilter(db_client, refresh_interval=0)
+    dedup.rebuild(capacity=50)
+
+    db_client.save_flash_bulk([{'id': f'f{i}', 'title': f'快讯{i}', 'source': '财联社'} for i in range(120)])
+    dedup.refresh(force=True)
+
+    assert dedup.stats()['capacity'] >= 120
+    assert dedup.existing_flash_ids([f'f{i}' for i in range(120)], '财联社') == {f'f{i}' for i in range(120)}
+    db_client.close()
+
+
+def test_shared_filter():
+    """同一数据库的抓取器共用一个过滤器，退出时的保存只注册一次"""
+    db_client = _make_db(articles=10, flash=0)
+    with mock.patch.dict(dedup_filter._filters, clear=True), mock.patch("atexit.register") as register:
+        crawlers = [ArticleCrawler(db_client.db_path) for _ in range(3)]
+        assert get_dedup_filter(db_client) is crawlers[0].dedup_filter
+        assert all(crawler.dedup_filter is crawlers[0].dedup_filter for crawler in crawlers)
+        assert crawlers[0].dedup_filter.existing_article_ids(['a1', 'x'], 'Jin10') == {'a1'}
+
+        other = get_dedup_filter(_make_db(articles=0, flash=0))
+        assert other is not crawlers[0].dedup_filter
+        assert register.call_count == 1
+    db_client.close()
+
+
+if __name__ == "__main__":
+    test_bloom_filter()
+    test_dedup_lookups()
+    test_persistence_and_catch_up()
+    test_grow_when_full()
+    test_shared_filter()
+    print("✓ 去重过滤器测试通过")
@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+DeepSeek 流式客户端测试脚本 - 使用本地模拟的 SSE 服务器，验证字段提前返回、格式错误时中断和响应缓存
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from testing_db import temp_db
+from utils.deepseek_stream import IncrementalJSONParser, StreamAborted, iter_sse_data
+from utils.response_cache import ResponseCache
+from utils.improved_ai_service import FinanceAnalyzer
+
+
+class FakeSSEHandler(BaseHTTPRequestHandler):
+    """按 server.script 逐段发送 DeepSeek 格式的流式回复"""
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.server.requests.append(json.loads(self.rfile.read(length)))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        try:
+            for delay, piece in self.server.script:
+                time.sleep(delay)
+                chunk = {"choices": [{"index": 0, "delta": {"content": piece}}]}
+                self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                self.server.sent += 1
+            self.wfile.write(b'data: {"choices": [], "usage": {"total_tokens": 50}}\n\ndata: [DONE]\n\n')
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            self.server.aborted = True
+
+    def log_message(self, *args):
+        pass
+
+
+def _start_server(script):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeSSEHandler)
+    server.script = script
+    server.requests = []
+    server.sent = 0
+    server.aborted = False
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _make_analyzer(server):
+    cache = ResponseCache(temp_db('cache.db'))
+    analyzer = FinanceAnalyzer(api_key="test-key", response_cache=cache)
+    analyzer.api_url = f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+    return analyzer
+
+
+def test_incremental_parser():
+    """逐字符输入时每个顶层字段完整后立即返回，嵌套结构和字符串中的符号不影响判断"""
+    data = {"market_summary": "央行降准，释放流动性{,}", "affected_industries": [{"industry": "银行", "companies": ["A", "B"]}],
+            "escaped": "引号\"和\\反斜杠", "score": 9}
+    text = "```json\n" + json.dumps(data, ensure_ascii=False, indent=2) + "\n```"
+    parser = IncrementalJSONParser()
+    fields = []
+    for char in text:
+        fields.extend(parser.feed(char))
+    assert [key for key, _ in fields] == list(data)
+    assert parser.done and parser.result == data
+
+    for bad in ("我无法提供该分析。" * 30, '{"a": 1, oops', '{"a": tru}'):
+        try:
+            IncrementalJSONParser().feed(bad)
+            assert False, bad
+        except StreamAborted:
+            pass
+
+
+def test_iter_sse_data():
+    """解析 data 行，忽略注释行，遇到 [DONE] 结束"""
+    lines = [b": keep-alive", b"", b"data: {\"a\": 1}", b"", "data: 第二条", "", b"data: [DONE]", b"", b"data: x"]
+    assert list(iter_sse_data(lines)) == ['{"a": 1}', "第二条"]
+
+
+def test_fields_before_completion_and_cache():
+    """摘要在回复生成完毕之前返回，完整回复写入缓存，再次分析不发起请求"""
+    script = [(0, '{"market_summary": "降准'), (0.05, '释放流动性", '), (0, '"impact_analysis": "')]
+    script += [(0.05, "分析" * 5)] * 20
+    script += [(0, '", "sentiment": "积极"}')]
+    server = _start_server(script)
+    analyzer = _make_analyzer(server)
+
+    start = time.time()
+    arrivals = []
+    for key, value in analyzer.analyze_market_news_stream("央行宣布降准", "降准"):
+        arrivals.append((key, value, time.time() - start))
+    server.shutdown()
+
+    assert [key for key, _, _ in arrivals] == ["market_summary", "impact_analysis", "sentiment"]
+    assert arrivals[0][1] == "降准释放流动性"
+    assert arrivals[0][2] < 0.5
+    assert arrivals[-1][2] >= 1.0
+    assert server.requests[0]["stream"] is True
+
+    cached = list(analyzer.analyze_market_news_stream("央行宣布降准", "降准"))
+    assert len(server.requests) == 1
+    assert [key for key, _ in cached] == ["market_summary", "impact_analysis", "sentiment"]
+    # 非流式调用共用同一缓存
+    assert analyzer.analyze_market_news("央行宣布降准", "降准")["sentiment"] == "积极"
+
+
+def test_fenced_reply_cached_as_json():
+    """回复带有代码块标记时缓存解析出的对象（对象结束后的内容不再接收），非流式调用可以直接使用"""
+    server = _start_server([(0, '```json\n{"market_summary": "加息", '), (0, '"sentiment": "消极"}'), (0, '\n```')])
+    analyzer = _make_analyzer(server)
+
+    fields = dict(analyzer.analyze_market_news_stream("美联储加息", "加息"))
+    server.shutdown()
+    assert fields == {"market_summary": "加息", "sentiment": "消极"}
+
+    assert analyzer.analyze_market_news("美联储加息", "加息") == fields
+    assert len(server.requests) == 1
+    assert analyzer.response_cache.stats()["stores"] == 1
+
+
+def test_malformed_output_aborts_early():
+    """回复不是JSON时立即中断连接，不再接收后续内容"""
+    server = _start_server([(0.02, "抱歉，我无法对这条新闻进行分析。")] * 100)
+    analyzer = _make_analyzer(server)
+
+    start = time.time()
+    try:
+        list(analyzer.analyze_market_news_stream("内容", "标题"))
+        assert False, "应当中断"
+    except StreamAborted:
+        pass
+    assert time.time() - start < 1.0
+    time.sleep(0.2)
+    server.shutdown()
+    assert server.sent < 100
+    assert server.aborted
+    assert analyzer.response_cache.stats()["stores"] == 0
+
+
+if __name__ == "__main__":
+    test_incremental_parser()
+    test_iter_sse_data()
+    test_fields_before_completion_and_cache()
+    test_fenced_reply_cached_as_json()
+    test_malformed_output_aborts_early()
+    print("✓ DeepSeek流式客户端测试通过")
@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+事件流测试脚本 - 验证事件总线的补发、有界缓冲、数据库写入（包括其他进程的写入）触发事件和 /api/flash/stream，不访问网络
+"""
+
+import os
+import sys
+import json
+import subprocess
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from testing_db import temp_db, temp_path
+import api.api_server as api_server
+import utils.event_bus as event_bus
+from utils.event_bus import EventBus, DatabaseTail, get_event_bus
+
+
+def test_resume_and_reset():
+    """按 Last-Event-ID 补发错过的事件，错过的事件已淘汰时标记 reset"""
+    bus = EventBus(history_size=5, buffer_size=10)
+    ids = [bus.publish("flash", {"n": i}) for i in range(3)]
+
+    subscription = bus.subscribe(last_event_id=ids[0])
+    assert not subscription.reset
+    assert [subscription.get(timeout=0)["data"]["n"] for _ in range(2)] == [1, 2]
+    assert subscription.get(timeout=0.01) is None
+    bus.publish("analysis", {"n": 3})
+    assert subscription.get(timeout=0)["event"] == "analysis"
+    subscription.close()
+
+    # 历史只保留 5 个事件，ids[0] 之后的事件已有被淘汰的
+    for i in range(4, 8):
+        bus.publish("flash", {"n": i})
+    assert bus.subscribe(last_event_id=ids[0]).reset
+    # 进程重启前的编号和无法识别的编号同样需要 reset
+    assert EventBus().subscribe(last_event_id=ids[-1]).reset
+    assert bus.subscribe(last_event_id=-1).reset
+    # 已收到最新事件时无需补发
+    latest = bus.subscribe(last_event_id=bus.last_id)
+    assert not latest.reset and latest.get(timeout=0) is None
+
+    stats = bus.stats()
+    assert stats["history"] == 5 and stats["resumed"] == 2 and stats["reset"] == 2
+
+
+def test_bounded_buffer_and_types():
+    """缓冲区满的订阅者被断开，不影响其他订阅者；只接收订阅的事件类型"""
+    bus = EventBus(history_size=100, buffer_size=3)
+    slow = bus.subscribe()
+    flash_only = bus.subscribe(types=["flash"], buffer_size=100)
+    for i in range(5):
+        bus.publish("flash", {"n": i})
+        bus.publish("analysis", {"n": i})
+
+    assert slow.overflowed and slow.closed
+    assert [slow.get(timeout=0)["data"]["n"] for _ in range(3)] == [0, 0, 1]
+    assert slow.get(timeout=0.01) is None
+
+    received = []
+    while True:
+        event = flash_only.get(timeout=0)
+        if event is None:
+            break
+        received.append(event)
+    assert [event["data"]["n"] for event in received] == list(range(5))
+    assert {event["event"] for event in received} == {"flash"}
+    assert bus.stats()["subscribers"] == 1 and bus.stats()["overflowed"] == 1
+
+
+def _drain(subscription):
+    events = []
+    while True:
+        event = subscription.get(timeout=0)
+        if event is None:
+            return events
+        events.append((event["event"], event["data"]["id"]))
+
+
+def test_db_writes_publish_events():
+    """新增的快讯和完成的分析提交后写入数据库，转发后发布；已存在的快讯和转发器启动前的事件不发布"""
+    db_client = temp_db('stream.db')
+    db_client.save_flash_bulk([{"id": "old", "title": "旧快讯", "source": "cls"}])
+    bus = EventBus()
+    tail = DatabaseTail(db_client, bus=bus)
+    subscription = bus.subscribe()
+
+    news = [{"id": f"f{i}", "title": f"快讯{i}", "pubDate": "2025-01-01T00:00:00", "source": "cls"}
+            for i in range(2)]
+    db_client.save_flash_bulk(news[:1])
+    assert db_client.save_flash_bulk(news)["inserted"] == 1
+    db_client.save_article({"id": "a1", "title": "文章", "content": "内容", "source": "jin10"})
+    assert db_client.update_article_analysis("a1", {"summary": "分析"}, "jin10")
+
+    assert _drain(subscription) == []
+    assert tail.poll_once() == 3
+    assert _drain(subscription) == [("flash", "f0"), ("flash", "f1"), ("analysis", "a1")]
+    assert tail.poll_once() == 0
+    subscription.close()
+
+
+def test_writes_from_other_process():
+    """抓取器在独立进程中写入的快讯同样推送给本进程的订阅者"""
+    db_client = temp_db('stream.db')
+    bus = EventBus()
+    tail = DatabaseTail(db_client, bus=bus, batch_size=2)
+    subscription = bus.subscribe()
+
+    script = (
+        "from db.sqlite_client import SQLiteClient\n"
+        f"SQLiteClient({db_client.db_path!r}).save_flash_bulk("
+        "[{'id': f'p{i}', 'title': f'快讯{i}', 'source': 'jin10'} for i in range(3)])"
+    )
+    result = subprocess.run([sys.executable, "-c", script], cwd=os.path.dirname(os.path.abspath(__file__)),
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    # 分批读取，一次轮询读完所有新事件
+    assert tail.poll_once() == 3
+    assert _drain(subscription) == [("flash", "p0"), ("flash", "p1"), ("flash", "p2")]
+    assert tail.stats()["forwarded"] == 3
+    subscription.close()
+
+
+def _read_events(response, count):
+    """从事件流响应中读取 count 个带编号的事件"""
+    events = []
+    buffer = ""
+    for chunk in response.response:
+        buffer += chunk if isinstance(chunk, str) else chunk.decode("utf-8")
+        while "\n\n" in buffer:
+            block, buffer = buffer.split("\n\n", 1)
+            fields = dict(line.split(": ", 1) for line in block.split("\n") if ": " in line and not line.startswith(":"))
+            if "event" in fields:
+                events.append({"id": int(fields["id"]), "event": fields["event"], "data": json.loads(fields["data"])})
+        if len(events) >= count:
+            break
+    return events
+
+
+def test_flash_stream_endpoint():
+    """事件流按 Last-Event-ID 补发并推送新事件，连接数超过上限时返回 503"""
+    original = (api_server.SSE_MAX_CLIENTS, api_server.SSE_MAX_STREAM_SECONDS, api_server.SSE_HEARTBEAT_SECONDS,
+                event_bus.SSE_POLL_INTERVAL)
+    api_server.SSE_MAX_CLIENTS, api_server.SSE_MAX_STREAM_SECONDS, api_server.SSE_HEARTBEAT_SECONDS = 1, 2, 0.1
+    event_bus.SSE_POLL_INTERVAL = 0.05
+    try:
+        server = api_server.APIServer(db_path=temp_path('api.db'))
+        client = server.app.test_client()
+        bus = get_event_bus()
+        start_id = bus.last_id
+        server.db_client.save_flash_bulk([{"id": "s1", "title": "快讯1", "source": "cls"},
+                                          {"id": "s2", "title": "快讯2", "source": "jin10"}])
+
+        response = client.get('/api/flash/stream?source=jin10', headers={'Last-Event-ID': str(start_id)},
+                              buffered=False)
+        assert response.status_code == 200 and response.mimetype == 'text/event-stream'
+        assert client.get('/api/flash/stream').status_code == 503
+
+        server.db_client.save_flash_bulk([{"id": "s3", "title": "快讯3", "source": "jin10"}])
+        events = _read_events(response, 2)
+        assert [event["data"]["id"] for event in events] == ["s2", "s3"]
+        assert events[0]["id"] < events[1]["id"] == bus.last_id
+        response.close()
+
+        # 连接关闭后释放名额，编号过旧时先推送 reset
+        response = client.get('/api/flash/stream', headers={'Last-Event-ID': '1'}, buffered=False)
+        events = _read_events(response, 1)
+        assert events[0]["event"] == "reset" and events[0]["id"] == bus.last_id
+        response.close()
+
+        assert client.get('/api/stats').get_json()['event_bus']['subscribers'] == 0
+    finally:
+        (api_server.SSE_MAX_CLIENTS, api_server.SSE_MAX_STREAM_SECONDS, api_server.SSE_HEARTBEAT_SECONDS,
+         event_bus.SSE_POLL_INTERVAL) = original
+
+
+if __name__ == "__main__":
+    test_resume_and_reset()
+    test_bounded_buffer_and_types()
+    test_db_writes_publish_events()
+    test_writes_from_other_process()
+    test_flash_stream_endpoint()
+    print("✓ 事件流测试通过")
@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+快讯高频轮询测试脚本 - 验证内存去重、批量写入、入库延迟统计和轮询线程，不访问网络
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from datetime import datetime
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from testing_db import temp_db, temp_path
+from crawlers.jin10 import Jin10Crawler
+from processors.article_crawler import ArticleCrawler
+from processors.flash_poller import FlashPoller, LatencyTracker, flash_poller_stats
+from utils import http_client
+from utils.http_client import NotModifiedList
+
+
+class FlashFactory:
+    """模拟爬虫工厂，每个来源的快讯列表由测试发布"""
+
+    def __init__(self, sources):
+        self.feeds = {source: [] for source in sources}
+        self.not_modified = set()
+        self.requests = 0
+
+    def publish(self, source, news_id, published_at=None):
+        pub_date = datetime.fromtimestamp(published_at or time.time()).isoformat()
+        self.feeds[source].insert(0, {"id": news_id, "title": f"快讯{news_id}", "content": "内容",
+                                      "url": f"https://{source}.example.com/{news_id}",
+                                      "pubDate": pub_date, "source": source})
+
+    def get_news_flash(self, source, limit=20, before=None, validator_scope=None):
+        self.requests += 1
+        if source in self.not_modified:
+            return NotModifiedList()
+        return [dict(news) for news in self.feeds[source][:limit]]
+
+
+def _make_poller(factory, **kwargs):
+    db_client = temp_db('flash.db')
+    return FlashPoller(db_client, factory, sources=list(factory.feeds), **kwargs), db_client
+
+
+def test_dedup_and_bulk_write():
+    """见过的快讯不再写库，各来源的新快讯在一个事务中写入"""
+    factory = FlashFactory(["jin10", "cls"])
+    # 轮询器创建前发布的积压快讯不计入延迟
+    factory.publish("jin10", "old", time.time() - 3600)
+    poller, db_client = _make_poller(factory)
+    factory.publish("jin10", "j1")
+    factory.publish("cls", "c1")
+
+    assert poller.poll_source("jin10") == 2 and poller.poll_source("cls") == 1
+    assert poller.flush() == 3
+    assert db_client.get_flash_count() == 3
+
+    # 再次轮询时列表中都是见过的快讯，不产生写入
+    factory.publish("cls", "c2")
+    factory.not_modified.add("jin10")
+    assert poller.poll_all_once() == 1
+    assert poller.poll_all_once() == 0
+
+    stats = poller.stats()
+    assert stats["writes"]["batches"] == 2 and stats["writes"]["inserted"] == 4
+    assert stats["sources"]["jin10"]["not_modified"] == 2 and stats["sources"]["cls"]["new"] == 2
+    latency = stats["publish_to_visible"]
+    assert latency["count"] == 3 and latency["over_target"] == 0 and latency["max"] < latency["target"]
+    assert stats["sources"]["cls"]["publish_to_visible"]["count"] == 2
+    assert "flash_poller" in flash_poller_stats()
+
+    # 新的轮询器从数据库中最新的快讯初始化去重集合
+    restarted = FlashPoller(db_client, factory, sources=["cls"], name="restarted")
+    assert restarted.poll_source("cls") == 0
+
+
+def test_write_failure_retried():
+    """写入失败的快讯从去重集合中移除，下次轮询重新写入"""
+    factory = FlashFactory(["jin10"])
+    poller, db_client = _make_poller(factory, name="retry")
+    factory.publish("jin10", "j1")
+
+    original = db_client.save_flash_bulk
+    db_client.save_flash_bulk = lambda news_list: {"inserted": 0, "skipped": 0, "error": "database is locked"}
+    assert poller.poll_all_once() == 0
+    db_client.save_flash_bulk = original
+
+    assert poller.poll_all_once() == 1
+    assert db_client.get_flash_count() == 1
+    assert poller.stats()["writes"]["errors"] == 1
+
+
+def test_polling_loop_latency():
+    """轮询线程运行时，新发布的快讯在一个轮询间隔内入库可见"""
+    factory = FlashFactory(["jin10", "cls"])
+    poller, db_client = _make_poller(factory, interval=0.05, name="loop")
+    poller.start()
+    try:
+        time.sleep(0.1)
+        factory.publish("cls", "c1")
+        deadline = time.time() + 2
+        while db_client.get_flash_count() == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        assert db_client.get_flash_count() == 1
+        assert poller.stats()["running"]
+    finally:
+        poller.stop()
+
+    stats = poller.stats()
+    assert not stats["running"]
+    assert stats["sources"]["jin10"]["polls"] > 2
+    assert stats["fetch_to_visible"]["p90"] < 1
+    assert stats["publish_to_visible"]["count"] == 1
+
+
+class _Jin10Handler(BaseHTTPRequestHandler):
+    """模拟金十 flash_newest.js：返回 ETag，If-None-Match 相同时返回 304"""
+
+    protocol_version = "HTTP/1.1"
+    items = []
+    requests = []
+
+    def do_GET(self):
+        body = ("var newest = " + json.dumps(_Jin10Handler.items) + ";").encode("utf-8")
+        etag = f'"{len(_Jin10Handler.items)}"'
+        status = 304 if self.headers.get("If-None-Match") == etag else 200
+        _Jin10Handler.requests.append(status)
+        self.send_response(status)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", "0" if status == 304 else str(len(body)))
+        self.end_headers()
+        if status == 200:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+    @classmethod
+    def publish(cls, news_id):
+        cls.items.insert(0, {"id": news_id, "time": datetime.now().isoformat(), "data": {"content": f"快讯{news_id}"}})
+
+
+def test_poller_does_not_starve_crawler():
+    """轮询器和文章抓取读取同一个带 ETag 的列表时，各自记录校验信息，都能取得新内容"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Jin10Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    crawler = ArticleCrawler(temp_path('flash.db'))
+    http_client.set_validator_store(crawler.db_client)
+    try:
+        _Jin10Handler.items, _Jin10Handler.requests = [], []
+        # 爬虫默认打开项目数据库，改用测试数据库
+        with mock.patch("crawlers.jin10.SQLiteClient", return_value=crawler.db_client):
+            jin10 = Jin10Crawler()
+        jin10.js_api = f"http://127.0.0.1:{server.server_address[1]}/flash_newest.js"
+        # 只保存摘要，不抓取详情和调用 AI
+        jin10.supports_immediate_processing = False
+        crawler.crawler_factory._crawlers["jin10"] = jin10
+        crawler.dedup_filter = None
+        poller = FlashPoller(crawler.db_client, crawler.crawler_factory, sources=["jin10"], name="jin10")
+
+        _Jin10Handler.publish("1")
+        assert poller.poll_all_once() == 1
+        result = crawler.crawl_source("jin10")
+        assert result["summaries_saved_for_later"] == 1 and "skipped_unchanged" not in result
+
+        # 列表未变化时两者都收到 304
+        assert poller.poll_all_once() == 0
+        assert crawler.crawl_source("jin10")["skipped_unchanged"] == 1
+        assert _Jin10Handler.requests[-2:] == [304, 304]
+
+        # 轮询器先取得新内容后，抓取器仍然能取得同一批新内容
+        _Jin10Handler.publish("2")
+        assert poller.poll_all_once() == 1
+        result = crawler.crawl_source("jin10")
+        assert result["summaries_saved_for_later"] == 1 and "skipped_unchanged" not in result
+        assert crawler.db_client.get_article_by_id("2") is not None
+        assert poller.stats()["sources"]["jin10"]["not_modified"] == 1
+    finally:
+        http_client.set_validator_store(None)
+        http_client.close_all_sessions()
+        server.shutdown()
+
+
+def test_latency_tracker():
+    """分位数按最近的样本计算，超出目标的样本单独计数"""
+    tracker = LatencyTracker(target=9, window=100)
+    for seconds in range(1, 121):
+        tracker.add(seconds / 10)
+    summary = tracker.summary()
+    assert summary["count"] == 120 and summary["over_target"] == 30
+    assert summary["p50"] == 7.1 and summary["max"] == 12.0
+
+
+if __name__ == "__main__":
+    test_dedup_and_bulk_write()
+    test_write_failure_retried()
+    test_polling_loop_latency()
+    test_poller_does_not_starve_crawler()
+    test_latency_tracker()
+    print("✓ 快讯高频轮询测试通过")
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+共享HTTP客户端测试脚本 - 使用本地HTTP服务验证连接复用、重试和条件请求
+"""
+
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from testing_db import temp_db
+from utils import http_client
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """本地测试服务：/flaky 前两次返回 503，/list 支持 ETag，其余路径返回 200"""
+
+    protocol_version = "HTTP/1.1"  # 支持 keep-alive
+    flaky_calls = 0
+    list_etag = '"v1"'
+    last_path = None
+
+    def do_GET(self):
+        _Handler.last_path = self.path
+        status = 200
+        headers = {}
+        if self.path == "/flaky":
+            _Handler.flaky_calls += 1
+            if _Handler.flaky_calls <= 2:
+                status = 503
+        elif self.path.startswith("/list"):
+            headers["ETag"] = _Handler.list_etag
+            if self.headers.get("If-None-Match") == _Handler.list_etag:
+                status = 304
+        body = b'' if status == 304 else b'{"ok": true}'
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_connection_reuse():
+    """同一主机的请求复用连接，并计入复用统计"""
+    server, base_url = _start_server()
+    try:
+        for i in range(10):
+            assert http_client.get(f"{base_url}/item/{i}").json() == {"ok": True}
+
+        assert http_client.get_session(base_url) is http_client.get_session(f"{base_url}/other")
+        stats = http_client.get_connection_stats()[base_url]
+        assert stats["requests"] == 10
+        assert stats["connections"] == 1
+        assert stats["reused"] == 9
+    finally:
+        http_client.close_all_sessions()
+        server.shutdown()
+
+
+def test_retry_on_server_error():
+    """5xx 自动退避重试；retry=False 时直接返回错误响应"""
+    server, base_url = _start_server()
+    try:
+        _Handler.flaky_calls = 0
+        assert http_client.get(f"{base_url}/flaky").status_code == 200
+        assert _Handler.flaky_calls == 3
+
+        _Handler.flaky_calls = 0
+        assert http_client.get(f"{base_url}/flaky", retry=False).status_code == 503
+        assert _Handler.flaky_calls == 1
+    finally:
+        http_client.close_all_sessions()
+        server.shutdown()
+
+
+def test_conditional_get():
+    """解析成功后记录 ETag，再次请求未变化时返回 304，内容变化后重新返回 200"""
+    server, base_url = _start_server()
+    store = temp_db('http.db')
+    http_client.set_validator_store(store)
+    try:
+        _Handler.list_etag = '"v1"'
+        url = f"{base_url}/list"
+        response = http_client.conditional_get(url, params={"page": 1}, validator_scope="articles")
+        assert response.status_code == 200
+
+        # 未记录校验信息前不会发送条件请求
+        assert http_client.conditional_get(url, params={"page": 1}, validator_scope="articles").status_code == 200
+
+        assert http_client.remember_validators(response)
+        assert store.get_http_validators(f"articles {url}?page=1") == {"etag": '"v1"', "last_modified": None}
+        assert http_client.conditional_get(url, params={"page": 1}, validator_scope="articles").status_code == 304
+        # 查询参数不同的URL单独记录
+        assert http_client.conditional_get(url, params={"page": 2}, validator_scope="articles").status_code == 200
+
+        _Handler.list_etag = '"v2"'
+        assert http_client.conditional_get(url, params={"page": 1}, validator_scope="articles").status_code == 200
+        assert http_client.get_connection_stats()[base_url]["not_modified"] == 1
+    finally:
+        http_client.set_validator_store(None)
+        http_client.close_all_sessions()
+        store.close()
+        server.shutdown()
+
+
+def test_conditional_get_scopes():
+    """同一URL的不同消费者各自记录校验信息；不指定作用域时总是完整获取，没有校验信息时附加时间戳参数"""
+    server, base_url = _start_server()
+    store = temp_db('http.db')
+    http_client.set_validator_store(store)
+    try:
+        _Handler.list_etag = '"v1"'
+        url = f"{base_url}/list"
+        articles_scope = http_client.slice_scope("articles", page=1, limit=20)
+        assert http_client.remember_validators(http_client.conditional_get(url, validator_scope=articles_scope))
+        assert http_client.conditional_get(url, validator_scope=articles_scope).status_code == 304
+
+        # 另一个消费者、另一个分页数量第一次请求仍取得完整内容
+        flash = http_client.conditional_get(url, validator_scope="flash")
+        assert flash.status_code == 200
+        assert http_client.conditional_get(
+            url, validator_scope=http_client.slice_scope("articles", page=1, limit=50)).status_code == 200
+        # 不指定作用域时不发送条件请求，也不记录
+        plain = http_client.conditional_get(url, cache_buster="t")
+        assert plain.status_code == 200 and plain.validator_key is None
+        assert not http_client.remember_validators(plain)
+        assert _Handler.last_path.startswith("/list?t=")
+
+        # 有校验信息时不附加时间戳参数
+        http_client.remember_validators(flash)
+        assert http_client.conditional_get(url, validator_scope="flash", cache_buster="t").status_code == 304
+        assert _Handler.last_path == "/list"
+    finally:
+        http_client.set_validator_store(None)
+        http_client.close_all_sessions()
+        store.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_connection_reuse()
+    test_retry_on_server_error()
+    test_conditional_get()
+    test_conditional_get_scopes()
+    print("✓ HTTP客户端测试通过")
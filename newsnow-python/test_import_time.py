@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+导入耗时测试脚本 - 验证爬虫工厂不预先加载爬虫和重量级模块、爬虫按需加载，
+并用 -X importtime 做一个宽松的耗时检查，不访问网络
+"""
+
+import os
+import sys
+import json
+import subprocess
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 导入 crawlers.crawler_factory 的累计耗时上限（毫秒）。耗时受机器和磁盘缓存影响，默认值很宽松，
+# 只用来发现数量级的退化；是否按需加载由下面的模块检查保证。需要更严格的检查时通过环境变量设置
+IMPORT_BUDGET_MS = float(os.environ.get("IMPORT_BUDGET_MS", "1000"))
+
+# 只有真正用到爬虫时才应加载的重量级模块
+HEAVY_MODULES = ["bs4", "requests", "aiohttp", "utils.enhanced_ai_service", "utils.search_service"]
+CRAWLER_MODULES = ["crawlers.jin10", "crawlers.gelonghui", "crawlers.wallstreet", "crawlers.fastbull", "crawlers.cls"]
+
+
+def _run(code):
+    """在新的解释器中执行 code，返回 (导入耗时表, 已加载的模块集合)"""
+    script = code + "\nimport sys, json\nprint(json.dumps(sorted(sys.modules)))"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", script],
+                            cwd=PROJECT_DIR, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = int(cumulative) / 1000
+    return timings, set(json.loads(result.stdout.strip().splitlines()[-1]))
+
+
+def test_factory_import_budget():
+    """导入爬虫工厂和列出来源不导入任何爬虫和重量级模块"""
+    timings, modules = _run(
+        "from crawlers.crawler_factory import CrawlerFactory\n"
+        "assert CrawlerFactory().get_all_sources() == ['jin10', 'gelonghui', 'wallstreet', 'fastbull', 'cls']"
+    )
+    loaded = [name for name in HEAVY_MODULES + CRAWLER_MODULES if name in modules]
+    assert loaded == [], loaded
+    assert timings["crawlers.crawler_factory"] < IMPORT_BUDGET_MS, timings["crawlers.crawler_factory"]
+
+
+def test_single_source_loads_only_its_crawler():
+    """只获取 cls 爬虫时不加载其他爬虫、搜索服务和 AI 分析器"""
+    _, modules = _run(
+        "from crawlers.crawler_factory import CrawlerFactory\n"
+        "factory = CrawlerFactory()\n"
+        "assert factory.get_crawler('CLS') is factory.get_crawler('cls')\n"
+        "assert factory.get_crawler('unknown') is None"
+    )
+    assert "crawlers.cls" in modules
+    loaded = [name for name in CRAWLER_MODULES + HEAVY_MODULES
+              if name in modules and name not in ("crawlers.cls", "requests")]
+    assert loaded == [], loaded
+
+
+if __name__ == "__main__":
+    test_factory_import_budget()
+    test_single_source_loads_only_its_crawler()
+    print("✓ 导入耗时测试通过")
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+任务队列测试脚本 - 验证优先级、租约、退避重试、死信和多个领取者不重复处理
+"""
+
+import os
+import sys
+import time
+import threading
+from datetime import datetime, timedelta
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from testing_db import temp_db
+from db.sqlite_client import SQLiteClient
+from utils.job_queue import JobQueue, compute_priority, parse_article_time
+
+
+def _make_db(count=0):
+    db = temp_db('jobs.db')
+    for i in range(count):
+        db.save_article({"id": f"a{i}", "title": f"文章{i}", "content": "内容", "source": "fastbull",
+                         "pubDate": (datetime.now() - timedelta(days=2)).strftime("%Y-%m-%d %H:%M:%S")})
+    return db
+
+
+def test_priority():
+    """新发布、重要来源、含关键词的文章优先"""
+    now = time.time()
+    fresh = datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S")
+    stale = datetime.fromtimestamp(now - 3 * 86400).isoformat()
+    assert abs(parse_article_time(fresh) - now) < 1
+    assert parse_article_time(str(int(now * 1000))) == int(now * 1000) / 1000
+    assert parse_article_time("昨天") is None
+
+    urgent = compute_priority({"source": "jin10", "title": "美联储宣布加息", "pubDate": fresh}, now)
+    routine = compute_priority({"source": "jin10", "title": "市场收盘", "pubDate": fresh}, now)
+    backlog = compute_priority({"source": "fastbull", "title": "市场收盘", "pubDate": stale}, now)
+    assert urgent > routine > backlog
+
+    db = _make_db(3)
+    db.save_article({"id": "breaking", "title": "央行突发降准", "content": "内容", "source": "cls",
+                     "pubDate": fresh})
+    queue = JobQueue(db, "analyze")
+    jobs = queue.claim(2)
+    assert jobs[0]["article_id"] == "breaking"
+    assert [job["attempts"] for job in jobs] == [1, 1]
+    # 已有任务的文章不重复入队
+    assert queue.sync() == 0
+    assert queue.stats() == {"leased": 2, "pending": 2}
+
+
+def test_concurrent_claims_do_not_overlap():
+    """多个领取者并发领取，每个任务只被领取一次"""
+    db = _make_db(60)
+    JobQueue(db, "analyze").sync()
+    claimed = []
+    lock = threading.Lock()
+
+    def worker(index):
+        queue = JobQueue(SQLiteClient(db.db_path), "analyze", worker_id=f"w{index}")
+        while True:
+            jobs = queue.claim(4)
+            if not jobs:
+                return
+            with lock:
+                claimed.extend(job["id"] for job in jobs)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(claimed) == 60
+    assert len(set(claimed)) == 60
+
+
+def test_lease_expiry_and_dead_letter():
+    """租约过期后任务被其他领取者接管，失败按退避重试，超过次数进入死信"""
+    db = _make_db(1)
+    first = JobQueue(db, "analyze", worker_id="first", lease_seconds=0.1, max_attempts=3, backoff_base=0)
+    second = JobQueue(db, "analyze", worker_id="second", lease_seconds=60, max_attempts=3, backoff_base=0)
+
+    job = first.claim(1)[0]
+    assert second.claim(1) == []
+    time.sleep(0.15)
+    taken = second.claim(1)[0]
+    assert taken["id"] == job["id"] and taken["attempts"] == 2
+    assert not db.complete_job(job["id"], "first")
+
+    assert second.fail(taken, "超时") == "pending"
+    last = second.claim(1)[0]
+    assert last["attempts"] == 3
+    assert second.fail(last, "再次超时") == "dead"
+    assert second.claim(1) == []
+
+    dead = db.get_dead_jobs("analyze")
+    assert len(dead) == 1 and dead[0]["last_error"] == "再次超时"
+    assert db.requeue_dead_jobs("analyze") == 1
+    assert second.claim(1)[0]["attempts"] == 1
+
+    # 退避时间按失败次数翻倍，不超过上限
+    queue = JobQueue(db, "analyze", backoff_base=10, backoff_max=60)
+    assert 8 <= queue.retry_delay(1) <= 12
+    assert 32 <= queue.retry_delay(3) <= 48
+    assert queue.retry_delay(10) <= 72
+
+
+def test_run_batch():
+    """处理成功的任务完成，失败的任务延迟重试，已被其他流程处理的文章直接完成"""
+    db = _make_db(4)
+    db.update_article_analysis("a3", {"summary": "已分析"})
+    queue = JobQueue(db, "analyze", backoff_base=30)
+    handled = []
+
+    def handler(article):
+        handled.append(article["id"])
+        if article["id"] == "a1":
+            raise RuntimeError("分析失败")
+        if article["id"] == "a2":
+            return False
+        return db.update_article_analysis(article["id"], {"summary": "ok"})
+
+    stats = queue.run_batch(handler, 10)
+    assert sorted(handled) == ["a0", "a1", "a2"]
+    assert stats == {"total": 3, "success": 1, "failed": 2}
+    assert queue.stats() == {"done": 1, "pending": 2}
+    # 失败的任务在退避期内不会被再次领取
+    assert queue.run_batch(handler, 10)["total"] == 0
+
+    enhance_queue = JobQueue(db, "enhance")
+    assert enhance_queue.sync() == 4
+
+
+def test_prune_done_jobs():
+    """完成超过保留时间的任务被清理，文章不会因此重新入队"""
+    db = _make_db(3)
+    queue = JobQueue(db, "analyze", done_retention=0)
+    queue.run_batch(lambda article: db.update_article_analysis(article["id"], {"summary": "ok"}), 10)
+    assert queue.stats() == {"done": 3}
+
+    assert queue.prune() == 3
+    assert queue.stats() == {} and queue.sync() == 0
+
+    # 保留期内的任务不清理
+    db.save_article({"id": "a9", "title": "文章9", "content": "内容", "source": "fastbull"})
+    retained = JobQueue(db, "analyze")
+    retained.run_batch(lambda article: db.update_article_analysis(article["id"], {"summary": "ok"}), 10)
+    assert retained.prune() == 0 and retained.stats() == {"done": 1}
+
+
+if __name__ == "__main__":
+    test_priority()
+    test_concurrent_claims_do_not_overlap()
+    test_lease_expiry_and_dead_letter()
+    test_run_batch()
+    test_prune_done_jobs()
+    print("✓ 任务队列测试通过")
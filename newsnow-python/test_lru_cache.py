@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+进程内缓存测试脚本 - 验证 LRU 淘汰、字节上限、有效期和并发访问
+"""
+
+import os
+import sys
+import time
+import threading
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.lru_cache import TTLCache
+
+
+def test_lru_eviction():
+    """超出条数上限时淘汰最久未使用的条目"""
+    cache = TTLCache(max_entries=3, max_bytes=0)
+    for i in range(3):
+        cache.set(f"k{i}", i)
+    assert cache.get("k0") == 0  # k0 最近被访问，k1 成为最久未使用
+    cache.set("k3", 3)
+
+    assert "k1" not in cache
+    assert [cache.get(key) for key in ("k0", "k2", "k3")] == [0, 2, 3]
+    assert len(cache) == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_max_bytes():
+    """超出字节上限时淘汰，单个条目超过上限时不缓存"""
+    cache = TTLCache(max_entries=100, max_bytes=25)
+    cache.set("a", "x" * 10)
+    cache.set("b", "y" * 10)
+    cache.set("c", "z" * 10)
+    assert "a" not in cache
+    assert cache.stats()["bytes"] == 20
+
+    cache.set("huge", "h" * 30)
+    assert "huge" not in cache
+    assert len(cache) == 2
+
+
+def test_ttl():
+    """条目过期后读取不到，单个条目可以指定有效期"""
+    cache = TTLCache(max_entries=10, ttl=0.1)
+    cache.set("short", "a")
+    cache.set("long", "b", ttl=10)
+    time.sleep(0.15)
+    assert cache.get("short") is None
+    assert cache.get("long") == "b"
+    stats = cache.stats()
+    assert stats["expired"] == 1
+    assert stats["entries"] == 1
+
+
+def test_get_or_set():
+    """只在未命中时获取数据，空结果不缓存"""
+    cache = TTLCache(max_entries=10)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return {"data": len(calls)}
+
+    assert cache.get_or_set("k", fetch) == {"data": 1}
+    assert cache.get_or_set("k", fetch) == {"data": 1}
+    assert len(calls) == 1
+
+    assert cache.get_or_set("empty", lambda: []) == []
+    assert "empty" not in cache
+
+
+def test_concurrent_access():
+    """多线程读写时条数不超过上限，字节计数保持一致"""
+    cache = TTLCache(max_entries=50, max_bytes=10 ** 6)
+
+    def worker(offset):
+        for i in range(500):
+            cache.set((offset + i) % 120, "v" * (i % 7))
+            cache.get((offset * 3 + i) % 120)
+
+    threads = [threading.Thread(target=worker, args=(n * 17,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(cache) == 50
+    assert cache.stats()["bytes"] == sum(size for _, _, size in cache._data.values())
+
+
+if __name__ == "__main__":
+    test_lru_eviction()
+    test_max_bytes()
+    test_ttl()
+    test_get_or_set()
+    test_concurrent_access()
+    print("✓ 进程内缓存测试通过")
@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+流水线测试脚本 - 验证阶段并发、背压、统计，以及慢的AI分析不阻塞抓取，不访问网络
+"""
+
+import os
+import sys
+import time
+import queue
+import threading
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from testing_db import temp_path
+from processors.article_crawler import ArticleCrawler
+from crawlers.async_base import detail_flight_key
+from utils.single_flight import get_single_flight
+from utils.pipeline import Pipeline, pipeline_stats
+
+
+def test_stages_and_stats():
+    """条目依次经过各阶段，返回 None 或异常的条目提前结束，统计各阶段的处理情况"""
+    def check(value):
+        if value == 3:
+            raise ValueError("bad")
+        return None if value % 2 else value
+
+    pipeline = (
+        Pipeline("test_stages")
+        .add_stage("double", lambda value: value * 2 if value != 5 else 3, workers=2)
+        .add_stage("check", check, workers=3)
+        .add_stage("format", lambda value: f"#{value}")
+    )
+    futures = [pipeline.submit(value) for value in range(6)]
+    assert [future.result(timeout=2) for future in futures] == ["#0", "#2", "#4", "#6", "#8", None]
+
+    stats = pipeline.stats()
+    assert stats["double"]["processed"] == 6 and stats["double"]["workers"] == 2
+    assert stats["check"]["errors"] == 1 and stats["check"]["processed"] == 5
+    assert stats["format"]["processed"] == 5
+    assert "test_stages" in pipeline_stats()
+
+    pipeline.close()
+    try:
+        pipeline.submit(1)
+        assert False, "关闭后不应接受新条目"
+    except RuntimeError:
+        pass
+
+
+def test_backpressure():
+    """下游阻塞时队列不超过容量，提交方被阻塞"""
+    release = threading.Event()
+    pipeline = (
+        Pipeline("test_backpressure", queue_size=2)
+        .add_stage("fast", lambda value: value, workers=1)
+        .add_stage("slow", lambda value: release.wait() and value, workers=1)
+    )
+    futures = [pipeline.submit(value) for value in range(5)]
+    time.sleep(0.2)
+    # slow 处理 1 个、队列 2 个，fast 手上 1 个等待放入下游，第一阶段队列中 1 个
+    stats = pipeline.stats()
+    assert stats["slow"]["queue_depth"] == 2 and stats["slow"]["busy"] == 1
+    try:
+        pipeline.submit(5)
+        pipeline.submit(6, timeout=0.2)
+        assert False, "队列已满时应当阻塞"
+    except queue.Full:
+        pass
+
+    release.set()
+    assert [future.result(timeout=2) for future in futures] == list(range(5))
+    assert pipeline.stats()["fast"]["blocked_seconds"] > 0.1
+    pipeline.close()
+
+
+class StagedCrawler:
+    """模拟实现了各阶段方法的即时处理爬虫，AI分析很慢"""
+
+    supports_immediate_processing = True
+    base_url = "https://staged.example.com"
+
+    def __init__(self, count, analyze_delay):
+        self.count = count
+        self.analyze_delay = analyze_delay
+        self.events = []
+        self.lock = threading.Lock()
+
+    def _record(self, name, article_id):
+        with self.lock:
+            self.events.append((name, article_id, time.time()))
+
+    def get_latest_articles(self, limit=20, validator_scope=None):
+        return [{"id": f"s{i}", "title": f"文章{i}", "source": "staged"} for i in range(self.count)]
+
+    def fetch_detail(self, article_id):
+        time.sleep(0.02)
+        self._record("fetch", article_id)
+        return {"status": 200} if article_id != "s3" else None
+
+    def parse_detail(self, article_id, response):
+        return {"id": article_id, "title": f"文章{article_id}", "content": "内容", "source": "staged"}
+
+    def enrich_article(self, article):
+        return [{"title": "相关"}]
+
+    def analyze_article(self, article, search_results):
+        time.sleep(self.analyze_delay)
+        self._record("analyze", article["id"])
+        return {"summary": "分析", "search_results": len(search_results)}
+
+    def persist_article(self, article, analysis_data):
+        article = dict(article, analysis_data=analysis_data, processed_immediately=True)
+        self._record("persist", article["id"])
+        return article
+
+
+def test_article_crawler_pipeline():
+    """AI分析慢时抓取照常进行，抓取失败的文章不推进抓取位置"""
+    crawler = ArticleCrawler(temp_path('pipeline.db'))
+    crawler.dedup_filter = None
+    staged = StagedCrawler(count=8, analyze_delay=0.3)
+    crawler.crawler_factory.get_crawler = lambda source: staged
+
+    start = time.time()
+    result = crawler.crawl_source("staged", limit=8)
+    elapsed = time.time() - start
+
+    assert result["immediately_processed"] == 7
+    fetches = [at for name, _, at in staged.events if name == "fetch"]
+    analyses = [at for name, _, at in staged.events if name == "analyze"]
+    assert len(fetches) == 8 and len(analyses) == 7
+    # 所有抓取在第一个分析完成前就已结束，分析按并发数并行
+    assert max(fetches) < min(analyses)
+    assert elapsed < 8 * 0.3
+
+    stats = crawler._get_pipeline().stats()
+    assert stats["fetch"]["dropped"] == 1
+    assert stats["persist"]["processed"] == 7
+    crawler._get_pipeline().close()
+
+
+def test_pipeline_coalesces_details():
+    """同一篇文章同时从两个批次提交时只抓取和分析一次"""
+    crawler = ArticleCrawler(temp_path('pipeline.db'))
+    crawler.dedup_filter = None
+    staged = StagedCrawler(count=4, analyze_delay=0.2)
+    article_ids = ["c1", "c2", "c3"]
+    outcomes = []
+
+    def run_batch():
+        outcomes.append(crawler._process_details(staged, article_ids))
+
+    threads = [threading.Thread(target=run_batch) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    fetched = sorted(article_id for name, article_id, _ in staged.events if name == "fetch")
+    assert fetched == article_ids
+    assert len(outcomes) == 2
+    for outcome in outcomes:
+        assert [article_id for article_id, _, _ in outcome] == article_ids
+        assert all(result["processed_immediately"] for _, result, _ in outcome)
+    crawler._get_pipeline().close()
+
+
+def test_pipeline_coalesced_error():
+    """合并到的其他调用抛出异常时只有这一篇失败，同批其他文章照常处理"""
+    crawler = ArticleCrawler(temp_path('pipeline.db'))
+    crawler.dedup_filter = None
+    staged = StagedCrawler(count=4, analyze_delay=0)
+    started = threading.Event()
+
+    def failing_detail():
+        started.set()
+        time.sleep(0.3)
+        raise RuntimeError("详情页请求失败")
+
+    def api_call():
+        try:
+            get_single_flight("article_detail").do(detail_flight_key(staged, "e2"), failing_detail)
+        except RuntimeError:
+            pass
+
+    leader = threading.Thread(target=api_call)
+    leader.start()
+    started.wait(5)
+    outcomes = crawler._process_details(staged, ["e1", "e2", "e3"])
+    leader.join()
+
+    assert [article_id for article_id, _, _ in outcomes] == ["e1", "e2", "e3"]
+    assert outcomes[1][1] is None and isinstance(outcomes[1][2], RuntimeError)
+    assert outcomes[0][1]["processed_immediately"] and outcomes[2][1]["processed_immediately"]
+    assert outcomes[0][2] is None and outcomes[2][2] is None
+    crawler._get_pipeline().close()
+
+
+if __name__ == "__main__":
+    test_stages_and_stats()
+    test_backpressure()
+    test_article_crawler_pipeline()
+    test_pipeline_coalesces_details()
+    test_pipeline_coalesced_error()
+    print("✓ 流水线测试通过")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+查询计划回归测试 - 确保热点查询都命中索引，不会退化为全表扫描或临时排序
+"""
+
+import os
+import re
+import sys
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from testing_db import temp_db
+
+# 任何形式的表扫描或为 ORDER BY 建临时B树都视为退化
+BAD_PLAN_PATTERNS = [
+    re.compile(r'^SCAN (articles|flash_news)\b'),
+    re.compile(r'USE TEMP B-TREE FOR ORDER BY'),
+]
+
+# 无过滤条件的 ORDER BY pub_date DESC LIMIT 按索引顺序扫描，读取 LIMIT 行即停止，允许出现
+ORDERED_SCAN_PATTERN = re.compile(r'^SCAN (articles|flash_news) USING (COVERING )?INDEX idx_\w+_pub_date(_id)?$')
+
+
+def _make_client():
+    """创建带少量测试数据的临时数据库"""
+    db_client = temp_db('plan.db')
+    db_client.save_articles_bulk([
+        {'id': f'a{i}', 'title': f'文章{i}', 'url': f'https://example.com/{i}',
+         'pubDate': f'2025-01-01T00:{i:02d}:00', 'source': 'jin10'}
+        for i in range(20)
+    ])
+    db_client.save_flash_bulk([
+        {'id': f'f{i}', 'title': f'快讯{i}', 'pubDate': f'2025-01-01T00:{i:02d}:00', 'source': 'jin10'}
+        for i in range(20)
+    ])
+    return db_client
+
+
+def _capture_statements(db_client, calls):
+    """执行热点方法，记录它们实际执行的SQL（参数已展开）"""
+    conn = db_client._get_connection()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        for call in calls:
+            call()
+    finally:
+        conn.set_trace_callback(None)
+    return [s for s in statements if s.lstrip().upper().startswith(('SELECT', 'UPDATE'))]
+
+
+def _bad_plan_lines(conn, statement, allow_ordered_scan=False):
+    """返回语句查询计划中退化的步骤"""
+    plan = conn.execute(f'EXPLAIN QUERY PLAN {statement}').fetchall()
+    details = [row[3] for row in plan]
+    if allow_ordered_scan:
+        details = [d for d in details if not ORDERED_SCAN_PATTERN.match(d)]
+    return [d for d in details if any(p.search(d) for p in BAD_PLAN_PATTERNS)]
+
+
+def test_hot_queries_use_indexes():
+    """热点查询的查询计划中不能出现全表扫描"""
+    db_client = _make_client()
+    # (调用, 是否允许按 pub_date 索引顺序扫描)
+    hot_calls = [
+        (lambda: db_client.article_exists('a1', 'jin10'), False),
+        (lambda: db_client.check_article_exists('https://example.com/1'), False),
+        (lambda: db_client.flash_exists('f1', 'jin10'), False),
+        (lambda: db_client.get_existing_article_ids(['a1', 'a2'], 'jin10'), False),
+        (lambda: db_client.get_article_by_id('a1'), False),
+        (lambda: db_client.get_article_by_id('a1', 'jin10'), False),
+        (lambda: db_client.get_unprocessed_articles(limit=10), False),
+        (lambda: db_client.get_unprocessed_articles(limit=10, source='jin10'), False),
+        (lambda: db_client.get_articles_for_enhancement(limit=10), False),
+        (lambda: db_client.get_articles_for_enhancement(limit=10, source='jin10'), False),
+        (lambda: db_client.get_latest_articles(limit=10), True),
+        (lambda: db_client.get_latest_articles(limit=10, source='jin10'), False),
+        (lambda: db_client.get_latest_flash(limit=10), True),
+        (lambda: db_client.get_latest_flash(limit=10, source='jin10'), False),
+        (lambda: db_client.update_article({'id': 'a1', 'title': '新标题', 'source': 'jin10'}), False),
+        (lambda: db_client.search_articles('美联储降息'), False),
+        (lambda: db_client.search_articles('美联储降息', source='jin10'), False),
+        (lambda: db_client.get_articles_page(limit=10), True),
+        (lambda: db_client.get_articles_page(limit=10, after=('2025-01-01T00:10:00', 'a10')), False),
+        (lambda: db_client.get_articles_page(limit=10, source='jin10', after=('2025-01-01T00:10:00', 'a10')), False),
+        (lambda: db_client.get_articles_page(limit=10, category='财经'), False),
+        (lambda: db_client.get_article_total(source='jin10'), False),
+    ]
+
+    conn = db_client._get_connection()
+    failures = {}
+    for call, allow_ordered_scan in hot_calls:
+        statements = _capture_statements(db_client, [call])
+        assert statements
+        for statement in statements:
+            bad = _bad_plan_lines(conn, statement, allow_ordered_scan)
+            if bad:
+                failures[statement.strip()] = bad
+
+    db_client.close()
+    assert not failures, f"以下查询退化为全表扫描: {failures}"
+
+
+def test_schema_version():
+    """新建数据库会执行全部迁移"""
+    db_client = _make_client()
+    conn = db_client._get_connection()
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+    assert version >= 1
+    assert 'idx_articles_url' in indexes
+    assert 'idx_articles_source' not in indexes
+    db_client.close()
+
+
+if __name__ == "__main__":
+    test_hot_queries_use_indexes()
+    test_schema_version()
+    print("✓ 查询计划测试通过")
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+AI响应缓存测试脚本 - 验证缓存键、有效期、容量淘汰和分析器命中缓存，不访问网络
+"""
+
+import os
+import sys
+import time
+from unittest import mock
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from testing_db import temp_db
+from db.sqlite_client import SQLiteClient
+from utils.response_cache import ResponseCache, make_cache_key
+from utils.improved_ai_service import FinanceAnalyzer
+from utils.enhanced_ai_service import EnhancedFinanceAnalyzer
+
+
+def test_cache_key():
+    """空白差异不影响缓存键，模型、版本和参数不同时键不同"""
+    messages = [{"role": "user", "content": "央行  宣布\n降准"}]
+    key = make_cache_key("deepseek-chat", "1", messages, max_tokens=800)
+    assert key == make_cache_key("deepseek-chat", "1", [{"role": "user", "content": " 央行 宣布 降准 "}], max_tokens=800)
+    assert key != make_cache_key("deepseek-chat", "2", messages, max_tokens=800)
+    assert key != make_cache_key("deepseek-reasoner", "1", messages, max_tokens=800)
+    assert key != make_cache_key("deepseek-chat", "1", messages, max_tokens=1000)
+
+
+def test_get_put_and_ttl():
+    """命中、未命中和过期都计入统计，两个实例共享同一个数据库"""
+    store = temp_db('cache.db')
+    cache = ResponseCache(store, ttl=1)
+    assert cache.get("k1") is None
+    cache.put("k1", "deepseek-chat", "分析结果")
+    cache.put("empty", "deepseek-chat", "")
+
+    other_process = ResponseCache(SQLiteClient(store.db_path), ttl=1)
+    assert other_process.get("k1") == "分析结果"
+    assert other_process.get("empty") is None
+
+    time.sleep(1.1)
+    assert cache.get("k1") is None
+    stats = cache.stats()
+    assert stats["hits"] == 0
+    assert stats["misses"] == 2
+    assert stats["stores"] == 1
+    assert other_process.stats()["hit_rate"] == 0.5
+    store.close()
+
+
+def test_lru_eviction():
+    """超出条数或字节数上限时淘汰最久未访问的条目"""
+    store = temp_db('cache.db')
+    cache = ResponseCache(store, ttl=3600, max_entries=3, max_bytes=10 ** 6, evict_interval=1)
+    for i in range(3):
+        cache.put(f"k{i}", "deepseek-chat", f"响应{i}")
+        time.sleep(0.01)
+    assert cache.get("k0") == "响应0"  # k0 最近被访问，k1 成为最久未访问
+    cache.put("k3", "deepseek-chat", "响应3")
+
+    assert cache.get("k1") is None
+    assert all(cache.get(key) for key in ("k0", "k2", "k3"))
+    assert cache.stats()["evictions"] == 1
+
+    cache.max_entries = 100
+    cache.max_bytes = 40
+    cache.put("big", "deepseek-chat", "x" * 30)
+    stats = cache.stats()
+    assert stats["bytes"] <= 40
+    assert cache.get("big") == "x" * 30
+    store.close()
+
+
+def test_analyzers_use_cache():
+    """分析器命中缓存时不发起请求，无法解析的响应会被删除"""
+    store = temp_db('cache.db')
+    cache = ResponseCache(store)
+
+    analyzer = FinanceAnalyzer(api_key="test-key", response_cache=cache)
+    messages = [{"role": "system", "content": "系统"}, {"role": "user", "content": "问题"}]
+    key = make_cache_key("deepseek-chat", FinanceAnalyzer.PROMPT_VERSION, messages, max_tokens=800)
+    cache.put(key, "deepseek-chat", '{"summary": "缓存的分析"}')
+    assert analyzer._call_deepseek_api("问题", "系统", json_output=True) == {"summary": "缓存的分析"}
+
+    cache.put(key, "deepseek-chat", "不是JSON")
+    assert analyzer._call_deepseek_api("问题", "系统", json_output=True)["raw_content"] == "不是JSON"
+    assert cache.get(key) is None
+
+    enhanced = EnhancedFinanceAnalyzer(api_key="test-key", response_cache=cache)
+    key = make_cache_key("deepseek-chat", EnhancedFinanceAnalyzer.PROMPT_VERSION,
+                         [{"role": "user", "content": "问题"}], max_tokens=1200, temperature=0.7, top_p=0.9)
+    cache.put(key, "deepseek-chat", "缓存内容")
+    result = enhanced._call_api_with_retry("问题")
+    assert result["success"] and result["content"] == "缓存内容"
+    store.close()
+
+
+def test_default_cache_is_lazy():
+    """创建分析器不打开默认数据库，首次使用缓存时才获取全局缓存"""
+    cache = ResponseCache(temp_db('cache.db'))
+    with mock.patch("utils.improved_ai_service.get_response_cache", return_value=cache) as finance_default, \
+            mock.patch("utils.enhanced_ai_service.get_response_cache", return_value=cache) as enhanced_default:
+        analyzer = FinanceAnalyzer(api_key="test-key")
+        enhanced = EnhancedFinanceAnalyzer(api_key="test-key")
+        assert not finance_default.called and not enhanced_default.called
+
+        assert analyzer.response_cache is cache and enhanced.response_cache is cache
+        assert analyzer.response_cache is cache
+        assert finance_default.call_count == 1
+
+        # 显式关闭缓存后不再获取全局缓存
+        disabled = FinanceAnalyzer(api_key="test-key")
+        disabled.response_cache = None
+        assert disabled.response_cache is None
+        assert finance_default.call_count == 1
+
+
+if __name__ == "__main__":
+    test_cache_key()
+    test_get_put_and_ttl()
+    test_lru_eviction()
+    test_analyzers_use_cache()
+    test_default_cache_is_lazy()
+    print("✓ AI响应缓存测试通过")
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+运行时容器测试脚本 - 验证组件跨任务复用、配置热加载和数据库只初始化一次，不访问网络
+"""
+
+import os
+import sys
+import time
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from testing_db import temp_path
+import config.settings as settings
+import processors.article_crawler as article_crawler
+from db.sqlite_client import SQLiteClient
+from utils.runtime import Runtime, reload_settings
+
+
+class FakeComponent:
+    """记录创建和关闭次数的组件"""
+
+    def __init__(self, counter, delay=0.1):
+        time.sleep(delay)
+        counter.append(self)
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def _make_runtime(env_file=None):
+    built = []
+    runtime = Runtime(
+        env_file=env_file or temp_path('.env'),
+        factories={"crawler": lambda rt: FakeComponent(built)}
+    )
+    return runtime, built
+
+
+def test_components_shared_across_jobs():
+    """组件只在第一次任务中创建，之后的任务不再付出准备成本"""
+    runtime, built = _make_runtime()
+    seen = []
+
+    def job(value):
+        seen.append(runtime.get("crawler"))
+        return value
+
+    assert runtime.run("crawl", job, 1) == 1
+    assert runtime.run("crawl", job, 2) == 2
+    assert len(built) == 1 and seen[0] is seen[1]
+
+    stats = runtime.stats()
+    assert stats["components"] == ["crawler"]
+    assert stats["builds"] == {"crawler": 1}
+    assert stats["jobs"]["crawl"]["runs"] == 2
+    assert stats["jobs"]["crawl"]["setup_seconds"] >= 0.1
+    assert stats["jobs"]["crawl"]["last_setup_seconds"] < 0.05
+
+
+def test_hot_reload():
+    """环境变量文件变化后重新加载配置，已导入的配置值和组件随之更新"""
+    env_file = temp_path('.env')
+    runtime, built = _make_runtime(env_file)
+    old_size = settings.PIPELINE_QUEUE_SIZE
+    first = runtime.get("crawler")
+    try:
+        # 文件未变化时不重新加载
+        assert runtime.check_reload() == {}
+
+        with open(env_file, 'w', encoding='utf-8') as f:
+            f.write("# 测试\nPIPELINE_QUEUE_SIZE=7\n")
+        os.utime(env_file, (time.time() + 5, time.time() + 5))
+        changed = runtime.check_reload()
+        assert changed == {"PIPELINE_QUEUE_SIZE": 7}
+        assert settings.PIPELINE_QUEUE_SIZE == 7
+        assert article_crawler.PIPELINE_QUEUE_SIZE == 7
+        assert first.closed
+        assert runtime.get("crawler") is not first and len(built) == 2
+
+        # 从文件中删除的变量恢复默认值
+        with open(env_file, 'w', encoding='utf-8') as f:
+            f.write("")
+        runtime.request_reload()
+        assert runtime.check_reload() == {"PIPELINE_QUEUE_SIZE": old_size}
+        assert article_crawler.PIPELINE_QUEUE_SIZE == old_size
+        assert runtime.stats()["reloads"] == 2
+    finally:
+        os.environ.pop("PIPELINE_QUEUE_SIZE", None)
+        reload_settings()
+
+
+def test_database_initialized_once():
+    """同一数据库文件的后续客户端不再执行建表和迁移"""
+    db_path = temp_path('runtime.db')
+    SQLiteClient(db_path)
+
+    original = SQLiteClient._init_db
+    calls = []
+    SQLiteClient._init_db = lambda self: calls.append(self)
+    try:
+        client = SQLiteClient(db_path)
+        assert calls == []
+        assert client.get_article_count() == 0
+        # 关闭连接后重新初始化
+        client.close()
+        SQLiteClient(db_path)
+        assert len(calls) == 1
+    finally:
+        SQLiteClient._init_db = original
+
+
+if __name__ == "__main__":
+    test_components_shared_across_jobs()
+    test_hot_reload()
+    test_database_initialized_once()
+    print("✓ 运行时容器测试通过")
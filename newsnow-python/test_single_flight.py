@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+请求合并测试脚本 - 验证并发的相同请求只执行一次，不访问网络
+"""
+
+import os
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.single_flight import SingleFlight, get_single_flight, single_flight_stats
+from utils.lru_cache import TTLCache
+from utils.search_service import SearchService
+from utils.improved_ai_service import FinanceAnalyzer
+from crawlers.async_base import AsyncCrawlerBase
+
+
+def _run_concurrently(func, count=8):
+    """同时启动 count 个线程调用 func，返回结果列表"""
+    results = [None] * count
+    barrier = threading.Barrier(count)
+
+    def worker(index):
+        barrier.wait()
+        results[index] = func()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_coalesce_and_errors():
+    """同一键的并发调用共享结果和异常，不同键各自执行"""
+    flight = SingleFlight("test")
+    calls = []
+
+    def slow(value):
+        calls.append(value)
+        time.sleep(0.2)
+        return {"value": value}
+
+    results = _run_concurrently(lambda: flight.do("k", slow, 1))
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    stats = flight.stats()
+    assert stats["executions"] == 1
+    assert stats["coalesced"] == 7
+    assert stats["in_flight"] == 0
+
+    # 完成后键被释放，再次调用重新执行
+    flight.do("k", slow, 2)
+    assert calls == [1, 2]
+
+    def failing():
+        time.sleep(0.2)
+        raise ValueError("boom")
+
+    errors = []
+
+    def call_failing():
+        try:
+            flight.do("bad", failing)
+        except ValueError as e:
+            errors.append(str(e))
+
+    _run_concurrently(call_failing, count=4)
+    assert errors == ["boom"] * 4
+    assert flight.stats()["errors"] == 1
+
+
+def test_submit_shares_future():
+    """异步提交与同步调用共用同一个合并键"""
+    flight = SingleFlight("test-submit")
+    executor = ThreadPoolExecutor(max_workers=2)
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return "done"
+
+    first = flight.submit("k", lambda: executor.submit(slow))
+    second = flight.submit("k", lambda: executor.submit(slow))
+    assert first is second
+    assert flight.do("k", slow) == "done"
+    assert first.result() == "done"
+    assert calls == [1]
+    assert flight.stats()["in_flight"] == 0
+
+    failed = flight.submit("bad", lambda: executor.submit(lambda: 1 / 0))
+    try:
+        failed.result()
+    except ZeroDivisionError:
+        pass
+    else:
+        raise AssertionError("异常应传给等待者")
+    assert flight.stats()["errors"] == 1
+    executor.shutdown()
+
+
+def test_ttl_cache_get_or_set():
+    """缓存未命中时并发获取只调用一次"""
+    cache = TTLCache(max_entries=10)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.2)
+        return ["data"]
+
+    _run_concurrently(lambda: cache.get_or_set("k", fetch))
+    assert len(calls) == 1
+    assert cache.stats()["coalesced"] == 7
+
+
+def test_crawler_detail():
+    """不同爬虫实例请求同一篇文章时只抓取一次"""
+    calls = []
+
+    class FakeCrawler(AsyncCrawlerBase):
+        def get_article_detail(self, article_id, response=None):
+            calls.append((article_id, response))
+            time.sleep(0.2)
+            return {"id": article_id}
+
+    crawlers = [FakeCrawler() for _ in range(4)]
+    results = _run_concurrently(lambda: crawlers[threading.get_ident() % 4].get_article_detail("42"), count=6)
+    assert calls == [("42", None)]
+    assert all(result == {"id": "42"} for result in results)
+    assert single_flight_stats()["article_detail"]["coalesced"] >= 5
+
+    # 带响应对象的调用不合并
+    crawlers[0].get_article_detail("42", response="r")
+    assert calls[-1] == ("42", "r")
+
+
+def test_search_service():
+    """相同查询的并发搜索只请求一次"""
+    service = SearchService(base_url="http://searxng.invalid")
+    calls = []
+
+    def fake_search(cache_key, query, *args):
+        calls.append(query)
+        time.sleep(0.2)
+        return [{"title": query}]
+
+    service._search_uncached = fake_search
+    results = _run_concurrently(lambda: service.search("央行降准"))
+    assert calls == ["央行降准"]
+    assert all(result == [{"title": "央行降准"}] for result in results)
+
+
+def test_finance_analyzer():
+    """相同提示词的并发分析只调用一次 API"""
+    calls = []
+
+    def fake_request(cache_key, headers, payload):
+        calls.append(cache_key)
+        time.sleep(0.2)
+        return '{"summary": "分析"}'
+
+    analyzers = [FinanceAnalyzer(api_key="test-key") for _ in range(2)]
+    for analyzer in analyzers:
+        analyzer.response_cache = None
+        analyzer._request_content = fake_request
+    before = get_single_flight("deepseek").stats()["coalesced"]
+
+    results = _run_concurrently(
+        lambda: analyzers[threading.get_ident() % 2]._call_deepseek_api("问题", "系统", json_output=True), count=6
+    )
+    assert len(calls) == 1
+    assert all(result == {"summary": "分析"} for result in results)
+    assert get_single_flight("deepseek").stats()["coalesced"] - before == 5
+
+
+if __name__ == "__main__":
+    test_coalesce_and_errors()
+    test_submit_shares_future()
+    test_ttl_cache_get_or_set()
+    test_crawler_detail()
+    test_search_service()
+    test_finance_analyzer()
+    print("✓ 请求合并测试通过")
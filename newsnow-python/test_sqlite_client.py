@@ -0,0 +1,253 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SQLite客户端测试脚本 - 使用临时数据库，不影响 data/newsnow.db
+"""
+
+import os
+import sys
+import threading
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from testing_db import temp_db
+import db.sqlite_client as sqlite_client
+from db.sqlite_client import SQLiteClient
+
+
+def test_connection_reused_per_thread():
+    """同一线程复用连接，不同线程使用各自的连接"""
+    db_client = temp_db()
+
+    main_conn = db_client._get_connection()
+    assert db_client._get_connection() is main_conn
+
+    other = {}
+    thread = threading.Thread(target=lambda: other.setdefault('conn', db_client._get_connection()))
+    thread.start()
+    thread.join()
+    assert other['conn'] is not main_conn
+
+    # 同一数据库文件的其他客户端共享连接
+    assert SQLiteClient(db_client.db_path)._get_connection() is main_conn
+    db_client.close()
+
+
+def test_connection_pragmas():
+    """长连接使用 WAL 和 synchronous=NORMAL"""
+    db_client = temp_db()
+    conn = db_client._get_connection()
+
+    assert conn.execute('PRAGMA journal_mode').fetchone()[0].lower() == 'wal'
+    assert conn.execute('PRAGMA synchronous').fetchone()[0] == 1  # NORMAL
+    assert conn.execute('PRAGMA cache_size').fetchone()[0] < 0
+    db_client.close()
+
+
+def test_close_and_reopen():
+    """关闭后再次调用会自动重新建立连接"""
+    db_client = temp_db()
+    assert db_client.save_article({'id': 'a1', 'title': '标题', 'source': 'jin10'})
+
+    old_conn = db_client._get_connection()
+    db_client.close()
+
+    assert db_client._get_connection() is not old_conn
+    assert db_client.article_exists('a1', 'jin10')
+    db_client.close()
+
+
+def test_close_leaves_other_threads():
+    """关闭时不关闭其他线程正在使用的连接，该线程下次获取连接时自己重建"""
+    db_client = temp_db()
+    db_client.save_article({'id': 'a1', 'title': '标题', 'source': 'jin10'})
+    holding, closed = threading.Event(), threading.Event()
+    outcome = {}
+
+    def worker():
+        conn = db_client._get_connection()
+        holding.set()
+        closed.wait()
+        # 其他线程调用 close() 之后，手上的连接仍然可用
+        outcome['count'] = conn.execute('SELECT COUNT(*) FROM articles').fetchone()[0]
+        outcome['reopened'] = db_client._get_connection() is not conn
+        outcome['exists'] = db_client.article_exists('a1', 'jin10')
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    holding.wait(5)
+    closed_count = db_client._connections.close_all()
+    closed.set()
+    thread.join(5)
+
+    assert closed_count == 1
+    assert outcome == {'count': 1, 'reopened': True, 'exists': True}
+    db_client.close()
+
+
+def test_save_articles_bulk():
+    """批量保存文章：统计新增与更新数量，更新时保留已有内容和处理状态"""
+    db_client = temp_db()
+    db_client.save_article({'id': 'a1', 'title': '旧标题', 'content': '正文', 'source': 'cls'},
+                           analysis_data={'summary': '分析'})
+
+    result = db_client.save_articles_bulk([
+        {'id': 'a1', 'title': '新标题', 'source': 'cls'},
+        {'id': 'a2', 'title': '文章2', 'source': 'cls'},
+        {'id': 'a3', 'title': '文章3', 'source': 'cls'},
+        {'title': '缺少ID'},
+    ])
+    assert result == {'inserted': 2, 'updated': 1}
+
+    article = db_client.get_article_by_id('a1')
+    assert article['title'] == '新标题'
+    assert article['content'] == '正文'
+    assert article['processed'] == 1
+    assert db_client.get_existing_article_ids(['a1', 'a2', 'x'], 'cls') == {'a1', 'a2'}
+    db_client.close()
+
+
+def test_save_flash_bulk():
+    """批量保存快讯：已存在的快讯跳过"""
+    db_client = temp_db()
+    news = [{'id': str(i), 'title': f'快讯{i}', 'source': 'jin10'} for i in range(50)]
+
+    assert db_client.save_flash_bulk(news[:10]) == {'inserted': 10, 'skipped': 0}
+    assert db_client.save_flash_bulk(news) == {'inserted': 40, 'skipped': 10}
+    assert db_client.get_flash_count() == 50
+    db_client.close()
+
+
+def test_search_articles_fts():
+    """全文检索：中文关键词、来源筛选、高亮片段，以及触发器同步更新"""
+    db_client = temp_db()
+    db_client.save_articles_bulk([
+        {'id': 'a1', 'title': '美联储宣布降息', 'content': '美联储周三宣布降息25个基点', 'source': 'jin10'},
+        {'id': 'a2', 'title': '黄金价格上涨', 'content': '受美联储降息预期影响，黄金走强', 'source': 'cls'},
+        {'id': 'a3', 'title': '原油库存下降', 'content': 'EIA数据显示原油库存下降', 'source': 'jin10'},
+    ])
+
+    results = db_client.search_articles('美联储')
+    assert [a['id'] for a in results] == ['a1', 'a2']  # 标题命中的排在前面
+    assert '<mark>' in results[0]['snippet']
+
+    assert [a['id'] for a in db_client.search_articles('美联储', source='cls')] == ['a2']
+    assert [a['id'] for a in db_client.search_articles('美联储 黄金')] == ['a2']
+
+    # 少于3个字符的关键词回退到 LIKE
+    assert {a['id'] for a in db_client.search_articles('黄金')} == {'a2'}
+
+    # 更新后索引随之变化
+    db_client.update_article({'id': 'a3', 'title': '美联储官员讲话', 'source': 'jin10'})
+    assert 'a3' in {a['id'] for a in db_client.search_articles('美联储')}
+    assert not db_client.search_articles('原油库存')
+    db_client.close()
+
+
+def test_rebuild_search_index():
+    """重建全文索引后仍可检索已有文章"""
+    db_client = temp_db()
+    db_client.save_article({'id': 'a1', 'title': '央行逆回购操作', 'source': 'cls'})
+
+    assert db_client.rebuild_search_index()
+    assert [a['id'] for a in db_client.search_articles('逆回购')] == ['a1']
+    db_client.close()
+
+
+def test_optional_fts_migration():
+    """全文索引迁移失败时跳过，后续迁移照常执行，检索回退到 LIKE"""
+    original = sqlite_client.SCHEMA_MIGRATIONS
+    # 模拟未编译FTS5的SQLite
+    sqlite_client.SCHEMA_MIGRATIONS = [
+        (version, ['CREATE VIRTUAL TABLE articles_fts USING no_such_module(title)'] if version == 2 else statements)
+        for version, statements in original
+    ]
+    try:
+        db_client = temp_db()
+    finally:
+        sqlite_client.SCHEMA_MIGRATIONS = original
+
+    with db_client._get_connection() as conn:
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == original[-1][0]
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(articles)')}
+    assert 'claimed_by' in columns and not db_client._has_search_index()
+
+    db_client.save_article({'id': 'a1', 'title': '央行逆回购操作', 'source': 'cls'})
+    assert [a['id'] for a in db_client.search_articles('逆回购')] == ['a1']
+    assert db_client.claim_unprocessed('worker', 1, 60)
+
+    # 之后可以补建全文索引
+    assert db_client.rebuild_search_index() and db_client._has_search_index()
+    assert [a['id'] for a in db_client.search_articles('逆回购')] == ['a1']
+    db_client.close()
+
+
+def test_get_articles_page():
+    """键集分页：逐页遍历不重复不遗漏，分类筛选在SQL中完成"""
+    db_client = temp_db()
+    db_client.save_articles_bulk([
+        {'id': f'a{i:02d}', 'title': f'文章{i}', 'source': 'jin10' if i % 2 else 'cls',
+         'category': '宏观' if i % 3 == 0 else '市场',
+         # 相邻两篇发布时间相同，检验 id 作为第二排序键
+         'pubDate': f'2025-01-01T00:{i // 2:02d}:00'}
+        for i in range(25)
+    ])
+
+    seen = []
+    after = None
+    while True:
+        page, after = db_client.get_articles_page(limit=10, after=after)
+        seen.extend(a['id'] for a in page)
+        if after is None:
+            break
+    assert seen == [f'a{i:02d}' for i in reversed(range(25))]
+
+    # offset 分页与键集分页结果一致
+    page, _ = db_client.get_articles_page(limit=10, offset=10)
+    assert [a['id'] for a in page] == seen[10:20]
+
+    page, after = db_client.get_articles_page(limit=100, source='jin10', category='宏观')
+    assert [a['id'] for a in page] == ['a21', 'a15', 'a09', 'a03']
+    assert after is None
+    db_client.close()
+
+
+def test_get_article_total():
+    """计数表随插入、删除和修改分类同步更新"""
+    db_client = temp_db()
+    db_client.save_articles_bulk([
+        {'id': f'a{i}', 'title': f'文章{i}', 'source': 'cls', 'category': '宏观' if i < 3 else ''}
+        for i in range(5)
+    ])
+
+    assert db_client.get_article_total() == 5
+    assert db_client.get_article_total(source='cls', category='宏观') == 3
+    assert db_client.get_article_total(source='jin10') == 0
+
+    db_client.update_article({'id': 'a4', 'title': '文章4', 'category': '宏观', 'source': 'cls'})
+    assert db_client.get_article_total(category='宏观') == 4
+
+    with db_client._get_connection() as conn:
+        conn.execute("DELETE FROM articles WHERE id = 'a0'")
+    assert db_client.get_article_total(category='宏观') == 3
+    assert db_client.get_article_total() == 4
+
+    assert db_client.count_search_results('文章') == 4
+    db_client.close()
+
+
+if __name__ == "__main__":
+    test_connection_reused_per_thread()
+    test_connection_pragmas()
+    test_close_and_reopen()
+    test_close_leaves_other_threads()
+    test_save_articles_bulk()
+    test_save_flash_bulk()
+    test_search_articles_fts()
+    test_rebuild_search_index()
+    test_optional_fts_migration()
+    test_get_articles_page()
+    test_get_article_total()
+    print("✓ SQLite客户端测试通过")
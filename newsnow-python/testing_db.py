@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+测试用临时数据库 - 各测试脚本共用，进程退出时关闭连接并删除创建的临时目录
+
+    db_client = temp_db('jobs.db')
+    crawler = ArticleCrawler(temp_path('crawl.db'))
+"""
+
+import os
+import sys
+import atexit
+import shutil
+import tempfile
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from db.sqlite_client import SQLiteClient, close_all_connections
+
+_temp_dirs = []
+
+
+def temp_path(name):
+    """
+    在新的临时目录中生成文件路径，目录在进程退出时删除
+
+    Args:
+        name (str): 文件名
+
+    Returns:
+        str: 文件路径
+    """
+    tmp_dir = tempfile.mkdtemp(prefix='newsnow-test-')
+    _temp_dirs.append(tmp_dir)
+    return os.path.join(tmp_dir, name)
+
+
+def temp_db(name='test.db'):
+    """
+    创建使用临时数据库文件的客户端
+
+    Args:
+        name (str): 数据库文件名
+
+    Returns:
+        SQLiteClient: 数据库客户端
+    """
+    return SQLiteClient(temp_path(name))
+
+
+def _cleanup():
+    close_all_connections()
+    while _temp_dirs:
+        shutil.rmtree(_temp_dirs.pop(), ignore_errors=True)
+
+
+# 导入时注册：之后注册的退出回调（如保存去重过滤器）先执行，最后再删除目录
+atexit.register(_cleanup)
@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+自适应抓取调度 - 按每个来源、每种抓取类型的新条目速率决定下次抓取时间
+
+原本所有来源按同一个固定间隔抓取：快讯频繁更新的来源在两次抓取之间积压大量新条目，
+半天没有更新的来源却每次都白跑一趟。这里为每个 (抓取类型, 来源) 记录新条目速率的指数加权平均，
+把间隔设为“平均每次抓取得到 CRAWL_ADAPTIVE_TARGET_NEW 条新条目”所需的时间，并限制在上下限之间：
+
+- 没有新条目（含列表未变化）时间隔乘以 CRAWL_ADAPTIVE_BACKOFF，逐渐退避
+- 整页都是新条目时可能有遗漏，间隔至少减半
+- 抓取失败时不更新速率，按原间隔重试
+
+学习到的状态保存在数据库的 crawl_schedule 表中，进程重启后继续沿用，也可通过 /api/stats 查看。
+
+    schedule = AdaptiveSchedule(db_client)
+    for kind, source in schedule.due(feeds):
+        result = crawl(kind, source)
+        schedule.record(kind, source, new_items, limit)
+"""
+
+import os
+import sys
+import time
+import logging
+import threading
+# 修改为绝对导入路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import (
+    CRAWL_INTERVAL, CRAWL_ADAPTIVE_MIN_INTERVAL, CRAWL_ADAPTIVE_MAX_INTERVAL,
+    CRAWL_ADAPTIVE_TARGET_NEW, CRAWL_ADAPTIVE_BACKOFF
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveSchedule:
+    """按新条目速率自适应调整各来源抓取间隔的调度表"""
+
+    def __init__(self, db_client, min_interval=None, max_interval=None, target_new=None,
+                 backoff=None, alpha=0.3):
+        """
+        Args:
+            db_client: 数据库客户端，用于加载和保存学习到的间隔
+            min_interval (float, optional): 间隔下限（秒），默认读取 CRAWL_ADAPTIVE_MIN_INTERVAL
+            max_interval (float, optional): 间隔上限（秒），默认读取 CRAWL_ADAPTIVE_MAX_INTERVAL
+            target_new (float, optional): 每次抓取期望的新条目数，默认读取 CRAWL_ADAPTIVE_TARGET_NEW
+            backoff (float, optional): 没有新条目时的放大倍数，默认读取 CRAWL_ADAPTIVE_BACKOFF
+            alpha (float): 速率指数加权平均中新样本的权重
+        """
+        self.db_client = db_client
+        self.min_interval = CRAWL_ADAPTIVE_MIN_INTERVAL if min_interval is None else min_interval
+        self.max_interval = CRAWL_ADAPTIVE_MAX_INTERVAL if max_interval is None else max_interval
+        self.target_new = CRAWL_ADAPTIVE_TARGET_NEW if target_new is None else target_new
+        self.backoff = CRAWL_ADAPTIVE_BACKOFF if backoff is None else backoff
+        self.alpha = alpha
+        # 第一次抓取还没有速率样本，先使用固定抓取间隔
+        self.initial_interval = self._clamp(CRAWL_INTERVAL * 60)
+        self._states = None
+        self._lock = threading.Lock()
+
+    def _clamp(self, interval):
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def _load(self):
+        """首次使用时从数据库加载状态，调用方须持有锁"""
+        if self._states is None:
+            self._states = {(row["kind"], row["source"]): row for row in self.db_client.get_crawl_schedule()}
+        return self._states
+
+    def due(self, feeds, now=None):
+        """
+        筛选已到抓取时间的来源
+
+        Args:
+            feeds (list): (抓取类型, 来源) 列表
+            now (float, optional): 当前时间戳
+
+        Returns:
+            list: 已到期的 (抓取类型, 来源)，从未抓取过的视为到期，保持 feeds 中的顺序
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            states = self._load()
+            return [feed for feed in feeds
+                    if feed not in states or (states[feed]["next_due_at"] or 0) <= now]
+
+    def seconds_until_due(self, feeds, now=None):
+        """
+        距离最早一个来源到期的秒数
+
+        Args:
+            feeds (list): (抓取类型, 来源) 列表
+            now (float, optional): 当前时间戳
+
+        Returns:
+            float: 秒数，已有来源到期时为 0，feeds 为空时为间隔上限
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            states = self._load()
+            waits = [max(0.0, (states[feed]["next_due_at"] or 0) - now) if feed in states else 0.0
+                     for feed in feeds]
+        return min(waits) if waits else self.max_interval
+
+    def record(self, kind, source, new_items, limit=None, now=None):
+        """
+        记录一次抓取结果并计算下次抓取时间
+
+        Args:
+            kind (str): 抓取类型，articles 或 flash
+            source (str): 来源标识
+            new_items (int): 本次抓取得到的新条目数，抓取失败时为 None
+            limit (int, optional): 本次抓取的数量限制，新条目数达到该值说明可能有遗漏
+            now (float, optional): 当前时间戳
+
+        Returns:
+            dict: 更新后的状态，包含 interval、rate、next_due_at 等
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            previous = self._load().get((kind, source))
+            interval = previous["interval"] if previous else self.initial_interval
+            rate = previous["rate"] if previous else None
+            last_crawl_at = previous["last_crawl_at"] if previous else None
+
+            if new_items is None:
+                # 抓取失败，不更新速率，按原间隔重试
+                pass
+            elif last_crawl_at is None:
+                # 第一次抓取得到的是积压的全部条目，不能作为速率样本
+                last_crawl_at = now
+            else:
+                sample = new_items / max(now - last_crawl_at, 1.0)
+                rate = sample if rate is None else self.alpha * sample + (1 - self.alpha) * rate
+                last_crawl_at = now
+                if new_items == 0 or not rate:
+                    interval = interval * self.backoff
+                else:
+                    target = self.target_new / rate
+                    if limit and new_items >= limit:
+                        target = min(target, interval / 2)
+                    interval = target
+            interval = self._clamp(interval)
+
+            state = {
+                "source": source,
+                "kind": kind,
+                "interval": round(interval, 1),
+                "rate": rate,
+                "last_new": new_items,
+                "last_crawl_at": last_crawl_at,
+                "next_due_at": now + interval
+            }
+            self._states[(kind, source)] = state
+        self.db_client.save_crawl_schedule(state)
+
+        if previous and abs(previous["interval"] - state["interval"]) >= 1:
+            logger.info(f"{source} {kind} 抓取间隔调整: {previous['interval']:.0f}秒 -> {state['interval']:.0f}秒 "
+                       f"(本次新增 {new_items}, 速率 {(rate or 0) * 60:.2f} 条/分钟)")
+        return state
+
+    def snapshot(self):
+        """
+        获取学习到的各来源抓取间隔
+
+        Returns:
+            list: 每项包含 source、kind、interval（秒）、rate（条/秒）、last_new、next_due_in（秒）
+        """
+        now = time.time()
+        with self._lock:
+            states = sorted(self._load().values(), key=lambda state: (state["source"], state["kind"]))
+        return [
+            {
+                "source": state["source"],
+                "kind": state["kind"],
+                "interval": state["interval"],
+                "rate": state["rate"],
+                "last_new": state["last_new"],
+                "next_due_in": round(max(0.0, (state["next_due_at"] or 0) - now), 1)
+            }
+            for state in states
+        ]
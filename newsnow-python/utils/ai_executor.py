@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+AI批量分析执行器 - 有界线程池并发分析文章
+
+并发线程只决定同时处理多少篇文章；DeepSeek 请求的速率和在途数由
+api_rate_limiter.api_gate 统一控制，因此吞吐量只受配额限制，不需要在文章或批次之间固定等待。
+"""
+
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+# 修改为绝对导入路径
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import AI_ANALYSIS_WORKERS
+from utils.api_rate_limiter import api_gate
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisExecutor:
+    """批量分析执行器"""
+
+    def __init__(self, max_workers=None):
+        """
+        Args:
+            max_workers (int, optional): 并发线程数，默认读取 AI_ANALYSIS_WORKERS 配置
+        """
+        self.max_workers = max(1, max_workers or AI_ANALYSIS_WORKERS)
+
+    def map(self, func, items):
+        """
+        并发对每个条目调用 func，单个条目异常不影响其他条目
+
+        Args:
+            func (callable): 处理单个条目的函数
+            items (list): 条目列表
+
+        Returns:
+            list: 与 items 顺序一致的结果，异常的条目为 None
+        """
+        items = list(items)
+        results = [None] * len(items)
+        if not items:
+            return results
+
+        start_time = time.time()
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items)),
+                                thread_name_prefix="ai-analysis") as executor:
+            futures = {executor.submit(func, item): index for index, item in enumerate(items)}
+            for future in as_completed(futures):
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    logger.error(f"并发分析任务异常: {str(e)}", exc_info=True)
+
+        stats = api_gate.stats()
+        logger.info(f"并发分析 {len(items)} 项完成，耗时 {time.time() - start_time:.2f}秒, "
+                    f"API并发上限 {stats['concurrency_limit']}, 对冲 {stats['hedged']} 次, "
+                    f"429 {stats['rate_limited']} 次")
+        return results
@@ -7,7 +7,6 @@ AI服务封装 - 提供文章分析和内容生成功能
 
 import os
 import json
-import requests
 from datetime import datetime
 # 修改为绝对导入路径
 import sys
@@ -20,6 +19,8 @@ from config.settings import (
     LOCAL_MODEL_PATH,
     MAX_SUMMARY_LENGTH
 )
+from utils import http_client
+from utils.api_rate_limiter import api_gate, estimate_tokens
 
 def generate_analysis(title, content, source=""):
     """
@@ -110,11 +111,15 @@ def deepseek_analysis(title, content, source):
         }
         
         # 发送请求
-        response = requests.post(
-            "https://api.deepseek.com/v1/chat/completions",
-            headers=headers,
-            json=payload,
-            timeout=30
+        response = api_gate.call(
+            lambda: http_client.post(
+                "https://api.deepseek.com/v1/chat/completions",
+                headers=headers,
+                json=payload,
+                timeout=30,
+                retry=False
+            ),
+            tokens=estimate_tokens(payload["messages"], payload["max_tokens"])
         )
         
         if response.status_code != 200:
@@ -2,40 +2,437 @@
 # -*- coding: utf-8 -*-
 """
 API请求限制器 - 防止频率过高
+
+DeepSeek 的请求都经过全局的 api_gate：
+
+- APIRateLimiter 按每分钟请求数和令牌数两个令牌桶限流，锁只保护计数，等待在锁外进行；
+- AdaptiveConcurrency 按 AIMD 调整在途请求数，成功时缓慢增加，收到 429 时减半；
+- RequestGate 组合两者，按 Retry-After 暂停，并在请求耗时超过近期 P95 时
+  用空闲配额发出对冲请求，取先返回的结果。
+
+    response = api_gate.call(lambda: http_client.post(url, json=payload),
+                             tokens=estimate_tokens(messages, max_tokens))
+
+流式请求使用 api_gate.stream，读完响应之前一直占用在途名额：
+
+    with api_gate.stream(lambda: http_client.post(url, json=payload, stream=True), tokens) as response:
+        for line in response.iter_lines():
+            ...
 """
 
 import time
+import logging
 import threading
-from datetime import datetime, timedelta
+from collections import deque
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+# 修改为绝对导入路径
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import (
+    DEEPSEEK_REQUESTS_PER_MINUTE, DEEPSEEK_TOKENS_PER_MINUTE, AI_INITIAL_CONCURRENCY, AI_MAX_CONCURRENCY,
+    AI_HEDGE_ENABLED, AI_HEDGE_DELAY, AI_HEDGE_MIN_DELAY, AI_RATE_LIMIT_BACKOFF
+)
+
+logger = logging.getLogger(__name__)
+
+
+def parse_retry_after(value):
+    """
+    解析 Retry-After 响应头
+
+    Args:
+        value (str): 秒数或 HTTP 日期
+
+    Returns:
+        float: 需要等待的秒数，无法解析时返回 None
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        return None
+
+
+def estimate_tokens(messages, max_tokens=0):
+    """
+    估算一次对话请求消耗的令牌数，按每个字符一个令牌保守估计，再加上最大输出长度
+
+    Args:
+        messages (list): 对话消息列表
+        max_tokens (int): 最大输出令牌数
+
+    Returns:
+        int: 估算的令牌数
+    """
+    return sum(len(message.get("content") or "") for message in messages) + (max_tokens or 0)
+
 
 class APIRateLimiter:
-    """API请求频率限制器"""
-    
-    def __init__(self, max_requests_per_minute=10):
+    """API请求频率限制器，每分钟请求数和令牌数两个令牌桶"""
+
+    def __init__(self, max_requests_per_minute=10, max_tokens_per_minute=0, min_backoff=None):
+        """
+        Args:
+            max_requests_per_minute (int): 每分钟请求数上限
+            max_tokens_per_minute (int): 每分钟令牌数上限，0 表示不限制
+            min_backoff (float, optional): 429 没有 Retry-After 时暂停的秒数，默认读取 AI_RATE_LIMIT_BACKOFF
+        """
+        self.min_backoff = AI_RATE_LIMIT_BACKOFF if min_backoff is None else min_backoff
+        # 连续收到 429 的次数，每次多暂停半个 min_backoff，成功后清零
+        self._rate_limit_streak = 0
         self.max_requests = max_requests_per_minute
-        self.requests = []
+        self.max_tokens = max_tokens_per_minute
         self.lock = threading.Lock()
-    
+        self._request_bucket = float(max_requests_per_minute)
+        self._token_bucket = float(max_tokens_per_minute)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._stats = {"granted": 0, "waited": 0.0, "rate_limited": 0}
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        self._updated = now
+        self._request_bucket = min(self.max_requests, self._request_bucket + elapsed * self.max_requests / 60)
+        if self.max_tokens:
+            self._token_bucket = min(self.max_tokens, self._token_bucket + elapsed * self.max_tokens / 60)
+
+    def try_acquire(self, tokens=0):
+        """
+        尝试获取一次请求的配额，不阻塞
+
+        Args:
+            tokens (int): 本次请求预计消耗的令牌数
+
+        Returns:
+            float: 0 表示已获取；否则为预计还需等待的秒数
+        """
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self._paused_until:
+                return self._paused_until - now
+
+            tokens = min(tokens, self.max_tokens) if self.max_tokens else 0
+            wait_time = 0.0
+            if self._request_bucket < 1:
+                wait_time = (1 - self._request_bucket) * 60 / self.max_requests
+            if tokens and self._token_bucket < tokens:
+                wait_time = max(wait_time, (tokens - self._token_bucket) * 60 / self.max_tokens)
+            if wait_time > 0:
+                return wait_time
+
+            self._request_bucket -= 1
+            self._token_bucket -= tokens
+            self._stats["granted"] += 1
+            return 0.0
+
+    def acquire(self, tokens=0, timeout=None):
+        """
+        获取一次请求的配额，配额不足时在锁外等待
+
+        Args:
+            tokens (int): 本次请求预计消耗的令牌数
+            timeout (float, optional): 最长等待秒数
+
+        Returns:
+            bool: 是否获取成功
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait_time = self.try_acquire(tokens)
+            if wait_time <= 0:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait_time = min(wait_time, remaining)
+            with self.lock:
+                self._stats["waited"] += wait_time
+            time.sleep(wait_time)
+
     def wait_if_needed(self):
         """如果需要，等待直到可以发送请求"""
+        self.acquire()
+
+    def record_usage(self, estimated_tokens, actual_tokens):
+        """
+        用实际消耗的令牌数修正预估值
+
+        Args:
+            estimated_tokens (int): 获取配额时的预估令牌数
+            actual_tokens (int): 响应中 usage 报告的令牌数
+        """
+        if not self.max_tokens or actual_tokens is None:
+            return
+        with self.lock:
+            estimated_tokens = min(estimated_tokens, self.max_tokens)
+            self._token_bucket = min(self.max_tokens, self._token_bucket + estimated_tokens - actual_tokens)
+
+    def on_rate_limited(self, retry_after=None):
+        """
+        收到 429 时清空令牌桶并暂停：有 Retry-After 时暂停到指定时间，没有时按连续 429 的次数退避
+        （min_backoff, 1.5 倍, 2 倍...，最多 5 倍），避免重试在几秒内耗尽
+
+        Args:
+            retry_after (float, optional): 服务端要求等待的秒数
+        """
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._request_bucket = min(self._request_bucket, 0.0)
+            # 同一次暂停期间的多个 429 来自同一批在途请求，只计一次
+            if now >= self._paused_until:
+                self._rate_limit_streak += 1
+            if not retry_after:
+                retry_after = self.min_backoff * min(5.0, 1 + 0.5 * (self._rate_limit_streak - 1))
+            self._paused_until = max(self._paused_until, now + retry_after)
+            self._stats["rate_limited"] += 1
+        logger.warning(f"[限流器] 收到 429，暂停 {retry_after:.1f} 秒")
+
+    def on_success(self):
+        """请求成功，清零连续 429 次数"""
+        with self.lock:
+            self._rate_limit_streak = 0
+
+    def stats(self):
+        """
+        Returns:
+            dict: 已发放配额数、累计等待秒数、收到 429 的次数
+        """
         with self.lock:
-            now = datetime.now()
-            
-            # 清理1分钟前的请求记录
-            self.requests = [req_time for req_time in self.requests 
-                           if now - req_time < timedelta(minutes=1)]
-            
-            # 如果请求数量达到限制，等待
-            if len(self.requests) >= self.max_requests:
-                oldest_request = min(self.requests)
-                wait_time = 60 - (now - oldest_request).total_seconds()
-                
-                if wait_time > 0:
-                    print(f"[限流器] 🕐 等待 {wait_time:.1f} 秒以避免频率限制...")
-                    time.sleep(wait_time)
-            
-            # 记录当前请求
-            self.requests.append(now)
+            return dict(self._stats)
+
+
+class AdaptiveConcurrency:
+    """按 AIMD 调整的在途请求上限：每次成功增加 1/上限，收到 429 时减半"""
+
+    def __init__(self, initial=2, maximum=8, minimum=1):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.in_flight = 0
+        self._condition = threading.Condition()
+        self._last_decrease = 0.0
+
+    def try_acquire(self):
+        """不阻塞地占用一个在途名额，返回是否成功"""
+        with self._condition:
+            if self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return True
+            return False
+
+    def acquire(self, timeout=None):
+        """占用一个在途名额，已满时等待"""
+        with self._condition:
+            if not self._condition.wait_for(lambda: self.in_flight < int(self.limit), timeout):
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self):
+        """释放在途名额"""
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+    def on_success(self):
+        with self._condition:
+            before = int(self.limit)
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            if int(self.limit) > before:
+                self._condition.notify_all()
+
+    def on_rate_limited(self):
+        with self._condition:
+            # 同一批在途请求的多个 429 只减半一次
+            now = time.monotonic()
+            if now - self._last_decrease < 1.0:
+                return
+            self._last_decrease = now
+            self.limit = max(self.minimum, self.limit / 2)
+
+
+class RequestGate:
+    """
+    DeepSeek 请求入口，组合配额、自适应并发和对冲请求
+    """
+
+    def __init__(self, limiter, concurrency, hedge=True, hedge_delay=30.0, hedge_min_delay=5.0):
+        """
+        Args:
+            limiter (APIRateLimiter): 配额限制器
+            concurrency (AdaptiveConcurrency): 在途请求上限
+            hedge (bool): 是否启用对冲请求
+            hedge_delay (float): 延迟样本不足时触发对冲的等待秒数
+            hedge_min_delay (float): 触发对冲的最短等待秒数
+        """
+        self.limiter = limiter
+        self.concurrency = concurrency
+        self.hedge = hedge
+        self.hedge_delay = hedge_delay
+        self.hedge_min_delay = hedge_min_delay
+        self._latencies = deque(maxlen=100)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._stats = {"requests": 0, "hedged": 0, "hedge_wins": 0}
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.concurrency.maximum * 2,
+                                                    thread_name_prefix="ai-request")
+            return self._executor
+
+    def current_hedge_delay(self):
+        """对冲等待时间：近期成功请求耗时的 P95，样本不足时使用默认值"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if len(latencies) < 10:
+            return self.hedge_delay
+        return max(self.hedge_min_delay, latencies[int(len(latencies) * 0.95) - 1])
+
+    def _attempt(self, func, tokens):
+        """执行一次请求并根据状态码反馈给限流器，调用前需已获取配额和在途名额"""
+        start_time = time.monotonic()
+        try:
+            response = func()
+            status = getattr(response, "status_code", None)
+            if status == 429:
+                self.concurrency.on_rate_limited()
+                self.limiter.on_rate_limited(parse_retry_after(response.headers.get("Retry-After")))
+            elif status == 200:
+                self.concurrency.on_success()
+                self.limiter.on_success()
+                with self._lock:
+                    self._latencies.append(time.monotonic() - start_time)
+                try:
+                    self.limiter.record_usage(tokens, response.json().get("usage", {}).get("total_tokens"))
+                except Exception:
+                    pass
+            return response
+        finally:
+            self.concurrency.release()
+
+    def call(self, func, tokens=0, hedge=None):
+        """
+        在配额和并发限制内发起请求
+
+        Args:
+            func (callable): 发起请求并返回响应的函数，可能被调用两次（对冲）
+            tokens (int): 预计消耗的令牌数
+            hedge (bool, optional): 是否允许对冲，默认使用构造参数
+
+        Returns:
+            requests.Response: 最先返回的响应
+        """
+        hedge = self.hedge if hedge is None else hedge
+        self.concurrency.acquire()
+        try:
+            self.limiter.acquire(tokens)
+        except BaseException:
+            self.concurrency.release()
+            raise
+        with self._lock:
+            self._stats["requests"] += 1
+
+        if not hedge:
+            return self._attempt(func, tokens)
+
+        executor = self._get_executor()
+        primary = executor.submit(self._attempt, func, tokens)
+        futures = [primary]
+        done, _ = wait(futures, timeout=self.current_hedge_delay())
+        # 对冲请求只使用空闲的名额和配额，不排队等待
+        if not done and self.concurrency.try_acquire():
+            if self.limiter.try_acquire(tokens) == 0:
+                futures.append(executor.submit(self._attempt, func, tokens))
+                with self._lock:
+                    self._stats["hedged"] += 1
+                logger.info("[限流器] 请求耗时超过近期 P95，发出对冲请求")
+            else:
+                self.concurrency.release()
+
+        pending = set(futures)
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is not primary:
+                        with self._lock:
+                            self._stats["hedge_wins"] += 1
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    @contextmanager
+    def stream(self, func, tokens=0):
+        """
+        在配额和并发限制内发起流式请求，退出时关闭响应并释放在途名额
+
+        流式响应不对冲，不计入对冲延迟样本，也不读取响应体；实际消耗的令牌由调用方
+        在收到用量后调用 limiter.record_usage 归还。
+
+        Args:
+            func (callable): 发起 stream=True 请求并返回响应的函数
+            tokens (int): 预计消耗的令牌数
+
+        Yields:
+            requests.Response: 响应
+        """
+        self.concurrency.acquire()
+        try:
+            self.limiter.acquire(tokens)
+        except BaseException:
+            self.concurrency.release()
+            raise
+        with self._lock:
+            self._stats["requests"] += 1
+
+        response = None
+        try:
+            response = func()
+            status = getattr(response, "status_code", None)
+            if status == 429:
+                self.concurrency.on_rate_limited()
+                self.limiter.on_rate_limited(parse_retry_after(response.headers.get("Retry-After")))
+            elif status == 200:
+                self.concurrency.on_success()
+                self.limiter.on_success()
+            yield response
+        finally:
+            if response is not None:
+                response.close()
+            self.concurrency.release()
+
+    def stats(self):
+        """
+        Returns:
+            dict: 请求数、对冲数、对冲胜出数、当前并发上限和在途数，以及限流器统计
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats["concurrency_limit"] = int(self.concurrency.limit)
+        stats["in_flight"] = self.concurrency.in_flight
+        stats["hedge_delay"] = self.current_hedge_delay()
+        stats.update(self.limiter.stats())
+        return stats
+
 
 # 全局限制器实例
-api_limiter = APIRateLimiter(max_requests_per_minute=8)  # 保守设置为8次/分钟
+api_limiter = APIRateLimiter(max_requests_per_minute=DEEPSEEK_REQUESTS_PER_MINUTE,
+                             max_tokens_per_minute=DEEPSEEK_TOKENS_PER_MINUTE)
+api_concurrency = AdaptiveConcurrency(initial=AI_INITIAL_CONCURRENCY, maximum=AI_MAX_CONCURRENCY)
+api_gate = RequestGate(api_limiter, api_concurrency, hedge=AI_HEDGE_ENABLED,
+                       hedge_delay=AI_HEDGE_DELAY, hedge_min_delay=AI_HEDGE_MIN_DELAY)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+合并分析提示词 - 把多篇短文章放进一次 DeepSeek 请求
+
+快讯等短内容单独分析时，系统提示词和输出格式说明占了请求的大部分。
+合并分析把 K 篇短文章连同各自的 id 以 JSON 数组发送，要求模型返回
+{"results": [{"id": ..., ...}]}，再按 id 拆分回每篇文章；
+缺失或无法解析的文章由调用方回退到单篇分析。
+"""
+
+import json
+# 修改为绝对导入路径
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import AI_BATCH_SIZE, AI_BATCH_MAX_CHARS
+
+
+def plan_batches(articles, batch_size=None, max_chars=None):
+    """
+    把文章分为合并分析的批次和需要单独分析的长文章
+
+    Args:
+        articles (list): 文章列表，每项包含 id 和 content
+        batch_size (int, optional): 每批文章数，默认读取 AI_BATCH_SIZE 配置
+        max_chars (int, optional): 参与合并的最大内容长度，默认读取 AI_BATCH_MAX_CHARS 配置
+
+    Returns:
+        tuple: (批次列表, 单独分析的文章列表)，只有一篇短文章的批次归入单独分析
+    """
+    batch_size = AI_BATCH_SIZE if batch_size is None else batch_size
+    max_chars = AI_BATCH_MAX_CHARS if max_chars is None else max_chars
+
+    short, singles = [], []
+    for article in articles:
+        if batch_size > 1 and len(article.get("content") or "") <= max_chars:
+            short.append(article)
+        else:
+            singles.append(article)
+
+    batches = [short[i:i + batch_size] for i in range(0, len(short), batch_size)]
+    if batches and len(batches[-1]) == 1:
+        singles.extend(batches.pop())
+    return batches, singles
+
+
+def pack_articles(articles, extra_fields=()):
+    """
+    把一批文章序列化为提示词中的 JSON 数组
+
+    Args:
+        articles (list): 文章列表，每项包含 id、title 和 content
+        extra_fields (tuple): 额外带上的字段名
+
+    Returns:
+        str: JSON 文本
+    """
+    packed = []
+    for article in articles:
+        item = {
+            "id": str(article["id"]),
+            "title": article.get("title") or "",
+            "content": " ".join((article.get("content") or "").split())
+        }
+        for field in extra_fields:
+            if article.get(field):
+                item[field] = article[field]
+        packed.append(item)
+    return json.dumps(packed, ensure_ascii=False, indent=1)
+
+
+def demux_results(data, ids):
+    """
+    按 id 拆分合并分析的结果
+
+    Args:
+        data (dict|list): 模型返回的 {"results": [...]} 或结果数组
+        ids (list): 本批文章的 id
+
+    Returns:
+        dict: id -> 单篇结果（已去掉 id 字段），只包含本批中存在且为对象的结果
+    """
+    if isinstance(data, dict):
+        data = data.get("results")
+    if not isinstance(data, list):
+        return {}
+
+    wanted = {str(article_id) for article_id in ids}
+    results = {}
+    for item in data:
+        if not isinstance(item, dict):
+            continue
+        article_id = str(item.get("id", ""))
+        if article_id in wanted and article_id not in results:
+            results[article_id] = {key: value for key, value in item.items() if key != "id"}
+    return results
@@ -0,0 +1,414 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+去重过滤器 - 在查询 SQLite 之前用布隆过滤器判断条目是否可能已存在
+
+布隆过滤器没有假阴性：判断为"不存在"的条目一定是新条目，直接跳过数据库查询；
+判断为"可能存在"的条目再到 SQLite 确认，确认不存在的计为假阳性。
+
+过滤器以 (来源, ID) 和 URL 为键，启动时从磁盘加载并按 rowid 追赶此后写入的行，
+文件不存在或与数据库不匹配时从数据库重建。
+
+    dedup = get_dedup_filter(db_client)   # 同一数据库在进程内共用一个过滤器
+    existing_ids = dedup.existing_article_ids(ids, source)
+    ...保存...
+    dedup.add_article(article)
+    dedup.save()
+"""
+
+import os
+import json
+import atexit
+import math
+import time
+import hashlib
+import logging
+import threading
+# 修改为绝对导入路径
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import DEDUP_FILTER_ERROR_RATE, DEDUP_FILTER_MIN_CAPACITY, DEDUP_FILTER_REFRESH_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+# 持久化文件格式版本，格式变化时旧文件会被丢弃并重建
+FILE_MAGIC = b"NNBLOOM1\n"
+
+
+class BloomFilter:
+    """
+    定长布隆过滤器
+
+    位数组大小和哈希函数个数由容量和期望误判率计算，
+    位置使用 blake2b 摘要的双重哈希 (h1 + i * h2) 生成。
+    """
+
+    def __init__(self, capacity, error_rate, num_bits=None, num_hashes=None, bits=None, count=0):
+        self.capacity = max(1, int(capacity))
+        self.error_rate = error_rate
+        self.num_bits = num_bits or max(8, int(math.ceil(-self.capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = num_hashes or max(1, int(round(self.num_bits / self.capacity * math.log(2))))
+        self.bits = bits if bits is not None else bytearray((self.num_bits + 7) // 8)
+        self.count = count
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, key):
+        """添加键，返回该键此前是否可能已存在"""
+        present = True
+        for position in self._positions(key):
+            mask = 1 << (position & 7)
+            if not self.bits[position >> 3] & mask:
+                present = False
+                self.bits[position >> 3] |= mask
+        if not present:
+            self.count += 1
+        return present
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def expected_error_rate(self):
+        """按当前键数估算的误判率"""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+
+class DedupFilter:
+    """
+    文章和快讯的去重过滤器
+
+    文章以 (来源, ID) 和 URL 为键，快讯以 (来源, ID) 为键。其他进程写入的行
+    按 rowid 增量追赶，间隔不少于 refresh_interval 秒。
+    """
+
+    def __init__(self, db_client, path=None, error_rate=None, refresh_interval=None):
+        """
+        初始化去重过滤器，优先从磁盘加载
+
+        Args:
+            db_client (SQLiteClient): 用于构建过滤器和确认阳性结果的数据库客户端
+            path (str, optional): 持久化文件路径，默认为数据库路径加 .bloom 后缀
+            error_rate (float, optional): 期望误判率，默认读取 DEDUP_FILTER_ERROR_RATE 配置
+            refresh_interval (float, optional): 追赶数据库新行的最小间隔（秒）
+        """
+        self.db_client = db_client
+        self.path = path or os.path.splitext(db_client.db_path)[0] + ".bloom"
+        self.error_rate = error_rate or DEDUP_FILTER_ERROR_RATE
+        self.refresh_interval = DEDUP_FILTER_REFRESH_INTERVAL if refresh_interval is None else refresh_interval
+        self._lock = threading.RLock()
+        self._watermarks = {"articles": 0, "flash_news": 0}
+        self._last_refresh = 0.0
+        self._dirty = False
+        self._stats = {"checks": 0, "negatives": 0, "positives": 0, "false_positives": 0}
+
+        if not self.load():
+            self.rebuild()
+
+    @staticmethod
+    def _article_keys(article_id, source, url=None):
+        keys = [f"a:{source}:{article_id}"]
+        if url:
+            keys.append(f"u:{url}")
+        return keys
+
+    @staticmethod
+    def _flash_key(news_id, source):
+        return f"f:{source}:{news_id}"
+
+    def _add_row(self, table, row):
+        _, item_id, source, url = row
+        if table == "articles":
+            for key in self._article_keys(item_id, source, url):
+                self._bloom.add(key)
+        else:
+            self._bloom.add(self._flash_key(item_id, source))
+
+    def _max_rowids(self):
+        with self.db_client._get_connection() as conn:
+            return {table: conn.execute(f"SELECT COALESCE(MAX(rowid), 0) FROM {table}").fetchone()[0]
+                    for table in self._watermarks}
+
+    def rebuild(self, capacity=None):
+        """
+        从数据库重建过滤器
+
+        Args:
+            capacity (int, optional): 容量，默认为现有行数的两倍且不少于 DEDUP_FILTER_MIN_CAPACITY
+        """
+        with self._lock:
+            start_time = time.time()
+            if capacity is None:
+                with self.db_client._get_connection() as conn:
+                    rows = (conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0] * 2
+                            + conn.execute("SELECT COUNT(*) FROM flash_news").fetchone()[0])
+                capacity = max(DEDUP_FILTER_MIN_CAPACITY, rows * 2)
+
+            self._bloom = BloomFilter(capacity, self.error_rate)
+            self._watermarks = {table: 0 for table in self._watermarks}
+            self._catch_up()
+            self._dirty = True
+            logger.info(f"去重过滤器重建完成: {self._bloom.count} 个键, 容量 {self._bloom.capacity}, "
+                        f"耗时 {time.time() - start_time:.2f}秒")
+
+    def _catch_up(self):
+        """加入 rowid 大于水位的行，键数超过容量时扩容重建"""
+        added = 0
+        for table in self._watermarks:
+            for row in self.db_client.iter_dedup_keys(table, self._watermarks[table]):
+                self._add_row(table, row)
+                self._watermarks[table] = row[0]
+                added += 1
+        self._last_refresh = time.monotonic()
+        if added:
+            self._dirty = True
+        if self._bloom.count > self._bloom.capacity:
+            logger.info(f"去重过滤器键数 {self._bloom.count} 超过容量 {self._bloom.capacity}，扩容重建")
+            self.rebuild(self._bloom.capacity * 2)
+        return added
+
+    def refresh(self, force=False):
+        """
+        追赶其他进程写入数据库的新行
+
+        Args:
+            force (bool): 是否忽略刷新间隔
+
+        Returns:
+            int: 新加入的行数
+        """
+        with self._lock:
+            if not force and time.monotonic() - self._last_refresh < self.refresh_interval:
+                return 0
+            try:
+                return self._catch_up()
+            except Exception as e:
+                logger.error(f"去重过滤器追赶数据库异常: {str(e)}")
+                return 0
+
+    def load(self):
+        """
+        从磁盘加载过滤器并追赶此后写入的行
+
+        Returns:
+            bool: 是否加载成功，文件不存在、损坏或与数据库不匹配时返回 False
+        """
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, "rb") as f:
+                if f.readline() != FILE_MAGIC:
+                    raise ValueError("文件格式不匹配")
+                header = json.loads(f.readline())
+                bits = bytearray(f.read())
+
+            if len(bits) != (header["num_bits"] + 7) // 8:
+                raise ValueError("位数组长度不匹配")
+            # 数据库被替换或清空后 rowid 会回退，此时文件已失效
+            max_rowids = self._max_rowids()
+            if any(header["watermarks"].get(table, 0) > max_rowids[table] for table in self._watermarks):
+                raise ValueError("水位超过数据库最大 rowid")
+
+            with self._lock:
+                self._bloom = BloomFilter(header["capacity"], header["error_rate"], header["num_bits"],
+                                          header["num_hashes"], bits, header["count"])
+                self._watermarks = {table: header["watermarks"].get(table, 0) for table in self._watermarks}
+                self._dirty = False
+                added = self._catch_up()
+            logger.info(f"去重过滤器已从 {self.path} 加载: {self._bloom.count} 个键, 追赶 {added} 行")
+            return True
+        except Exception as e:
+            logger.warning(f"加载去重过滤器失败，将从数据库重建: {str(e)}")
+            return False
+
+    def save(self):
+        """
+        将过滤器写入磁盘，先写临时文件再原子替换
+
+        Returns:
+            bool: 是否保存成功
+        """
+        with self._lock:
+            if not self._dirty and os.path.exists(self.path):
+                return True
+            header = {
+                "capacity": self._bloom.capacity,
+                "error_rate": self._bloom.error_rate,
+                "num_bits": self._bloom.num_bits,
+                "num_hashes": self._bloom.num_hashes,
+                "count": self._bloom.count,
+                "watermarks": dict(self._watermarks)
+            }
+            bits = bytes(self._bloom.bits)
+            self._dirty = False
+
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(FILE_MAGIC)
+                f.write(json.dumps(header).encode("utf-8") + b"\n")
+                f.write(bits)
+            os.replace(tmp_path, self.path)
+            return True
+        except Exception as e:
+            self._dirty = True
+            logger.error(f"保存去重过滤器异常: {str(e)}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+
+    def _candidates(self, keys):
+        """返回过滤器判断为可能存在的键，并更新统计"""
+        self.refresh()
+        with self._lock:
+            candidates = [key for key in keys if key in self._bloom]
+            self._stats["checks"] += len(keys)
+            self._stats["positives"] += len(candidates)
+            self._stats["negatives"] += len(keys) - len(candidates)
+        return candidates
+
+    def _record_confirmed(self, positives, confirmed):
+        with self._lock:
+            self._stats["false_positives"] += positives - confirmed
+
+    def existing_article_ids(self, ids, source=None):
+        """
+        找出已存在的文章ID，语义与 SQLiteClient.get_existing_article_ids 相同
+
+        Args:
+            ids (list): 文章ID列表
+            source (str, optional): 文章来源，为 None 时直接查询数据库
+
+        Returns:
+            set: 已存在的文章ID集合
+        """
+        ids = [str(i) for i in ids]
+        if source is None:
+            return self.db_client.get_existing_article_ids(ids)
+
+        candidates = [key.split(":", 2)[2] for key in self._candidates(
+            [self._article_keys(i, source)[0] for i in ids])]
+        if not candidates:
+            return set()
+        existing = self.db_client.get_existing_article_ids(candidates, source)
+        self._record_confirmed(len(candidates), len(existing))
+        return existing
+
+    def existing_flash_ids(self, ids, source):
+        """
+        找出已存在的快讯ID
+
+        Args:
+            ids (list): 快讯ID列表
+            source (str): 快讯来源
+
+        Returns:
+            set: 已存在的快讯ID集合
+        """
+        ids = [str(i) for i in ids]
+        candidates = [key.split(":", 2)[2] for key in self._candidates(
+            [self._flash_key(i, source) for i in ids])]
+        if not candidates:
+            return set()
+        existing = self.db_client.get_existing_flash_ids(candidates, source)
+        self._record_confirmed(len(candidates), len(existing))
+        return existing
+
+    def url_exists(self, url):
+        """
+        检查URL对应的文章是否已存在，语义与 SQLiteClient.check_article_exists 相同
+
+        Args:
+            url (str): 文章URL
+
+        Returns:
+            bool: 文章是否存在
+        """
+        if not self._candidates([f"u:{url}"]):
+            return False
+        exists = self.db_client.check_article_exists(url)
+        self._record_confirmed(1, int(exists))
+        return exists
+
+    def add_article(self, article):
+        """
+        记录已保存的文章
+
+        Args:
+            article (dict): 文章数据，使用其中的 id、source 和 url
+        """
+        with self._lock:
+            for key in self._article_keys(article.get("id"), article.get("source"), article.get("url")):
+                self._bloom.add(key)
+            self._dirty = True
+
+    def add_flash(self, news):
+        """
+        记录已保存的快讯
+
+        Args:
+            news (dict): 快讯数据，使用其中的 id 和 source
+        """
+        with self._lock:
+            self._bloom.add(self._flash_key(news.get("id"), news.get("source")))
+            self._dirty = True
+
+    def stats(self):
+        """
+        获取过滤器统计
+
+        Returns:
+            dict: 检查次数、直接判定为新条目的次数、阳性次数、假阳性次数、
+                实际误判率（假阳性 / 实际不存在的键）和按键数估算的误判率
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["keys"] = self._bloom.count
+            stats["capacity"] = self._bloom.capacity
+            stats["size_bytes"] = len(self._bloom.bits)
+            stats["expected_fp_rate"] = self._bloom.expected_error_rate()
+        absent = stats["negatives"] + stats["false_positives"]
+        stats["observed_fp_rate"] = stats["false_positives"] / absent if absent else 0.0
+        return stats
+
+
+_filters = {}
+_filters_lock = threading.Lock()
+
+
+def _save_all():
+    with _filters_lock:
+        filters = list(_filters.values())
+    for dedup in filters:
+        try:
+            dedup.save()
+        except Exception as e:
+            logger.error(f"保存去重过滤器 {dedup.path} 失败: {str(e)}")
+
+
+def get_dedup_filter(db_client):
+    """
+    获取数据库对应的进程级去重过滤器
+
+    抓取器、定时任务和运行时按数据库路径共用同一个过滤器，不会各自加载一份；
+    进程退出时统一保存一次。
+
+    Args:
+        db_client (SQLiteClient): 数据库客户端，首次创建过滤器时使用
+
+    Returns:
+        DedupFilter: 去重过滤器
+    """
+    path = os.path.abspath(db_client.db_path)
+    with _filters_lock:
+        dedup = _filters.get(path)
+        if dedup is None:
+            if not _filters:
+                atexit.register(_save_all)
+            dedup = _filters[path] = DedupFilter(db_client)
+        return dedup
@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+DeepSeek 流式客户端 - 读取 SSE 增量内容并增量解析 JSON
+
+非流式调用要等整段回复生成完毕才能解析。流式模式下，JSON 对象的每个顶层字段一旦完整，
+就以 (字段名, 值) 的形式交给调用方，例如 summary 生成完即可展示；
+回复一开始就不是 JSON 对象或出现格式错误时立即中断连接，不再为后续 token 付费。
+
+    for key, value in stream_json(api_url, headers, payload):
+        ...
+"""
+
+import json
+import logging
+# 修改为绝对导入路径
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import http_client
+from utils.api_rate_limiter import api_gate, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# JSON 对象开始之前允许的非空白字符数（如 ```json 代码块标记）
+MAX_JSON_PREFIX = 200
+
+
+class StreamAborted(Exception):
+    """流式回复格式错误，已中断"""
+
+
+def iter_sse_data(lines):
+    """
+    解析 SSE 事件流
+
+    Args:
+        lines (iterable): 按行的响应内容，bytes 或 str
+
+    Yields:
+        str: 每个事件的 data 内容，遇到 [DONE] 时结束
+    """
+    data_lines = []
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        line = line.rstrip("\r")
+        if not line:
+            if data_lines:
+                data = "\n".join(data_lines)
+                data_lines = []
+                if data == "[DONE]":
+                    return
+                yield data
+            continue
+        if line.startswith(":"):
+            continue  # 注释行，常用作保活
+        field, _, value = line.partition(":")
+        if field == "data":
+            data_lines.append(value[1:] if value.startswith(" ") else value)
+    if data_lines:
+        data = "\n".join(data_lines)
+        if data != "[DONE]":
+            yield data
+
+
+class IncrementalJSONParser:
+    """
+    增量解析 JSON 对象的顶层字段
+
+    只跟踪字符串、转义和嵌套深度，某个顶层成员结束（遇到深度 1 的逗号或最外层的右括号）时
+    解析该成员，因此每段输入只扫描一次。
+    """
+
+    def __init__(self, max_prefix=MAX_JSON_PREFIX):
+        """
+        Args:
+            max_prefix (int): JSON 对象开始之前允许的非空白字符数
+        """
+        self.max_prefix = max_prefix
+        self.result = {}
+        self.done = False
+        self._prefix = ""
+        self._buf = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member_start = 0
+        self._expect_key = True
+
+    def feed(self, text):
+        """
+        输入一段内容
+
+        Args:
+            text (str): 新收到的内容
+
+        Returns:
+            list: 本段内容中完成的 (字段名, 值) 列表
+
+        Raises:
+            StreamAborted: 内容不是 JSON 对象或格式错误
+        """
+        fields = []
+        if self.done:
+            return fields
+
+        if self._depth == 0:
+            start = text.find("{")
+            if start < 0:
+                self._check_prefix(text)
+                return fields
+            self._check_prefix(text[:start])
+            text = text[start:]
+
+        for char in text:
+            self._buf.append(char)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if self._depth == 1 and self._expect_key and not char.isspace():
+                if char not in '"}':
+                    raise StreamAborted(f"JSON字段名格式错误: {''.join(self._buf[-20:])}")
+                self._expect_key = False
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+                if self._depth == 1:
+                    self._member_start = len(self._buf)
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._complete_member(len(self._buf) - 1, fields)
+                    self.done = True
+                    return fields
+                if self._depth < 0:
+                    raise StreamAborted("JSON括号不匹配")
+            elif char == "," and self._depth == 1:
+                self._complete_member(len(self._buf) - 1, fields)
+                self._member_start = len(self._buf)
+                self._expect_key = True
+        return fields
+
+    def _check_prefix(self, text):
+        self._prefix += text
+        stripped = "".join(self._prefix.split())
+        if len(stripped) > self.max_prefix:
+            raise StreamAborted(f"回复不是JSON对象: {stripped[:50]}")
+
+    def _complete_member(self, end, fields):
+        member = "".join(self._buf[self._member_start:end]).strip()
+        if not member:
+            return
+        try:
+            parsed = json.loads("{" + member + "}")
+        except ValueError:
+            raise StreamAborted(f"JSON字段格式错误: {member[:50]}")
+        for key, value in parsed.items():
+            self.result[key] = value
+            fields.append((key, value))
+
+
+def stream_chat(api_url, headers, payload, timeout=60):
+    """
+    发起流式对话请求，逐段返回回复内容
+
+    请求经过 api_gate 的配额和并发限制；调用方停止迭代时关闭连接。
+
+    Args:
+        api_url (str): 接口地址
+        headers (dict): 请求头
+        payload (dict): 请求体，会自动加上 stream 参数
+        timeout (float): 两段内容之间的最长等待时间（秒）
+
+    Yields:
+        str: 回复内容片段
+    """
+    payload = dict(payload, stream=True, stream_options={"include_usage": True})
+    tokens = estimate_tokens(payload["messages"], payload.get("max_tokens", 0))
+
+    with api_gate.stream(
+        lambda: http_client.post(api_url, headers=headers, json=payload, stream=True, timeout=timeout, retry=False),
+        tokens=tokens
+    ) as response:
+        response.raise_for_status()
+        for data in iter_sse_data(response.iter_lines()):
+            chunk = json.loads(data)
+            usage = chunk.get("usage")
+            if usage:
+                api_gate.limiter.record_usage(tokens, usage.get("total_tokens"))
+            for choice in chunk.get("choices") or []:
+                delta = (choice.get("delta") or {}).get("content")
+                if delta:
+                    yield delta
+
+
+def stream_json(api_url, headers, payload, timeout=60, parser=None):
+    """
+    流式请求并增量解析回复中的 JSON 对象
+
+    Args:
+        api_url (str): 接口地址
+        headers (dict): 请求头
+        payload (dict): 请求体
+        timeout (float): 两段内容之间的最长等待时间（秒）
+        parser (IncrementalJSONParser, optional): 使用调用方的解析器，结束后可从 parser.result 取得完整对象
+
+    Yields:
+        tuple: (字段名, 值)，每个顶层字段完整后立即返回
+
+    Raises:
+        StreamAborted: 回复格式错误，连接已关闭
+    """
+    if parser is None:
+        parser = IncrementalJSONParser()
+    for delta in stream_chat(api_url, headers, payload, timeout):
+        for field in parser.feed(delta):
+            yield field
+        if parser.done:
+            return
+    if not parser.done:
+        raise StreamAborted("回复在JSON对象结束前中断")
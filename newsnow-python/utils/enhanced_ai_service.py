@@ -12,36 +12,60 @@ import requests
 from datetime import datetime
 import hashlib
 import logging
+from utils import http_client
+from utils.api_rate_limiter import api_gate, estimate_tokens
+from utils.response_cache import get_response_cache, make_cache_key
+from utils.batch_prompt import plan_batches, pack_articles, demux_results
+from config.settings import AI_BATCH_SIZE, AI_BATCH_MAX_TOKENS
 
 logger = logging.getLogger(__name__)
 
 class EnhancedFinanceAnalyzer:
     """增强版财经分析器 - 专为内容质量优化"""
     
-    def __init__(self, api_key=None):
+    # 提示词模板版本，修改提示词模板后递增，使旧的缓存响应失效
+    PROMPT_VERSION = "2.0"
+    
+    def __init__(self, api_key=None, response_cache=None):
+        """
+        Args:
+            api_key (str, optional): DeepSeek API密钥，默认读取环境变量
+            response_cache (ResponseCache, optional): 响应缓存，默认在首次使用时获取全局缓存
+        """
         self.api_key = api_key or os.environ.get("DEEPSEEK_API_KEY")
         self.api_url = "https://api.deepseek.com/v1/chat/completions"
-        self.cache = {}
-        self.cache_ttl = 1800  # 30分钟缓存
-        self.last_request_time = 0
-        self.min_request_interval = 8  # 最小请求间隔（秒）
+        # 响应缓存在数据库中，多个进程共享，按完整提示词内容命中
+        self._response_cache = response_cache
     
-    def _wait_if_needed(self):
-        """简单的请求频率控制"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        
-        if time_since_last < self.min_request_interval:
-            wait_time = self.min_request_interval - time_since_last
-            logger.info(f"[AI] 🕐 等待 {wait_time:.1f} 秒以避免频率限制...")
-            time.sleep(wait_time)
-        
-        self.last_request_time = time.time()
+    @property
+    def response_cache(self):
+        """响应缓存，未指定时首次使用才获取全局缓存，创建分析器不会打开默认数据库"""
+        if self._response_cache is None:
+            cache = get_response_cache()
+            self._response_cache = cache if cache is not None else False
+        return self._response_cache if self._response_cache is not False else None
+    
+    @response_cache.setter
+    def response_cache(self, cache):
+        # 显式设为 None 表示不使用缓存
+        self._response_cache = cache if cache is not None else False
     
-    def _call_api_with_retry(self, prompt, system_prompt=None, max_retries=5):
+    def _call_api_with_retry(self, prompt, system_prompt=None, max_retries=5, max_tokens=1200):
         """带智能重试机制的API调用 - 优化限流处理"""
         base_delay = 2  # 基础延迟时间（秒）
         
+        cache_messages = []
+        if system_prompt:
+            cache_messages.append({"role": "system", "content": system_prompt})
+        cache_messages.append({"role": "user", "content": prompt})
+        cache_key = make_cache_key("deepseek-chat", self.PROMPT_VERSION, cache_messages,
+                                   max_tokens=max_tokens, temperature=0.7, top_p=0.9)
+        if self.response_cache:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                logger.info("[AI] 使用缓存的API响应")
+                return {"success": True, "content": cached, "cache_key": cache_key}
+        
         for attempt in range(max_retries):
             try:
                 headers = {
@@ -58,32 +82,30 @@ class EnhancedFinanceAnalyzer:
                 payload = {
                     "model": "deepseek-chat",
                     "messages": messages,
-                    "max_tokens": 1200,
+                    "max_tokens": max_tokens,
                     "temperature": 0.7,
                     "top_p": 0.9
                 }
                 
-                # 在请求前添加延迟，避免频率过高
-                if attempt > 0:
-                    delay = base_delay * (2 ** (attempt - 1))  # 指数退避
-                    logger.info(f"[AI] 等待 {delay} 秒后重试 (尝试 {attempt + 1}/{max_retries})")
-                    time.sleep(delay)
-                
-                # 使用简单的请求限制器
-                self._wait_if_needed()
-                
-                response = requests.post(
-                    self.api_url, 
-                    headers=headers, 
-                    json=payload, 
-                    timeout=60  # 增加超时时间
+                # 配额、并发和 429 退避由全局 api_gate 控制，不再固定间隔等待
+                response = api_gate.call(
+                    lambda: http_client.post(
+                        self.api_url, 
+                        headers=headers, 
+                        json=payload, 
+                        timeout=60,  # 增加超时时间
+                        retry=False  # 重试由本方法的循环处理
+                    ),
+                    tokens=estimate_tokens(messages, payload["max_tokens"])
                 )
                 
                 if response.status_code == 200:
                     result = response.json()
                     content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
                     logger.info(f"[AI] ✅ API调用成功 (尝试 {attempt + 1}/{max_retries})")
-                    return {"success": True, "content": content}
+                    if self.response_cache:
+                        self.response_cache.put(cache_key, "deepseek-chat", content)
+                    return {"success": True, "content": content, "cache_key": cache_key}
                     
                 elif response.status_code == 401:
                     error_msg = response.text
@@ -104,10 +126,7 @@ class EnhancedFinanceAnalyzer:
                     logger.warning(f"[AI] ⚠️ API请求频率过高 (尝试 {attempt + 1}/{max_retries}): {error_msg}")
                     
                     if attempt < max_retries - 1:
-                        # 对于429错误，使用更长的等待时间
-                        wait_time = 60 + (attempt * 30)  # 60, 90, 120, 150秒
-                        logger.info(f"[AI] 🕐 等待 {wait_time} 秒后重试...")
-                        time.sleep(wait_time)
+                        # api_gate 已暂停（按 Retry-After，没有时至少 AI_RATE_LIMIT_BACKOFF 秒）并降低并发，下次请求会排队等到暂停结束
                         continue
                     else:
                         return {"success": False, "error": f"API请求频率限制: {error_msg}"}
@@ -137,17 +156,6 @@ class EnhancedFinanceAnalyzer:
     def generate_comprehensive_analysis(self, title, content, search_results=None):
         """生成全面的财经分析 - AdSense友好"""
         
-        # 生成缓存键
-        cache_key = hashlib.md5(f"{title}_{content[:100]}".encode()).hexdigest()
-        current_time = time.time()
-        
-        # 检查缓存
-        if cache_key in self.cache:
-            cached_data, cached_time = self.cache[cache_key]
-            if current_time - cached_time < self.cache_ttl:
-                logger.info("[AI] 使用缓存的分析结果")
-                return cached_data
-        
         system_prompt = """你是一位资深的财经分析师和内容创作专家，专门为新闻网站创作高质量的原创分析内容。
 
 你的任务是基于提供的新闻内容，创作一篇深度分析文章，要求：
@@ -231,52 +239,17 @@ class EnhancedFinanceAnalyzer:
             content_text = result["content"]
             logger.info(f"[AI] 收到API响应，长度: {len(content_text)} 字符")
             
-            # 多种方式提取JSON部分
-            import re
-            analysis_data = None
-            
-            # 方式1: 标准的 ```json``` 格式
-            json_match = re.search(r'```json\s*([\s\S]*?)\s*```', content_text)
-            if json_match:
-                json_content = json_match.group(1).strip()
-                logger.info("[AI] 找到标准JSON格式")
-                try:
-                    analysis_data = json.loads(json_content)
-                except json.JSONDecodeError as e:
-                    logger.warning(f"[AI] 标准JSON解析失败: {e}")
-            
-            # 方式2: 尝试找到任何 { } 包围的JSON
-            if not analysis_data:
-                json_match = re.search(r'\{[\s\S]*\}', content_text)
-                if json_match:
-                    json_content = json_match.group(0).strip()
-                    logger.info("[AI] 找到大括号JSON格式")
-                    try:
-                        analysis_data = json.loads(json_content)
-                    except json.JSONDecodeError as e:
-                        logger.warning(f"[AI] 大括号JSON解析失败: {e}")
-            
-            # 方式3: 尝试直接解析整个响应
-            if not analysis_data:
-                logger.info("[AI] 尝试直接解析整个响应")
-                try:
-                    analysis_data = json.loads(content_text.strip())
-                except json.JSONDecodeError as e:
-                    logger.warning(f"[AI] 直接解析失败: {e}")
+            analysis_data = self._parse_json_content(content_text)
             
             if analysis_data:
-                # 添加元数据
-                analysis_data["generated_at"] = datetime.now().isoformat()
-                analysis_data["ai_model"] = "deepseek-chat"
-                analysis_data["analysis_version"] = "2.0"
-                
-                # 缓存结果
-                self.cache[cache_key] = (analysis_data, current_time)
-                
+                self._add_metadata(analysis_data)
                 logger.info("[AI] ✅ 成功生成AI分析内容")
                 return analysis_data
             else:
                 logger.warning("[AI] ⚠️ 所有JSON解析方式都失败，使用备用方案")
+                # 无法解析的响应不保留在缓存中，下次重新请求
+                if self.response_cache:
+                    self.response_cache.invalidate(result["cache_key"])
                 # 记录前200个字符用于调试
                 logger.debug(f"[AI] 响应内容前200字符: {content_text[:200]}...")
                 return self._generate_fallback_analysis(title, content)
@@ -285,6 +258,169 @@ class EnhancedFinanceAnalyzer:
             logger.error(f"[AI] JSON解析异常: {e}")
             return self._generate_fallback_analysis(title, content)
     
+    def _parse_json_content(self, content_text):
+        """
+        从响应内容中提取JSON
+        
+        Args:
+            content_text (str): API响应内容
+            
+        Returns:
+            dict: 解析出的JSON对象，失败时返回None
+        """
+        # 多种方式提取JSON部分
+        import re
+        analysis_data = None
+        
+        # 方式1: 标准的 ```json``` 格式
+        json_match = re.search(r'```json\s*([\s\S]*?)\s*```', content_text)
+        if json_match:
+            json_content = json_match.group(1).strip()
+            logger.info("[AI] 找到标准JSON格式")
+            try:
+                analysis_data = json.loads(json_content)
+            except json.JSONDecodeError as e:
+                logger.warning(f"[AI] 标准JSON解析失败: {e}")
+        
+        # 方式2: 尝试找到任何 { } 包围的JSON
+        if not analysis_data:
+            json_match = re.search(r'\{[\s\S]*\}', content_text)
+            if json_match:
+                json_content = json_match.group(0).strip()
+                logger.info("[AI] 找到大括号JSON格式")
+                try:
+                    analysis_data = json.loads(json_content)
+                except json.JSONDecodeError as e:
+                    logger.warning(f"[AI] 大括号JSON解析失败: {e}")
+        
+        # 方式3: 尝试直接解析整个响应
+        if not analysis_data:
+            logger.info("[AI] 尝试直接解析整个响应")
+            try:
+                analysis_data = json.loads(content_text.strip())
+            except json.JSONDecodeError as e:
+                logger.warning(f"[AI] 直接解析失败: {e}")
+        
+        return analysis_data
+    
+    def _add_metadata(self, analysis_data):
+        """添加生成时间、模型和版本元数据"""
+        analysis_data["generated_at"] = datetime.now().isoformat()
+        analysis_data["ai_model"] = "deepseek-chat"
+        analysis_data["analysis_version"] = "2.0"
+        return analysis_data
+    
+    def generate_comprehensive_analysis_batch(self, articles, batch_size=None):
+        """
+        合并生成多篇短文章的分析，每次请求包含一批文章，按 id 拆分结果
+        
+        长文章、只剩一篇的批次以及合并结果中缺失的文章回退到 generate_comprehensive_analysis 单篇分析。
+        
+        Args:
+            articles (list): 文章列表，每项包含 id、title、content，可选 search_results
+            batch_size (int, optional): 每批文章数，默认读取 AI_BATCH_SIZE 配置
+            
+        Returns:
+            dict: 文章id -> 与 generate_comprehensive_analysis 相同格式的分析结果
+        """
+        articles = [dict(article, id=str(article["id"])) for article in articles]
+        # 每篇输出约 1200 token，批次大小受合并请求的输出上限约束
+        batch_size = min(batch_size or AI_BATCH_SIZE, max(1, AI_BATCH_MAX_TOKENS // 1200))
+        batches, singles = plan_batches(articles, batch_size)
+        
+        results = {}
+        for batch in batches:
+            results.update(self._analyze_batch(batch))
+        
+        fallback = singles + [article for batch in batches for article in batch if article["id"] not in results]
+        if batches:
+            logger.info(f"[AI] 合并分析 {sum(len(batch) for batch in batches)} 篇文章，{len(batches)} 次请求，"
+                        f"{len(fallback)} 篇单独分析")
+        for article in fallback:
+            results[article["id"]] = self.generate_comprehensive_analysis(
+                article.get("title", ""), article.get("content", ""), article.get("search_results")
+            )
+        return results
+    
+    def _analyze_batch(self, batch):
+        """
+        一次请求分析一批文章
+        
+        Args:
+            batch (list): 文章列表
+            
+        Returns:
+            dict: 文章id -> 分析结果，请求或解析失败的文章不包含在内
+        """
+        for article in batch:
+            search_results = article.get("search_results") or []
+            if search_results:
+                article["market_info"] = "；".join(item.get("title", "") for item in search_results[:2])
+        
+        system_prompt = """你是一位资深的财经分析师和内容创作专家，专门为新闻网站创作高质量的原创分析内容。
+
+你会收到多条财经新闻，请对每一条分别创作原创、专业、结构清晰的分析，各条之间互不影响：
+- 观点独特且有价值，有数据支撑
+- 包含风险提示和免责声明
+- 包含相关关键词和标签"""
+        
+        prompt = f"""请基于以下 {len(batch)} 条新闻（JSON数组，每条包含 id、title、content，可能带有 market_info 相关市场信息）逐条创作分析：
+
+{pack_articles(batch, extra_fields=("market_info",))}
+
+请返回如下JSON对象，results 中每条新闻一项，id 与输入一致：
+
+```json
+{{
+  "results": [
+    {{
+      "id": "新闻id",
+      "analysis_title": "分析文章标题（与原标题不同的原创标题）",
+      "executive_summary": "执行摘要（80-120字）",
+      "market_analysis": {{
+        "immediate_impact": "即时市场影响分析（80-120字）",
+        "long_term_implications": "长期影响分析（80-120字）",
+        "affected_sectors": [
+          {{
+            "sector": "受影响行业",
+            "impact_level": "高/中/低",
+            "key_companies": ["公司1", "公司2"],
+            "analysis": "具体影响分析"
+          }}
+        ]
+      }},
+      "investment_perspective": {{
+        "opportunities": "投资机会分析",
+        "risks": "风险提示",
+        "strategy_suggestions": "策略建议"
+      }},
+      "conclusion": "结论和展望",
+      "tags": ["标签1", "标签2", "标签3"],
+      "seo_keywords": ["关键词1", "关键词2"],
+      "risk_disclaimer": "投资风险提示和免责声明",
+      "content_quality_score": 90,
+      "originality_score": 95
+    }}
+  ]
+}}
+```"""
+        
+        max_tokens = min(AI_BATCH_MAX_TOKENS, 1200 * len(batch))
+        result = self._call_api_with_retry(prompt, system_prompt, max_tokens=max_tokens)
+        if not result["success"]:
+            logger.error(f"[AI] 合并分析失败: {result['error']}")
+            return {}
+        
+        data = self._parse_json_content(result["content"])
+        results = demux_results(data, [article["id"] for article in batch])
+        if not results:
+            logger.warning("[AI] ⚠️ 合并分析结果无法按id拆分，回退到单篇分析")
+            if self.response_cache:
+                self.response_cache.invalidate(result["cache_key"])
+        for analysis_data in results.values():
+            self._add_metadata(analysis_data)
+        return results
+    
     def _generate_fallback_analysis(self, title, content):
         """生成备用分析内容"""
         return {
@@ -7,8 +7,8 @@
 import os
 import json
 import time
-import requests
 from datetime import datetime
+from utils import http_client
 
 class EnhancedFinanceAnalyzer:
     """简化版财经分析器"""
@@ -56,11 +56,12 @@ class EnhancedFinanceAnalyzer:
                     "temperature": 0.7
                 }
                 
-                response = requests.post(
+                response = http_client.post(
                     self.api_url, 
                     headers=headers, 
                     json=payload, 
-                    timeout=30
+                    timeout=30,
+                    retry=False  # 重试由本方法的循环处理
                 )
                 
                 if response.status_code == 200:
@@ -0,0 +1,288 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+事件总线 - 数据库写入新快讯或分析结果后发布事件，推送给 /api/flash/stream 的订阅者
+
+写入新快讯或分析结果的进程（抓取器、调度器、轮询器，通常与 API 不在同一进程）把事件追加到数据库的
+stream_events 表；API 进程中的 DatabaseTail 每隔 SSE_POLL_INTERVAL 秒按编号读取新事件，发布到进程内的总线。
+
+每个事件有递增的编号，最近 SSE_HISTORY_SIZE 个事件保留在内存中，客户端断线重连时带上最后收到的编号
+（Last-Event-ID）即可补发错过的事件；错过的事件已不在内存中时订阅被标记为 reset，客户端应重新拉取列表。
+每个订阅者有容量为 SSE_CLIENT_BUFFER 的缓冲区，消费太慢、缓冲区满的订阅者被断开，由客户端重连补发，
+不会因为一个慢客户端让内存无限增长或拖慢发布方。
+
+编号从进程启动时的毫秒时间戳开始递增，进程重启后的编号大于重启前的编号，重启前的编号一律视为需要 reset。
+
+    bus = get_event_bus()
+    bus.publish("flash", {"id": "123", "title": "..."})
+
+    start_event_tail(db_client)            # API 进程中转发数据库中的事件
+    subscription = bus.subscribe(last_event_id=request.headers.get("Last-Event-ID"))
+    event = subscription.get(timeout=15)   # {"id": ..., "event": "flash", "data": {...}}，超时返回 None
+"""
+
+import os
+import sys
+import time
+import logging
+import threading
+from collections import deque
+# 修改为绝对导入路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import SSE_HISTORY_SIZE, SSE_CLIENT_BUFFER, SSE_POLL_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """一个订阅者的有界事件缓冲区"""
+
+    def __init__(self, bus, types=None, buffer_size=None):
+        self._bus = bus
+        self.types = set(types) if types else None
+        self.buffer_size = SSE_CLIENT_BUFFER if buffer_size is None else buffer_size
+        self._events = deque()
+        self._cond = threading.Condition()
+        self.closed = False
+        # 缓冲区满被断开
+        self.overflowed = False
+        # 错过的事件已不在内存中，客户端需要重新拉取列表
+        self.reset = False
+        # 订阅时最近一个事件的编号，之后的事件都会进入缓冲区
+        self.start_id = None
+
+    def _offer(self, event):
+        """放入一个事件，调用方持有总线的锁。缓冲区满时关闭订阅并返回 False"""
+        if self.types and event["event"] not in self.types:
+            return True
+        with self._cond:
+            if self.closed:
+                return False
+            if len(self._events) >= self.buffer_size:
+                self.overflowed = True
+                self.closed = True
+            else:
+                self._events.append(event)
+            self._cond.notify_all()
+            return not self.closed
+
+    def get(self, timeout=None):
+        """
+        取出下一个事件
+
+        Args:
+            timeout (float, optional): 没有事件时最多等待的秒数
+
+        Returns:
+            dict: 事件 {"id", "event", "data"}；超时或订阅已关闭且缓冲区为空时返回 None
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._events or self.closed, timeout)
+            return self._events.popleft() if self._events else None
+
+    def close(self):
+        """取消订阅"""
+        self._bus._unsubscribe(self)
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class EventBus:
+    """带重放历史的进程内发布/订阅总线"""
+
+    def __init__(self, history_size=None, buffer_size=None):
+        """
+        Args:
+            history_size (int, optional): 保留在内存中用于补发的事件数，默认读取 SSE_HISTORY_SIZE
+            buffer_size (int, optional): 每个订阅者的缓冲区容量，默认读取 SSE_CLIENT_BUFFER
+        """
+        self.buffer_size = SSE_CLIENT_BUFFER if buffer_size is None else buffer_size
+        self._history = deque(maxlen=SSE_HISTORY_SIZE if history_size is None else history_size)
+        self._last_id = int(time.time() * 1000)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._stats = {"published": 0, "subscribed": 0, "resumed": 0, "reset": 0, "overflowed": 0}
+
+    @property
+    def last_id(self):
+        """最近一个事件的编号"""
+        return self._last_id
+
+    def publish(self, event_type, data):
+        """
+        发布事件
+
+        Args:
+            event_type (str): 事件类型，如 flash、analysis
+            data (dict): 事件内容，需可序列化为 JSON
+
+        Returns:
+            int: 事件编号
+        """
+        with self._lock:
+            self._last_id += 1
+            event = {"id": self._last_id, "event": event_type, "data": data}
+            self._history.append(event)
+            self._stats["published"] += 1
+            for subscription in list(self._subscribers):
+                if not subscription._offer(event):
+                    self._subscribers.discard(subscription)
+                    if subscription.overflowed:
+                        self._stats["overflowed"] += 1
+                        logger.warning("事件订阅者消费太慢，缓冲区已满，断开连接等待重连补发")
+            return event["id"]
+
+    def subscribe(self, last_event_id=None, types=None, buffer_size=None):
+        """
+        订阅事件
+
+        Args:
+            last_event_id (int, optional): 客户端最后收到的事件编号，从它之后的事件开始补发
+            types (list, optional): 只接收这些类型的事件，默认全部
+            buffer_size (int, optional): 缓冲区容量，默认使用总线的设置
+
+        Returns:
+            Subscription: 订阅，错过的事件无法补发时 reset 为 True
+        """
+        subscription = Subscription(self, types, self.buffer_size if buffer_size is None else buffer_size)
+        with self._lock:
+            self._stats["subscribed"] += 1
+            subscription.start_id = self._last_id
+            if last_event_id is not None:
+                oldest = self._history[0]["id"] if self._history else self._last_id + 1
+                missed = [event for event in self._history if event["id"] > last_event_id]
+                if last_event_id + 1 < oldest or last_event_id > self._last_id or len(missed) > subscription.buffer_size:
+                    subscription.reset = True
+                    self._stats["reset"] += 1
+                else:
+                    for event in missed:
+                        subscription._offer(event)
+                    self._stats["resumed"] += 1
+            self._subscribers.add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def stats(self):
+        """
+        Returns:
+            dict: 当前订阅者数、最近事件编号、历史事件数，以及累计发布、订阅、补发、reset 和因缓冲区满断开的次数
+        """
+        with self._lock:
+            return dict(self._stats, subscribers=len(self._subscribers), last_id=self._last_id,
+                        history=len(self._history))
+
+
+_bus = None
+_bus_lock = threading.Lock()
+
+
+def get_event_bus():
+    """
+    获取进程内共享的事件总线
+
+    Returns:
+        EventBus: 事件总线
+    """
+    global _bus
+    with _bus_lock:
+        if _bus is None:
+            _bus = EventBus()
+        return _bus
+
+
+class DatabaseTail:
+    """按编号读取数据库 stream_events 表中的新事件并发布到总线，其他进程写入的事件同样能推送给订阅者"""
+
+    def __init__(self, db_client, bus=None, interval=None, batch_size=500):
+        """
+        Args:
+            db_client (SQLiteClient): 数据库客户端
+            bus (EventBus, optional): 事件总线，默认使用进程内共享的总线
+            interval (float, optional): 读取间隔（秒），默认读取 SSE_POLL_INTERVAL 配置
+            batch_size (int): 每次读取的最大事件数
+        """
+        self.db_client = db_client
+        self.bus = bus or get_event_bus()
+        self.interval = SSE_POLL_INTERVAL if interval is None else interval
+        self.batch_size = batch_size
+        # 只转发启动之后写入的事件，更早的事件由客户端通过 /api/flash 拉取
+        self.last_id = db_client.get_last_stream_event_id()
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {"polls": 0, "forwarded": 0, "errors": 0}
+
+    def poll_once(self):
+        """
+        读取并发布所有新事件
+
+        Returns:
+            int: 发布的事件数
+        """
+        forwarded = 0
+        while True:
+            events = self.db_client.get_stream_events(self.last_id, self.batch_size)
+            for event in events:
+                self.bus.publish(event["event"], event["data"])
+                self.last_id = event["id"]
+            forwarded += len(events)
+            if len(events) < self.batch_size:
+                break
+        self._stats["polls"] += 1
+        self._stats["forwarded"] += forwarded
+        return forwarded
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll_once()
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.error(f"读取数据库事件异常: {str(e)}")
+
+    def start(self):
+        """启动后台读取线程"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="event-tail", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """停止后台读取线程"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def stats(self):
+        """
+        Returns:
+            dict: 读取次数、转发的事件数、异常次数和已读取的最后一个事件编号
+        """
+        return dict(self._stats, last_id=self.last_id, interval=self.interval)
+
+
+_tails = {}
+_tails_lock = threading.Lock()
+
+
+def start_event_tail(db_client):
+    """
+    为数据库启动转发事件的后台线程，同一数据库在进程内只启动一个，避免重复发布
+
+    Args:
+        db_client (SQLiteClient): 数据库客户端
+
+    Returns:
+        DatabaseTail: 转发器
+    """
+    path = os.path.abspath(db_client.db_path)
+    with _tails_lock:
+        tail = _tails.get(path)
+        if tail is None:
+            tail = _tails[path] = DatabaseTail(db_client).start()
+        return tail
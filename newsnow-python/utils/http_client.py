@@ -0,0 +1,293 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+共享HTTP客户端 - 按主机复用 requests.Session
+
+每个主机使用一个长期存在的 Session，连接池大小、重试退避和超时统一配置，
+避免每次请求都重新建立 TCP+TLS 连接。用法与 requests 模块相同：
+
+    from utils import http_client
+    response = http_client.get(url, headers=headers)
+
+列表接口可以使用条件请求，内容未变化时服务器返回 304，不再传输和解析整个列表：
+
+    response = http_client.conditional_get(url, headers=headers, validator_scope="articles")
+    if response.status_code == 304:
+        return http_client.NotModifiedList()
+    ...解析...
+    http_client.remember_validators(response)  # 解析成功后才记录 ETag / Last-Modified
+
+304 只说明内容自“这个调用方”上次解析以来没有变化。同一个列表有多个消费者（例如文章抓取、快讯抓取和
+快讯轮询读取同一个接口）时，各自传入不同的 validator_scope 分别记录校验信息，否则先请求的一方记录后，
+另一方每次都会收到 304 而漏掉新内容。不传 validator_scope 时不发送条件请求，总是返回完整内容。
+"""
+
+import time
+
+import logging
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+# 修改为绝对导入路径
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import (
+    REQUEST_TIMEOUT, HTTP_CONNECT_TIMEOUT, HTTP_POOL_MAXSIZE, HTTP_MAX_RETRIES, HTTP_BACKOFF_FACTOR
+)
+
+logger = logging.getLogger(__name__)
+
+# 遇到这些状态码时按退避重试，429/503 会遵循 Retry-After
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# urllib3 只有在安装 brotli 时才能解码 br，未安装时不声明支持
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = "gzip, deflate, br"
+    except ImportError:
+        ACCEPT_ENCODING = "gzip, deflate"
+
+
+class NotModifiedList(list):
+    """列表接口返回 304 时使用的空结果，调用方据此区分内容未变化和抓取失败"""
+
+
+class _TimeoutSession(requests.Session):
+    """未显式指定 timeout 的请求使用全局超时策略 (连接超时, 读取超时)"""
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", (HTTP_CONNECT_TIMEOUT, REQUEST_TIMEOUT))
+        return super().request(method, url, **kwargs)
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+# 各主机收到 304 的次数
+_not_modified_counts = {}
+
+# ETag / Last-Modified 的持久化存储，默认使用 SQLiteClient
+_validator_store = None
+
+
+def _session_key(url, retry):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}", retry
+
+
+def _create_session(retry):
+    """创建带连接池和重试策略的 Session"""
+    session = _TimeoutSession()
+    max_retries = Retry(
+        total=HTTP_MAX_RETRIES,
+        backoff_factor=HTTP_BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=None,  # 爬虫的 POST 都是只读查询接口，同样可以重试
+        respect_retry_after_header=True,
+        raise_on_status=False
+    ) if retry else Retry(total=0, raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=max_retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+    return session
+
+
+def get_session(url, retry=True):
+    """
+    获取URL所属主机的共享 Session
+
+    Args:
+        url (str): 请求地址
+        retry (bool): 是否对 429/5xx 自动退避重试。自带重试逻辑的调用方应传 False，避免重复重试
+
+    Returns:
+        requests.Session: 共享的 Session
+    """
+    key = _session_key(url, retry)
+    session = _sessions.get(key)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(key)
+            if session is None:
+                session = _sessions[key] = _create_session(retry)
+    return session
+
+
+def request(method, url, retry=True, **kwargs):
+    """
+    通过共享 Session 发起请求，参数与 requests.request 相同
+
+    Args:
+        method (str): HTTP 方法
+        url (str): 请求地址
+        retry (bool): 是否对 429/5xx 自动退避重试
+        **kwargs: 传给 requests 的其他参数
+
+    Returns:
+        requests.Response: 响应
+    """
+    return get_session(url, retry).request(method, url, **kwargs)
+
+
+def get(url, **kwargs):
+    """发起 GET 请求"""
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    """发起 POST 请求"""
+    return request("POST", url, **kwargs)
+
+
+def set_validator_store(store):
+    """
+    设置缓存校验信息的存储
+
+    Args:
+        store: 提供 get_http_validators(url) 和 save_http_validators(url, etag, last_modified) 的对象
+    """
+    global _validator_store
+    _validator_store = store
+
+
+def _get_validator_store():
+    global _validator_store
+    if _validator_store is None:
+        from db.sqlite_client import SQLiteClient
+        _validator_store = SQLiteClient()
+    return _validator_store
+
+
+def slice_scope(validator_scope, **slice_params):
+    """
+    为在客户端分页截取的列表生成作用域：URL 不含分页参数时，不同页和数量需要分别记录校验信息
+
+    Args:
+        validator_scope (str): 调用方作用域，为空时返回 None
+        **slice_params: 分页参数，如 page、limit
+
+    Returns:
+        str: 作用域
+    """
+    if not validator_scope:
+        return None
+    return " ".join([validator_scope] + [f"{name}={value}" for name, value in sorted(slice_params.items())])
+
+
+def conditional_get(url, params=None, headers=None, validator_scope=None, cache_buster=None, **kwargs):
+    """
+    带 If-None-Match / If-Modified-Since 的 GET 请求
+
+    使用同一作用域和URL上次 remember_validators 记录的校验信息；内容未变化时服务器返回 304，
+    调用方应直接跳过解析。
+
+    Args:
+        url (str): 请求地址
+        params (dict, optional): 查询参数，参与校验信息的URL键
+        headers (dict, optional): 请求头
+        validator_scope (str, optional): 调用方作用域，如 "articles"、"flash"。同一URL的不同消费者使用不同作用域；
+            不传时发送普通请求，也不记录校验信息
+        cache_buster (str, optional): 没有校验信息时附加毫秒时间戳的查询参数名，用于不返回
+            ETag / Last-Modified 的服务器绕过中间缓存，该参数不参与URL键
+        **kwargs: 传给 request 的其他参数
+
+    Returns:
+        requests.Response: 响应，validator_key 属性为记录校验信息使用的键，未指定作用域时为 None
+    """
+    key = None
+    validators = None
+    headers = dict(headers or {})
+
+    if validator_scope:
+        key = f"{validator_scope} {requests.Request('GET', url, params=params).prepare().url}"
+        validators = _get_validator_store().get_http_validators(key)
+
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+    elif cache_buster:
+        params = dict(params or {}, **{cache_buster: int(time.time() * 1000)})
+
+    response = request("GET", url, params=params, headers=headers, **kwargs)
+    response.validator_key = key
+
+    if response.status_code == 304:
+        origin = _session_key(url, True)[0]
+        with _sessions_lock:
+            _not_modified_counts[origin] = _not_modified_counts.get(origin, 0) + 1
+        logger.debug(f"内容未变化 (304): {key}")
+
+    return response
+
+
+def remember_validators(response):
+    """
+    记录 conditional_get 响应的 ETag / Last-Modified，应在响应成功解析后调用
+
+    Args:
+        response (requests.Response): conditional_get 返回的 200 响应
+
+    Returns:
+        bool: 是否记录了校验信息
+    """
+    key = getattr(response, "validator_key", None)
+    if not key or response.status_code != 200:
+        return False
+
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if not etag and not last_modified:
+        return False
+
+    return _get_validator_store().save_http_validators(key, etag, last_modified)
+
+
+def get_connection_stats():
+    """
+    获取各主机的连接复用统计
+
+    Returns:
+        dict: {主机: {"requests": 请求数, "connections": 新建连接数, "reused": 复用连接的请求数,
+                      "not_modified": 条件请求返回304的次数}}
+    """
+    stats = {}
+    with _sessions_lock:
+        sessions = list(_sessions.items())
+        not_modified_counts = dict(_not_modified_counts)
+
+    for (origin, _), session in sessions:
+        entry = stats.setdefault(origin, {"requests": 0, "connections": 0, "reused": 0,
+                                          "not_modified": not_modified_counts.get(origin, 0)})
+        for adapter in set(session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            with pools.lock:
+                connection_pools = list(pools._container.values())
+            for pool in connection_pools:
+                entry["requests"] += pool.num_requests
+                entry["connections"] += pool.num_connections
+
+    for entry in stats.values():
+        entry["reused"] = max(0, entry["requests"] - entry["connections"])
+    return stats
+
+
+def close_all_sessions():
+    """关闭所有共享 Session 及其连接"""
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
@@ -7,39 +7,60 @@
 
 import os
 import json
-import time
-import requests
+import logging
 from datetime import datetime
+from utils import http_client
+from utils.api_rate_limiter import api_gate, estimate_tokens
+from utils.response_cache import get_response_cache, make_cache_key
+from utils.single_flight import get_single_flight
+from utils.batch_prompt import plan_batches, pack_articles, demux_results
+from utils.ai_executor import AnalysisExecutor
+from utils.deepseek_stream import IncrementalJSONParser, StreamAborted, stream_json
+from config.settings import AI_BATCH_SIZE, AI_BATCH_MAX_TOKENS
+
+logger = logging.getLogger(__name__)
+
+# 收到 429 后重新排队的次数，等待时间由 api_gate 控制（Retry-After，没有时至少 AI_RATE_LIMIT_BACKOFF 秒）
+RATE_LIMIT_RETRIES = 3
 
 class FinanceAnalyzer:
     """财经内容分析器"""
     
-    def __init__(self, api_key=None):
+    # 提示词模板版本，修改提示词模板后递增，使旧的缓存响应失效
+    PROMPT_VERSION = "1"
+    
+    # 合并分析使用的系统提示词，只在每批请求中出现一次
+    BATCH_SYSTEM_PROMPT = """
+    你是一名资深财经分析师，擅长快速解读财经快讯和短新闻。
+    你会收到多条新闻，请对每一条分别给出客观、中立、以事实为依据的分析，
+    各条之间互不影响，并以JSON格式返回所有结果。
+    """
+    
+    def __init__(self, api_key=None, response_cache=None):
+        """
+        Args:
+            api_key (str, optional): DeepSeek API密钥，默认读取环境变量
+            response_cache (ResponseCache, optional): 响应缓存，默认在首次使用时获取全局缓存
+        """
         self.api_key = api_key or os.environ.get("DEEPSEEK_API_KEY")
         self.api_url = "https://api.deepseek.com/v1/chat/completions"
-        # 添加缓存
-        self._cache = {}
-        self._cache_time = {}
-        self._cache_ttl = 3600  # 缓存1小时
+        # 响应缓存在数据库中，多个进程共享，按完整提示词内容命中
+        self._response_cache = response_cache
+        # 相同提示词的并发请求只调用一次 API
+        self.api_flight = get_single_flight("deepseek")
     
-    def _get_with_cache(self, cache_key, fetch_func):
-        """带缓存的获取数据"""
-        current_time = time.time()
-        if cache_key in self._cache and current_time - self._cache_time.get(cache_key, 0) < self._cache_ttl:
-            return self._cache[cache_key]
-        
-        data = fetch_func()
-        if data:
-            self._cache[cache_key] = data
-            self._cache_time[cache_key] = current_time
-        return data
+    @property
+    def response_cache(self):
+        """响应缓存，未指定时首次使用才获取全局缓存，创建分析器不会打开默认数据库"""
+        if self._response_cache is None:
+            cache = get_response_cache()
+            self._response_cache = cache if cache is not None else False
+        return self._response_cache if self._response_cache is not False else None
     
-    def _generate_cache_key(self, text, template_type, extra_context=None):
-        """生成缓存键"""
-        # 使用文本的前100个字符和模板类型作为缓存键
-        text_key = text[:100].replace(" ", "").lower()
-        context_key = hash(extra_context) if extra_context else ""
-        return f"analysis_{template_type}_{hash(text_key)}_{context_key}"
+    @response_cache.setter
+    def response_cache(self, cache):
+        # 显式设为 None 表示不使用缓存
+        self._response_cache = cache if cache is not None else False
     
     def _call_deepseek_api(self, prompt, system_prompt=None, model="deepseek-chat", max_tokens=800, json_output=False):
         """调用DeepSeek API"""
@@ -70,11 +91,11 @@ class FinanceAnalyzer:
                 "max_tokens": max_tokens
             }
             
-            response = requests.post(self.api_url, headers=headers, json=payload, timeout=30)
-            response.raise_for_status()
+            cache_key = make_cache_key(model, self.PROMPT_VERSION, messages, max_tokens=max_tokens)
+            content = self.response_cache.get(cache_key) if self.response_cache else None
             
-            result = response.json()
-            content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
+            if content is None:
+                content = self.api_flight.do(cache_key, self._request_content, cache_key, headers, payload)
             
             # 如果需要JSON输出，尝试解析内容
             if json_output:
@@ -92,9 +113,13 @@ class FinanceAnalyzer:
                             json_content = json_match.group(1).strip()
                             return json.loads(json_content)
                         else:
-                            # 如果找不到JSON块，返回格式化的结果
+                            # 如果找不到JSON块，返回格式化的结果，并且不保留在缓存中
+                            if self.response_cache:
+                                self.response_cache.invalidate(cache_key)
                             return {"raw_content": content, "error": "无法解析为JSON格式"}
                 except Exception as e:
+                    if self.response_cache:
+                        self.response_cache.invalidate(cache_key)
                     return {"raw_content": content, "error": f"JSON解析错误: {str(e)}"}
             
             return content
@@ -102,66 +127,249 @@ class FinanceAnalyzer:
             error_msg = f"API调用错误: {str(e)}"
             return {"error": error_msg} if json_output else error_msg
     
-    def analyze_market_news(self, text, title=None, searxng_results=None):
-        """分析市场新闻，可选择性整合SearxNG搜索结果"""
-        def _fetch():
-            content = f"标题：{title}\n\n内容：{text}" if title else text
+    def _request_content(self, cache_key, headers, payload):
+        """发起API请求，返回消息内容并写入响应缓存"""
+        # 配额、并发和 429 退避由 api_gate 统一控制
+        tokens = estimate_tokens(payload["messages"], payload["max_tokens"])
+        for _ in range(RATE_LIMIT_RETRIES + 1):
+            response = api_gate.call(
+                lambda: http_client.post(self.api_url, headers=headers, json=payload, timeout=30, retry=False),
+                tokens=tokens
+            )
+            if response.status_code != 429:
+                break
+        response.raise_for_status()
+        
+        result = response.json()
+        content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
+        if self.response_cache:
+            self.response_cache.put(cache_key, payload["model"], content)
+        return content
+    
+    def stream_deepseek_json(self, prompt, system_prompt=None, model="deepseek-chat", max_tokens=800):
+        """
+        流式调用DeepSeek API并增量解析JSON回复
+        
+        与 _call_deepseek_api(json_output=True) 共用响应缓存：命中缓存时直接逐个返回缓存中的字段，
+        完整收到的回复写入缓存。回复格式错误时立即中断连接。
+        
+        Args:
+            prompt (str): 用户提示词
+            system_prompt (str, optional): 系统提示词
+            model (str): 模型名称
+            max_tokens (int): 最大输出 token 数
             
-            system_prompt = """
-            你是一名专业的财经分析师，擅长分析市场新闻并提供深入见解。
-            你可能会收到原始新闻内容以及相关的背景信息或搜索引擎结果。
-            请综合所有提供的信息，以清晰、专业的语言进行分析，重点关注：
-            1. 市场影响：该消息对股市、债市或商品市场的潜在影响
-            2. 行业关联：受影响的特定行业或公司
-            3. 宏观趋势：与更广泛的经济趋势或政策方向的关联
-            4. 投资启示：基于此消息对投资者的建议
+        Yields:
+            tuple: (字段名, 值)
             
-            你的分析应客观、中立，避免使用夸张词汇，并以数据和事实支持你的观点。
-            你需要返回JSON格式的分析结果。
-            """
+        Raises:
+            StreamAborted: 回复格式错误
+        """
+        if not self.api_key:
+            raise StreamAborted("未提供DeepSeek API密钥")
+        
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+        cache_key = make_cache_key(model, self.PROMPT_VERSION, messages, max_tokens=max_tokens)
+        
+        cached = self.response_cache.get(cache_key) if self.response_cache else None
+        if cached is not None:
+            parser = IncrementalJSONParser()
+            try:
+                fields = parser.feed(cached)
+            except StreamAborted:
+                fields = []
+            if parser.done:
+                yield from fields
+                return
+            self.response_cache.invalidate(cache_key)
+        
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_key}"
+        }
+        payload = {"model": model, "messages": messages, "max_tokens": max_tokens}
+        parser = IncrementalJSONParser()
+        yield from stream_json(self.api_url, headers, payload, parser=parser)
+        # 缓存解析出的对象而不是原始回复：原始回复可能带有代码块标记，或在对象结束处被截断
+        if self.response_cache:
+            self.response_cache.put(cache_key, model, json.dumps(parser.result, ensure_ascii=False))
+    
+    def analyze_market_news(self, text, title=None, searxng_results=None):
+        """分析市场新闻，可选择性整合SearxNG搜索结果"""
+        prompt, system_prompt = self._market_news_prompts(text, title, searxng_results)
+        return self._call_deepseek_api(prompt, system_prompt, json_output=True)
+    
+    def analyze_market_news_stream(self, text, title=None, searxng_results=None):
+        """
+        流式分析市场新闻，每个字段生成完毕即返回
+        
+        Args:
+            text (str): 新闻内容
+            title (str, optional): 标题
+            searxng_results (list, optional): 搜索结果
             
-            searxng_info = ""
-            if searxng_results:
-                # 简单地将搜索结果拼接，实际应用中可能需要更复杂的处理，比如取摘要
-                searxng_summary = "\n".join([f"- {item.get('title', '')}: {item.get('content', '')[:150]}..." for item in searxng_results[:3]]) # 取前3条结果的部分内容
-                searxng_info = f"""
+        Yields:
+            tuple: (字段名, 值)，格式与 analyze_market_news 的结果字段一致
+        """
+        prompt, system_prompt = self._market_news_prompts(text, title, searxng_results)
+        return self.stream_deepseek_json(prompt, system_prompt)
+    
+    def _market_news_prompts(self, text, title=None, searxng_results=None):
+        """
+        构建市场新闻分析的提示词
+        
+        Returns:
+            tuple: (用户提示词, 系统提示词)
+        """
+        content = f"标题：{title}\n\n内容：{text}" if title else text
+        
+        system_prompt = """
+        你是一名专业的财经分析师，擅长分析市场新闻并提供深入见解。
+        你可能会收到原始新闻内容以及相关的背景信息或搜索引擎结果。
+        请综合所有提供的信息，以清晰、专业的语言进行分析，重点关注：
+        1. 市场影响：该消息对股市、债市或商品市场的潜在影响
+        2. 行业关联：受影响的特定行业或公司
+        3. 宏观趋势：与更广泛的经济趋势或政策方向的关联
+        4. 投资启示：基于此消息对投资者的建议
+        
+        你的分析应客观、中立，避免使用夸张词汇，并以数据和事实支持你的观点。
+        你需要返回JSON格式的分析结果。
+        """
+        
+        searxng_info = ""
+        if searxng_results:
+            # 简单地将搜索结果拼接，实际应用中可能需要更复杂的处理，比如取摘要
+            searxng_summary = "\n".join([f"- {item.get('title', '')}: {item.get('content', '')[:150]}..." for item in searxng_results[:3]]) # 取前3条结果的部分内容
+            searxng_info = f"""
 
 相关背景信息（来自搜索引擎）：
 {searxng_summary}
 """
 
-            prompt = f"""
-            请对以下财经新闻进行专业分析，并参考提供的相关背景信息：
+        prompt = f"""
+        请对以下财经新闻进行专业分析，并参考提供的相关背景信息：
 
 新闻内容：
 {content}
 {searxng_info}
 
 请按照以下JSON格式提供分析结果，确保返回有效的JSON结构：
-            
-            ```json
+        
+        ```json
+        {{
+          "market_summary": "100字以内简明扼要的摘要",
+          "impact_analysis": "200-300字深入分析",
+          "affected_industries": [
             {{
-              "market_summary": "100字以内简明扼要的摘要",
-              "impact_analysis": "200-300字深入分析",
-              "affected_industries": [
-                {{
-                  "industry": "受影响的行业名称",
-                  "companies": ["相关公司1", "相关公司2"],
-                  "impact_level": "高/中/低"
-                }}
-              ],
-              "investment_advice": "基于消息的客观投资建议",
-              "sentiment": "积极/中性/消极"
+              "industry": "受影响的行业名称",
+              "companies": ["相关公司1", "相关公司2"],
+              "impact_level": "高/中/低"
             }}
-            ```
+          ],
+          "investment_advice": "基于消息的客观投资建议",
+          "sentiment": "积极/中性/消极"
+        }}
+        ```
+        
+        请务必按照以上JSON格式返回，不要添加其他内容，确保JSON格式有效。
+        """
+        
+        return prompt, system_prompt
+    
+    def analyze_market_news_batch(self, articles, batch_size=None):
+        """
+        合并分析多篇短新闻，每次请求包含一批文章，按 id 拆分结果
+        
+        长文章、只剩一篇的批次以及合并结果中缺失或无法解析的文章回退到 analyze_market_news 单篇分析。
+        
+        Args:
+            articles (list): 文章列表，每项包含 id、content，可选 title 和 searxng_results
+            batch_size (int, optional): 每批文章数，默认读取 AI_BATCH_SIZE 配置
             
-            请务必按照以上JSON格式返回，不要添加其他内容，确保JSON格式有效。
-            """
+        Returns:
+            dict: 文章id -> 与 analyze_market_news 相同格式的分析结果
+        """
+        articles = [dict(article, id=str(article["id"])) for article in articles]
+        # 每篇输出约 800 token，批次大小受合并请求的输出上限约束
+        batch_size = min(batch_size or AI_BATCH_SIZE, max(1, AI_BATCH_MAX_TOKENS // 800))
+        batches, singles = plan_batches(articles, batch_size)
+        
+        results = {}
+        executor = AnalysisExecutor()
+        for batch_results in executor.map(self._analyze_news_batch, batches):
+            results.update(batch_results or {})
+        
+        fallback = singles + [article for batch in batches for article in batch if article["id"] not in results]
+        if batches:
+            logger.info(f"合并分析 {sum(len(batch) for batch in batches)} 篇新闻，{len(batches)} 次请求，"
+                        f"{len(fallback)} 篇单独分析")
+        
+        def analyze_single(article):
+            return self.analyze_market_news(article.get("content", ""), article.get("title"),
+                                            article.get("searxng_results"))
+        
+        for article, result in zip(fallback, executor.map(analyze_single, fallback)):
+            results[article["id"]] = result
+        return results
+    
+    def _analyze_news_batch(self, batch):
+        """
+        一次请求分析一批新闻
+        
+        Args:
+            batch (list): 文章列表
             
-            return self._call_deepseek_api(prompt, system_prompt, json_output=True)
+        Returns:
+            dict: 文章id -> 分析结果，请求或解析失败的文章不包含在内
+        """
+        for article in batch:
+            searxng_results = article.get("searxng_results") or []
+            if searxng_results:
+                article["background"] = "；".join(item.get("title", "") for item in searxng_results[:2])
         
-        cache_key = self._generate_cache_key(text, "market_news", extra_context=json.dumps(searxng_results) if searxng_results else None)
-        return self._get_with_cache(cache_key, _fetch)
+        system_prompt = self.BATCH_SYSTEM_PROMPT
+        prompt = f"""
+请逐篇分析以下 {len(batch)} 条财经新闻（JSON数组，每条包含 id、title、content，可能带有 background 背景信息）：
+
+{pack_articles(batch, extra_fields=("background",))}
+
+请返回如下JSON对象，results 中每条新闻一项，id 与输入一致：
+
+```json
+{{
+  "results": [
+    {{
+      "id": "新闻id",
+      "market_summary": "100字以内简明扼要的摘要",
+      "impact_analysis": "100-200字分析",
+      "affected_industries": [
+        {{
+          "industry": "受影响的行业名称",
+          "companies": ["相关公司1", "相关公司2"],
+          "impact_level": "高/中/低"
+        }}
+      ],
+      "investment_advice": "基于消息的客观投资建议",
+      "sentiment": "积极/中性/消极"
+    }}
+  ]
+}}
+```
+
+请务必按照以上JSON格式返回，不要添加其他内容，确保JSON格式有效。
+"""
+        max_tokens = min(AI_BATCH_MAX_TOKENS, 800 * len(batch))
+        data = self._call_deepseek_api(prompt, system_prompt, max_tokens=max_tokens, json_output=True)
+        results = demux_results(data, [article["id"] for article in batch])
+        if not results and self.response_cache:
+            # 结构不符合要求的响应不保留在缓存中
+            messages = [{"role": "system", "content": system_prompt}, {"role": "user", "content": prompt}]
+            self.response_cache.invalidate(make_cache_key("deepseek-chat", self.PROMPT_VERSION, messages,
+                                                          max_tokens=max_tokens))
+        return results
     
     def analyze_economic_data(self, data_text, data_type=None):
         """分析经济数据"""
@@ -211,8 +419,7 @@ class FinanceAnalyzer:
             
             return self._call_deepseek_api(prompt, system_prompt, json_output=True)
         
-        cache_key = self._generate_cache_key(data_text, "economic_data")
-        return self._get_with_cache(cache_key, _fetch)
+        return _fetch()
     
     def analyze_company_report(self, report_text, company_name=None):
         """分析公司财报"""
@@ -277,8 +484,7 @@ class FinanceAnalyzer:
             
             return self._call_deepseek_api(prompt, system_prompt, json_output=True)
         
-        cache_key = self._generate_cache_key(report_text, "company_report")
-        return self._get_with_cache(cache_key, _fetch)
+        return _fetch()
     
     def generate_market_summary(self, news_list, market_type="股市"):
         """生成市场综述"""
@@ -344,11 +550,7 @@ class FinanceAnalyzer:
             
             return self._call_deepseek_api(prompt, system_prompt, max_tokens=1000, json_output=True)
         
-        # 生成一个唯一的缓存键
-        news_ids = "_".join([str(news.get("id", hash(news.get("title", "")))) for news in news_list[:3]])
-        cache_key = f"market_summary_{market_type}_{news_ids}"
-        
-        return self._get_with_cache(cache_key, _fetch)
+        return _fetch()
 
     def analyze_article(self, article_data):
         """
@@ -455,12 +657,7 @@ class FinanceAnalyzer:
             
             return self._call_deepseek_api(prompt, system_prompt, max_tokens=2000, json_output=True)
         
-        # 生成缓存键
-        cache_key = self._generate_cache_key(
-            article_data.get('title', '') + article_data.get('summary', ''), 
-            "article_analysis"
-        )
-        return self._get_with_cache(cache_key, _fetch)
+        return _fetch()
 
     def generate_seo_content(self, article_data, target_keywords=None):
         """
@@ -530,8 +727,7 @@ class FinanceAnalyzer:
             
             return self._call_deepseek_api(prompt, system_prompt, max_tokens=1500, json_output=True)
         
-        cache_key = self._generate_cache_key(title, "seo_content")
-        return self._get_with_cache(cache_key, _fetch)
+        return _fetch()
 
     def create_content_series(self, topic, article_count=5):
         """
@@ -577,8 +773,7 @@ class FinanceAnalyzer:
             
             return self._call_deepseek_api(prompt, system_prompt, max_tokens=1200, json_output=True)
         
-        cache_key = f"content_series_{topic}_{article_count}"
-        return self._get_with_cache(cache_key, _fetch)
+        return _fetch()
 
 # 测试代码
 if __name__ == "__main__":
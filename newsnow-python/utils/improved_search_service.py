@@ -9,9 +9,10 @@ import os
 import re
 import json
 import time
-import requests
 from urllib.parse import quote_plus
 from datetime import datetime, timedelta
+from utils import http_client
+from utils.lru_cache import TTLCache
 
 class FinanceSearchService:
     """财经搜索服务"""
@@ -20,9 +21,8 @@ class FinanceSearchService:
         self.searxng_url = searxng_url or os.environ.get("SEARXNG_URL", "http://searxng:8080/search")
         self.timeout = 15
         # 搜索结果缓存
-        self._cache = {}
-        self._cache_time = {}
         self._cache_ttl = 1800  # 默认缓存30分钟
+        self._cache = TTLCache(ttl=self._cache_ttl)
         # 相关词权重
         self.finance_keywords = {
             "高级": ["股市", "证券", "股票", "基金", "债券", "期货", "外汇", "汇率", "央行", "货币政策", 
@@ -35,17 +35,7 @@ class FinanceSearchService:
     
     def _get_with_cache(self, cache_key, fetch_func, ttl=None):
         """带缓存的获取数据"""
-        current_time = time.time()
-        cache_ttl = ttl if ttl is not None else self._cache_ttl
-        
-        if cache_key in self._cache and current_time - self._cache_time.get(cache_key, 0) < cache_ttl:
-            return self._cache[cache_key]
-        
-        data = fetch_func()
-        if data:
-            self._cache[cache_key] = data
-            self._cache_time[cache_key] = current_time
-        return data
+        return self._cache.get_or_set(cache_key, fetch_func, ttl)
     
     def _extract_finance_keywords(self, text):
         """从文本中提取财经关键词"""
@@ -173,7 +163,7 @@ class FinanceSearchService:
             
             try:
                 # 发送搜索请求
-                response = requests.get(self.searxng_url, params=params, timeout=self.timeout)
+                response = http_client.get(self.searxng_url, params=params, timeout=self.timeout)
                 if response.status_code != 200:
                     return {"error": f"搜索请求失败，状态码: {response.status_code}"}
                 
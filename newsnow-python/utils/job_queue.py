@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+任务队列 - 按优先级分发文章处理任务
+
+未完成的文章按优先级加入数据库中的 job_queue 表，优先级由来源权重、发布时效和标题中的重要关键词组成，
+刚发布的重要消息不必排在积压文章之后。多个进程通过带租约的原子领取消费同一队列，不会重复处理；
+领取者崩溃时租约过期，任务被其他进程重新领取。失败的任务按指数退避重试，超过最大次数后进入死信。
+
+    queue = JobQueue(db_client, "analyze")
+    stats = queue.run_batch(process_article, 20)
+"""
+
+import os
+import time
+import uuid
+import random
+import socket
+import logging
+from datetime import datetime
+# 修改为绝对导入路径
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import (
+    JOB_MAX_ATTEMPTS, JOB_LEASE_SECONDS, JOB_BACKOFF_BASE, JOB_BACKOFF_MAX, JOB_DONE_RETENTION, JOB_SOURCE_WEIGHTS,
+    JOB_RECENCY_WEIGHT, JOB_RECENCY_HALF_LIFE, JOB_KEYWORD_WEIGHT, JOB_PRIORITY_KEYWORDS
+)
+from db.sqlite_client import JOB_DONE_COLUMNS
+from utils.ai_executor import AnalysisExecutor
+
+logger = logging.getLogger(__name__)
+
+# 清理已完成任务的最小间隔（秒）
+PRUNE_INTERVAL = 3600
+
+# 文章发布时间的常见格式
+_DATE_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y/%m/%d %H:%M:%S", "%Y-%m-%d")
+
+
+def parse_article_time(value):
+    """
+    解析文章发布时间
+
+    Args:
+        value (str|int|float): ISO 格式、常见日期格式或秒/毫秒时间戳
+
+    Returns:
+        float: 时间戳，无法解析时返回 None
+    """
+    if value in (None, ""):
+        return None
+    if isinstance(value, (int, float)) or str(value).isdigit():
+        timestamp = float(value)
+        return timestamp / 1000 if timestamp > 1e12 else timestamp
+    text = str(value).strip().replace("Z", "+00:00")
+    try:
+        return datetime.fromisoformat(text).timestamp()
+    except ValueError:
+        pass
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(text[:19], fmt).timestamp()
+        except ValueError:
+            continue
+    return None
+
+
+def compute_priority(article, now=None):
+    """
+    计算文章任务的优先级，数值越大越先处理
+
+    Args:
+        article (dict): 文章，使用 source、title、pubDate（缺失时用 created_at）
+        now (float, optional): 当前时间戳
+
+    Returns:
+        float: 优先级
+    """
+    now = time.time() if now is None else now
+    priority = float(JOB_SOURCE_WEIGHTS.get(article.get("source") or "", 0))
+
+    published = parse_article_time(article.get("pubDate")) or parse_article_time(article.get("created_at"))
+    if published is not None:
+        age_hours = max(0.0, (now - published) / 3600)
+        priority += JOB_RECENCY_WEIGHT * 0.5 ** (age_hours / JOB_RECENCY_HALF_LIFE)
+
+    title = article.get("title") or ""
+    if any(keyword in title for keyword in JOB_PRIORITY_KEYWORDS):
+        priority += JOB_KEYWORD_WEIGHT
+    return round(priority, 4)
+
+
+def make_worker_id():
+    """
+    生成领取者标识
+
+    Returns:
+        str: 主机名:进程号:随机串
+    """
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class JobQueue:
+    """某一类型任务的队列"""
+
+    def __init__(self, db_client, kind, worker_id=None, lease_seconds=None, max_attempts=None,
+                 backoff_base=None, backoff_max=None, done_retention=None):
+        """
+        Args:
+            db_client (SQLiteClient): 数据库客户端
+            kind (str): 任务类型，analyze（AI分析）或 enhance（质量增强）
+            worker_id (str, optional): 领取者标识，默认由主机名、进程号和随机串组成
+            lease_seconds (float, optional): 租约时长，默认读取 JOB_LEASE_SECONDS 配置
+            max_attempts (int, optional): 最大尝试次数，默认读取 JOB_MAX_ATTEMPTS 配置
+            backoff_base (float, optional): 基础退避时间，默认读取 JOB_BACKOFF_BASE 配置
+            backoff_max (float, optional): 最长退避时间，默认读取 JOB_BACKOFF_MAX 配置
+            done_retention (float, optional): 已完成任务的保留时间，默认读取 JOB_DONE_RETENTION 配置
+        """
+        if kind not in JOB_DONE_COLUMNS:
+            raise ValueError(f"未知的任务类型: {kind}")
+        self.db_client = db_client
+        self.kind = kind
+        self.done_column = JOB_DONE_COLUMNS[kind]
+        self.worker_id = worker_id or make_worker_id()
+        self.lease_seconds = JOB_LEASE_SECONDS if lease_seconds is None else lease_seconds
+        self.max_attempts = JOB_MAX_ATTEMPTS if max_attempts is None else max_attempts
+        self.backoff_base = JOB_BACKOFF_BASE if backoff_base is None else backoff_base
+        self.backoff_max = JOB_BACKOFF_MAX if backoff_max is None else backoff_max
+        self.done_retention = JOB_DONE_RETENTION if done_retention is None else done_retention
+        self._last_prune = 0.0
+
+    def sync(self, limit=1000):
+        """
+        把尚未完成且没有任务的文章加入队列
+
+        Args:
+            limit (int): 本次最多加入的数量
+
+        Returns:
+            int: 新加入的任务数
+        """
+        articles = self.db_client.find_articles_without_job(self.kind, limit)
+        now = time.time()
+        added = self.db_client.enqueue_jobs([{
+            "kind": self.kind,
+            "article_id": article["id"],
+            "source": article["source"],
+            "priority": compute_priority(article, now),
+            "max_attempts": self.max_attempts
+        } for article in articles])
+        if added:
+            logger.info(f"[{self.kind}] 新加入 {added} 个任务")
+        return added
+
+    def claim(self, n, source=None):
+        """
+        同步新文章后领取最多 n 个任务
+
+        Args:
+            n (int): 数量
+            source (str, optional): 只领取该来源的任务
+
+        Returns:
+            list: 任务列表，按优先级从高到低
+        """
+        self.sync()
+        if time.time() - self._last_prune >= PRUNE_INTERVAL:
+            self.prune()
+        return self.db_client.claim_jobs(self.kind, self.worker_id, n, self.lease_seconds, source)
+
+    def prune(self):
+        """
+        清理完成超过 done_retention 秒的任务，领取任务时每小时自动执行一次
+
+        Returns:
+            int: 删除的任务数
+        """
+        self._last_prune = time.time()
+        pruned = self.db_client.prune_done_jobs(self.kind, self._last_prune - self.done_retention)
+        if pruned:
+            logger.info(f"[{self.kind}] 清理了 {pruned} 个已完成的任务")
+        return pruned
+
+    def retry_delay(self, attempts):
+        """
+        第 attempts 次失败后的退避时间，带 ±20% 抖动避免多个任务同时重试
+
+        Args:
+            attempts (int): 已尝试次数
+
+        Returns:
+            float: 秒数
+        """
+        delay = min(self.backoff_max, self.backoff_base * 2 ** max(0, attempts - 1))
+        return delay * random.uniform(0.8, 1.2)
+
+    def complete(self, job):
+        """标记任务完成"""
+        if not self.db_client.complete_job(job["id"], self.worker_id):
+            logger.warning(f"[{self.kind}] 任务 {job['id']} 的租约已被接管，完成状态未记录")
+
+    def fail(self, job, error):
+        """
+        记录任务失败
+
+        Returns:
+            str: 任务的新状态 pending 或 dead
+        """
+        status = self.db_client.fail_job(job["id"], self.worker_id, error, self.retry_delay(job["attempts"]))
+        if status == "dead":
+            logger.error(f"[{self.kind}] 任务 {job['id']} ({job['source']}/{job['article_id']}) "
+                         f"失败 {job['attempts']} 次，进入死信: {error}")
+        return status
+
+    def defer(self, job, reason):
+        """放回未能开始处理的任务，不消耗尝试次数，按首次失败的退避时间后重试"""
+        if not self.db_client.defer_job(job["id"], self.worker_id, reason, self.retry_delay(1)):
+            logger.warning(f"[{self.kind}] 任务 {job['id']} 的租约已被接管，未能放回")
+
+    def _run_job(self, job, handler):
+        article = self.db_client.get_article_by_id(job["article_id"], job["source"] or None)
+        if not article:
+            self.fail(job, "文章不存在")
+            return False
+        # 文章可能已被其他流程（如爬虫即时分析）处理
+        if article.get(self.done_column):
+            self.complete(job)
+            return True
+        # AI分析同时领取文章本身，与通过 claim_unprocessed 直接领取文章的批处理进程互斥
+        claimed = self.kind == "analyze"
+        if claimed and not self.db_client.claim_article(job["article_id"], job["source"], self.worker_id,
+                                                        self.lease_seconds):
+            # 只是锁冲突，任务并未执行，不应因此进入死信
+            self.defer(job, "文章正被其他进程处理")
+            return False
+        try:
+            if handler(article):
+                self.complete(job)
+                return True
+            self.fail(job, "处理失败")
+        except Exception as e:
+            logger.error(f"[{self.kind}] 任务 {job['id']} 异常: {str(e)}")
+            self.fail(job, str(e))
+        if claimed:
+            self.db_client.release_claims(self.worker_id, [job["article_id"]])
+        return False
+
+    def run_batch(self, handler, n, source=None, executor=None):
+        """
+        领取一批任务并并发处理
+
+        Args:
+            handler (callable): 处理函数，参数为文章字典，返回真值表示成功
+            n (int): 最多领取的任务数
+            source (str, optional): 只处理该来源
+            executor (AnalysisExecutor, optional): 并发执行器
+
+        Returns:
+            dict: {"total": 领取数, "success": 成功数, "failed": 失败数}
+        """
+        jobs = self.claim(n, source)
+        if not jobs:
+            return {"total": 0, "success": 0, "failed": 0}
+        results = (executor or AnalysisExecutor()).map(lambda job: self._run_job(job, handler), jobs)
+        success = sum(1 for result in results if result)
+        return {"total": len(jobs), "success": success, "failed": len(jobs) - success}
+
+    def stats(self):
+        """
+        Returns:
+            dict: 本类型各状态的任务数
+        """
+        return self.db_client.get_job_queue_stats().get(self.kind, {})
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+进程内缓存 - 线程安全的 TTL + LRU 缓存
+
+基于 OrderedDict：命中时移到末尾，超出条数或字节数上限时从头部淘汰最久未使用的条目，
+插入和淘汰都是 O(1)。过期条目在读取时删除，或随 LRU 顺序被淘汰。
+
+    cache = TTLCache(max_entries=1000, ttl=300)
+    data = cache.get_or_set(key, fetch_func)
+"""
+
+import json
+import time
+import threading
+from collections import OrderedDict
+# 修改为绝对导入路径
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import MEMORY_CACHE_MAX_ENTRIES, MEMORY_CACHE_MAX_BYTES
+from utils.single_flight import SingleFlight
+
+_MISSING = object()
+
+
+def estimate_size(value):
+    """
+    估算缓存值占用的字节数，按 JSON 序列化后的长度计算
+
+    Args:
+        value: 缓存值
+
+    Returns:
+        int: 估算的字节数
+    """
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    try:
+        return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+    except (TypeError, ValueError):
+        return sys.getsizeof(value)
+
+
+class TTLCache:
+    """线程安全的 TTL + LRU 缓存"""
+
+    def __init__(self, max_entries=None, max_bytes=None, ttl=None, sizeof=estimate_size):
+        """
+        Args:
+            max_entries (int, optional): 最大条数，默认读取 MEMORY_CACHE_MAX_ENTRIES 配置
+            max_bytes (int, optional): 最大字节数，默认读取 MEMORY_CACHE_MAX_BYTES 配置，0 表示不限制
+            ttl (float, optional): 默认有效期（秒），None 表示不过期
+            sizeof (callable): 计算条目字节数的函数
+        """
+        self.max_entries = MEMORY_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self.max_bytes = MEMORY_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self._data = OrderedDict()  # 键 -> (值, 过期时间, 字节数)
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+        self._flight = SingleFlight()
+
+    def _remove(self, key):
+        _, _, size = self._data.pop(key)
+        self._bytes -= size
+
+    def get(self, key, default=None):
+        """
+        读取缓存，命中时标记为最近使用
+
+        Args:
+            key: 缓存键
+            default: 未命中或已过期时的返回值
+
+        Returns:
+            缓存值
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return default
+            value, expires_at, _ = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return default
+            self._data.move_to_end(key)
+            self._stats["hits"] += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        """
+        写入缓存，超出上限时淘汰最久未使用的条目
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+            ttl (float, optional): 本条目的有效期（秒），默认使用构造参数
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        size = self.sizeof(value) if self.max_bytes else 0
+
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            # 单个条目超过字节上限时不缓存
+            if self.max_bytes and size > self.max_bytes:
+                return
+            self._data[key] = (value, expires_at, size)
+            self._bytes += size
+            while self._data and (len(self._data) > self.max_entries or
+                                  (self.max_bytes and self._bytes > self.max_bytes)):
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self._stats["evictions"] += 1
+
+    def get_or_set(self, key, fetch_func, ttl=None):
+        """
+        读取缓存，未命中时调用 fetch_func 获取，结果为真值时写入缓存。
+        同一键的并发未命中只调用一次 fetch_func
+
+        Args:
+            key: 缓存键
+            fetch_func (callable): 获取数据的函数
+            ttl (float, optional): 有效期（秒）
+
+        Returns:
+            缓存值或 fetch_func 的返回值
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        return self._flight.do(key, self._fetch_and_set, key, fetch_func, ttl)
+
+    def _fetch_and_set(self, key, fetch_func, ttl):
+        value = fetch_func()
+        if value:
+            self.set(key, value, ttl)
+        return value
+
+    def delete(self, key):
+        """删除一个条目"""
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def stats(self):
+        """
+        获取缓存统计
+
+        Returns:
+            dict: 命中、未命中、过期和淘汰次数，被合并的未命中次数，以及当前条数和字节数
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._data)
+            stats["bytes"] = self._bytes
+        stats["coalesced"] = self._flight.stats()["coalesced"]
+        return stats
@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+分阶段流水线 - 各阶段之间用有界队列连接，每个阶段有独立的并发数
+
+抓取、解析、搜索增强、AI分析和写库原本在同一个调用中串行执行，一次慢的 AI 请求会卡住后续所有抓取。
+流水线中每个阶段由自己的线程消费上游队列，处理完放入下游队列；下游队列满时上游阻塞（背压），
+因此内存占用有上限，慢阶段不会让队列无限堆积。每个阶段的处理量、耗时和队列深度可以通过 stats() 查看。
+
+    pipeline = Pipeline("article")
+    pipeline.add_stage("fetch", fetch, workers=4)
+    pipeline.add_stage("analyze", analyze, workers=8)
+    future = pipeline.submit(item)
+    result = future.result()
+
+阶段函数接收上一阶段的返回值，返回 None 表示该条目到此结束（如抓取失败），不再进入后续阶段。
+"""
+
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+# 通知工作线程退出
+_STOP = object()
+
+
+class _Stage:
+    """流水线中的一个阶段"""
+
+    def __init__(self, name, func, workers, queue_size):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.queue = queue.Queue(maxsize=max(1, queue_size))
+        self.threads = []
+        self.lock = threading.Lock()
+        self.busy = 0
+        self.processed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.blocked_seconds = 0.0
+
+    def stats(self, elapsed):
+        with self.lock:
+            done = self.processed + self.dropped + self.errors
+            return {
+                "workers": self.workers,
+                "queue_depth": self.queue.qsize(),
+                "queue_size": self.queue.maxsize,
+                "busy": self.busy,
+                "processed": self.processed,
+                "dropped": self.dropped,
+                "errors": self.errors,
+                "avg_seconds": round(self.total_seconds / done, 3) if done else 0.0,
+                "throughput": round(done / elapsed, 3) if elapsed > 0 else 0.0,
+                "blocked_seconds": round(self.blocked_seconds, 3)
+            }
+
+
+class Pipeline:
+    """由有界队列连接的多阶段流水线"""
+
+    def __init__(self, name, queue_size=32):
+        """
+        Args:
+            name (str): 名称，用于线程名、日志和统计
+            queue_size (int): 各阶段输入队列的默认容量
+        """
+        self.name = name
+        self.queue_size = queue_size
+        self._stages = []
+        self._lock = threading.Lock()
+        self._started_at = None
+        self._closed = False
+        _register(self)
+
+    def add_stage(self, name, func, workers=1, queue_size=None):
+        """
+        添加一个阶段，须在第一次 submit 之前调用
+
+        Args:
+            name (str): 阶段名称
+            func (callable): 处理函数，参数为上一阶段的返回值，返回 None 表示结束
+            workers (int): 该阶段的并发线程数
+            queue_size (int, optional): 该阶段输入队列的容量，默认使用流水线的 queue_size
+
+        Returns:
+            Pipeline: 自身，便于链式调用
+        """
+        if self._started_at is not None:
+            raise RuntimeError(f"流水线 {self.name} 已启动，不能再添加阶段")
+        self._stages.append(_Stage(name, func, workers, self.queue_size if queue_size is None else queue_size))
+        return self
+
+    def _start(self):
+        with self._lock:
+            if self._started_at is not None:
+                return
+            if not self._stages:
+                raise RuntimeError(f"流水线 {self.name} 没有任何阶段")
+            for index, stage in enumerate(self._stages):
+                for i in range(stage.workers):
+                    thread = threading.Thread(target=self._worker, args=(index,),
+                                              name=f"{self.name}-{stage.name}-{i}", daemon=True)
+                    thread.start()
+                    stage.threads.append(thread)
+            self._started_at = time.time()
+
+    def submit(self, item, timeout=None):
+        """
+        提交一个条目，第一个阶段的队列已满时阻塞
+
+        Args:
+            item: 第一个阶段的输入
+            timeout (float, optional): 最长阻塞时间（秒），超时抛出 queue.Full
+
+        Returns:
+            Future: 条目离开流水线时完成，结果为最后一个阶段的返回值，中途结束或异常时为 None
+        """
+        if self._closed:
+            raise RuntimeError(f"流水线 {self.name} 已关闭")
+        self._start()
+        future = Future()
+        self._stages[0].queue.put((item, future), timeout=timeout)
+        return future
+
+    def _worker(self, index):
+        stage = self._stages[index]
+        next_stage = self._stages[index + 1] if index + 1 < len(self._stages) else None
+        while True:
+            entry = stage.queue.get()
+            if entry is _STOP:
+                return
+            item, future = entry
+            with stage.lock:
+                stage.busy += 1
+            start_time = time.time()
+            try:
+                result = stage.func(item)
+            except Exception as e:
+                logger.error(f"[{self.name}] 阶段 {stage.name} 异常: {str(e)}", exc_info=True)
+                result, failed = None, True
+            else:
+                failed = False
+            with stage.lock:
+                stage.busy -= 1
+                stage.total_seconds += time.time() - start_time
+                if failed:
+                    stage.errors += 1
+                elif result is None:
+                    stage.dropped += 1
+                else:
+                    stage.processed += 1
+
+            if result is None or next_stage is None:
+                future.set_result(result)
+                continue
+            # 下游队列满时阻塞，形成背压
+            wait_start = time.time()
+            next_stage.queue.put((result, future))
+            blocked = time.time() - wait_start
+            if blocked > 0.001:
+                with stage.lock:
+                    stage.blocked_seconds += blocked
+
+    def close(self):
+        """关闭流水线：已提交的条目处理完后工作线程退出，返回时所有工作线程均已结束"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            started = self._started_at is not None
+        if not started:
+            return
+        # 逐个阶段关闭，上游线程全部退出后其条目都已进入下游队列，下游才收到退出信号
+        for stage in self._stages:
+            for _ in stage.threads:
+                stage.queue.put(_STOP)
+            for thread in stage.threads:
+                thread.join()
+
+    def stats(self):
+        """
+        获取各阶段统计
+
+        Returns:
+            dict: 阶段名 -> 并发数、队列深度和容量、处理中数量、完成/结束/异常数、平均耗时、
+                每秒处理量和因下游队列满而阻塞的总时间
+        """
+        elapsed = time.time() - self._started_at if self._started_at else 0
+        return {stage.name: stage.stats(elapsed) for stage in self._stages}
+
+
+_pipelines = {}
+_pipelines_lock = threading.Lock()
+
+
+def _register(pipeline):
+    with _pipelines_lock:
+        _pipelines[pipeline.name] = pipeline
+
+
+def pipeline_stats():
+    """
+    获取本进程中所有流水线的统计
+
+    Returns:
+        dict: 流水线名称 -> 各阶段统计
+    """
+    with _pipelines_lock:
+        pipelines = list(_pipelines.values())
+    return {pipeline.name: pipeline.stats() for pipeline in pipelines}
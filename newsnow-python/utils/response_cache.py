@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+AI 响应缓存 - 多个进程共享的持久化缓存
+
+缓存键是模型、提示词模板版本、请求参数和规范化后消息内容的 SHA-256，
+内容相同的文章无论由哪个调度器或爬虫分析，都只调用一次 DeepSeek。
+缓存保存在 SQLite 中，按有效期过期，超出条数或字节数上限时淘汰最久未访问的条目。
+
+    cache = get_response_cache()
+    key = make_cache_key(model, PROMPT_VERSION, messages, max_tokens=800)
+    content = cache.get(key)
+    if content is None:
+        content = ...调用API...
+        cache.put(key, model, content)
+"""
+
+import json
+import time
+import hashlib
+import logging
+import threading
+# 修改为绝对导入路径
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import (
+    AI_CACHE_ENABLED, AI_CACHE_TTL, AI_CACHE_MAX_ENTRIES, AI_CACHE_MAX_BYTES, AI_CACHE_EVICT_INTERVAL
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(text):
+    """合并连续空白，空白差异不影响缓存键"""
+    return " ".join((text or "").split())
+
+
+def make_cache_key(model, prompt_version, messages, **params):
+    """
+    生成缓存键
+
+    Args:
+        model (str): 模型名称
+        prompt_version (str): 提示词模板版本，模板修改后应更新，使旧缓存失效
+        messages (list): 对话消息列表
+        **params: 影响输出的其他请求参数，如 max_tokens、temperature
+
+    Returns:
+        str: 十六进制的 SHA-256 摘要
+    """
+    material = {
+        "model": model,
+        "version": prompt_version,
+        "messages": [[message.get("role"), _normalize(message.get("content"))] for message in messages],
+        "params": params
+    }
+    return hashlib.sha256(json.dumps(material, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """持久化的 AI 响应缓存"""
+
+    def __init__(self, store, ttl=None, max_entries=None, max_bytes=None, evict_interval=None):
+        """
+        Args:
+            store (SQLiteClient): 缓存存储
+            ttl (int, optional): 有效期（秒），默认读取 AI_CACHE_TTL 配置
+            max_entries (int, optional): 最大条数，默认读取 AI_CACHE_MAX_ENTRIES 配置
+            max_bytes (int, optional): 最大字节数，默认读取 AI_CACHE_MAX_BYTES 配置
+            evict_interval (int, optional): 每写入多少条执行一次淘汰
+        """
+        self.store = store
+        self.ttl = AI_CACHE_TTL if ttl is None else ttl
+        self.max_entries = AI_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self.max_bytes = AI_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.evict_interval = max(1, AI_CACHE_EVICT_INTERVAL if evict_interval is None else evict_interval)
+        self._lock = threading.Lock()
+        self._puts_since_evict = 0
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def get(self, key):
+        """
+        读取缓存
+
+        Args:
+            key (str): 缓存键
+
+        Returns:
+            str: 缓存的响应内容，未命中时返回 None
+        """
+        response = self.store.get_cached_response(key, time.time() - self.ttl)
+        with self._lock:
+            self._stats["hits" if response is not None else "misses"] += 1
+        return response
+
+    def put(self, key, model, response):
+        """
+        写入缓存，每 evict_interval 次写入执行一次过期清理和容量淘汰
+
+        Args:
+            key (str): 缓存键
+            model (str): 模型名称
+            response (str): 响应内容，为空时不缓存
+        """
+        if not response:
+            return
+        if not self.store.save_cached_response(key, model, response):
+            return
+        with self._lock:
+            self._stats["stores"] += 1
+            self._puts_since_evict += 1
+            evict = self._puts_since_evict >= self.evict_interval
+            if evict:
+                self._puts_since_evict = 0
+        if evict:
+            self.evict()
+
+    def invalidate(self, key):
+        """
+        删除一条缓存，用于响应内容无法使用的情况
+
+        Args:
+            key (str): 缓存键
+        """
+        self.store.delete_cached_response(key)
+
+    def evict(self):
+        """
+        清理过期条目并按容量淘汰
+
+        Returns:
+            int: 删除的条数
+        """
+        deleted = self.store.evict_cached_responses(time.time() - self.ttl, self.max_entries, self.max_bytes)
+        if deleted:
+            with self._lock:
+                self._stats["evictions"] += deleted
+            logger.info(f"AI响应缓存淘汰 {deleted} 条")
+        return deleted
+
+    def stats(self):
+        """
+        获取缓存统计
+
+        Returns:
+            dict: 本进程的命中、未命中、写入和淘汰次数，命中率，以及缓存的总条数和字节数
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        storage = self.store.get_response_cache_stats()
+        stats["entries"] = storage["entries"]
+        stats["bytes"] = storage["bytes"]
+        return stats
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """
+    获取全局 AI 响应缓存，默认使用 SQLiteClient 的数据库
+
+    Returns:
+        ResponseCache: 缓存实例，AI_CACHE_ENABLED 关闭时返回 None
+    """
+    global _response_cache
+    if not AI_CACHE_ENABLED:
+        return None
+    with _response_cache_lock:
+        if _response_cache is None:
+            from db.sqlite_client import SQLiteClient
+            _response_cache = ResponseCache(SQLiteClient())
+        return _response_cache
+
+
+def set_response_cache(cache):
+    """
+    设置全局 AI 响应缓存
+
+    Args:
+        cache (ResponseCache): 缓存实例，为 None 时下次使用重新创建默认缓存
+    """
+    global _response_cache
+    with _response_cache_lock:
+        _response_cache = cache
@@ -0,0 +1,316 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+运行时容器 - 长期运行的进程中只创建一次抓取器、处理器和数据库客户端
+
+定时任务原本每次执行都新建 ArticleCrawler / ArticleProcessor，连带重新创建所有爬虫、搜索服务、
+AI 分析器和数据库客户端，内存缓存、连接池和去重过滤器每次都从零开始。运行时容器按名称懒加载这些组件，
+之后的任务直接复用；环境变量文件变化（或收到 SIGHUP）时重新加载配置并重建组件。
+
+    runtime = get_runtime()
+    runtime.run("crawl", crawl_articles_job, logger)   # 任务内通过 runtime.get("crawler") 取组件
+"""
+
+import os
+import sys
+import time
+import signal
+import logging
+import importlib
+import threading
+# 修改为绝对导入路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config.settings as settings
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_MISSING = object()
+
+
+def _build_db_client(runtime):
+    from db.sqlite_client import SQLiteClient
+    return SQLiteClient()
+
+
+def _build_crawler(runtime):
+    from processors.article_crawler import ArticleCrawler
+    return ArticleCrawler()
+
+
+def _build_processor(runtime):
+    from processors.article_analyzer import ArticleProcessor
+    return ArticleProcessor()
+
+
+def _build_search_analyzer(runtime):
+    from processors.search_analyzer import SearchAnalyzer
+    analyzer = SearchAnalyzer()
+    # 与抓取器共用同一组爬虫实例
+    analyzer.crawler_factory = runtime.get("crawler").crawler_factory
+    return analyzer
+
+
+def _build_enhancer(runtime):
+    from processors.content_quality_enhancer import ContentQualityEnhancer
+    return ContentQualityEnhancer()
+
+
+def _build_search_service(runtime):
+    from utils.search_service import SearchService
+    return SearchService()
+
+
+def _build_dedup_filter(runtime):
+    if not settings.DEDUP_FILTER_ENABLED:
+        return None
+    from utils.dedup_filter import get_dedup_filter
+    # 与抓取器共用进程级的过滤器
+    return get_dedup_filter(runtime.get("db_client"))
+
+
+def _build_flash_poller(runtime):
+    from processors.flash_poller import FlashPoller
+    # 与抓取器共用数据库客户端和爬虫实例；条件请求的校验信息按作用域分开记录，轮询器不会让抓取器收到 304
+    return FlashPoller(runtime.get("db_client"), runtime.get("crawler").crawler_factory)
+
+
+# 组件名称 -> 创建函数，参数为运行时本身，便于组件之间共享
+DEFAULT_FACTORIES = {
+    "db_client": _build_db_client,
+    "crawler": _build_crawler,
+    "processor": _build_processor,
+    "search_analyzer": _build_search_analyzer,
+    "enhancer": _build_enhancer,
+    "search_service": _build_search_service,
+    "dedup_filter": _build_dedup_filter,
+    "flash_poller": _build_flash_poller,
+}
+
+
+def read_env_file(path):
+    """
+    读取环境变量文件
+
+    Args:
+        path (str): 文件路径，每行 KEY=VALUE，# 开头为注释
+
+    Returns:
+        dict: 变量字典，文件不存在时为空
+    """
+    values = {}
+    if not os.path.exists(path):
+        return values
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#') and '=' in line:
+                key, value = line.split('=', 1)
+                values[key.strip()] = value.strip()
+    return values
+
+
+def reload_settings():
+    """
+    按当前环境变量重新计算 config.settings 中的配置
+
+    各模块通过 from config.settings import X 得到的是值的副本，这里把项目内模块中
+    仍指向旧值的同名变量一并更新为新值。
+
+    Returns:
+        dict: 变化的配置项 -> 新值
+    """
+    old = {name: value for name, value in vars(settings).items() if name.isupper()}
+    importlib.reload(settings)
+    new = {name: value for name, value in vars(settings).items() if name.isupper()}
+    changed = {name: value for name, value in new.items() if old.get(name, _MISSING) != value}
+    if not changed:
+        return changed
+
+    for module in list(sys.modules.values()):
+        module_file = getattr(module, "__file__", None) or ""
+        if module is settings or not os.path.abspath(module_file).startswith(PROJECT_ROOT):
+            continue
+        for name, value in changed.items():
+            if name in old and getattr(module, name, _MISSING) is old[name]:
+                setattr(module, name, value)
+    return changed
+
+
+class Runtime:
+    """长期运行进程的组件容器"""
+
+    def __init__(self, env_file=None, factories=None):
+        """
+        Args:
+            env_file (str, optional): 监视的环境变量文件，默认读取 RUNTIME_ENV_FILE 配置
+            factories (dict, optional): 额外或替换的组件创建函数
+        """
+        self.env_file = env_file or settings.RUNTIME_ENV_FILE
+        self._factories = dict(DEFAULT_FACTORIES, **(factories or {}))
+        self._components = {}
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._env_keys = set()
+        self._env_mtime = self._read_mtime()
+        self._reload_requested = False
+        self.generation = 0
+        self._stats = {"reloads": 0, "builds": {}, "jobs": {}}
+
+    def _read_mtime(self):
+        try:
+            return os.path.getmtime(self.env_file)
+        except OSError:
+            return None
+
+    def get(self, name):
+        """
+        获取组件，第一次获取时创建，之后的任务复用同一实例
+
+        Args:
+            name (str): 组件名称，如 crawler、processor、db_client
+
+        Returns:
+            组件实例（功能关闭时可能为 None）
+        """
+        start_time = time.time()
+        with self._lock:
+            component = self._components.get(name, _MISSING)
+            if component is _MISSING:
+                factory = self._factories.get(name)
+                if factory is None:
+                    raise KeyError(f"未知的组件: {name}")
+                component = factory(self)
+                self._components[name] = component
+                builds = self._stats["builds"]
+                builds[name] = builds.get(name, 0) + 1
+                logger.info(f"运行时创建组件 {name}，耗时 {time.time() - start_time:.3f}秒")
+        # 记入当前任务的准备耗时
+        if hasattr(self._local, "setup"):
+            self._local.setup += time.time() - start_time
+        return component
+
+    def request_reload(self, *args):
+        """请求在下一个任务开始前重新加载配置，可直接用作信号处理函数"""
+        self._reload_requested = True
+
+    def install_signal_handler(self):
+        """收到 SIGHUP 时重新加载配置（仅限支持该信号的平台，且须在主线程调用）"""
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, self.request_reload)
+
+    def check_reload(self):
+        """
+        环境变量文件有变化或收到重新加载请求时重新加载配置
+
+        Returns:
+            dict: 变化的配置项，没有重新加载时为空
+        """
+        mtime = self._read_mtime()
+        if not self._reload_requested and mtime == self._env_mtime:
+            return {}
+        self._reload_requested = False
+        self._env_mtime = mtime
+        return self.reload_config()
+
+    def reload_config(self):
+        """
+        从环境变量文件重新加载配置，配置有变化时关闭并丢弃所有组件，下次获取时按新配置创建
+
+        Returns:
+            dict: 变化的配置项 -> 新值
+        """
+        with self._lock:
+            values = read_env_file(self.env_file)
+            # 从文件中删除的变量同样从环境中移除
+            for key in self._env_keys - set(values):
+                os.environ.pop(key, None)
+            os.environ.update(values)
+            self._env_keys = set(values)
+
+            changed = reload_settings()
+            if changed:
+                self.reset()
+                self._stats["reloads"] += 1
+                logger.info(f"配置已重新加载，变化项: {', '.join(sorted(changed))}")
+            return changed
+
+    def reset(self):
+        """关闭并丢弃所有组件"""
+        with self._lock:
+            components = list(self._components.items())
+            self._components.clear()
+            self.generation += 1
+        for name, component in reversed(components):
+            try:
+                if hasattr(component, "close"):
+                    component.close()
+                elif hasattr(component, "save"):
+                    component.save()
+            except Exception as e:
+                logger.error(f"关闭组件 {name} 异常: {str(e)}")
+
+    def run(self, name, func, *args, **kwargs):
+        """
+        执行一次任务：必要时先重新加载配置，并记录准备组件和执行的耗时
+
+        Args:
+            name (str): 任务名称，用于统计
+            func (callable): 任务函数，通过 runtime.get 获取组件
+            *args, **kwargs: 传给 func 的参数
+
+        Returns:
+            func 的返回值
+        """
+        start_time = time.time()
+        self.check_reload()
+        self._local.setup = time.time() - start_time
+        try:
+            return func(*args, **kwargs)
+        finally:
+            setup = self._local.setup
+            del self._local.setup
+            elapsed = time.time() - start_time
+            with self._lock:
+                job = self._stats["jobs"].setdefault(name, {"runs": 0, "setup_seconds": 0.0, "total_seconds": 0.0})
+                job["runs"] += 1
+                job["setup_seconds"] += setup
+                job["total_seconds"] += elapsed
+                job["last_setup_seconds"] = setup
+                job["last_total_seconds"] = elapsed
+            logger.info(f"任务 {name} 第 {job['runs']} 次执行: 准备组件 {setup:.3f}秒, 总耗时 {elapsed:.2f}秒")
+
+    def stats(self):
+        """
+        Returns:
+            dict: 已创建的组件、各组件创建次数、配置重新加载次数和各任务的准备/总耗时
+        """
+        with self._lock:
+            return {
+                "components": sorted(self._components),
+                "generation": self.generation,
+                "reloads": self._stats["reloads"],
+                "builds": dict(self._stats["builds"]),
+                "jobs": {name: dict(job) for name, job in self._stats["jobs"].items()}
+            }
+
+
+_runtime = None
+_runtime_lock = threading.Lock()
+
+
+def get_runtime():
+    """
+    获取进程内共享的运行时
+
+    Returns:
+        Runtime: 运行时
+    """
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None:
+            _runtime = Runtime()
+        return _runtime
@@ -5,7 +5,6 @@
 搜索服务 - 提供与SearXNG的交互接口
 """
 
-import requests
 import logging
 import time
 import json
@@ -16,6 +15,9 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.settings import SEARXNG_URL, SEARXNG_TIMEOUT, SEARCH_CACHE_TTL
+from utils import http_client
+from utils.lru_cache import TTLCache
+from utils.single_flight import get_single_flight
 
 logger = logging.getLogger(__name__)
 
@@ -30,8 +32,9 @@ class SearchService:
             base_url (str, optional): SearXNG服务的基础URL，默认使用配置文件中的设置
         """
         self.base_url = base_url or SEARXNG_URL
-        self.search_cache = {}  # 简单的内存缓存
         self.cache_ttl = SEARCH_CACHE_TTL  # 缓存过期时间（秒）
+        self.search_cache = TTLCache(ttl=self.cache_ttl)  # 有界的内存缓存
+        self.search_flight = get_single_flight("search")  # 合并并发的相同查询
         logger.info(f"搜索服务初始化完成，使用服务器: {self.base_url}")
     
     def search(self, query, category="finance", language="zh-CN", time_range=None, max_results=10):
@@ -52,12 +55,19 @@ class SearchService:
         cache_key = f"{query}:{category}:{language}:{time_range}:{max_results}"
         
         # 检查缓存
-        if cache_key in self.search_cache:
-            cache_entry = self.search_cache[cache_key]
-            if time.time() - cache_entry["timestamp"] < self.cache_ttl:
-                logger.info(f"从缓存获取搜索结果: {query}")
-                return cache_entry["results"]
-        
+        cached_results = self.search_cache.get(cache_key)
+        if cached_results is not None:
+            logger.info(f"从缓存获取搜索结果: {query}")
+            return cached_results
+        
+        # 其他调用者正在执行相同查询时，等待并共享其结果
+        return self.search_flight.do(
+            (self.base_url, cache_key), self._search_uncached,
+            cache_key, query, category, language, time_range, max_results
+        )
+    
+    def _search_uncached(self, cache_key, query, category, language, time_range, max_results):
+        """向 SearXNG 发起搜索并写入缓存"""
         logger.info(f"执行搜索查询: {query}, 类别: {category}")
         
         # 构建请求参数
@@ -75,7 +85,7 @@ class SearchService:
         
         try:
             search_url = f"{self.base_url}/search"
-            response = requests.get(
+            response = http_client.get(
                 search_url,
                 params=params,
                 timeout=SEARXNG_TIMEOUT
@@ -90,10 +100,7 @@ class SearchService:
             results = self._process_search_results(data)
             
             # 更新缓存
-            self.search_cache[cache_key] = {
-                "timestamp": time.time(),
-                "results": results
-            }
+            self.search_cache.set(cache_key, results)
             
             logger.info(f"搜索查询成功: {query}, 获取到 {len(results)} 条结果")
             return results
@@ -180,7 +187,7 @@ class SearchService:
     
     def clear_cache(self):
         """清除搜索缓存"""
-        self.search_cache = {}
+        self.search_cache.clear()
         logger.info("搜索缓存已清除")
     
     def health_check(self):
@@ -191,7 +198,7 @@ class SearchService:
             bool: 服务是否可用
         """
         try:
-            response = requests.get(
+            response = http_client.get(
                 f"{self.base_url}/healthz",
                 timeout=3
             )
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+请求合并 - 相同键的并发调用共享一次正在进行的计算
+
+调度器、批量分析和 API 可能同时请求同一篇文章的详情、同一个搜索词或同一段提示词的分析，
+第一个调用者执行计算，其余调用者等待并拿到同一个结果（或同一个异常）。
+计算完成后键即被释放，之后的调用重新执行，结果的复用交给各自的缓存。
+
+    flight = get_single_flight("search")
+    results = flight.do(cache_key, fetch_func)
+
+注意：合并的调用者拿到的是同一个对象，调用方不应修改返回值。
+"""
+
+import threading
+import logging
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """一次正在进行的计算，结果或异常放在 future 中"""
+
+    def __init__(self):
+        self.future = Future()
+        self.waiters = 0
+
+
+class SingleFlight:
+    """按键合并并发调用"""
+
+    def __init__(self, name=None):
+        """
+        Args:
+            name (str, optional): 名称，用于日志和统计
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = {"calls": 0, "executions": 0, "coalesced": 0, "errors": 0}
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        执行 func(*args, **kwargs)，同一键已有计算在进行时等待其结果
+
+        Args:
+            key: 合并键，需可哈希
+            func (callable): 计算函数
+            *args, **kwargs: 传给 func 的参数
+
+        Returns:
+            func 的返回值；计算抛出异常时，所有等待者都会收到同一个异常
+        """
+        call, leader = self._join(key)
+        if not leader:
+            logger.debug(f"[{self.name}] 合并重复请求: {key}")
+            return call.future.result()
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, call, error=e)
+            raise
+        self._finish(key, call, result=result)
+        return result
+
+    def submit(self, key, start):
+        """
+        异步版本的 do：start() 启动计算并返回 Future，同一键已有计算在进行时（包括 do 发起的）不再启动
+
+        Args:
+            key: 合并键，需可哈希
+            start (callable): 启动计算的函数，返回 concurrent.futures.Future
+
+        Returns:
+            Future: 计算完成时完成，同一键的并发调用者拿到同一个 Future
+        """
+        call, leader = self._join(key)
+        if not leader:
+            logger.debug(f"[{self.name}] 合并重复请求: {key}")
+            return call.future
+
+        try:
+            future = start()
+        except BaseException as e:
+            self._finish(key, call, error=e)
+            raise
+
+        def on_done(done):
+            error = done.exception()
+            if error is not None:
+                self._finish(key, call, error=error)
+            else:
+                self._finish(key, call, result=done.result())
+
+        future.add_done_callback(on_done)
+        return call.future
+
+    def _join(self, key):
+        """登记一次调用，返回 (计算, 是否由本次调用执行)"""
+        with self._lock:
+            self._stats["calls"] += 1
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._stats["coalesced"] += 1
+                return call, False
+            call = self._calls[key] = _Call()
+            self._stats["executions"] += 1
+            return call, True
+
+    def _finish(self, key, call, result=None, error=None):
+        """释放键并把结果交给所有等待者"""
+        with self._lock:
+            if error is not None:
+                self._stats["errors"] += 1
+            self._calls.pop(key, None)
+        if error is not None:
+            call.future.set_exception(error)
+        else:
+            call.future.set_result(result)
+
+    def in_flight(self):
+        """
+        Returns:
+            int: 正在进行的计算数
+        """
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self):
+        """
+        获取合并统计
+
+        Returns:
+            dict: 调用次数、实际执行次数、被合并的次数、异常次数和正在进行的计算数
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._calls)
+        return stats
+
+
+_groups = {}
+_groups_lock = threading.Lock()
+
+
+def get_single_flight(name):
+    """
+    获取指定名称的全局合并组，同一进程内所有实例共享
+
+    Args:
+        name (str): 名称，如 "article_detail"、"search"、"deepseek"
+
+    Returns:
+        SingleFlight: 合并组
+    """
+    with _groups_lock:
+        group = _groups.get(name)
+        if group is None:
+            group = _groups[name] = SingleFlight(name)
+        return group
+
+
+def single_flight_stats():
+    """
+    获取所有全局合并组的统计
+
+    Returns:
+        dict: 名称 -> 统计
+    """
+    with _groups_lock:
+        groups = list(_groups.values())
+    return {group.name: group.stats() for group in groups}